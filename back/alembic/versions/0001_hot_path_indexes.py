@@ -0,0 +1,87 @@
+"""Índices compuestos para los accesos frecuentes y eliminación de índices redundantes
+
+Los índices se crean y eliminan con CONCURRENTLY para no bloquear escrituras,
+por eso cada operación va en un bloque autocommit (fuera de la transacción
+de la migración). Primero se crean los índices nuevos y después se eliminan
+los antiguos, de forma que las consultas nunca se quedan sin índice.
+
+Revision ID: 0001_hot_path_indexes
+Revises:
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_hot_path_indexes"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (nombre, tabla, columnas)
+COMPOSITE_INDEXES = (
+    ("ix_items_wishlist_id_created_at", "items", ["wishlist_id", "created_at"]),
+    ("ix_item_claims_item_id_status", "item_claims", ["item_id", "status"]),
+    ("ix_wishlist_permissions_subject", "wishlist_permissions", ["subject_kind", "subject_id", "wishlist_id"]),
+    ("ix_contribution_invites_subject_status", "contribution_invites", ["subject_kind", "subject_id", "status"]),
+    ("ix_item_acl_subject", "item_acl", ["subject_kind", "subject_id"]),
+)
+
+# Índices sobre la clave primaria (duplican el índice de la PK)
+PRIMARY_KEY_INDEXES = (
+    ("ix_auth_identity_id", "auth_identity"),
+    ("ix_contribution_invites_id", "contribution_invites"),
+    ("ix_groups_id", "groups"),
+    ("ix_items_id", "items"),
+    ("ix_item_activity_id", "item_activity"),
+    ("ix_item_claims_id", "item_claims"),
+    ("ix_item_contributions_id", "item_contributions"),
+    ("ix_sessions_id", "sessions"),
+    ("ix_tags_id", "tags"),
+    ("ix_users_id", "users"),
+    ("ix_wishlists_id", "wishlists"),
+    ("ix_wishlist_permissions_id", "wishlist_permissions"),
+)
+
+# Índices de una columna cubiertos por una restricción única o un índice compuesto,
+# o de muy baja cardinalidad ('user'/'group')
+REDUNDANT_INDEXES = (
+    ("ix_auth_identity_provider", "auth_identity", ["provider"]),  # uq_provider_user_id
+    ("ix_items_wishlist_id", "items", ["wishlist_id"]),  # ix_items_wishlist_id_created_at
+    ("ix_item_claims_item_id", "item_claims", ["item_id"]),  # uq_item_claim
+    ("ix_item_contributions_item_id", "item_contributions", ["item_id"]),  # uq_item_contribution
+    ("ix_wishlist_permissions_wishlist_id", "wishlist_permissions", ["wishlist_id"]),  # uq_wishlist_permission
+    ("ix_wishlist_permissions_subject_kind", "wishlist_permissions", ["subject_kind"]),
+    ("ix_wishlist_permissions_subject_id", "wishlist_permissions", ["subject_id"]),  # ix_wishlist_permissions_subject
+    ("ix_item_acl_subject_kind", "item_acl", ["subject_kind"]),
+    ("ix_item_acl_subject_id", "item_acl", ["subject_id"]),  # ix_item_acl_subject
+)
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in COMPOSITE_INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+        for name, table in PRIMARY_KEY_INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+        for name, table, _ in REDUNDANT_INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in REDUNDANT_INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+        for name, table in PRIMARY_KEY_INDEXES:
+            op.create_index(name, table, ["id"], postgresql_concurrently=True, if_not_exists=True)
+
+        for name, table, _ in COMPOSITE_INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,62 @@
+"""Versión de concurrencia optimista en item_claims y un único claim activo por item
+
+Antes de crear el índice único parcial se liberan los claims activos
+duplicados de un mismo item (se conserva el más antiguo).
+
+Revision ID: 0002_item_claim_version
+Revises: 0001_hot_path_indexes
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_item_claim_version"
+down_revision: Union[str, None] = "0001_hot_path_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # ADD COLUMN con DEFAULT constante no reescribe la tabla (PostgreSQL 11+)
+    op.add_column(
+        "item_claims",
+        sa.Column("version", sa.Integer(), nullable=False, server_default="1"),
+    )
+    op.execute("""
+        UPDATE item_claims c
+        SET status = 'released', version = version + 1, updated_at = now()
+        WHERE c.status IN ('claimed', 'purchased')
+          AND EXISTS (
+              SELECT 1 FROM item_claims o
+              WHERE o.item_id = c.item_id
+                AND o.status IN ('claimed', 'purchased')
+                AND (o.created_at, o.id) < (c.created_at, c.id)
+          )
+    """)
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "uq_item_claims_active_item",
+            "item_claims",
+            ["item_id"],
+            unique=True,
+            postgresql_where=sa.text("status IN ('claimed', 'purchased')"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "uq_item_claims_active_item",
+            table_name="item_claims",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column("item_claims", "version")
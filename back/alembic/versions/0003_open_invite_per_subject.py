@@ -0,0 +1,59 @@
+"""Una invitación vigente por sujeto e item en contribution_invites
+
+Permite deduplicar el envío masivo de invitaciones con ON CONFLICT DO NOTHING.
+Antes de crear el índice se marcan como expiradas las invitaciones vigentes
+duplicadas (se conserva la más antigua).
+
+Revision ID: 0003_open_invite_per_subject
+Revises: 0002_item_claim_version
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_open_invite_per_subject"
+down_revision: Union[str, None] = "0002_item_claim_version"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        UPDATE contribution_invites c
+        SET status = 'expired'
+        WHERE c.status IN ('pending', 'accepted')
+          AND EXISTS (
+              SELECT 1 FROM contribution_invites o
+              WHERE o.item_id = c.item_id
+                AND o.subject_kind = c.subject_kind
+                AND o.subject_id = c.subject_id
+                AND o.status IN ('pending', 'accepted')
+                AND (o.created_at, o.id) < (c.created_at, c.id)
+          )
+    """)
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "uq_contribution_invites_open_subject",
+            "contribution_invites",
+            ["item_id", "subject_kind", "subject_id"],
+            unique=True,
+            postgresql_where=sa.text("status IN ('pending', 'accepted')"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "uq_contribution_invites_open_subject",
+            table_name="contribution_invites",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,55 @@
+"""Índices para el barrido de invitaciones, sesiones y claims caducados
+
+Revision ID: 0004_maintenance_sweep_indexes
+Revises: 0003_open_invite_per_subject
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_maintenance_sweep_indexes"
+down_revision: Union[str, None] = "0003_open_invite_per_subject"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_sessions_expires_at",
+            "sessions",
+            ["expires_at"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_contribution_invites_pending_created_at",
+            "contribution_invites",
+            ["created_at"],
+            postgresql_where=sa.text("status = 'pending'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_item_claims_interested_updated_at",
+            "item_claims",
+            ["updated_at"],
+            postgresql_where=sa.text("status = 'interested'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table in (
+            ("ix_item_claims_interested_updated_at", "item_claims"),
+            ("ix_contribution_invites_pending_created_at", "contribution_invites"),
+            ("ix_sessions_expires_at", "sessions"),
+        ):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
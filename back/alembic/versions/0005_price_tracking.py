@@ -0,0 +1,82 @@
+"""Seguimiento de precios: product_prices, price_history y claves de URL normalizada
+
+- ``items.source_url_key``: URL normalizada (la rellena el planificador por lotes)
+- ``wishlists.event_date``: fecha del evento de la lista (prioriza el refresco)
+- ``product_prices``: un producto seguido por URL normalizada con su último precio
+- ``price_history``: cambios de precio por producto
+
+Revision ID: 0005_price_tracking
+Revises: 0004_maintenance_sweep_indexes
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_price_tracking"
+down_revision: Union[str, None] = "0004_maintenance_sweep_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Columnas nullable sin DEFAULT: no reescriben la tabla
+    op.add_column("items", sa.Column("source_url_key", sa.Text(), nullable=True))
+    op.add_column("wishlists", sa.Column("event_date", sa.Date(), nullable=True))
+
+    op.create_table(
+        "product_prices",
+        sa.Column("url_key", sa.Text(), primary_key=True),
+        sa.Column("source_url", sa.Text(), nullable=False),
+        sa.Column("price_cents", sa.Integer(), nullable=True),
+        sa.Column("previous_price_cents", sa.Integer(), nullable=True),
+        sa.Column("currency", sa.Text(), nullable=True),
+        sa.Column("available", sa.Boolean(), nullable=True),
+        sa.Column("observed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("next_check_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("next_event_on", sa.Date(), nullable=True),
+        sa.Column("failures", sa.SmallInteger(), nullable=False, server_default="0"),
+    )
+    op.create_index("ix_product_prices_next_check_at", "product_prices", ["next_check_at"])
+    op.create_index(
+        "ix_product_prices_next_event_on",
+        "product_prices",
+        ["next_event_on"],
+        postgresql_where=sa.text("next_event_on IS NOT NULL"),
+    )
+
+    op.create_table(
+        "price_history",
+        sa.Column(
+            "url_key",
+            sa.Text(),
+            sa.ForeignKey("product_prices.url_key", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("observed_at", sa.DateTime(timezone=True), primary_key=True),
+        sa.Column("price_cents", sa.Integer(), nullable=True),
+        sa.Column("currency", sa.Text(), nullable=True),
+        sa.Column("available", sa.Boolean(), nullable=True),
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_items_source_url_key",
+            "items",
+            ["source_url_key"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_items_source_url_key", table_name="items", postgresql_concurrently=True, if_exists=True)
+    op.drop_table("price_history")
+    op.drop_table("product_prices")
+    op.drop_column("wishlists", "event_date")
+    op.drop_column("items", "source_url_key")
@@ -0,0 +1,36 @@
+"""Tabla de tipos de cambio
+
+Se crea con la moneda base por defecto (EUR = 1); el resto se carga con
+``python -m app.cli.currency_rates``.
+
+Revision ID: 0006_currency_rates
+Revises: 0005_price_tracking
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006_currency_rates"
+down_revision: Union[str, None] = "0005_price_tracking"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "currency_rates",
+        sa.Column("currency", sa.Text(), primary_key=True),
+        sa.Column("units_per_base", sa.Numeric(20, 10), nullable=False),
+        sa.Column("source", sa.Text(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    op.execute("INSERT INTO currency_rates (currency, units_per_base, source) VALUES ('EUR', 1, 'base')")
+
+
+def downgrade() -> None:
+    op.drop_table("currency_rates")
@@ -0,0 +1,46 @@
+"""Tabla de claves de idempotencia
+
+Guarda la huella y la respuesta de los POST con cabecera Idempotency-Key
+para repetir los reintentos sin volver a ejecutarlos. Las filas caducan
+(``expires_at``) y las borra el barrido de mantenimiento.
+
+Revision ID: 0007_idempotency_keys
+Revises: 0006_currency_rates
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007_idempotency_keys"
+down_revision: Union[str, None] = "0006_currency_rates"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "idempotency_keys",
+        sa.Column("scope", sa.Text(), primary_key=True),
+        sa.Column("key", sa.Text(), primary_key=True),
+        sa.Column("fingerprint", sa.Text(), nullable=False),
+        sa.Column("status", sa.Text(), nullable=False),
+        sa.Column("response_status", sa.SmallInteger(), nullable=True),
+        sa.Column("content_type", sa.Text(), nullable=True),
+        sa.Column("response_body", postgresql.BYTEA(), nullable=True),
+        sa.Column("locked_until", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.CheckConstraint("status IN ('in_progress', 'completed')", name="check_idempotency_status_valid"),
+    )
+    op.create_index("ix_idempotency_keys_expires_at", "idempotency_keys", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_idempotency_keys_expires_at", table_name="idempotency_keys")
+    op.drop_table("idempotency_keys")
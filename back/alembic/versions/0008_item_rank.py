@@ -0,0 +1,54 @@
+"""Orden de los items dentro de su lista: items.rank
+
+``rank`` es una clave de orden fraccionaria (``app.utils.ranking``) con
+``COLLATE "C"`` para que PostgreSQL compare bytes, igual que Python. La
+columna es nullable sin DEFAULT (no reescribe la tabla): el reequilibrado
+de ``rank_service`` numera las listas existentes por lotes en segundo plano.
+
+Revision ID: 0008_item_rank
+Revises: 0007_idempotency_keys
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008_item_rank"
+down_revision: Union[str, None] = "0007_idempotency_keys"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Fijado aquí (y no importado de app.utils.ranking) para que la migración no cambie
+REBALANCE_LENGTH = 24
+
+
+def upgrade() -> None:
+    op.add_column("items", sa.Column("rank", sa.Text(collation="C"), nullable=True))
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_items_wishlist_id_rank",
+            "items",
+            ["wishlist_id", sa.text("rank NULLS FIRST")],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_items_rank_rebalance",
+            "items",
+            ["wishlist_id"],
+            postgresql_where=sa.text(f"rank IS NULL OR length(rank) > {REBALANCE_LENGTH}"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in ("ix_items_rank_rebalance", "ix_items_wishlist_id_rank"):
+            op.drop_index(name, table_name="items", postgresql_concurrently=True, if_exists=True)
+    op.drop_column("items", "rank")
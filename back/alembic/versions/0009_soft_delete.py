@@ -0,0 +1,87 @@
+"""Borrado diferido de usuarios y listas: deleted_at y claves foráneas con ON DELETE
+
+- ``users.deleted_at`` y ``wishlists.deleted_at``: marca de borrado; la
+  purga por lotes (``app.services.deletion_service``) elimina las filas después
+- ``item_activity.actor_id`` y ``contribution_invites.inviter_id`` pasan a
+  ``ON DELETE CASCADE`` y ``group_members.added_by`` a ``ON DELETE SET NULL``
+  (nullable): con ``passive_deletes`` el ORM ya no borra esas filas por su cuenta
+- Índices para que la purga y las acciones de las claves foráneas no recorran tablas enteras
+
+Las claves foráneas se crean ``NOT VALID`` y se validan después: la
+validación no bloquea escrituras.
+
+Revision ID: 0009_soft_delete
+Revises: 0008_item_rank
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009_soft_delete"
+down_revision: Union[str, None] = "0008_item_rank"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (tabla, columna, ON DELETE nuevo)
+FOREIGN_KEYS = (
+    ("item_activity", "actor_id", "CASCADE"),
+    ("contribution_invites", "inviter_id", "CASCADE"),
+    ("group_members", "added_by", "SET NULL"),
+)
+
+# (nombre, tabla, columnas, predicado)
+INDEXES = (
+    ("ix_users_deleted_at", "users", ["deleted_at"], "deleted_at IS NOT NULL"),
+    ("ix_wishlists_deleted_at", "wishlists", ["deleted_at"], "deleted_at IS NOT NULL"),
+    ("ix_contribution_invites_inviter_id", "contribution_invites", ["inviter_id"], None),
+    ("ix_group_members_user_id", "group_members", ["user_id"], None),
+    ("ix_group_members_added_by", "group_members", ["added_by"], None),
+)
+
+
+def _replace_foreign_keys(on_delete: dict[str, str]) -> None:
+    for table, column, _ in FOREIGN_KEYS:
+        name = f"{table}_{column}_fkey"
+        op.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {name}")
+        op.execute(
+            f"ALTER TABLE {table} ADD CONSTRAINT {name} FOREIGN KEY ({column}) "
+            f"REFERENCES users (id) ON DELETE {on_delete[table]} NOT VALID"
+        )
+
+
+def upgrade() -> None:
+    # Columnas nullable sin DEFAULT: no reescriben la tabla
+    op.add_column("users", sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("wishlists", sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True))
+    op.alter_column("group_members", "added_by", existing_type=sa.UUID(), nullable=True)
+    _replace_foreign_keys({table: action for table, _, action in FOREIGN_KEYS})
+
+    with op.get_context().autocommit_block():
+        for table, column, _ in FOREIGN_KEYS:
+            op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {table}_{column}_fkey")
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_where=sa.text(where) if where else None,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+    _replace_foreign_keys({table: "NO ACTION" for table, _, _ in FOREIGN_KEYS})
+    op.execute("DELETE FROM group_members WHERE added_by IS NULL")
+    op.alter_column("group_members", "added_by", existing_type=sa.UUID(), nullable=False)
+    op.drop_column("wishlists", "deleted_at")
+    op.drop_column("users", "deleted_at")
@@ -0,0 +1 @@
+"""Benchmarks de la API (ejecutar desde back/ con ``python -m benchmarks.<módulo>``)."""
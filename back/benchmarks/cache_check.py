@@ -0,0 +1,193 @@
+"""
+Comprobación de la caché de lecturas (app.core.cache)
+
+Ejecuta los dos backends: ``memory`` y ``redis`` contra un servidor local
+mínimo con protocolo Redis (GET, SET EX, MGET, PING) levantado por el propio
+script. No necesita base de datos ni un Redis real; con ``--redis-url``
+se usa un servidor existente en su lugar.
+
+Comprueba:
+- N hilos pidiendo la misma clave en frío ejecutan un solo cálculo (single-flight)
+- Aciertos, fallos y ratio de aciertos en las métricas
+- Invalidar una etiqueta descarta sus entradas, también en otra instancia
+  (otro worker) que comparte el backend ``redis``
+- Un cálculo que empieza antes de una invalidación no deja un valor obsoleto
+- Si el servidor deja de responder, la caché sigue funcionando en memoria
+
+Sale con código 1 si falla alguna comprobación.
+
+Uso (desde back/, requiere el paquete ``redis``):
+    PYTHONPATH=src python -m benchmarks.cache_check --threads 64
+"""
+import argparse
+import socketserver
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from app.core.cache import Cache, MemoryBackend, RedisBackend
+
+
+class _RespHandler(socketserver.StreamRequestHandler):
+    """Subconjunto de comandos Redis (RESP2) que usa RedisBackend"""
+
+    def _read_command(self) -> Optional[list[bytes]]:
+        header = self.rfile.readline()
+        if not header:
+            return None
+        args = []
+        for _ in range(int(header[1:])):
+            size = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(size + 2)[:-2])
+        return args
+
+    def _bulk(self, value: Optional[bytes]) -> bytes:
+        return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+
+    def handle(self) -> None:
+        store = self.server.store
+        while (command := self._read_command()) is not None:
+            name = command[0].upper()
+            now = time.monotonic()
+            with self.server.lock:
+                if name == b"GET":
+                    value, expires = store.get(command[1], (None, 0))
+                    reply = self._bulk(value if expires > now else None)
+                elif name == b"MGET":
+                    values = [store.get(key, (None, 0)) for key in command[1:]]
+                    reply = b"*%d\r\n" % len(values) + b"".join(
+                        self._bulk(value if expires > now else None) for value, expires in values
+                    )
+                elif name == b"SET":
+                    ttl = int(command[4]) if len(command) > 4 and command[3].upper() == b"EX" else 10**9
+                    store[command[1]] = (command[2], now + ttl)
+                    reply = b"+OK\r\n"
+                elif name == b"PING":
+                    reply = b"+PONG\r\n"
+                else:  # CLIENT SETINFO y similares del handshake
+                    reply = b"+OK\r\n"
+            self.wfile.write(reply)
+
+
+class _StandIn(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # Todos los hilos conectan a la vez
+
+
+def _start_stand_in() -> socketserver.ThreadingTCPServer:
+    server = _StandIn(("127.0.0.1", 0), _RespHandler)
+    server.store, server.lock = {}, threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _check_single_flight(cache: Cache, threads: int, failures: list[str], label: str) -> None:
+    calls = []
+    barrier = threading.Barrier(threads)
+
+    def compute() -> dict:
+        calls.append(1)
+        time.sleep(0.05)  # Consulta lenta: todos los hilos llegan mientras se calcula
+        return {"id": "u1", "display_name": "Ana"}
+
+    def lookup(_: int) -> dict:
+        barrier.wait()
+        return cache.get_or_set("users:u1", compute, tags=["users:u1"])
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(lookup, range(threads)))
+    if len(calls) != 1:
+        failures.append(f"{label}: single-flight ejecutó {len(calls)} cálculos")
+    if any(result != {"id": "u1", "display_name": "Ana"} for result in results):
+        failures.append(f"{label}: resultados distintos entre hilos")
+    if results[0] is results[1]:
+        failures.append(f"{label}: los hilos comparten el mismo objeto")
+
+    for _ in range(10):
+        cache.get_or_set("users:u1", compute, tags=["users:u1"])
+    if len(calls) != 1:
+        failures.append(f"{label}: la entrada no se reutilizó")
+
+
+def _check_invalidation(cache: Cache, other: Cache, failures: list[str], label: str) -> None:
+    version = {"n": 1}
+
+    def compute() -> dict:
+        return {"n": version["n"]}
+
+    def get_item() -> dict:
+        return cache.get_or_set("items:i1", compute, tags=["items:i1"], tags_from=lambda v: ["wishlists:w1"])
+
+    get_item()
+    version["n"] = 2
+    other.invalidate("items:i1")
+    if get_item() != {"n": 2}:
+        failures.append(f"{label}: invalidar items:i1 no descartó la entrada")
+
+    version["n"] = 3
+    other.invalidate("wishlists:w1")  # Etiqueta obtenida del valor (tags_from)
+    if get_item() != {"n": 3}:
+        failures.append(f"{label}: invalidar wishlists:w1 no descartó la entrada")
+
+    # La escritura y su invalidación ocurren mientras otro hilo calcula con datos viejos
+    def slow_compute() -> dict:
+        value = {"n": version["n"]}
+        version["n"] = 4
+        other.invalidate("items:i2")
+        return value
+
+    cache.get_or_set("items:i2", slow_compute, tags=["items:i2"])
+    if cache.get_or_set("items:i2", compute, tags=["items:i2"]) != {"n": 4}:
+        failures.append(f"{label}: un cálculo anterior a la invalidación quedó en la caché")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Punto de entrada de la comprobación."""
+    parser = argparse.ArgumentParser(description="Backends, single-flight e invalidación de la caché")
+    parser.add_argument("--threads", type=int, default=64, help="Hilos pidiendo la misma clave")
+    parser.add_argument("--redis-url", help="Servidor Redis existente (por defecto, uno local de prueba)")
+    args = parser.parse_args(argv)
+    failures: list[str] = []
+
+    memory = Cache(MemoryBackend(max_entries=100))
+    _check_single_flight(memory, args.threads, failures, "memory")
+    _check_invalidation(memory, memory, failures, "memory")
+    print(f"memory: {memory.metrics()}")
+
+    server = None if args.redis_url else _start_stand_in()
+    url = args.redis_url or f"redis://127.0.0.1:{server.server_address[1]}/0"
+    try:
+        prefix = f"cache-check-{time.time_ns()}:"
+        worker_a = Cache(RedisBackend(url, fallback=MemoryBackend(), prefix=prefix))
+        worker_b = Cache(RedisBackend(url, fallback=MemoryBackend(), prefix=prefix))
+        _check_single_flight(worker_a, args.threads, failures, "redis")
+        _check_invalidation(worker_a, worker_b, failures, "redis")
+        if worker_a.metrics()["backend_errors"]:
+            failures.append(f"redis: errores del backend con el servidor activo: {worker_a.metrics()}")
+        print(f"redis: {worker_a.metrics()}")
+    finally:
+        if server:
+            server.shutdown()
+            server.server_close()
+
+    if server:
+        # Con el servidor caído, las lecturas siguen funcionando (en memoria del proceso)
+        offline = Cache(RedisBackend(url, fallback=MemoryBackend(), prefix="offline:"))
+        values = [offline.get_or_set("users:u2", lambda: {"ok": True}, tags=["users:u2"]) for _ in range(3)]
+        metrics = offline.metrics()
+        if values != [{"ok": True}] * 3 or metrics["hits"] != 2 or not metrics["backend_errors"]:
+            failures.append(f"redis caído: fallback a memoria incorrecto: {metrics}")
+        print(f"redis caído: {metrics}")
+
+    if failures:
+        for failure in failures:
+            print(f"FALLO: {failure}", file=sys.stderr)
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""
+Prueba de estrés de claims concurrentes
+
+Crea un item y N usuarios temporales y lanza N ``claim_service.transition``
+simultáneos (una sesión y un hilo por usuario, sincronizados con una
+barrera). Comprueba los invariantes de la máquina de estados:
+- Exactamente un claim ``claimed`` gana; el resto recibe ConflictError
+- En la base de datos queda como mucho un claim activo por item
+- Ningún request falla con un error distinto de ConflictError
+
+Sale con código 1 si se viola algún invariante. Los datos temporales se
+eliminan al terminar.
+
+Uso (desde back/, con PostgreSQL accesible en DATABASE_URL y migraciones aplicadas):
+    PYTHONPATH=src python -m benchmarks.claim_stress --concurrency 200 --rounds 5
+"""
+import argparse
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from sqlalchemy import create_engine, delete, func, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.exceptions import ConflictError
+from app.db.models import Item, ItemClaim, User, Wishlist
+from app.db.models.enums import ClaimStatus
+from app.db.session import database_url
+from app.services import claim_service
+
+
+def _create_fixtures(Session, concurrency: int) -> tuple[uuid.UUID, list[uuid.UUID]]:
+    run = uuid.uuid4().hex[:8]
+    user_ids = [uuid.uuid4() for _ in range(concurrency)]
+    wishlist_id, item_id = uuid.uuid4(), uuid.uuid4()
+    with Session() as db:
+        db.execute(insert(User), [
+            {"id": uid, "email": f"stress-{run}-{n}@example.com", "display_name": f"Stress {n}"}
+            for n, uid in enumerate(user_ids)
+        ])
+        db.execute(insert(Wishlist).values(id=wishlist_id, creator_id=user_ids[0], name=f"Stress {run}"))
+        db.execute(insert(Item).values(
+            id=item_id, wishlist_id=wishlist_id, source_url="https://example.com/stress", name="Stress item"
+        ))
+        db.commit()
+    return item_id, user_ids
+
+
+def _cleanup(Session, user_ids: list[uuid.UUID]) -> None:
+    # ON DELETE CASCADE elimina listas, items y claims de los usuarios temporales
+    with Session() as db:
+        db.execute(delete(User).where(User.id.in_(user_ids)))
+        db.commit()
+
+
+def _race(Session, item_id: uuid.UUID, user_ids: list[uuid.UUID], target: ClaimStatus) -> Counter:
+    barrier = threading.Barrier(len(user_ids))
+
+    def attempt(user_id: uuid.UUID) -> str:
+        with Session() as db:
+            barrier.wait()
+            try:
+                claim_service.transition(db, item_id=item_id, user_id=user_id, target=target)
+                return "ok"
+            except ConflictError:
+                return "conflict"
+            except Exception as exc:  # Cualquier otro error es un fallo del invariante
+                return f"error:{exc.__class__.__name__}"
+
+    with ThreadPoolExecutor(max_workers=len(user_ids)) as pool:
+        return Counter(pool.map(attempt, user_ids))
+
+
+def _active_claims(Session, item_id: uuid.UUID) -> int:
+    with Session() as db:
+        return db.execute(
+            select(func.count()).select_from(ItemClaim).where(
+                ItemClaim.item_id == item_id,
+                ItemClaim.status.in_([s.value for s in claim_service.ACTIVE_STATUSES]),
+            )
+        ).scalar_one()
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Punto de entrada de la prueba de estrés."""
+    parser = argparse.ArgumentParser(description="Claims concurrentes sobre el mismo item")
+    parser.add_argument("--concurrency", type=int, default=200, help="Usuarios que reclaman a la vez")
+    parser.add_argument("--rounds", type=int, default=3, help="Rondas (claim + release)")
+    args = parser.parse_args(argv)
+
+    engine = create_engine(database_url, pool_size=args.concurrency, max_overflow=0)
+    Session = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    item_id, user_ids = _create_fixtures(Session, args.concurrency)
+    failures = []
+
+    try:
+        # Ronda 0: todos se apuntan como interesados (sin conflicto entre ellos)
+        interested = _race(Session, item_id, user_ids, ClaimStatus.INTERESTED)
+        print(f"interested: {dict(interested)}")
+        if interested["ok"] != len(user_ids):
+            failures.append(f"interested: se esperaban {len(user_ids)} ok, {dict(interested)}")
+
+        for round_number in range(1, args.rounds + 1):
+            started = time.perf_counter()
+            results = _race(Session, item_id, user_ids, ClaimStatus.CLAIMED)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            active = _active_claims(Session, item_id)
+            print(f"ronda {round_number}: {dict(results)}, claims activos={active}, {elapsed_ms:.0f} ms")
+
+            errors = {k: v for k, v in results.items() if k.startswith("error:")}
+            if results["ok"] != 1 or active != 1 or errors:
+                failures.append(f"ronda {round_number}: {dict(results)}, activos={active}")
+
+            # El ganador libera el item para la siguiente ronda
+            with Session() as db:
+                winner = db.execute(
+                    select(ItemClaim.user_id).where(
+                        ItemClaim.item_id == item_id, ItemClaim.status == ClaimStatus.CLAIMED.value
+                    )
+                ).scalar_one_or_none()
+                if winner is not None:
+                    claim_service.transition(db, item_id=item_id, user_id=winner, target=ClaimStatus.RELEASED)
+    finally:
+        _cleanup(Session, user_ids)
+        engine.dispose()
+
+    if failures:
+        for failure in failures:
+            print(f"FALLO: {failure}", file=sys.stderr)
+        return 1
+    print("OK: un único claim activo por ronda")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
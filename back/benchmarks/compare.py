@@ -0,0 +1,58 @@
+"""
+Compara dos ficheros de resultados del benchmark HTTP
+
+Uso (desde back/):
+    python -m benchmarks.compare benchmarks/results/antes.json benchmarks/results/despues.json
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Optional
+
+METRICS = (
+    ("throughput_rps", "req/s", True),
+    ("latency_ms.p50", "p50 ms", False),
+    ("latency_ms.p95", "p95 ms", False),
+    ("latency_ms.p99", "p99 ms", False),
+    ("db_queries_per_request", "queries/req", False),
+    ("db_commits_per_request", "commits/req", False),
+)
+
+
+def _get(summary: dict[str, Any], dotted: str) -> Optional[float]:
+    value: Any = summary
+    for key in dotted.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Imprime la variación de cada métrica por escenario."""
+    parser = argparse.ArgumentParser(description="Compara dos resultados de benchmarks.http_bench")
+    parser.add_argument("baseline", help="Resultado de referencia")
+    parser.add_argument("candidate", help="Resultado a comparar")
+    args = parser.parse_args(argv)
+
+    baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+    candidate = json.loads(Path(args.candidate).read_text(encoding="utf-8"))
+    print(f"{baseline.get('commit') or '?'} -> {candidate.get('commit') or '?'}")
+
+    for name in sorted(set(baseline["scenarios"]) & set(candidate["scenarios"])):
+        print(f"\n{name}")
+        for key, label, higher_is_better in METRICS:
+            before = _get(baseline["scenarios"][name], key)
+            after = _get(candidate["scenarios"][name], key)
+            if before is None or after is None:
+                continue
+            change = (after - before) / before * 100 if before else 0.0
+            better = change > 0 if higher_is_better else change < 0
+            marker = "" if abs(change) < 1 else (" (mejor)" if better else " (peor)")
+            print(f"  {label:<12} {before:>10.2f} -> {after:>10.2f}  {change:+6.1f}%{marker}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
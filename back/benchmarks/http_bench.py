@@ -0,0 +1,353 @@
+"""
+Benchmark HTTP reproducible de la API
+
+Arranca ``app.main`` con uvicorn (o usa un servidor ya levantado con --url),
+lanza los escenarios de ``benchmarks.scenarios`` con la concurrencia indicada
+y guarda los resultados en JSON para poder comparar commits.
+
+Uso (desde back/, con PostgreSQL accesible en DATABASE_URL):
+    python -m benchmarks.http_bench --scenario users_list --concurrency 32 --duration 20
+    python -m benchmarks.http_bench --all --fixtures benchmarks/fixtures.json
+    python -m benchmarks.http_bench --writes --requests 2000
+    python -m benchmarks.http_bench --url http://localhost:8000 --scenario users_list
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+import httpx
+
+from benchmarks.scenarios import SCENARIOS, Fixtures, Scenario
+
+BACK_DIR = Path(__file__).resolve().parents[1]
+RESULTS_DIR = BACK_DIR / "benchmarks" / "results"
+QUERY_COUNT_HEADER = "X-DB-Queries"
+COMMIT_COUNT_HEADER = "X-DB-Commits"
+
+
+def percentile(sorted_values: list[float], pct: float) -> Optional[float]:
+    """Percentil por rango más cercano sobre una lista ya ordenada."""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+class _Recorder:
+    """Acumula latencias, códigos de estado, queries y commits por request"""
+
+    def __init__(self) -> None:
+        self.latencies_ms: list[float] = []
+        self.statuses: Counter = Counter()
+        self.query_counts: list[int] = []
+        self.commit_counts: list[int] = []
+        self.errors = 0
+
+    def add(self, latency_ms: float, status: int, queries: Optional[str], commits: Optional[str] = None) -> None:
+        self.latencies_ms.append(latency_ms)
+        self.statuses[str(status)] += 1
+        if status >= 400:
+            self.errors += 1
+        if queries is not None:
+            self.query_counts.append(int(queries))
+        if commits is not None:
+            self.commit_counts.append(int(commits))
+
+    def add_failure(self, latency_ms: float, exc: Exception) -> None:
+        self.latencies_ms.append(latency_ms)
+        self.statuses[exc.__class__.__name__] += 1
+        self.errors += 1
+
+    def summary(self, elapsed_s: float) -> dict[str, Any]:
+        latencies = sorted(self.latencies_ms)
+        total = len(latencies)
+        return {
+            "requests": total,
+            "errors": self.errors,
+            "elapsed_s": round(elapsed_s, 3),
+            "throughput_rps": round(total / elapsed_s, 2) if elapsed_s else 0.0,
+            "latency_ms": {
+                "mean": round(sum(latencies) / total, 3) if total else None,
+                "p50": percentile(latencies, 50),
+                "p95": percentile(latencies, 95),
+                "p99": percentile(latencies, 99),
+                "max": latencies[-1] if latencies else None,
+            },
+            "db_queries_per_request": (
+                round(sum(self.query_counts) / len(self.query_counts), 3) if self.query_counts else None
+            ),
+            "db_commits_per_request": (
+                round(sum(self.commit_counts) / len(self.commit_counts), 3) if self.commit_counts else None
+            ),
+            "statuses": dict(self.statuses),
+        }
+
+
+async def run_scenario(
+    base_url: str,
+    scenario: Scenario,
+    fixtures: Fixtures,
+    *,
+    concurrency: int,
+    duration_s: float,
+    max_requests: Optional[int],
+    warmup_s: float,
+    seed: int,
+    options: dict[str, Any],
+) -> dict[str, Any]:
+    """Ejecuta un escenario y devuelve su resumen."""
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+        # Calentamiento: no se mide
+        if warmup_s > 0:
+            await _drive(client, scenario, fixtures, _Recorder(), concurrency, warmup_s, None, seed - 1, options)
+
+        recorder = _Recorder()
+        started = time.perf_counter()
+        await _drive(client, scenario, fixtures, recorder, concurrency, duration_s, max_requests, seed, options)
+        elapsed = time.perf_counter() - started
+
+    return recorder.summary(elapsed)
+
+
+async def _drive(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    fixtures: Fixtures,
+    recorder: _Recorder,
+    concurrency: int,
+    duration_s: float,
+    max_requests: Optional[int],
+    seed: int,
+    options: dict[str, Any],
+) -> None:
+    deadline = time.perf_counter() + duration_s
+    remaining = [max_requests] if max_requests is not None else None
+    # Todos los workers esperan a la barrera para que la ráfaga empiece a la vez
+    start_gate = asyncio.Event()
+
+    async def worker(worker_id: int) -> None:
+        rng = random.Random(seed * 10_007 + worker_id)
+        await start_gate.wait()
+        while time.perf_counter() < deadline:
+            if remaining is not None:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            spec = scenario.build(fixtures, rng, options)
+            sent = time.perf_counter()
+            try:
+                response = await client.request(spec.method, spec.path, json=spec.json)
+            except httpx.HTTPError as exc:
+                recorder.add_failure((time.perf_counter() - sent) * 1000, exc)
+                continue
+            recorder.add(
+                (time.perf_counter() - sent) * 1000,
+                response.status_code,
+                response.headers.get(QUERY_COUNT_HEADER),
+                response.headers.get(COMMIT_COUNT_HEADER),
+            )
+
+    tasks = [asyncio.create_task(worker(i)) for i in range(concurrency)]
+    start_gate.set()
+    await asyncio.gather(*tasks)
+
+
+def load_fixtures(base_url: str, path: Optional[str], sample: int) -> Fixtures:
+    """Carga los datos de prueba desde un JSON o los descubre con los endpoints de listado."""
+    if path:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        return Fixtures(
+            user_ids=[str(v) for v in data.get("user_ids", [])],
+            item_ids=[str(v) for v in data.get("item_ids", [])],
+            wishlist_ids=[str(v) for v in data.get("wishlist_ids", [])],
+        )
+
+    def _ids(url: str, field: str) -> list[str]:
+        try:
+            response = httpx.get(url, timeout=30.0)
+            response.raise_for_status()
+            return sorted({str(row[field]) for row in response.json() if row.get(field) is not None})
+        except (httpx.HTTPError, ValueError, TypeError, KeyError):
+            return []
+
+    items_url = f"{base_url}/api/v1/items/?limit={sample}"
+    return Fixtures(
+        user_ids=_ids(f"{base_url}/api/v1/users/?limit={sample}", "id"),
+        item_ids=_ids(items_url, "id"),
+        wishlist_ids=_ids(items_url, "wishlist_id"),
+    )
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers: int, port: Optional[int] = None, timeout_s: float = 30.0) -> tuple[subprocess.Popen, str]:
+    """Arranca app.main con uvicorn y espera a que /health responda."""
+    port = port or _free_port()
+    env = dict(os.environ)
+    env["DB_QUERY_COUNT_HEADER"] = "True"
+    env["DEBUG"] = "False"
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--app-dir", str(BACK_DIR / "src"),
+            "--host", "127.0.0.1",
+            "--port", str(port),
+            "--workers", str(workers),
+            "--log-level", "warning",
+        ],
+        cwd=BACK_DIR,
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"El servidor terminó al arrancar (código {process.returncode})")
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1.0).status_code == 200:
+                return process, base_url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"El servidor no respondió en {timeout_s:.0f} s")
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACK_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_summary(name: str, summary: dict[str, Any]) -> None:
+    latency = summary["latency_ms"]
+
+    def fmt(value: Optional[float]) -> str:
+        return f"{value:8.2f}" if value is not None else "       -"
+
+    queries = summary["db_queries_per_request"]
+    commits = summary.get("db_commits_per_request")
+    print(
+        f"{name:<16} {summary['requests']:>7} req {summary['errors']:>6} err "
+        f"{summary['throughput_rps']:>9.1f} req/s  p50 {fmt(latency['p50'])}  p95 {fmt(latency['p95'])}  "
+        f"p99 {fmt(latency['p99'])} ms  queries/req {queries if queries is not None else '-'}  "
+        f"commits/req {commits if commits is not None else '-'}"
+    )
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Punto de entrada del benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark HTTP de la API")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Escenario (repetible)")
+    parser.add_argument("--all", action="store_true", help="Ejecutar todos los escenarios de lectura")
+    parser.add_argument("--writes", action="store_true", help="Ejecutar los escenarios que escriben (modifican datos)")
+    parser.add_argument("--url", help="Usar un servidor ya levantado en lugar de arrancar app.main")
+    parser.add_argument("--workers", type=int, default=1, help="Workers de uvicorn al arrancar el servidor")
+    parser.add_argument("--concurrency", type=int, default=16, help="Requests concurrentes")
+    parser.add_argument("--duration", type=float, default=15.0, help="Duración de cada escenario (s)")
+    parser.add_argument("--requests", type=int, help="Número máximo de requests por escenario")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Calentamiento previo no medido (s)")
+    parser.add_argument("--seed", type=int, default=42, help="Semilla para la selección de ids")
+    parser.add_argument("--fixtures", help="JSON con user_ids, item_ids y wishlist_ids")
+    parser.add_argument("--page-size", type=int, default=100, help="Tamaño de página de los listados")
+    parser.add_argument("--max-skip", type=int, default=100_000, help="OFFSET máximo en deep_pagination")
+    parser.add_argument("--wishlist-limit", type=int, default=1000, help="Límite en wishlist_items")
+    parser.add_argument("--output", help="Fichero de resultados (por defecto benchmarks/results/<fecha>-<commit>.json)")
+    args = parser.parse_args(argv)
+
+    # Sin --scenario: las lecturas (con --all o por defecto) y las escrituras con --writes
+    names = args.scenario or [
+        name for name, scenario in sorted(SCENARIOS.items())
+        if (args.writes if scenario.writes else args.all or not args.writes)
+    ]
+    options = {"page_size": args.page_size, "max_skip": args.max_skip, "wishlist_limit": args.wishlist_limit}
+
+    process = None
+    if args.url:
+        base_url = args.url.rstrip("/")
+    else:
+        process, base_url = start_server(args.workers)
+
+    try:
+        fixtures = load_fixtures(base_url, args.fixtures, sample=max(args.page_size, 1000))
+        results: dict[str, Any] = {}
+        for name in names:
+            scenario = SCENARIOS[name]
+            missing = [field for field in scenario.requires if not getattr(fixtures, field)]
+            if missing:
+                print(f"{name:<16} omitido: faltan datos de prueba ({', '.join(missing)})")
+                continue
+            summary = asyncio.run(
+                run_scenario(
+                    base_url,
+                    scenario,
+                    fixtures,
+                    concurrency=args.concurrency,
+                    duration_s=args.duration,
+                    max_requests=args.requests,
+                    warmup_s=args.warmup,
+                    seed=args.seed,
+                    options=options,
+                )
+            )
+            results[name] = summary
+            _print_summary(name, summary)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+
+    commit = _git_commit()
+    output = Path(args.output) if args.output else (
+        RESULTS_DIR / f"{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}-{commit or 'nocommit'}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(
+        json.dumps(
+            {
+                "commit": commit,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "base_url": base_url,
+                "config": {
+                    "workers": None if args.url else args.workers,
+                    "concurrency": args.concurrency,
+                    "duration_s": args.duration,
+                    "requests": args.requests,
+                    "warmup_s": args.warmup,
+                    "seed": args.seed,
+                    **options,
+                },
+                "scenarios": results,
+            },
+            indent=2,
+        ),
+        encoding="utf-8",
+    )
+    print(f"\nResultados guardados en {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""
+Memoria y tiempo de los listados: entidades ORM frente a proyección de columnas
+
+Crea una lista temporal con N items (con descripción y metadatos, como los
+del scraper) y la lee de tres formas, serializando el resultado como lo
+haría el endpoint ``GET /items``:
+
+- ``orm``: ``item_repository.get_multi`` (entidades ``Item`` completas)
+- ``rows``: ``item_repository.get_multi_rows`` con las columnas de la respuesta
+- ``fields``: ``get_multi_rows`` solo con ``--fields`` (``?fields=...``)
+
+Para cada una mide el pico de memoria (``tracemalloc``) y la mediana del
+tiempo de ``--repeat`` ejecuciones (sin ``tracemalloc``), y lo normaliza a
+10 000 filas. Los datos temporales se eliminan al terminar.
+
+Uso (desde back/, con PostgreSQL accesible en DATABASE_URL y migraciones aplicadas):
+    PYTHONPATH=src python -m benchmarks.read_models_bench --rows 10000 --repeat 5
+"""
+import argparse
+import gc
+import json
+import statistics
+import time
+import tracemalloc
+import uuid
+from typing import Callable, Optional
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, delete, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models import Item, User, Wishlist
+from app.db.session import database_url
+from app.repositories import item_repository
+from app.schemas import item as item_schema
+from app.schemas.fields import parse_fields, partial_response, schema_fields
+
+_ITEMS = TypeAdapter(list[item_schema.Item])
+
+
+def _create_fixtures(Session, rows: int) -> tuple[uuid.UUID, uuid.UUID]:
+    run = uuid.uuid4().hex[:8]
+    user_id, wishlist_id = uuid.uuid4(), uuid.uuid4()
+    with Session() as db:
+        db.execute(insert(User).values(id=user_id, email=f"bench-{run}@example.com", display_name="Bench"))
+        db.execute(insert(Wishlist).values(id=wishlist_id, creator_id=user_id, name=f"Bench {run}"))
+        db.execute(insert(Item), [
+            {
+                "wishlist_id": wishlist_id,
+                "source_url": f"https://example.com/product/{n}",
+                "name": f"Producto {n}",
+                "description": "Descripción del producto " * 8,
+                "brand": "Marca",
+                "price_cents": 1999 + n,
+                "image_url": f"https://example.com/img/{n}.jpg",
+                "item_metadata": {"sizes": ["S", "M", "L"], "color": "azul", "specs": {"peso": "200 g"}},
+                "rank": f"a{n:06d}",
+            }
+            for n in range(rows)
+        ])
+        db.commit()
+    return user_id, wishlist_id
+
+
+def _cleanup(Session, user_id: uuid.UUID) -> None:
+    # ON DELETE CASCADE elimina la lista y sus items
+    with Session() as db:
+        db.execute(delete(User).where(User.id == user_id))
+        db.commit()
+
+
+def _paths(wishlist_id: uuid.UUID, rows: int, fields: tuple[str, ...]) -> dict[str, Callable]:
+    columns = schema_fields(item_schema.Item)
+    return {
+        "orm": lambda db: _ITEMS.dump_json(_ITEMS.validate_python(
+            item_repository.get_multi(db, limit=rows, wishlist_id=wishlist_id), from_attributes=True
+        )),
+        "rows": lambda db: _ITEMS.dump_json(_ITEMS.validate_python(
+            item_repository.get_multi_rows(db, columns=columns, limit=rows, wishlist_id=wishlist_id),
+            from_attributes=True,
+        )),
+        "fields": lambda db: partial_response(
+            item_schema.Item,
+            fields,
+            item_repository.get_multi_rows(db, columns=fields, limit=rows, wishlist_id=wishlist_id),
+        ).body,
+    }
+
+
+def _measure(Session, path: Callable, repeat: int) -> tuple[float, float, int]:
+    """Pico de memoria (bytes), mediana del tiempo (s) y tamaño de la respuesta (bytes)."""
+    gc.collect()
+    with Session() as db:
+        tracemalloc.start()
+        body = path(db)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        with Session() as db:
+            started = time.perf_counter()
+            path(db)
+            timings.append(time.perf_counter() - started)
+    return peak, statistics.median(timings), len(body)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Memoria por 10k filas: ORM frente a proyección de columnas")
+    parser.add_argument("--rows", type=int, default=10_000, help="Items de la lista temporal")
+    parser.add_argument("--repeat", type=int, default=5, help="Ejecuciones para la mediana del tiempo")
+    parser.add_argument("--fields", default="id,name,price_cents", help="Campos de la variante 'fields'")
+    parser.add_argument("--json", help="Guardar los resultados en este fichero")
+    args = parser.parse_args(argv)
+
+    fields = parse_fields(item_schema.Item, [args.fields])
+    engine = create_engine(database_url)
+    Session = sessionmaker(bind=engine)
+    user_id, wishlist_id = _create_fixtures(Session, args.rows)
+    scale = 10_000 / args.rows
+    results = {}
+    try:
+        print(f"{'ruta':<8} {'MiB/10k filas':>14} {'ms/10k filas':>13} {'KiB respuesta':>14}")
+        for name, path in _paths(wishlist_id, args.rows, fields).items():
+            peak, seconds, size = _measure(Session, path, args.repeat)
+            results[name] = {
+                "peak_mib_per_10k": round(peak * scale / 2**20, 2),
+                "ms_per_10k": round(seconds * scale * 1000, 1),
+                "response_kib": round(size / 1024, 1),
+            }
+            print(
+                f"{name:<8} {results[name]['peak_mib_per_10k']:>14} {results[name]['ms_per_10k']:>13} "
+                f"{results[name]['response_kib']:>14}"
+            )
+    finally:
+        _cleanup(Session, user_id)
+        engine.dispose()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"rows": args.rows, "fields": list(fields or ()), "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,98 @@
+"""
+Escenarios de carga para el benchmark HTTP
+
+Cada escenario genera el siguiente request a partir de los datos de prueba
+(ids de usuarios, listas e items).
+
+No hay escenario de login: ``POST /users/login`` no funciona todavía (el
+modelo ``User`` se autentica con OAuth y no tiene usuario ni contraseña).
+"""
+import random
+from typing import Any, Callable, NamedTuple, Optional
+
+
+class Fixtures(NamedTuple):
+    """Datos existentes en la base de datos sobre los que se lanzan los requests"""
+    user_ids: list[str]
+    item_ids: list[str]
+    wishlist_ids: list[str]
+
+
+class RequestSpec(NamedTuple):
+    """Request a ejecutar"""
+    method: str
+    path: str
+    json: Optional[dict[str, Any]] = None
+
+
+class Scenario(NamedTuple):
+    """Escenario de carga"""
+    name: str
+    description: str
+    build: Callable[[Fixtures, random.Random, dict[str, Any]], RequestSpec]
+    requires: tuple[str, ...] = ()  # Campos de Fixtures que no pueden estar vacíos
+    writes: bool = False  # Modifica datos: solo se ejecuta con --writes
+
+
+def _users_list(fx: Fixtures, rng: random.Random, opts: dict[str, Any]) -> RequestSpec:
+    return RequestSpec("GET", f"/api/v1/users/?skip=0&limit={opts['page_size']}")
+
+
+def _user_detail(fx: Fixtures, rng: random.Random, opts: dict[str, Any]) -> RequestSpec:
+    return RequestSpec("GET", f"/api/v1/users/{rng.choice(fx.user_ids)}")
+
+
+def _items_list(fx: Fixtures, rng: random.Random, opts: dict[str, Any]) -> RequestSpec:
+    return RequestSpec("GET", f"/api/v1/items/?skip=0&limit={opts['page_size']}")
+
+
+def _item_detail(fx: Fixtures, rng: random.Random, opts: dict[str, Any]) -> RequestSpec:
+    return RequestSpec("GET", f"/api/v1/items/{rng.choice(fx.item_ids)}")
+
+
+def _deep_pagination(fx: Fixtures, rng: random.Random, opts: dict[str, Any]) -> RequestSpec:
+    skip = rng.randint(opts["max_skip"] // 2, opts["max_skip"])
+    return RequestSpec("GET", f"/api/v1/items/?skip={skip}&limit={opts['page_size']}")
+
+
+def _wishlist_items(fx: Fixtures, rng: random.Random, opts: dict[str, Any]) -> RequestSpec:
+    wishlist_id = rng.choice(fx.wishlist_ids)
+    return RequestSpec("GET", f"/api/v1/items/?wishlist_id={wishlist_id}&limit={opts['wishlist_limit']}")
+
+
+def _item_create(fx: Fixtures, rng: random.Random, opts: dict[str, Any]) -> RequestSpec:
+    n = rng.randrange(1_000_000_000)
+    return RequestSpec("POST", "/api/v1/items/", json={
+        "wishlist_id": rng.choice(fx.wishlist_ids),
+        "name": f"Benchmark {n}",
+        "source_url": f"https://example.com/benchmark/{n}",
+    })
+
+
+def _item_update(fx: Fixtures, rng: random.Random, opts: dict[str, Any]) -> RequestSpec:
+    return RequestSpec("PUT", f"/api/v1/items/{rng.choice(fx.item_ids)}", json={"price_cents": rng.randint(100, 99_999)})
+
+
+def _item_move(fx: Fixtures, rng: random.Random, opts: dict[str, Any]) -> RequestSpec:
+    return RequestSpec("PUT", f"/api/v1/items/{rng.choice(fx.item_ids)}/position", json={"after_id": None})
+
+
+def _user_update(fx: Fixtures, rng: random.Random, opts: dict[str, Any]) -> RequestSpec:
+    return RequestSpec("PUT", f"/api/v1/users/{rng.choice(fx.user_ids)}", json={"locale": rng.choice(["es-ES", "en-US"])})
+
+
+SCENARIOS: dict[str, Scenario] = {
+    scenario.name: scenario
+    for scenario in (
+        Scenario("users_list", "Primera página del listado de usuarios", _users_list),
+        Scenario("user_detail", "Usuario por ID", _user_detail, requires=("user_ids",)),
+        Scenario("items_list", "Primera página del listado de items", _items_list),
+        Scenario("item_detail", "Item por ID", _item_detail, requires=("item_ids",)),
+        Scenario("deep_pagination", "Páginas profundas del listado de items (OFFSET alto)", _deep_pagination),
+        Scenario("wishlist_items", "Items de una lista con muchos items", _wishlist_items, requires=("wishlist_ids",)),
+        Scenario("item_create", "Alta de items al final de una lista", _item_create, requires=("wishlist_ids",), writes=True),
+        Scenario("item_update", "Cambio de precio de un item", _item_update, requires=("item_ids",), writes=True),
+        Scenario("item_move", "Item al principio de su lista", _item_move, requires=("item_ids",), writes=True),
+        Scenario("user_update", "Cambio de idioma de un usuario", _user_update, requires=("user_ids",), writes=True),
+    )
+}
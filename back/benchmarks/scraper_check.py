@@ -0,0 +1,213 @@
+"""
+Comprobación del scraper contra un servidor HTTP falso local
+
+Levanta un servidor en 127.0.0.1 con páginas de producto sintéticas
+(JSON-LD, Open Graph, microdatos), una página lenta y una que falla la
+primera vez, y ejecuta el pipeline de enriquecimiento sobre ellas. No
+necesita base de datos: los resultados se recogen en memoria.
+
+Comprueba:
+- Los campos extraídos de cada tipo de página
+- Cada producto se descarga una vez aunque aparezca en muchas listas con
+  variantes de la URL (parámetros utm_, mayúsculas, barra final...)
+- Nunca hay más de SCRAPER_PER_DOMAIN_CONCURRENCY descargas simultáneas
+- Los errores 503 se reintentan y los timeouts no bloquean a los demás
+- ``submit`` vuelve al instante aunque el servidor sea lento
+
+Sale con código 1 si falla alguna comprobación.
+
+Uso (desde back/):
+    PYTHONPATH=src python -m benchmarks.scraper_check --products 200 --copies 5
+"""
+import argparse
+import asyncio
+import json
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from app.scraper.fetcher import Fetcher, ResultCache, Scraper
+from app.scraper.parser import ProductData
+from app.scraper.pipeline import EnrichmentPipeline
+
+
+class FakeShop:
+    """Estado compartido del servidor falso: visitas por ruta y concurrencia máxima"""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.hits: Counter = Counter()
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+
+def _product_page(n: int) -> str:
+    if n % 3 == 0:  # JSON-LD
+        ld = {
+            "@context": "https://schema.org", "@type": "Product", "name": f"Producto {n}",
+            "brand": {"@type": "Brand", "name": "Acme"}, "image": f"/img/{n}.jpg", "sku": f"SKU-{n}",
+            "offers": {"@type": "Offer", "price": f"{n}.99", "priceCurrency": "EUR",
+                       "availability": "https://schema.org/InStock"},
+        }
+        return f'<html><head><script type="application/ld+json">{json.dumps(ld)}</script></head></html>'
+    if n % 3 == 1:  # Open Graph
+        return (f'<html><head><meta property="og:title" content="Producto {n}">'
+                f'<meta property="og:image" content="https://cdn.example.com/{n}.jpg">'
+                f'<meta property="product:brand" content="Acme">'
+                f'<meta property="product:price:amount" content="{n},99">'
+                f'<meta property="product:price:currency" content="eur"></head></html>')
+    return (f'<html><head><title>Producto {n}</title></head><body itemscope>'  # Microdatos
+            f'<span itemprop="brand">Acme</span><img itemprop="image" src="/img/{n}.jpg">'
+            f'<meta itemprop="price" content="{n}.99"><meta itemprop="priceCurrency" content="EUR"></body></html>')
+
+
+def _make_handler(shop: FakeShop):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args) -> None:
+            pass
+
+        def do_GET(self) -> None:
+            path = self.path.split("?", 1)[0]
+            with shop.lock:
+                shop.hits[path] += 1
+                hits = shop.hits[path]
+                shop.active += 1
+                shop.max_active = max(shop.max_active, shop.active)
+            try:
+                if path == "/slow":
+                    time.sleep(5)
+                else:
+                    time.sleep(shop.delay)
+                if path == "/flaky" and hits == 1:
+                    self._send(503, "text/plain", "Service Unavailable")
+                elif path == "/flaky":
+                    self._send(200, "text/html", _product_page(0))
+                elif path.startswith("/product/"):
+                    self._send(200, "text/html; charset=utf-8", _product_page(int(path.rsplit("/", 1)[1])))
+                else:
+                    self._send(404, "text/plain", "Not Found")
+            finally:
+                with shop.lock:
+                    shop.active -= 1
+
+        def _send(self, status: int, content_type: str, body: str) -> None:
+            payload = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    return Handler
+
+
+def _url_variant(base: str, n: int, copy: int) -> str:
+    # Variantes de la misma página que normalize_url debe unificar
+    path = f"/product/{n}"
+    return [
+        f"{base}{path}",
+        f"{base}{path}/",
+        f"{base}{path}?utm_source=newsletter&utm_campaign={copy}",
+        f"{base.upper()}{path}#reviews",
+        f"{base}{path}?fbclid=abc{copy}",
+    ][copy % 5]
+
+
+async def _run(base: str, shop: FakeShop, products: int, copies: int, per_domain: int) -> list[str]:
+    failures = []
+    results: dict[uuid.UUID, ProductData] = {}
+
+    async def collect(item_id: uuid.UUID, product: ProductData) -> None:
+        results[item_id] = product
+
+    scraper = Scraper(
+        Fetcher(
+            per_domain_concurrency=per_domain,
+            timeout_seconds=1.0,
+            retries=2,
+            backoff_seconds=0.05,
+            allow_private_hosts=True,  # El servidor falso escucha en 127.0.0.1
+        ),
+        ResultCache(),
+    )
+    pipeline = EnrichmentPipeline(scraper, workers=32, queue_size=products * copies + 10, apply_result=collect)
+    pipeline.start()
+
+    expected: dict[uuid.UUID, int] = {}
+    started = time.perf_counter()
+    for copy in range(copies):
+        for n in range(1, products + 1):
+            item_id = uuid.uuid4()
+            expected[item_id] = n
+            pipeline.submit(item_id, _url_variant(base, n, copy))
+    flaky_id, slow_id = uuid.uuid4(), uuid.uuid4()
+    pipeline.submit(flaky_id, f"{base}/flaky")
+    pipeline.submit(slow_id, f"{base}/slow")
+    submit_ms = (time.perf_counter() - started) * 1000
+
+    await pipeline.join()
+    elapsed = time.perf_counter() - started
+    await pipeline.stop()
+
+    print(f"encolados {len(expected) + 2} items en {submit_ms:.1f} ms; procesados en {elapsed:.2f} s")
+    print(f"scraper: {scraper.stats}")
+    print(f"pipeline: {pipeline.stats}")
+    print(f"servidor: {sum(shop.hits.values())} peticiones, concurrencia máxima {shop.max_active}")
+
+    if submit_ms > 1000:
+        failures.append(f"submit tardó {submit_ms:.0f} ms")
+    duplicated = {path: hits for path, hits in shop.hits.items() if path.startswith("/product/") and hits > 1}
+    if duplicated:
+        failures.append(f"{len(duplicated)} productos descargados más de una vez (p. ej. {next(iter(duplicated))})")
+    if shop.max_active > per_domain:
+        failures.append(f"concurrencia máxima {shop.max_active} > límite por dominio {per_domain}")
+    if shop.hits["/flaky"] != 2 or flaky_id not in results:
+        failures.append(f"/flaky: {shop.hits['/flaky']} peticiones, enriquecido={flaky_id in results}")
+    if slow_id in results:
+        failures.append("/slow no debería enriquecerse (timeout)")
+
+    for item_id, n in expected.items():
+        product = results.get(item_id)
+        wanted = (f"Producto {n}", "Acme", n * 100 + 99, "EUR")
+        got = product and (product.name, product.brand, product.price_cents, product.currency)
+        if got != wanted or not product.image_url:
+            failures.append(f"producto {n}: esperado {wanted}, obtenido {got}")
+            break
+    return failures
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Punto de entrada de la comprobación."""
+    parser = argparse.ArgumentParser(description="Pipeline del scraper contra un servidor falso")
+    parser.add_argument("--products", type=int, default=100, help="Productos distintos")
+    parser.add_argument("--copies", type=int, default=5, help="Items por producto (listas que lo contienen)")
+    parser.add_argument("--per-domain", type=int, default=4, help="Límite de descargas simultáneas")
+    parser.add_argument("--delay", type=float, default=0.01, help="Latencia de cada página (s)")
+    args = parser.parse_args(argv)
+
+    shop = FakeShop(delay=args.delay)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(shop))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        failures = asyncio.run(_run(base, shop, args.products, args.copies, args.per_domain))
+    finally:
+        server.shutdown()
+
+    if failures:
+        for failure in failures:
+            print(f"FALLO: {failure}", file=sys.stderr)
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
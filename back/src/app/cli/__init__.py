@@ -0,0 +1 @@
+"""Comandos de línea de comandos (ejecutar con ``python -m app.cli.<comando>``)."""
@@ -0,0 +1,60 @@
+"""
+Carga de tipos de cambio en ``currency_rates``
+
+Acepta el XML diario del BCE, JSON ``{"base": ..., "rates": {...}}`` o CSV
+``currency,rate`` (ver ``currency_service.parse_rates``). Sin argumentos
+descarga ``CURRENCY_RATES_FEED_URL``.
+
+Uso:
+    PYTHONPATH=src python -m app.cli.currency_rates
+    PYTHONPATH=src python -m app.cli.currency_rates --file rates.csv
+    PYTHONPATH=src python -m app.cli.currency_rates --url https://example.com/rates.json --dry-run
+"""
+import argparse
+import sys
+from pathlib import Path
+from typing import Optional
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Punto de entrada del comando."""
+    from app.core.config import settings
+    from app.services import currency_service
+
+    parser = argparse.ArgumentParser(description="Carga tipos de cambio desde un fichero o un feed")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--file", help="Fichero XML (BCE), JSON o CSV")
+    source.add_argument("--url", default=settings.CURRENCY_RATES_FEED_URL, help="Feed a descargar")
+    parser.add_argument("--dry-run", action="store_true", help="Mostrar los tipos sin guardarlos")
+    args = parser.parse_args(argv)
+
+    if args.file:
+        origin, content = args.file, Path(args.file).read_text(encoding="utf-8")
+    else:
+        import httpx
+
+        response = httpx.get(args.url, timeout=30, follow_redirects=True)
+        response.raise_for_status()
+        origin, content = args.url, response.text
+
+    try:
+        rates = currency_service.parse_rates(content, settings.CURRENCY_BASE)
+    except (ValueError, KeyError) as exc:
+        print(f"ERROR: no se pudieron interpretar los tipos de {origin}: {exc}", file=sys.stderr)
+        return 1
+
+    for code, rate in sorted(rates.items()):
+        print(f"  {code}  {rate:.6f}")
+    if args.dry_run:
+        return 0
+
+    from app.db.session import SessionLocal
+
+    with SessionLocal() as db:
+        count = currency_service.load_rates(db, content, source=origin)
+    print(f"{count} tipos de cambio guardados (base {settings.CURRENCY_BASE})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
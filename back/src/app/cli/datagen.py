@@ -0,0 +1,470 @@
+"""
+Generador de datos sintéticos a gran escala
+
+Carga usuarios, grupos, listas, items y sus claims, contribuciones,
+invitaciones y actividad con ``COPY`` desde varios procesos en paralelo.
+La salida es determinista para una misma semilla y factor de escala: cada
+trozo de filas usa su propio generador aleatorio y los UUID se derivan del
+índice de la fila, así que el resultado no depende del número de workers.
+
+Escala 1.0 ≈ 1M usuarios, 5M items (más ~4M filas relacionadas).
+
+Uso:
+    PYTHONPATH=src python -m app.cli.datagen --scale 0.01 --truncate
+    PYTHONPATH=src python -m app.cli.datagen --scale 1 --workers 8 --seed 7 --truncate \\
+        --fixtures-out benchmarks/fixtures.json
+"""
+import argparse
+import hashlib
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from multiprocessing import Pool
+from pathlib import Path
+from typing import Any, Callable, Iterator, NamedTuple, Optional
+
+from app.db.models import (
+    ContributionInvite,
+    Group,
+    GroupMember,
+    Item,
+    ItemActivity,
+    ItemClaim,
+    ItemContribution,
+    Session,
+    User,
+    Wishlist,
+    WishlistPermission,
+)
+from app.db.models.enums import ClaimStatus, InviteStatus, ListRole, SubjectType
+from app.utils.ranking import nth_key
+
+# Tamaño de cada trozo que procesa un worker
+CHUNK_SIZE = 50_000
+
+# Volúmenes por unidad de escala
+BASE_COUNTS = {
+    "users": 1_000_000,
+    "groups": 100_000,
+    "wishlists": 800_000,
+    "items": 5_000_000,
+}
+
+# Primos para dispersar los índices "populares" entre tablas
+_SCATTER_PRIMES = {
+    "users": 1_000_003,
+    "groups": 999_983,
+    "wishlists": 1_299_709,
+}
+
+_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+_SPAN_SECONDS = 2 * 365 * 24 * 3600
+
+_CURRENCIES = (("EUR", 80), ("USD", 12), ("GBP", 6), ("JPY", 2))
+_BRANDS = ("Lego", "Apple", "Zara", "Ikea", "Sony", "Nike", "Decathlon", "Kindle", "Nintendo", None)
+_CLAIM_STATUSES = (
+    (ClaimStatus.INTERESTED.value, 45),
+    (ClaimStatus.CLAIMED.value, 25),
+    (ClaimStatus.PURCHASED.value, 20),
+    (ClaimStatus.RELEASED.value, 7),
+    (ClaimStatus.CANCELLED.value, 3),
+)
+_ACTIVE_CLAIM_STATUSES = (ClaimStatus.CLAIMED.value, ClaimStatus.PURCHASED.value)
+_INVITE_STATUSES = (
+    (InviteStatus.PENDING.value, 40),
+    (InviteStatus.ACCEPTED.value, 35),
+    (InviteStatus.DECLINED.value, 15),
+    (InviteStatus.EXPIRED.value, 10),
+)
+_ACTIVITY_KINDS = (("note", 50), ("status_change", 35), ("invite_sent", 15))
+
+
+class Plan(NamedTuple):
+    """Número de filas por entidad raíz y semilla"""
+    seed: int
+    users: int
+    groups: int
+    wishlists: int
+    items: int
+
+
+def build_plan(scale: float, seed: int) -> Plan:
+    """Calcula los volúmenes para un factor de escala."""
+    counts = {name: max(1, int(base * scale)) for name, base in BASE_COUNTS.items()}
+    return Plan(seed=seed, **counts)
+
+
+# ---------------------------------------------------------------------------
+# Utilidades deterministas
+# ---------------------------------------------------------------------------
+
+def _namespace(seed: int, table: str) -> int:
+    digest = hashlib.blake2b(f"{seed}:{table}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def make_uuid(namespace: int, index: int) -> str:
+    """UUID determinista: 64 bits del espacio de nombres + 64 bits del índice."""
+    raw = f"{namespace:016x}{index:016x}"
+    return f"{raw[:8]}-{raw[8:12]}-{raw[12:16]}-{raw[16:20]}-{raw[20:]}"
+
+
+def _skewed(rng: random.Random, n: int, alpha: float, table: str) -> int:
+    """Índice en [0, n) con distribución sesgada (pocos elementos muy populares)."""
+    raw = min(n - 1, int(n * rng.random() ** alpha))
+    return (raw * _SCATTER_PRIMES[table]) % n
+
+
+def _weighted(rng: random.Random, choices: tuple[tuple[Any, int], ...]) -> Any:
+    values, weights = zip(*choices)
+    return rng.choices(values, weights=weights)[0]
+
+
+def _timestamp(rng: random.Random, after: Optional[datetime] = None) -> datetime:
+    start = after or _EPOCH
+    remaining = _SPAN_SECONDS - int((start - _EPOCH).total_seconds())
+    return start + timedelta(seconds=rng.randint(0, max(1, remaining)))
+
+
+def _chunk_rng(plan: Plan, table: str, start: int) -> random.Random:
+    return random.Random(f"{plan.seed}:{table}:{start}")
+
+
+class _Ids:
+    """Generadores de UUID por tabla para una semilla"""
+
+    def __init__(self, seed: int) -> None:
+        self.ns = {
+            table: _namespace(seed, table)
+            for table in (
+                "users", "sessions", "groups", "wishlists", "wishlist_permissions", "items",
+                "item_claims", "item_contributions", "contribution_invites", "item_activity",
+            )
+        }
+
+    def __call__(self, table: str, index: int) -> str:
+        return make_uuid(self.ns[table], index)
+
+
+# ---------------------------------------------------------------------------
+# Generadores por fase. Cada uno devuelve {tabla: filas} para un trozo.
+# ---------------------------------------------------------------------------
+
+def _gen_users(plan: Plan, ids: _Ids, start: int, stop: int) -> dict[str, list[tuple]]:
+    rng = _chunk_rng(plan, "users", start)
+    users, sessions = [], []
+    for i in range(start, stop):
+        user_id = ids("users", i)
+        created = _timestamp(rng)
+        users.append((
+            user_id,
+            f"user{i}@example.com",
+            rng.random() < 0.8,
+            f"Usuario {i}",
+            f"https://avatars.example.com/{i}.png" if rng.random() < 0.6 else None,
+            rng.choice(("es-ES", "es-ES", "es-ES", "en-US", "fr-FR")),
+            rng.random() > 0.02,
+            created,
+            created,
+        ))
+        # Sesiones: la mitad de los usuarios no tiene ninguna, unos pocos muchas
+        session_count = min(64, int(rng.paretovariate(1.5))) if rng.random() < 0.5 else 0
+        for k in range(session_count):
+            session_created = _timestamp(rng, created)
+            sessions.append((
+                ids("sessions", i * 64 + k),
+                user_id,
+                session_created,
+                session_created + timedelta(days=rng.choice((1, 7, 30))),
+            ))
+    return {"users": users, "sessions": sessions}
+
+
+def _gen_groups(plan: Plan, ids: _Ids, start: int, stop: int) -> dict[str, list[tuple]]:
+    rng = _chunk_rng(plan, "groups", start)
+    groups, members = [], []
+    for g in range(start, stop):
+        group_id = ids("groups", g)
+        owner = _skewed(rng, plan.users, 1.5, "users")
+        created = _timestamp(rng)
+        groups.append((group_id, rng.choice(("Familia", "Amigas", "Clase", "Trabajo", "Equipo")), ids("users", owner), created))
+        size = min(plan.users, max(2, int(rng.paretovariate(1.3)) + 1), 200)
+        member_indexes = {owner, *rng.sample(range(plan.users), size - 1)} if size > 1 else {owner}
+        for member in member_indexes:
+            members.append((group_id, ids("users", member), ids("users", owner), _timestamp(rng, created)))
+    return {"groups": groups, "group_members": members}
+
+
+def _gen_wishlists(plan: Plan, ids: _Ids, start: int, stop: int) -> dict[str, list[tuple]]:
+    rng = _chunk_rng(plan, "wishlists", start)
+    wishlists, permissions = [], []
+    for w in range(start, stop):
+        wishlist_id = ids("wishlists", w)
+        creator = _skewed(rng, plan.users, 1.8, "users")
+        created = _timestamp(rng)
+        wishlists.append((
+            wishlist_id,
+            ids("users", creator),
+            rng.choice(("Cumpleaños", "Navidad", "Boda", "Reyes", "Bebé")) + f" {w}",
+            "Lista generada" if rng.random() < 0.3 else None,
+            (created + timedelta(days=rng.randint(7, 365))).date() if rng.random() < 0.6 else None,  # event_date
+            created,
+            created,
+        ))
+        subjects = {(SubjectType.USER.value, creator): ListRole.OWNER.value}
+        for _ in range(rng.randint(0, 4)):
+            if rng.random() < 0.4:
+                subject = (SubjectType.GROUP.value, _skewed(rng, plan.groups, 1.5, "groups"))
+            else:
+                subject = (SubjectType.USER.value, rng.randrange(plan.users))
+            subjects.setdefault(subject, _weighted(rng, ((ListRole.VIEWER.value, 85), (ListRole.EDITOR.value, 15))))
+        for k, ((kind, index), role) in enumerate(subjects.items()):
+            subject_id = ids("users" if kind == SubjectType.USER.value else "groups", index)
+            permissions.append((ids("wishlist_permissions", w * 8 + k), wishlist_id, kind, subject_id, role))
+    return {"wishlists": wishlists, "wishlist_permissions": permissions}
+
+
+def _gen_items(plan: Plan, ids: _Ids, start: int, stop: int) -> dict[str, list[tuple]]:
+    rng = _chunk_rng(plan, "items", start)
+    items, claims, contributions, invites, activity = [], [], [], [], []
+    for i in range(start, stop):
+        item_id = ids("items", i)
+        wishlist = _skewed(rng, plan.wishlists, 2.0, "wishlists")
+        created = _timestamp(rng)
+        price = int(rng.lognormvariate(8.0, 1.2))  # Mediana ~30 €
+        group_gift = rng.random() < 0.05
+        items.append((
+            item_id,
+            ids("wishlists", wishlist),
+            f"https://shop{rng.randint(1, 500)}.example.com/p/{rng.randrange(plan.items * 2)}",
+            f"Producto {i}",
+            "Descripción del producto " * rng.randint(0, 6) or None,
+            rng.choice(_BRANDS),
+            price,
+            _weighted(rng, _CURRENCIES),
+            f"https://img.example.com/{i}.jpg" if rng.random() < 0.7 else None,
+            json.dumps({"color": rng.choice(("rojo", "azul", "negro")), "talla": rng.choice(("S", "M", "L"))})
+            if rng.random() < 0.4 else None,
+            "restricted" if rng.random() < 0.05 else "list",
+            rng.randint(3, 10) if group_gift else None,
+            2 if group_gift else None,
+            price * 2 if group_gift and rng.random() < 0.2 else None,
+            created,
+            created,
+            nth_key(i),  # rank: creciente con el índice, así que cada lista queda ordenada y numerada
+        ))
+
+        # Claims: ~20% de los items, 1-3 personas distintas y como mucho uno activo
+        if rng.random() < 0.2:
+            taken = False
+            for k, user in enumerate(rng.sample(range(plan.users), min(plan.users, rng.randint(1, 3)))):
+                status = _weighted(rng, _CLAIM_STATUSES)
+                if status in _ACTIVE_CLAIM_STATUSES:
+                    status, taken = (ClaimStatus.INTERESTED.value, taken) if taken else (status, True)
+                claimed = _timestamp(rng, created)
+                claims.append((
+                    ids("item_claims", i * 4 + k), item_id, ids("users", user),
+                    status, None, claimed, claimed,
+                ))
+
+        # Regalos en grupo: contribuciones e invitaciones
+        if group_gift:
+            contributors = rng.sample(range(plan.users), min(plan.users, rng.randint(2, 8)))
+            inviter = ids("users", contributors[0])
+            share = price // len(contributors)
+            for k, user in enumerate(contributors):
+                contributions.append((
+                    ids("item_contributions", i * 8 + k), item_id, ids("users", user),
+                    share, rng.random() < 0.3, _timestamp(rng, created),
+                ))
+            invited = set()
+            for k in range(rng.randint(1, 3)):
+                if rng.random() < 0.5:
+                    kind, subject_id = SubjectType.GROUP.value, ids("groups", _skewed(rng, plan.groups, 1.5, "groups"))
+                else:
+                    kind, subject_id = SubjectType.USER.value, ids("users", rng.randrange(plan.users))
+                if (kind, subject_id) in invited:
+                    continue
+                invited.add((kind, subject_id))
+                status = _weighted(rng, _INVITE_STATUSES)
+                sent = _timestamp(rng, created)
+                invites.append((
+                    ids("contribution_invites", i * 4 + k), item_id, inviter, kind, subject_id, share, status,
+                    sent, None if status == InviteStatus.PENDING.value else _timestamp(rng, sent),
+                ))
+
+        # Actividad: larga cola (la mayoría 0, algunos items muchas entradas)
+        for k in range(min(15, int(rng.paretovariate(1.8)) - 1)):
+            activity.append((
+                ids("item_activity", i * 16 + k), item_id, ids("users", rng.randrange(plan.users)),
+                _weighted(rng, _ACTIVITY_KINDS), None, _timestamp(rng, created),
+            ))
+
+    return {
+        "items": items,
+        "item_claims": claims,
+        "item_contributions": contributions,
+        "contribution_invites": invites,
+        "item_activity": activity,
+    }
+
+
+# Columnas por tabla, en el orden de las tuplas generadas
+COLUMNS: dict[str, tuple[str, ...]] = {
+    User.__tablename__: ("id", "email", "email_verified", "display_name", "avatar_url", "locale",
+                         "is_active", "created_at", "updated_at"),
+    Session.__tablename__: ("id", "user_id", "created_at", "expires_at"),
+    Group.__tablename__: ("id", "name", "owner_id", "created_at"),
+    GroupMember.__tablename__: ("group_id", "user_id", "added_by", "created_at"),
+    Wishlist.__tablename__: ("id", "creator_id", "name", "description", "event_date", "created_at", "updated_at"),
+    WishlistPermission.__tablename__: ("id", "wishlist_id", "subject_kind", "subject_id", "role"),
+    Item.__tablename__: ("id", "wishlist_id", "source_url", "name", "description", "brand", "price_cents",
+                         "currency", "image_url", "metadata", "visibility", "max_contributors",
+                         "min_contributors", "target_amount_cents", "created_at", "updated_at", "rank"),
+    ItemClaim.__tablename__: ("id", "item_id", "user_id", "status", "note", "created_at", "updated_at"),
+    ItemContribution.__tablename__: ("id", "item_id", "user_id", "amount_cents", "locked", "created_at"),
+    ContributionInvite.__tablename__: ("id", "item_id", "inviter_id", "subject_kind", "subject_id",
+                                       "suggested_each_cents", "status", "created_at", "responded_at"),
+    ItemActivity.__tablename__: ("id", "item_id", "actor_id", "kind", "payload", "created_at"),
+}
+
+# Fases en orden de dependencias (claves foráneas)
+PHASES: tuple[tuple[str, str, Callable[..., dict[str, list[tuple]]]], ...] = (
+    ("users", "users", _gen_users),
+    ("groups", "groups", _gen_groups),
+    ("wishlists", "wishlists", _gen_wishlists),
+    ("items", "items", _gen_items),
+)
+
+
+# ---------------------------------------------------------------------------
+# Carga con COPY
+# ---------------------------------------------------------------------------
+
+def _conninfo(database_url: str) -> str:
+    """Convierte una URL de SQLAlchemy en una cadena de conexión de psycopg."""
+    for prefix in ("postgresql+psycopg://", "postgresql+psycopg2://"):
+        if database_url.startswith(prefix):
+            return "postgresql://" + database_url[len(prefix):]
+    return database_url
+
+
+_worker_conn = None
+
+
+def _init_worker(conninfo: str) -> None:
+    global _worker_conn
+    import psycopg
+
+    _worker_conn = psycopg.connect(conninfo)
+
+
+def copy_rows(conn, table: str, rows: list[tuple]) -> None:
+    """Carga filas en una tabla con COPY FROM STDIN."""
+    if not rows:
+        return
+    columns = ", ".join(COLUMNS[table])
+    with conn.cursor() as cur:
+        with cur.copy(f"COPY {table} ({columns}) FROM STDIN") as copy:
+            for row in rows:
+                copy.write_row(row)
+
+
+def _load_chunk(task: tuple[str, Plan, int, int]) -> dict[str, int]:
+    phase, plan, start, stop = task
+    generator = next(gen for name, _, gen in PHASES if name == phase)
+    tables = generator(plan, _Ids(plan.seed), start, stop)
+    with _worker_conn.transaction():
+        for table, rows in tables.items():
+            copy_rows(_worker_conn, table, rows)
+    return {table: len(rows) for table, rows in tables.items()}
+
+
+def _chunks(total: int, size: int) -> Iterator[tuple[int, int]]:
+    for start in range(0, total, size):
+        yield start, min(total, start + size)
+
+
+def write_fixtures(plan: Plan, path: Path, sample: int = 1000) -> None:
+    """
+    Guarda ids existentes para los escenarios de benchmarks.http_bench.
+
+    Sin credenciales: los usuarios generados no pueden hacer login (el modelo
+    ``User`` se autentica con OAuth y no tiene usuario ni contraseña).
+    """
+    ids = _Ids(plan.seed)
+    rng = random.Random(plan.seed)
+
+    def pick(table: str, total: int) -> list[str]:
+        return [ids(table, i) for i in sorted(rng.sample(range(total), min(total, sample)))]
+
+    # Las listas más populares (con más items) son los primeros índices antes de dispersar
+    popular = sorted({(k * _SCATTER_PRIMES["wishlists"]) % plan.wishlists for k in range(min(plan.wishlists, 50))})
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({
+        "user_ids": pick("users", plan.users),
+        "item_ids": pick("items", plan.items),
+        "wishlist_ids": [ids("wishlists", w) for w in popular],
+    }, indent=2), encoding="utf-8")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Punto de entrada del comando."""
+    from app.core.config import settings
+
+    parser = argparse.ArgumentParser(description="Genera y carga datos sintéticos con COPY")
+    parser.add_argument("--scale", type=float, default=0.01, help="Factor de escala (1.0 = 1M usuarios, 5M items)")
+    parser.add_argument("--seed", type=int, default=42, help="Semilla (misma semilla y escala = mismos datos)")
+    parser.add_argument("--workers", type=int, default=4, help="Procesos de carga en paralelo")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Filas raíz por trozo")
+    parser.add_argument("--database-url", default=settings.DATABASE_URL, help="Por defecto DATABASE_URL")
+    parser.add_argument("--truncate", action="store_true", help="Vaciar las tablas antes de cargar")
+    parser.add_argument("--fixtures-out", help="Guardar ids de muestra para benchmarks.http_bench")
+    parser.add_argument("--dry-run", action="store_true", help="Mostrar el plan sin cargar nada")
+    args = parser.parse_args(argv)
+
+    plan = build_plan(args.scale, args.seed)
+    print(f"Plan (escala {args.scale}, semilla {args.seed}): "
+          f"{plan.users} usuarios, {plan.groups} grupos, {plan.wishlists} listas, {plan.items} items")
+    if args.dry_run:
+        return 0
+
+    import psycopg
+
+    conninfo = _conninfo(args.database_url)
+    with psycopg.connect(conninfo, autocommit=True) as conn:
+        if args.truncate:
+            conn.execute(f"TRUNCATE {', '.join(COLUMNS)} CASCADE")
+        elif conn.execute(f"SELECT EXISTS (SELECT 1 FROM {User.__tablename__})").fetchone()[0]:
+            print("ERROR: la base de datos ya tiene datos; usa --truncate para vaciarla", file=sys.stderr)
+            return 1
+
+    totals: dict[str, int] = {}
+    started = time.perf_counter()
+    with Pool(processes=args.workers, initializer=_init_worker, initargs=(conninfo,)) as pool:
+        for phase, count_field, _ in PHASES:
+            phase_started = time.perf_counter()
+            tasks = [(phase, plan, start, stop) for start, stop in _chunks(getattr(plan, count_field), args.chunk_size)]
+            for counts in pool.imap_unordered(_load_chunk, tasks):
+                for table, rows in counts.items():
+                    totals[table] = totals.get(table, 0) + rows
+            print(f"  {phase:<10} {time.perf_counter() - phase_started:7.1f} s")
+
+    with psycopg.connect(conninfo, autocommit=True) as conn:
+        conn.execute(f"ANALYZE {', '.join(COLUMNS)}")
+
+    elapsed = time.perf_counter() - started
+    for table in COLUMNS:
+        print(f"  {table:<22} {totals.get(table, 0):>12,} filas")
+    print(f"Total: {sum(totals.values()):,} filas en {elapsed:.1f} s")
+
+    if args.fixtures_out:
+        write_fixtures(plan, Path(args.fixtures_out))
+        print(f"Datos de prueba para benchmarks guardados en {args.fixtures_out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+"""
+Informe de tiempos de importación (estilo ``python -X importtime``)
+
+Lanza un intérprete limpio que importa el módulo indicado (por defecto
+``app.main``), agrega el tiempo por paquete de primer nivel y permite fallar
+cuando el arranque supera el presupuesto configurado.
+
+Uso:
+    PYTHONPATH=src python -m app.cli.importtime
+    PYTHONPATH=src python -m app.cli.importtime --top 30 --json importtime.json
+    PYTHONPATH=src python -m app.cli.importtime --check --budget-ms 1200
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+# Directorio src/ (para que el subproceso encuentre el paquete app)
+SRC_DIR = Path(__file__).resolve().parents[2]
+
+
+class ImportRecord(NamedTuple):
+    """Una línea del informe de -X importtime (tiempos en microsegundos)"""
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+class ImportProfile(NamedTuple):
+    """Resultado de una ejecución del perfilado"""
+    records: list[ImportRecord]
+    wall_ms: float
+
+
+def parse_importtime(output: str) -> list[ImportRecord]:
+    """Parsea la salida de ``-X importtime`` (stderr del intérprete)."""
+    records = []
+    for line in output.splitlines():
+        match = _LINE_RE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        records.append(
+            ImportRecord(
+                module=module,
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+                depth=len(indent) // 2,
+            )
+        )
+    return records
+
+
+def profile_imports(module: str = "app.main", python: Optional[str] = None) -> ImportProfile:
+    """Importa ``module`` en un intérprete nuevo y devuelve sus tiempos."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC_DIR), env.get("PYTHONPATH")]))
+    # Evitar que la caché de bytecode obsoleta o el logging distorsionen la medida
+    env.setdefault("PYTHONDONTWRITEBYTECODE", "1")
+
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [python or sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+
+    if completed.returncode != 0:
+        raise RuntimeError(
+            f"No se pudo importar {module}:\n{completed.stderr[-2000:]}"
+        )
+    return ImportProfile(records=parse_importtime(completed.stderr), wall_ms=wall_ms)
+
+
+def module_total_us(records: list[ImportRecord], module: str) -> int:
+    """Tiempo acumulado de importación del módulo raíz."""
+    for record in records:
+        if record.module == module:
+            return record.cumulative_us
+    return sum(record.self_us for record in records)
+
+
+def aggregate_by_package(records: list[ImportRecord]) -> dict[str, int]:
+    """Suma el tiempo propio (self) de cada módulo por paquete de primer nivel."""
+    totals: dict[str, int] = defaultdict(int)
+    for record in records:
+        totals[record.module.split(".", 1)[0]] += record.self_us
+    return dict(totals)
+
+
+def _print_report(profile: ImportProfile, module: str, top: int) -> None:
+    """Imprime el informe en formato tabla."""
+    total_ms = module_total_us(profile.records, module) / 1000
+    print(f"Importación de {module}: {total_ms:.1f} ms "
+          f"(intérprete completo: {profile.wall_ms:.1f} ms, {len(profile.records)} módulos)")
+
+    print(f"\nPaquetes con más tiempo propio (top {top}):")
+    packages = sorted(aggregate_by_package(profile.records).items(), key=lambda kv: kv[1], reverse=True)
+    for name, self_us in packages[:top]:
+        print(f"  {self_us / 1000:9.1f} ms  {name}")
+
+    print(f"\nMódulos con más tiempo acumulado (top {top}):")
+    modules = sorted(profile.records, key=lambda r: r.cumulative_us, reverse=True)
+    for record in modules[:top]:
+        print(f"  {record.cumulative_us / 1000:9.1f} ms  {'  ' * record.depth}{record.module}")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Punto de entrada del comando."""
+    from app.core.config import settings
+
+    parser = argparse.ArgumentParser(description="Perfil de tiempos de importación de la aplicación")
+    parser.add_argument("--module", default="app.main", help="Módulo a importar (por defecto app.main)")
+    parser.add_argument("--top", type=int, default=20, help="Número de entradas a mostrar")
+    parser.add_argument("--runs", type=int, default=3, help="Ejecuciones; se usa la mediana")
+    parser.add_argument("--json", dest="json_path", help="Guardar el resultado en un fichero JSON")
+    parser.add_argument("--check", action="store_true", help="Salir con código 1 si se supera el presupuesto")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=settings.STARTUP_IMPORT_BUDGET_MS,
+        help="Presupuesto de importación en ms (por defecto STARTUP_IMPORT_BUDGET_MS)",
+    )
+    args = parser.parse_args(argv)
+
+    profiles = [profile_imports(args.module) for _ in range(max(1, args.runs))]
+    totals_ms = [module_total_us(p.records, args.module) / 1000 for p in profiles]
+    median_ms = statistics.median(totals_ms)
+    # Informe detallado de la ejecución más cercana a la mediana
+    profile = min(profiles, key=lambda p: abs(module_total_us(p.records, args.module) / 1000 - median_ms))
+
+    _print_report(profile, args.module, args.top)
+    print(f"\nMediana de {len(profiles)} ejecuciones: {median_ms:.1f} ms (presupuesto: {args.budget_ms:.0f} ms)")
+
+    if args.json_path:
+        payload = {
+            "module": args.module,
+            "median_ms": median_ms,
+            "runs_ms": totals_ms,
+            "budget_ms": args.budget_ms,
+            "packages_ms": {k: v / 1000 for k, v in aggregate_by_package(profile.records).items()},
+            "modules": [r._asdict() for r in profile.records],
+        }
+        Path(args.json_path).write_text(json.dumps(payload, indent=2), encoding="utf-8")
+
+    if args.check and median_ms > args.budget_ms:
+        print(f"ERROR: el arranque ({median_ms:.1f} ms) supera el presupuesto de {args.budget_ms:.0f} ms",
+              file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+"""
+Asesor de índices
+
+Revisa las estadísticas de PostgreSQL para detectar:
+- Índices sin uso (``pg_stat_user_indexes.idx_scan`` bajo) que solo cuestan escrituras
+- Índices redundantes (sus columnas son prefijo de otro índice de la misma tabla)
+- Tablas grandes con muchos ``Seq Scan`` (``pg_stat_user_tables``)
+- Consultas frecuentes de ``pg_stat_statements`` cuyo plan genérico recorre
+  tablas grandes sin índice (``EXPLAIN (GENERIC_PLAN)``)
+
+La revisión de consultas requiere PostgreSQL 16 o posterior
+(``GENERIC_PLAN``): con versiones anteriores se omite y se indica, en lugar
+de informar de que no hay consultas. El resto del informe funciona en
+cualquier versión.
+
+Uso:
+    PYTHONPATH=src python -m app.cli.index_advisor
+    PYTHONPATH=src python -m app.cli.index_advisor --min-scans 50 --top-statements 30 --json advisor.json
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
+
+# EXPLAIN (GENERIC_PLAN) explica consultas con parámetros $1, $2... sin valores
+MIN_SERVER_VERSION = 160000
+
+UNUSED_INDEXES_SQL = text("""
+    SELECT s.relname AS table_name,
+           s.indexrelname AS index_name,
+           s.idx_scan,
+           pg_relation_size(s.indexrelid) AS size_bytes
+    FROM pg_stat_user_indexes s
+    JOIN pg_index i ON i.indexrelid = s.indexrelid
+    WHERE NOT i.indisunique
+      AND NOT i.indisprimary
+      AND s.idx_scan <= :min_scans
+    ORDER BY pg_relation_size(s.indexrelid) DESC
+""")
+
+INDEX_DEFINITIONS_SQL = text("""
+    SELECT t.relname AS table_name,
+           c.relname AS index_name,
+           i.indisunique OR i.indisprimary AS is_unique,
+           i.indkey::int2[] AS columns,
+           i.indpred IS NOT NULL OR i.indexprs IS NOT NULL AS is_partial_or_expression,
+           pg_relation_size(c.oid) AS size_bytes
+    FROM pg_index i
+    JOIN pg_class c ON c.oid = i.indexrelid
+    JOIN pg_class t ON t.oid = i.indrelid
+    JOIN pg_namespace n ON n.oid = t.relnamespace
+    WHERE n.nspname = current_schema()
+""")
+
+SEQ_SCAN_TABLES_SQL = text("""
+    SELECT relname AS table_name,
+           seq_scan,
+           seq_tup_read,
+           COALESCE(idx_scan, 0) AS idx_scan,
+           n_live_tup
+    FROM pg_stat_user_tables
+    WHERE n_live_tup >= :min_rows
+      AND seq_scan > COALESCE(idx_scan, 0)
+    ORDER BY seq_tup_read DESC
+""")
+
+TOP_STATEMENTS_SQL = text("""
+    SELECT queryid, query, calls, total_exec_time, mean_exec_time, rows
+    FROM pg_stat_statements
+    WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+      AND query ~* '^\\s*(select|with)\\M'
+    ORDER BY total_exec_time DESC
+    LIMIT :limit
+""")
+
+
+def find_unused_indexes(conn: Connection, min_scans: int) -> list[dict[str, Any]]:
+    """Índices no únicos con ``idx_scan <= min_scans`` desde el último reset de estadísticas."""
+    return [dict(row._mapping) for row in conn.execute(UNUSED_INDEXES_SQL, {"min_scans": min_scans})]
+
+
+def find_redundant_indexes(conn: Connection) -> list[dict[str, Any]]:
+    """Índices cuyas columnas son un prefijo de otro índice de la misma tabla."""
+    by_table: dict[str, list[dict[str, Any]]] = {}
+    for row in conn.execute(INDEX_DEFINITIONS_SQL):
+        if row.is_partial_or_expression:
+            continue
+        by_table.setdefault(row.table_name, []).append(dict(row._mapping))
+
+    redundant = []
+    for indexes in by_table.values():
+        for index in indexes:
+            # Un índice único puede ser necesario para la restricción aunque esté cubierto
+            if index["is_unique"]:
+                continue
+            columns = list(index["columns"])
+            for other in indexes:
+                other_columns = list(other["columns"])
+                if other is index or len(other_columns) < len(columns):
+                    continue
+                if other_columns[: len(columns)] == columns and (
+                    len(other_columns) > len(columns)
+                    or other["is_unique"]
+                    or other["index_name"] < index["index_name"]  # Duplicados exactos: se conserva uno
+                ):
+                    redundant.append({
+                        "table_name": index["table_name"],
+                        "index_name": index["index_name"],
+                        "covered_by": other["index_name"],
+                        "size_bytes": index["size_bytes"],
+                    })
+                    break
+    return redundant
+
+
+def find_seq_scan_tables(conn: Connection, min_rows: int) -> list[dict[str, Any]]:
+    """Tablas grandes que se leen más con Seq Scan que con índices."""
+    return [dict(row._mapping) for row in conn.execute(SEQ_SCAN_TABLES_SQL, {"min_rows": min_rows})]
+
+
+def _plan_nodes(plan: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+def find_unindexed_statements(conn: Connection, limit: int, min_rows: float) -> Optional[list[dict[str, Any]]]:
+    """
+    Consultas de ``pg_stat_statements`` con ``Seq Scan`` sobre tablas grandes.
+
+    Devuelve None si la extensión no está instalada.
+    """
+    installed = conn.execute(
+        text("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements')")
+    ).scalar()
+    if not installed:
+        return None
+
+    findings = []
+    for statement in conn.execute(TOP_STATEMENTS_SQL, {"limit": limit}).all():
+        # Cada EXPLAIN en su propio savepoint: una consulta no explicable no aborta el resto
+        savepoint = conn.begin_nested()
+        try:
+            plan = conn.exec_driver_sql(
+                f"EXPLAIN (FORMAT JSON, GENERIC_PLAN) {statement.query}"
+            ).scalar()[0]["Plan"]
+        except DBAPIError:
+            savepoint.rollback()
+            continue
+        savepoint.rollback()
+
+        scans = [
+            {"table_name": node.get("Relation Name"), "estimated_rows": node.get("Plan Rows")}
+            for node in _plan_nodes(plan)
+            if node.get("Node Type") == "Seq Scan" and node.get("Plan Rows", 0) >= min_rows
+        ]
+        if scans:
+            findings.append({
+                "queryid": statement.queryid,
+                "query": " ".join(statement.query.split())[:300],
+                "calls": statement.calls,
+                "total_exec_time_ms": round(statement.total_exec_time, 1),
+                "mean_exec_time_ms": round(statement.mean_exec_time, 3),
+                "seq_scans": scans,
+            })
+    return findings
+
+
+def _size(size_bytes: int) -> str:
+    for unit in ("B", "kB", "MB", "GB"):
+        if size_bytes < 1024:
+            return f"{size_bytes:.0f} {unit}"
+        size_bytes /= 1024
+    return f"{size_bytes:.1f} TB"
+
+
+def _print_section(title: str, rows: list[dict[str, Any]], fmt) -> None:
+    print(f"\n{title}")
+    if not rows:
+        print("  (ninguno)")
+    for row in rows:
+        print(f"  {fmt(row)}")
+
+
+def server_version(conn: Connection) -> int:
+    """Versión del servidor como ``server_version_num`` (p. ej. 160002 para 16.2)."""
+    return int(conn.execute(text("SHOW server_version_num")).scalar())
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Punto de entrada del comando."""
+    from app.db.session import engine
+
+    parser = argparse.ArgumentParser(description="Detecta índices sin uso o redundantes y consultas sin índice")
+    parser.add_argument("--min-scans", type=int, default=0, help="Índices con idx_scan <= N se consideran sin uso")
+    parser.add_argument("--min-rows", type=int, default=10_000, help="Tamaño mínimo de tabla para avisar de Seq Scan")
+    parser.add_argument("--top-statements", type=int, default=20, help="Consultas de pg_stat_statements a revisar")
+    parser.add_argument("--json", dest="json_path", help="Guardar el informe en un fichero JSON")
+    args = parser.parse_args(argv)
+
+    with engine.connect() as conn:
+        version = server_version(conn)
+        explainable = version >= MIN_SERVER_VERSION
+        stats_reset = conn.execute(
+            text("SELECT stats_reset FROM pg_stat_database WHERE datname = current_database()")
+        ).scalar()
+        report = {
+            "stats_reset": stats_reset.isoformat() if stats_reset else None,
+            "unused_indexes": find_unused_indexes(conn, args.min_scans),
+            "redundant_indexes": find_redundant_indexes(conn),
+            "seq_scan_tables": find_seq_scan_tables(conn, args.min_rows),
+            "unindexed_statements": (
+                find_unindexed_statements(conn, args.top_statements, args.min_rows) if explainable else None
+            ),
+            "server_version_num": version,
+        }
+
+    print(f"Estadísticas acumuladas desde: {report['stats_reset'] or 'inicio del servidor'}")
+
+    _print_section(
+        f"Índices sin uso (idx_scan <= {args.min_scans}):",
+        report["unused_indexes"],
+        lambda r: f"{r['table_name']}.{r['index_name']}: {r['idx_scan']} scans, {_size(r['size_bytes'])}",
+    )
+    _print_section(
+        "Índices redundantes:",
+        report["redundant_indexes"],
+        lambda r: f"{r['table_name']}.{r['index_name']} (cubierto por {r['covered_by']}), {_size(r['size_bytes'])}",
+    )
+    _print_section(
+        f"Tablas con más Seq Scan que Index Scan (>= {args.min_rows} filas):",
+        report["seq_scan_tables"],
+        lambda r: (f"{r['table_name']}: {r['seq_scan']} seq / {r['idx_scan']} idx, "
+                   f"{r['seq_tup_read']} filas leídas, {r['n_live_tup']} filas"),
+    )
+
+    print("\nConsultas frecuentes con Seq Scan sobre tablas grandes:")
+    if not explainable:
+        print(f"  Omitido: EXPLAIN (GENERIC_PLAN) necesita PostgreSQL 16 o posterior "
+              f"(el servidor es {version // 10000}.{version % 10000})")
+    elif report["unindexed_statements"] is None:
+        print("  pg_stat_statements no está instalada (CREATE EXTENSION pg_stat_statements;"
+              " requiere shared_preload_libraries)")
+    elif not report["unindexed_statements"]:
+        print("  (ninguna)")
+    for row in report["unindexed_statements"] or []:
+        tables = ", ".join(f"{s['table_name']} (~{s['estimated_rows']:.0f} filas)" for s in row["seq_scans"])
+        print(f"  [{row['calls']} llamadas, {row['mean_exec_time_ms']} ms/llamada] {tables}\n      {row['query']}")
+
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(report, indent=2, default=str), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+"""
+Barrido de mantenimiento como proceso independiente
+
+Caduca invitaciones pendientes, elimina sesiones caducadas, libera claims
+'interested' abandonados y reequilibra las claves de orden de los items
+(ver ``app.services.maintenance_service``).
+
+Uso:
+    PYTHONPATH=src python -m app.cli.maintenance --once
+    PYTHONPATH=src python -m app.cli.maintenance --interval 300 --batch-size 500
+"""
+import argparse
+import asyncio
+import json
+import sys
+from typing import Optional
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Punto de entrada del comando."""
+    from app.core.config import settings
+    from app.services import maintenance_service
+
+    parser = argparse.ArgumentParser(description="Caduca invitaciones, sesiones y claims abandonados")
+    parser.add_argument("--once", action="store_true", help="Ejecutar una sola pasada y salir")
+    parser.add_argument("--interval", type=float, default=settings.MAINTENANCE_INTERVAL_SECONDS,
+                        help="Segundos entre pasadas (modo continuo)")
+    parser.add_argument("--batch-size", type=int, default=settings.MAINTENANCE_BATCH_SIZE,
+                        help="Filas por lote")
+    parser.add_argument("--max-batches", type=int, default=settings.MAINTENANCE_MAX_BATCHES,
+                        help="Lotes máximos por tarea y pasada")
+    args = parser.parse_args(argv)
+
+    settings.MAINTENANCE_BATCH_SIZE = args.batch_size
+    settings.MAINTENANCE_MAX_BATCHES = args.max_batches
+
+    if args.once:
+        summary = maintenance_service.run_once()
+        print(json.dumps(summary, indent=2))
+        return 1 if summary["errors"] else 0
+
+    try:
+        asyncio.run(maintenance_service.run_periodically(args.interval))
+    except KeyboardInterrupt:
+        print(json.dumps(maintenance_service.get_metrics(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""
+Planificador de refresco de precios como proceso independiente
+
+Rellena las claves de URL de los items nuevos y refresca por lotes los
+precios pendientes (ver ``app.services.price_service``).
+
+Uso:
+    PYTHONPATH=src python -m app.cli.price_refresh --once
+    PYTHONPATH=src python -m app.cli.price_refresh --interval 60
+"""
+import argparse
+import asyncio
+import json
+import sys
+from typing import Optional
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Punto de entrada del comando."""
+    from app.core.config import settings
+    from app.scraper.pipeline import build_scraper
+    from app.services import price_service
+
+    parser = argparse.ArgumentParser(description="Refresca los precios de los productos seguidos")
+    parser.add_argument("--once", action="store_true", help="Ejecutar una sola pasada y salir")
+    parser.add_argument("--interval", type=float, default=settings.PRICE_REFRESH_TICK_SECONDS,
+                        help="Segundos entre pasadas (modo continuo)")
+    parser.add_argument("--batch-size", type=int, default=settings.PRICE_REFRESH_BATCH_SIZE,
+                        help="Productos por lote")
+    args = parser.parse_args(argv)
+
+    settings.PRICE_REFRESH_BATCH_SIZE = args.batch_size
+
+    async def run_once() -> dict:
+        scraper = build_scraper()
+        try:
+            return await price_service.refresh_once(scraper)
+        finally:
+            await scraper.fetcher.aclose()
+
+    if args.once:
+        print(json.dumps(asyncio.run(run_once()), indent=2))
+        return 0
+
+    try:
+        asyncio.run(price_service.run_periodically(build_scraper(), args.interval))
+    except KeyboardInterrupt:
+        print(json.dumps(price_service.get_metrics(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
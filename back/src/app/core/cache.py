@@ -0,0 +1,362 @@
+"""
+Caché de lecturas con backend intercambiable
+
+Las lecturas por ID (``user_service.get_user``, ``item_service.get_item``)
+se repiten mucho y cambian poco. La caché guarda el resultado ya serializado
+(JSON), así que no depende de la sesión de SQLAlchemy que lo leyó, y ofrece:
+
+- ``get_or_set``: devuelve la entrada o la calcula. Las peticiones simultáneas
+  de la misma clave en el proceso esperan al primer cálculo (single-flight)
+  en vez de ir todas a la base de datos
+- Invalidación por etiquetas (``users:<id>``, ``items:<id>``, ``wishlists:<id>``):
+  cada etiqueta tiene una versión y una entrada guardada con versiones
+  antiguas se descarta al leerla. Invalidar cuesta O(etiquetas), no
+  O(claves), y un cálculo que empezó antes de una invalidación no puede
+  dejar en la caché un valor anterior a ella
+- ``@cached`` calcula siempre en el primario (``routing.use_primary``): la
+  invalidación llega justo después del commit, cuando una réplica puede no
+  tener aún la escritura
+- Métricas de aciertos, fallos, entradas obsoletas y peticiones agrupadas
+
+Backends:
+- ``memory``: LRU con TTL en el proceso
+- ``redis``: compartido entre workers/instancias (cualquier servidor con protocolo
+  Redis); requiere el paquete ``redis`` y cae a ``memory`` si el servidor no responde.
+  Las invalidaciones hechas durante la caída solo llegan al proceso que las hace:
+  el TTL acota cuánto puede durar un valor obsoleto en los demás
+
+Uso en servicios:
+    @cached("users:{user_id}", schema=user_schema.User, tags=("users:{user_id}",))
+    def get_user(db, user_id): ...
+
+    get_cache().invalidate(f"users:{user_id}")  # Después del commit
+"""
+import functools
+import inspect
+import itertools
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Optional, Sequence
+
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.core.logging_config import get_logger
+from app.db.routing import use_primary
+
+logger = get_logger(__name__)
+
+_MISS = object()
+
+
+class MemoryBackend:
+    """Entradas y versiones de etiquetas en memoria del proceso"""
+
+    def __init__(self, max_entries: int = 10_000) -> None:
+        self._entries: OrderedDict[str, tuple[bytes, float]] = OrderedDict()
+        # Todas las versiones caducan con el mismo TTL: el orden de inserción es el de caducidad
+        self._versions: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._counter = itertools.count(1)
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self.errors = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Valor de ``key`` o None si no existe o ha caducado."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        """Guarda ``value`` durante ``ttl`` segundos."""
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)  # Descartar la entrada menos reciente
+
+    def versions(self, tags: Sequence[str]) -> list[Optional[str]]:
+        """Versión actual de cada etiqueta (None si nunca se ha invalidado o ya caducó)."""
+        now = time.monotonic()
+        with self._lock:
+            result = []
+            for tag in tags:
+                version = self._versions.get(tag)
+                result.append(version[0] if version and version[1] > now else None)
+            return result
+
+    def bump(self, tags: Sequence[str], ttl: int) -> None:
+        """Da una versión nueva a cada etiqueta."""
+        now = time.monotonic()
+        with self._lock:
+            for tag in tags:
+                self._versions.pop(tag, None)
+                self._versions[tag] = (str(next(self._counter)), now + ttl)
+            while self._versions:
+                oldest = next(iter(self._versions.values()))
+                if oldest[1] > now:
+                    break
+                self._versions.popitem(last=False)
+
+
+class RedisBackend:
+    """Entradas y versiones compartidas en un servidor con protocolo Redis"""
+
+    def __init__(self, url: str, fallback: MemoryBackend, prefix: str = "cache:") -> None:
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError(
+                "CACHE_BACKEND=redis requiere el paquete 'redis' (pip install redis)"
+            ) from exc
+
+        self._redis_errors = (redis.RedisError, OSError)
+        # RESP2: lo habla cualquier servidor compatible (Redis, Valkey, KeyDB, Dragonfly...)
+        self._client = redis.Redis.from_url(url, protocol=2, socket_timeout=0.1, socket_connect_timeout=0.1)
+        self._fallback = fallback
+        self._prefix = prefix
+        self.errors = 0
+
+    def _unavailable(self, exc: Exception) -> None:
+        self.errors += 1
+        logger.warning(f"Backend de caché no disponible, usando memoria: {exc}")
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Como MemoryBackend.get."""
+        try:
+            return self._client.get(self._prefix + key)
+        except self._redis_errors as exc:
+            self._unavailable(exc)
+            return self._fallback.get(key)
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        """Como MemoryBackend.set (la expiración la aplica el servidor)."""
+        try:
+            self._client.set(self._prefix + key, value, ex=ttl)
+        except self._redis_errors as exc:
+            self._unavailable(exc)
+            self._fallback.set(key, value, ttl)
+
+    def versions(self, tags: Sequence[str]) -> list[Optional[str]]:
+        """Como MemoryBackend.versions, en un solo MGET."""
+        try:
+            values = self._client.mget([f"{self._prefix}tag:{tag}" for tag in tags])
+        except self._redis_errors as exc:
+            self._unavailable(exc)
+            return self._fallback.versions(tags)
+        return [value.decode() if value is not None else None for value in values]
+
+    def bump(self, tags: Sequence[str], ttl: int) -> None:
+        """
+        Como MemoryBackend.bump.
+
+        Las versiones son aleatorias y no un INCR: si la clave de una etiqueta
+        caduca, un INCR posterior podría repetir una versión ya usada.
+        """
+        try:
+            pipeline = self._client.pipeline(transaction=False)
+            for tag in tags:
+                pipeline.set(f"{self._prefix}tag:{tag}", uuid.uuid4().hex, ex=ttl)
+            pipeline.execute()
+        except self._redis_errors as exc:
+            self._unavailable(exc)
+            self._fallback.bump(tags, ttl)
+
+
+class Cache:
+    """get-or-compute con single-flight e invalidación por etiquetas sobre un backend"""
+
+    def __init__(
+        self,
+        backend,
+        *,
+        enabled: bool = True,
+        default_ttl: int = 300,
+        max_ttl: int = 3600,
+    ) -> None:
+        self.backend = backend
+        self.enabled = enabled
+        self.default_ttl = default_ttl
+        self.max_ttl = max_ttl
+        self._inflight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._metrics = dict.fromkeys(
+            ("hits", "misses", "stale", "coalesced", "stores", "invalidations"), 0
+        )
+
+    def _record(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._metrics[name] += amount
+
+    def _read(self, key: str) -> Any:
+        raw = self.backend.get(key)
+        if raw is None:
+            return _MISS
+        entry = json.loads(raw)
+        tags = entry["t"]
+        if tags and self.backend.versions(list(tags)) != list(tags.values()):
+            self._record("stale")
+            return _MISS
+        return entry["v"]
+
+    def get_or_set(
+        self,
+        key: str,
+        compute: Callable[[], Any],
+        *,
+        ttl: Optional[int] = None,
+        tags: Sequence[str] = (),
+        tags_from: Optional[Callable[[Any], Iterable[str]]] = None,
+    ) -> Any:
+        """
+        Devuelve el valor de ``key`` o lo calcula con ``compute`` y lo guarda.
+
+        Args:
+            compute: Función sin argumentos que devuelve datos serializables en JSON.
+                Un resultado None no se guarda
+            ttl: Segundos de vida (``CACHE_TTL_SECONDS`` por defecto, como mucho ``CACHE_MAX_TTL_SECONDS``)
+            tags: Etiquetas conocidas antes de calcular; invalidarlas descarta la entrada
+            tags_from: Etiquetas adicionales que dependen del valor calculado
+
+        Returns:
+            Una copia del valor (decodificada del JSON), igual en aciertos y fallos
+        """
+        if not self.enabled:
+            return compute()
+
+        value = self._read(key)
+        if value is not _MISS:
+            self._record("hits")
+            return value
+
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            self._record("coalesced")
+            payload = future.result()
+            return None if payload is None else json.loads(payload)
+
+        self._record("misses")
+        try:
+            # Versiones leídas antes de calcular: una invalidación durante el cálculo deja la entrada obsoleta
+            tags = list(tags)
+            versions = self.backend.versions(tags) if tags else []
+            value = compute()
+            payload = None
+            if value is not None:
+                payload = json.dumps(value)
+                entry_tags = dict(zip(tags, versions))
+                extra = [tag for tag in (tags_from(value) if tags_from else ()) if tag not in entry_tags]
+                if extra:
+                    entry_tags.update(zip(extra, self.backend.versions(extra)))
+                entry = json.dumps({"t": entry_tags, "v": value}).encode()
+                self.backend.set(key, entry, min(ttl or self.default_ttl, self.max_ttl))
+                self._record("stores")
+            future.set_result(payload)
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        return None if payload is None else json.loads(payload)
+
+    def invalidate(self, *tags: str) -> None:
+        """Descarta todas las entradas guardadas con alguna de ``tags``."""
+        if not self.enabled or not tags:
+            return
+        self.backend.bump(tags, self.max_ttl)
+        self._record("invalidations", len(tags))
+
+    def metrics(self) -> dict[str, Any]:
+        """Contadores acumulados desde el arranque del proceso."""
+        with self._lock:
+            metrics = dict(self._metrics)
+        lookups = metrics["hits"] + metrics["misses"] + metrics["coalesced"]
+        metrics["hit_ratio"] = round(metrics["hits"] / lookups, 4) if lookups else None
+        metrics["backend_errors"] = self.backend.errors
+        return metrics
+
+
+@lru_cache(maxsize=1)
+def get_cache() -> Cache:
+    """Cache de la aplicación, construida a partir de ``settings``."""
+    memory = MemoryBackend(max_entries=settings.CACHE_MAX_ENTRIES)
+    backend = memory
+    if settings.CACHE_BACKEND == "redis":
+        backend = RedisBackend(settings.CACHE_REDIS_URL, fallback=memory, prefix=settings.CACHE_KEY_PREFIX)
+    elif settings.CACHE_BACKEND != "memory":
+        raise ValueError(f"CACHE_BACKEND desconocido: '{settings.CACHE_BACKEND}'")
+
+    return Cache(
+        backend,
+        enabled=settings.CACHE_ENABLED,
+        default_ttl=settings.CACHE_TTL_SECONDS,
+        max_ttl=settings.CACHE_MAX_TTL_SECONDS,
+    )
+
+
+def get_metrics() -> dict[str, Any]:
+    """Métricas de la caché de la aplicación."""
+    return get_cache().metrics()
+
+
+def cached(
+    key: str,
+    *,
+    schema: type[BaseModel],
+    tags: Sequence[str] = (),
+    tags_from: Optional[Callable[[dict], Iterable[str]]] = None,
+    ttl: Optional[int] = None,
+) -> Callable:
+    """
+    Cachea una lectura de servicio que devuelve un modelo ORM (o None).
+
+    ``key`` y ``tags`` son plantillas de ``str.format`` sobre los argumentos
+    de la función. El resultado se guarda como ``schema`` serializado y la
+    función decorada devuelve siempre una instancia de ``schema``, haya
+    acierto o no; la original sigue disponible como ``.uncached``.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            arguments = signature.bind(*args, **kwargs).arguments
+
+            def compute() -> Optional[dict]:
+                # Del primario: una réplica con retraso dejaría en la caché compartida
+                # el valor anterior a una escritura ya invalidada
+                with use_primary():
+                    result = func(*args, **kwargs)
+                return None if result is None else schema.model_validate(result).model_dump(mode="json")
+
+            value = get_cache().get_or_set(
+                key.format(**arguments),
+                compute,
+                ttl=ttl,
+                tags=[tag.format(**arguments) for tag in tags],
+                tags_from=tags_from,
+            )
+            return None if value is None else schema.model_validate(value)
+
+        wrapper.uncached = func
+        return wrapper
+
+    return decorator
@@ -0,0 +1,223 @@
+"""
+Compresión de respuestas (gzip y, opcionalmente, brotli y zstd)
+
+Los listados y exportaciones (items con descripción y metadatos JSONB) son
+texto muy repetitivo: comprimidos ocupan entre 5 y 10 veces menos. El
+middleware:
+
+- Negocia la codificación con ``Accept-Encoding`` (valores ``q``, ``*`` e
+  ``identity;q=0``) y elige la primera de ``COMPRESSION_ENCODINGS`` que
+  acepte el cliente
+- No comprime cuerpos de menos de ``COMPRESSION_MIN_BYTES`` (la cabecera y la
+  CPU cuestan más de lo que se ahorra), respuestas sin ``Content-Length``
+  (``StreamingResponse``: se envían según se generan), tipos ya comprimidos
+  (imágenes) ni respuestas que ya traen ``Content-Encoding``
+- Comprime en un hilo los cuerpos de ``COMPRESSION_THREAD_MIN_BYTES`` o más,
+  para no bloquear el event loop con un listado grande
+- Guarda los cuerpos comprimidos en un LRU por huella del contenido
+  (``COMPRESSION_CACHE_*``): una respuesta que se repite byte a byte (lecturas
+  de la caché, respuestas repetidas de Idempotency-Key, listados que no han
+  cambiado) se comprime una sola vez por codificación
+
+``br`` requiere el paquete ``brotli`` y ``zstd`` el paquete ``zstandard``.
+Es un middleware ASGI puro, como ``IdempotencyMiddleware``: necesita
+reescribir las cabeceras y el cuerpo de la respuesta completa.
+"""
+import asyncio
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Tipos que merece la pena comprimir (las imágenes y los binarios ya suelen estarlo)
+_COMPRESSIBLE_TYPES = ("text/", "application/json", "application/xml", "application/javascript", "image/svg+xml")
+_NO_BODY_STATUSES = frozenset({204, 304})
+_DEFAULT_LEVELS = {"gzip": 6, "br": 4, "zstd": 3}
+
+
+def _compressors(encodings: Iterable[str], levels: dict[str, int]) -> dict[str, Callable[[bytes], bytes]]:
+    """Función de compresión de cada codificación, en orden de preferencia."""
+    compressors = {}
+    for encoding in encodings:
+        level = levels.get(encoding, _DEFAULT_LEVELS.get(encoding))
+        if encoding == "gzip":
+            compressors[encoding] = lambda body, level=level: gzip.compress(body, compresslevel=level, mtime=0)
+        elif encoding == "br":
+            try:
+                import brotli
+            except ImportError as exc:
+                raise RuntimeError(
+                    "COMPRESSION_ENCODINGS con 'br' requiere el paquete 'brotli' (pip install brotli)"
+                ) from exc
+            compressors[encoding] = lambda body, level=level: brotli.compress(body, quality=level)
+        elif encoding == "zstd":
+            try:
+                import zstandard
+            except ImportError as exc:
+                raise RuntimeError(
+                    "COMPRESSION_ENCODINGS con 'zstd' requiere el paquete 'zstandard' (pip install zstandard)"
+                ) from exc
+            # ZstdCompressor no es seguro entre hilos: uno por llamada (crearlo es barato)
+            compressors[encoding] = lambda body, level=level: zstandard.ZstdCompressor(level=level).compress(body)
+        else:
+            raise ValueError(f"Codificación de compresión desconocida: '{encoding}'")
+    return compressors
+
+
+def negotiate(accept_encoding: str, available: Iterable[str]) -> Optional[str]:
+    """
+    Codificación de ``available`` (en orden de preferencia del servidor) que acepta el cliente, o None.
+
+    Una codificación con ``q=0`` está excluida; ``*`` cubre las no mencionadas.
+    """
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name] = q
+    wildcard = weights.get("*", 0.0)
+    # Más peso del cliente primero; a igual peso, el orden del servidor
+    candidates = [
+        (-weights.get(encoding, wildcard), index, encoding)
+        for index, encoding in enumerate(available)
+        if weights.get(encoding, wildcard) > 0
+    ]
+    return min(candidates)[2] if candidates else None
+
+
+class CompressedCache:
+    """LRU de cuerpos comprimidos por (codificación, huella del cuerpo), con un presupuesto de bytes"""
+
+    def __init__(self, max_entries: int, max_bytes: int) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple[str, bytes], bytes] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(encoding: str, body: bytes) -> tuple[str, bytes]:
+        # blake2b es mucho más rápido que comprimir: la huella se paga siempre, la compresión solo una vez
+        return encoding, hashlib.blake2b(body, digest_size=16).digest()
+
+    def get(self, key: tuple[str, bytes]) -> Optional[bytes]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: tuple[str, bytes], value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = value
+            self._size += len(value)
+            while self._entries and (len(self._entries) > self.max_entries or self._size > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+
+class CompressionMiddleware:
+    """Comprime las respuestas completas según Accept-Encoding"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        encodings: Iterable[str] = ("gzip",),
+        levels: Optional[dict[str, int]] = None,
+        min_bytes: int = 1024,
+        thread_min_bytes: int = 65_536,
+        cache_max_entries: int = 512,
+        cache_max_bytes: int = 16 * 2**20,
+    ) -> None:
+        self.app = app
+        self.compressors = _compressors(encodings, levels or {})
+        self.min_bytes = min_bytes
+        self.thread_min_bytes = thread_min_bytes
+        self.cache = CompressedCache(cache_max_entries, cache_max_bytes) if cache_max_entries > 0 else None
+        logger.debug(f"Compresión de respuestas: {', '.join(self.compressors)} (desde {min_bytes} bytes)")
+
+    async def _compress(self, encoding: str, body: bytes) -> bytes:
+        key = CompressedCache.key(encoding, body) if self.cache is not None else None
+        if key is not None and (cached := self.cache.get(key)) is not None:
+            return cached
+        compress = self.compressors[encoding]
+        if len(body) >= self.thread_min_bytes:
+            compressed = await asyncio.to_thread(compress, body)
+        else:
+            compressed = compress(body)
+        if key is not None:
+            self.cache.set(key, compressed)
+        return compressed
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.compressors)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        # None: sin cabeceras todavía; {}: se envía sin comprimir; el mensaje: se comprimirá
+        start: Optional[Message] = None
+        chunks: list[bytes] = []
+
+        async def compressing_send(message: Message) -> None:
+            nonlocal start
+            if start is None and message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                length = headers.get("content-length")
+                if (
+                    message["status"] in _NO_BODY_STATUSES
+                    or length is None  # Streaming: se envía tal cual, según se genera
+                    or int(length) < self.min_bytes
+                    or "content-encoding" in headers
+                    or not headers.get("content-type", "").startswith(_COMPRESSIBLE_TYPES)
+                ):
+                    start = {}  # Sin compresión: el resto de mensajes pasan sin cambios
+                    await send(message)
+                    return
+                start = message
+                return
+            if not start or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            # Content-Length conocido: se acumula el cuerpo (el de BaseHTTPMiddleware llega en trozos)
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            body = b"".join(chunks)
+            compressed = await self._compress(encoding, body)
+            headers = MutableHeaders(raw=start["headers"])
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, compressing_send)
@@ -5,6 +5,7 @@ import logging
 from typing import Any
 
 from fastapi import Request, status
+from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
@@ -12,6 +13,8 @@ from sqlalchemy.exc import SQLAlchemyError, IntegrityError, OperationalError
 
 from app.core.exceptions import AppException, DatabaseError
 from app.core.logging_config import get_logger
+from app.db.health import is_unavailable_error
+from app.db.retry import retry_reason
 
 logger = get_logger(__name__)
 
@@ -45,9 +48,10 @@ async def app_exception_handler(request: Request, exc: AppException) -> JSONResp
             "error": {
                 "message": exc.message,
                 "type": exc.__class__.__name__,
-                "details": exc.details,
+                "details": jsonable_encoder(exc.details),  # Los IDs suelen ser UUID
             }
-        }
+        },
+        headers=exc.headers,
     )
 
 
@@ -130,7 +134,29 @@ async def database_exception_handler(request: Request, exc: SQLAlchemyError) ->
     
     Convierte excepciones de SQLAlchemy en DatabaseError para mantener
     el formato consistente y no exponer detalles internos de la BD.
+    Los errores transitorios que siguen fallando tras los reintentos de
+    ``app.db.retry`` (serialización, interbloqueo, conexión) y los de una
+    base de datos no disponible (``app.db.health``) responden 503 con
+    ``Retry-After``: el cliente puede repetir la petición.
     """
+    reason = retry_reason(exc) or ("unavailable" if is_unavailable_error(exc) else None)
+    if reason is not None:
+        logger.warning(
+            f"Error transitorio de base de datos ({reason}) en {request.url.path}: {exc}",
+            extra={"path": request.url.path, "method": request.method},
+        )
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={
+                "error": {
+                    "message": "La base de datos no está disponible temporalmente, reintenta en unos segundos",
+                    "type": "DatabaseError",
+                    "details": {"exception_type": exc.__class__.__name__, "reason": reason},
+                }
+            },
+            headers={"Retry-After": "1"},
+        )
+    
     # Log completo para debugging
     logger.exception(
         f"Error de base de datos en {request.url.path}: {exc}",
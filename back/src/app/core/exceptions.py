@@ -31,11 +31,13 @@ class AppException(Exception):
         self,
         message: str,
         status_code: int = 500,
-        details: Optional[dict[str, Any]] = None
+        details: Optional[dict[str, Any]] = None,
+        headers: Optional[dict[str, str]] = None
     ):
         self.message = message
         self.status_code = status_code
         self.details = details or {}
+        self.headers = headers
         super().__init__(self.message)
 
 
@@ -109,6 +111,18 @@ class DatabaseError(AppException):
         )
 
 
+class ServiceUnavailableError(AppException):
+    """Servicio no disponible temporalmente (ej: base de datos caída)"""
+    
+    def __init__(self, message: str, retry_after: int = 1, details: Optional[dict] = None):
+        super().__init__(
+            message=message,
+            status_code=503,
+            details=details or {},
+            headers={"Retry-After": str(retry_after)}
+        )
+
+
 class ConflictError(AppException):
     """Conflicto de estado (ej: intentar eliminar un recurso en uso)"""
     
@@ -118,3 +132,15 @@ class ConflictError(AppException):
             status_code=409,
             details=details or {}
         )
+
+
+class RateLimitError(AppException):
+    """Demasiadas peticiones (límite de tasa superado)"""
+    
+    def __init__(self, limit: str, retry_after: int, details: Optional[dict] = None):
+        super().__init__(
+            message="Demasiadas peticiones, inténtalo de nuevo más tarde",
+            status_code=429,
+            details=details or {"limit": limit, "retry_after": retry_after},
+            headers={"Retry-After": str(retry_after)}
+        )
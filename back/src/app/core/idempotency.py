@@ -0,0 +1,210 @@
+"""
+Idempotency-Key para los POST de creación
+
+Los clientes móviles reintentan ``POST /api/v1/items/`` y ``POST /api/v1/users/``
+cuando pierden la respuesta, lo que crea duplicados y repite trabajo caro
+(como el scraping del item). Si el request lleva la cabecera ``Idempotency-Key``:
+
+1. Se calcula una huella (sha256 de método, ruta, query y cuerpo)
+2. Se reserva la clave en ``idempotency_keys`` (la fila ``in_progress`` hace de candado)
+3. Primer intento: se ejecuta el endpoint y se guarda la respuesta
+4. Reintentos: se devuelve la respuesta guardada (cabecera ``Idempotent-Replayed: true``)
+   sin llegar a los routers ni a los servicios
+5. Duplicados simultáneos: esperan hasta ``IDEMPOTENCY_WAIT_SECONDS`` a que
+   termine el primero; si no termina, ``409`` con ``Retry-After``
+6. La misma clave con otra huella: ``422``
+
+No se guardan las respuestas 5xx, 409 y 429 (se libera la clave y el
+reintento vuelve a ejecutarse). Las claves caducan a las
+``IDEMPOTENCY_TTL_HOURS`` horas. Sin cabecera, el request pasa sin cambios.
+
+Es un middleware ASGI puro (no ``@app.middleware``) porque necesita leer el
+cuerpo y capturar la respuesta completa.
+"""
+import asyncio
+import hashlib
+import time
+from typing import Callable, Iterable, Optional
+
+from fastapi import Request
+from sqlalchemy.exc import SQLAlchemyError
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.exception_handlers import app_exception_handler
+from app.core.exceptions import AppException, ConflictError, ValidationError
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+# Respuestas que no se guardan: un reintento debe volver a ejecutarse
+_TRANSIENT_STATUSES = frozenset({409, 429})
+
+
+def fingerprint(method: str, path: str, query: bytes, body: bytes) -> str:
+    """Huella del request: la misma clave con otra huella es un error del cliente."""
+    digest = hashlib.sha256()
+    for part in (method.encode(), path.encode(), query, body):
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class IdempotencyMiddleware:
+    """Reserva, ejecuta una vez y repite la respuesta de los POST con Idempotency-Key"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        paths: Iterable[str],
+        session_factory: Callable,
+        ttl_seconds: float = 86_400,
+        lock_seconds: float = 60,
+        wait_seconds: float = 10,
+        max_response_bytes: int = 65_536,
+    ) -> None:
+        self.app = app
+        self.paths = frozenset(path.rstrip("/") for path in paths)
+        self.session_factory = session_factory
+        self.ttl_seconds = ttl_seconds
+        self.lock_seconds = lock_seconds
+        self.wait_seconds = wait_seconds
+        self.max_response_bytes = max_response_bytes
+
+    def _call(self, function: Callable, **kwargs):
+        with self.session_factory() as db:
+            return function(db, **kwargs)
+
+    async def _finish(self, function: Callable, **kwargs) -> None:
+        # La respuesta ya se ha enviado: un fallo aquí solo se registra
+        try:
+            await asyncio.to_thread(self._call, function, **kwargs)
+        except SQLAlchemyError as e:
+            logger.warning(f"No se pudo guardar el resultado de Idempotency-Key '{kwargs['key']}': {e}")
+
+    async def _error(self, scope: Scope, receive: Receive, send: Send, exc: AppException) -> None:
+        response = await app_exception_handler(Request(scope), exc)
+        await response(scope, receive, send)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"].rstrip("/") not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        key = Request(scope).headers.get(IDEMPOTENCY_HEADER)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not 0 < len(key) <= MAX_KEY_LENGTH:
+            await self._error(scope, receive, send, ValidationError(
+                message=f"{IDEMPOTENCY_HEADER} debe tener entre 1 y {MAX_KEY_LENGTH} caracteres",
+                field=IDEMPOTENCY_HEADER,
+            ))
+            return
+
+        # El cuerpo se lee una vez: sirve para la huella y se vuelve a entregar al endpoint
+        chunks = []
+        while True:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+        body = b"".join(chunks)
+        body_sent = False
+
+        async def replay_receive() -> Message:
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        from app.repositories import idempotency_repository
+
+        route = f"POST {scope['path'].rstrip('/')}"
+        request_fingerprint = fingerprint("POST", scope["path"].rstrip("/"), scope.get("query_string", b""), body)
+        deadline = time.monotonic() + self.wait_seconds
+        delay = 0.05
+        while True:
+            try:
+                result = await asyncio.to_thread(
+                    self._call, idempotency_repository.acquire,
+                    scope=route, key=key, fingerprint=request_fingerprint,
+                    lock_seconds=self.lock_seconds, ttl_seconds=self.ttl_seconds,
+                )
+            except SQLAlchemyError as e:
+                # Sin almacén no hay idempotencia, pero el request no debe fallar por ello
+                logger.warning(f"Idempotencia no disponible, se ejecuta sin protección: {e}")
+                await self.app(scope, replay_receive, send)
+                return
+
+            if result.acquired:
+                break
+            existing = result.existing
+            if existing is not None:
+                if existing.fingerprint != request_fingerprint:
+                    await self._error(scope, receive, send, ValidationError(
+                        message=f"{IDEMPOTENCY_HEADER} ya usada con otra petición",
+                        field=IDEMPOTENCY_HEADER,
+                    ))
+                    return
+                if existing.status == idempotency_repository.COMPLETED:
+                    await self._replay(send, existing)
+                    return
+            if time.monotonic() >= deadline:
+                error = ConflictError(
+                    message="Ya se está procesando una petición con la misma Idempotency-Key",
+                    details={"idempotency_key": key},
+                )
+                error.headers = {"Retry-After": "1"}
+                await self._error(scope, receive, send, error)
+                return
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.5)
+
+        await self._run(scope, replay_receive, send, idempotency_repository, route, key)
+
+    async def _run(self, scope: Scope, receive: Receive, send: Send, repository, route: str, key: str) -> None:
+        status_code = 500
+        content_type: Optional[str] = None
+        parts: list[bytes] = []
+        size = 0
+
+        async def capture(message: Message) -> None:
+            nonlocal status_code, content_type, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                for name, value in message.get("headers", []):
+                    if name.lower() == b"content-type":
+                        content_type = value.decode("latin-1")
+            elif message["type"] == "http.response.body" and size <= self.max_response_bytes:
+                chunk = message.get("body", b"")
+                size += len(chunk)
+                parts.append(chunk)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, capture)
+        except BaseException:
+            await self._finish(repository.release, scope=route, key=key)
+            raise
+
+        if status_code >= 500 or status_code in _TRANSIENT_STATUSES or size > self.max_response_bytes:
+            await self._finish(repository.release, scope=route, key=key)
+            return
+        await self._finish(
+            repository.complete,
+            scope=route, key=key, status_code=status_code, content_type=content_type, body=b"".join(parts),
+        )
+
+    async def _replay(self, send: Send, existing) -> None:
+        headers = [(REPLAYED_HEADER.lower().encode(), b"true")]
+        if existing.content_type:
+            headers.append((b"content-type", existing.content_type.encode("latin-1")))
+        body = bytes(existing.response_body or b"")
+        headers.append((b"content-length", str(len(body)).encode()))
+        await send({"type": "http.response.start", "status": existing.response_status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,199 @@
+"""
+Limitación de tasa (rate limiting) con token bucket
+
+Cada límite es un bucket por identidad (IP del cliente, nombre de usuario...)
+con capacidad ``N`` que se rellena a ``N / periodo`` tokens por segundo. Las
+comprobaciones se hacen antes de tocar la base de datos o calcular hashes,
+así que un cliente que supera el límite recibe un 429 con ``Retry-After``
+casi sin coste.
+
+Backends:
+- ``memory``: diccionario en proceso, O(1) por comprobación y acotado en tamaño (LRU)
+- ``redis``: compartido entre workers/instancias (script Lua atómico); requiere el
+  paquete ``redis`` y cae a ``memory`` si el servidor no responde
+
+Uso en routers:
+    @router.post("/login", dependencies=[Depends(limit_by_ip("login"))])
+    def login(...):
+        get_rate_limiter().check("login:username", credentials.username)
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, NamedTuple, Optional
+
+from fastapi import Request
+
+from app.core.config import settings
+from app.core.exceptions import RateLimitError
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+class RateLimit(NamedTuple):
+    """Capacidad del bucket y tokens que se recuperan por segundo"""
+    capacity: float
+    refill_per_second: float
+
+
+def parse_rate(value: str) -> Optional[RateLimit]:
+    """
+    Convierte ``"N/periodo"`` (second, minute, hour, day) en un RateLimit.
+
+    Una cadena vacía desactiva el límite (devuelve None). N tiene que ser
+    positivo: con 0 el bucket nunca se rellena (división por cero al calcular
+    la espera).
+    """
+    value = value.strip()
+    if not value:
+        return None
+    try:
+        amount, period = value.split("/", 1)
+        seconds = _PERIODS[period.strip().rstrip("s")]
+        capacity = float(amount)
+        if not math.isfinite(capacity) or capacity <= 0:
+            raise ValueError(capacity)
+    except (ValueError, KeyError):
+        raise ValueError(f"Límite de tasa inválido: '{value}' (formato esperado: N/second|minute|hour|day)")
+    return RateLimit(capacity=capacity, refill_per_second=capacity / seconds)
+
+
+class MemoryBackend:
+    """Buckets en memoria del proceso (un dict acotado, O(1) por operación)"""
+
+    def __init__(self, max_keys: int = 100_000) -> None:
+        self._buckets: OrderedDict[str, list[float]] = OrderedDict()
+        self._max_keys = max_keys
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str, limit: RateLimit, cost: float = 1.0) -> float:
+        """Consume ``cost`` tokens. Devuelve 0 si se permite o los segundos a esperar."""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = [limit.capacity, now]
+                self._buckets[key] = bucket
+                if len(self._buckets) > self._max_keys:
+                    self._buckets.popitem(last=False)  # Descartar el bucket menos reciente
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(limit.capacity, bucket[0] + (now - bucket[1]) * limit.refill_per_second)
+                bucket[1] = now
+
+            if bucket[0] >= cost:
+                bucket[0] -= cost
+                return 0.0
+            return (cost - bucket[0]) / limit.refill_per_second
+
+
+_REDIS_TOKEN_BUCKET = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+else
+    retry_after = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return tostring(retry_after)
+"""
+
+
+class RedisBackend:
+    """Buckets compartidos en un servidor con protocolo Redis"""
+
+    def __init__(self, url: str, fallback: MemoryBackend, prefix: str = "ratelimit:") -> None:
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError(
+                "RATE_LIMIT_BACKEND=redis requiere el paquete 'redis' (pip install redis)"
+            ) from exc
+
+        self._redis_errors = (redis.RedisError, OSError)
+        self._client = redis.Redis.from_url(url, socket_timeout=0.05, socket_connect_timeout=0.05)
+        self._script = self._client.register_script(_REDIS_TOKEN_BUCKET)
+        self._fallback = fallback
+        self._prefix = prefix
+
+    def acquire(self, key: str, limit: RateLimit, cost: float = 1.0) -> float:
+        """Como MemoryBackend.acquire, pero atómico entre procesos."""
+        try:
+            return float(self._script(
+                keys=[self._prefix + key],
+                args=[limit.capacity, limit.refill_per_second, time.time(), cost],
+            ))
+        except self._redis_errors as exc:
+            # Si el backend compartido no responde, limitar al menos por proceso
+            logger.warning(f"Backend de rate limiting no disponible, usando memoria: {exc}")
+            return self._fallback.acquire(key, limit, cost)
+
+
+class RateLimiter:
+    """Aplica los límites configurados sobre un backend"""
+
+    def __init__(self, backend, limits: dict[str, Optional[RateLimit]], enabled: bool = True) -> None:
+        self.backend = backend
+        self.limits = limits
+        self.enabled = enabled
+
+    def check(self, name: str, identity: str, cost: float = 1.0) -> None:
+        """Consume del bucket ``name`` de ``identity``; lanza RateLimitError si está vacío."""
+        limit = self.limits.get(name)
+        if not self.enabled or limit is None:
+            return
+
+        retry_after = self.backend.acquire(f"{name}:{identity}", limit, cost)
+        if retry_after > 0:
+            logger.warning(f"Límite de tasa superado: {name} ({identity}), reintentar en {retry_after:.1f} s")
+            raise RateLimitError(limit=name, retry_after=math.ceil(retry_after))
+
+
+@lru_cache(maxsize=1)
+def get_rate_limiter() -> RateLimiter:
+    """RateLimiter de la aplicación, construido a partir de ``settings``."""
+    memory = MemoryBackend(max_keys=settings.RATE_LIMIT_MAX_KEYS)
+    backend = memory
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        backend = RedisBackend(settings.RATE_LIMIT_REDIS_URL, fallback=memory)
+    elif settings.RATE_LIMIT_BACKEND != "memory":
+        raise ValueError(f"RATE_LIMIT_BACKEND desconocido: '{settings.RATE_LIMIT_BACKEND}'")
+
+    limits = {
+        "login:ip": parse_rate(settings.RATE_LIMIT_LOGIN_PER_IP),
+        "login:username": parse_rate(settings.RATE_LIMIT_LOGIN_PER_USERNAME),
+        "create_user:ip": parse_rate(settings.RATE_LIMIT_CREATE_USER_PER_IP),
+    }
+    return RateLimiter(backend, limits, enabled=settings.RATE_LIMIT_ENABLED)
+
+
+def client_ip(request: Request) -> str:
+    """IP del cliente (primer salto de X-Forwarded-For si se confía en el proxy)."""
+    if settings.RATE_LIMIT_TRUST_FORWARDED_FOR:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",", 1)[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def limit_by_ip(route: str) -> Callable[[Request], None]:
+    """Dependencia que aplica el límite ``<route>:ip`` a la IP del cliente."""
+
+    def dependency(request: Request) -> None:
+        get_rate_limiter().check(f"{route}:ip", client_ip(request))
+
+    return dependency
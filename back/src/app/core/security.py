@@ -1,28 +1,41 @@
 """
 Utilidades de seguridad: autenticación y autorización
+
+Los backends criptográficos (passlib/bcrypt y python-jose) se cargan de forma
+diferida en el primer uso para no penalizar el arranque de la aplicación.
 """
 from datetime import datetime, timedelta
-from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional
+
 from app.core.config import settings
 
-# Contexto para hashing de contraseñas
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+
+@lru_cache(maxsize=1)
+def get_pwd_context() -> "CryptContext":
+    """Contexto para hashing de contraseñas (se construye en el primer uso)"""
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verifica si una contraseña coincide con su hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """Genera el hash de una contraseña"""
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Crea un token JWT de acceso"""
+    from jose import jwt
+
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -36,9 +49,10 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 def decode_access_token(token: str) -> Optional[dict]:
     """Decodifica un token JWT"""
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         return payload
     except JWTError:
         return None
-
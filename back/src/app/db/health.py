@@ -0,0 +1,252 @@
+"""
+Salud de la base de datos: comprobación periódica y circuit breaker
+
+``/health/ready`` no consulta la base de datos: devuelve el último estado
+medido por ``run_health_monitor`` (latencia de un ``SELECT 1`` y ocupación
+del pool), así que un balanceador puede preguntar a menudo sin añadir carga.
+
+El circuit breaker evita que, con PostgreSQL caído o saturado, cada request
+espere el timeout completo del pool antes de fallar:
+
+- Cerrado: todo pasa. Cada error de conexión (desconexión, no se puede
+  conectar, timeout del pool, clases ``08``/``53``/``57``) suma; cualquier
+  sentencia correcta pone el contador a cero
+- Abierto: tras ``failure_threshold`` errores seguidos, ``get_db`` responde
+  503 al momento durante ``open_seconds``
+- Semiabierto: pasado ese tiempo deja pasar un request de prueba. Si su
+  primera sentencia va bien, el circuito se cierra; si falla, vuelve a abrirse.
+  El ping de ``run_health_monitor`` también vale como prueba: si un
+  balanceador deja de enviar tráfico mientras ``/health/ready`` dice 503,
+  ningún request llegaría a ``get_db`` para cerrar el circuito
+
+Los errores de una consulta (SQL inválido, restricciones, serialización) no
+cuentan: no dicen nada de la disponibilidad de la base de datos.
+"""
+import asyncio
+import threading
+import time
+from typing import Any, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# connection_exception, insufficient_resources, operator_intervention (apagado, statement_timeout)
+_UNAVAILABLE_SQLSTATE_CLASSES = frozenset({"08", "53", "57"})
+
+
+class CircuitBreaker:
+    """Circuit breaker de la base de datos (cerrado, abierto, semiabierto)"""
+
+    def __init__(self, *, failure_threshold: int, open_seconds: float, enabled: bool = True) -> None:
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.enabled = enabled
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_started_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.rejected = 0
+        self.times_opened = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Si un request puede usar la base de datos. En semiabierto, solo uno de prueba a la vez."""
+        if not self.enabled or self.state == CLOSED:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            if self.state == OPEN and now - self.opened_at >= self.open_seconds:
+                self.state = HALF_OPEN
+                self.trial_started_at = None
+                logger.info("Circuit breaker de la base de datos semiabierto: request de prueba")
+            # Una prueba que no termina en open_seconds (p. ej. no llegó a usar la base de datos) deja paso a otra
+            if self.state == HALF_OPEN and (
+                self.trial_started_at is None or now - self.trial_started_at >= self.open_seconds
+            ):
+                self.trial_started_at = now
+                return True
+            self.rejected += 1
+            return False
+
+    def retry_after(self) -> int:
+        """Segundos hasta que el circuito deje pasar otro request de prueba."""
+        started = self.trial_started_at if self.state == HALF_OPEN else self.opened_at
+        if started is None:
+            return 1
+        return max(1, int(self.open_seconds - (time.monotonic() - started) + 0.999))
+
+    def record_success(self) -> None:
+        if self.state == CLOSED and self.failures == 0:
+            return  # Camino habitual sin bloqueo
+        with self._lock:
+            if self.state == HALF_OPEN:
+                logger.info("Circuit breaker de la base de datos cerrado: la base de datos responde")
+                self.state = CLOSED
+            if self.state == CLOSED:
+                self.failures = 0
+
+    def record_probe_success(self) -> None:
+        """El ping de salud fue bien: cierra el circuito si ya se podía probar (``open_seconds`` cumplido)."""
+        if self.state == CLOSED:
+            return
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self.opened_at < self.open_seconds:
+                return
+            logger.info("Circuit breaker de la base de datos cerrado: el ping de salud responde")
+            self.state = CLOSED
+            self.failures = 0
+            self.trial_started_at = None
+
+    def record_failure(self, error: BaseException) -> None:
+        with self._lock:
+            self.last_error = f"{error.__class__.__name__}: {error}"
+            if self.state == OPEN:
+                return
+            self.failures += 1
+            if self.enabled and (self.state == HALF_OPEN or self.failures >= self.failure_threshold):
+                logger.warning(
+                    f"Circuit breaker de la base de datos abierto durante {self.open_seconds} s "
+                    f"({self.failures} errores de conexión; último: {self.last_error})"
+                )
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                self.times_opened += 1
+                self.failures = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+            "last_error": self.last_error,
+        }
+
+
+def is_unavailable_error(exc: BaseException, *, is_disconnect: bool = False) -> bool:
+    """Si ``exc`` indica que la base de datos no está disponible (y no un error de la consulta)."""
+    if is_disconnect:
+        return True
+    orig = getattr(exc, "orig", None) or exc
+    sqlstate = getattr(orig, "sqlstate", None) or getattr(orig, "pgcode", None)
+    if sqlstate:
+        return sqlstate[:2] in _UNAVAILABLE_SQLSTATE_CLASSES
+    # Sin SQLSTATE: error del cliente al conectar o leer del socket
+    return isinstance(exc, OperationalError)
+
+
+def install_breaker(engine: Engine, breaker: CircuitBreaker) -> None:
+    """Alimenta el circuit breaker con los errores y los éxitos de las sentencias del engine."""
+
+    def handle_error(context) -> None:
+        if is_unavailable_error(context.sqlalchemy_exception, is_disconnect=context.is_disconnect):
+            breaker.record_failure(context.original_exception)
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        breaker.record_success()
+
+    event.listen(engine, "handle_error", handle_error)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+
+
+class DatabaseHealth:
+    """Último estado medido de la base de datos principal"""
+
+    def __init__(
+        self,
+        engine: Engine,
+        breaker: CircuitBreaker,
+        *,
+        max_ping_ms: float,
+        max_pool_saturation: float,
+        stale_seconds: float,
+    ) -> None:
+        self.engine = engine
+        self.breaker = breaker
+        self.max_ping_ms = max_ping_ms
+        self.max_pool_saturation = max_pool_saturation
+        self.stale_seconds = stale_seconds
+        self.healthy = False  # Hasta la primera comprobación correcta no está listo
+        self.ping_ms: Optional[float] = None
+        self.checked_at: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def pool_status(self) -> dict[str, Any]:
+        """Conexiones en uso, libres y ocupación del pool (sin tocar la base de datos)."""
+        pool = self.engine.pool
+        if not hasattr(pool, "checkedout"):
+            return {}
+        capacity = pool.size() + max(getattr(pool, "_max_overflow", 0), 0)
+        checked_out = pool.checkedout()
+        return {
+            "size": pool.size(),
+            "capacity": capacity,
+            "checked_out": checked_out,
+            "idle": pool.checkedin(),
+            "saturation": round(checked_out / capacity, 3) if capacity else None,
+        }
+
+    def check(self) -> None:
+        """Mide la latencia de ``SELECT 1`` (síncrono; llamar desde un hilo)."""
+        was_healthy = self.healthy
+        started = time.perf_counter()
+        try:
+            with self.engine.connect() as conn:
+                conn.execute(text("SELECT 1")).scalar()
+            self.ping_ms = round((time.perf_counter() - started) * 1000, 2)
+            self.healthy = True
+            self.error = None
+            self.breaker.record_probe_success()
+        except Exception as exc:
+            self.ping_ms = None
+            self.healthy = False
+            self.error = f"{exc.__class__.__name__}: {exc}"
+        self.checked_at = time.monotonic()
+
+        if was_healthy and not self.healthy:
+            logger.warning(f"La base de datos no responde: {self.error}")
+        elif self.healthy and not was_healthy:
+            logger.info(f"Base de datos disponible (ping {self.ping_ms} ms)")
+
+    def readiness(self) -> tuple[bool, dict[str, Any]]:
+        """Si la instancia puede recibir tráfico, con los motivos si no puede."""
+        pool = self.pool_status()
+        reasons = []
+        if self.checked_at is None:
+            reasons.append("sin comprobación todavía")
+        elif time.monotonic() - self.checked_at > self.stale_seconds:
+            reasons.append("comprobación antigua (el ping no termina)")
+        elif not self.healthy:
+            reasons.append("la base de datos no responde")
+        elif self.ping_ms > self.max_ping_ms:
+            reasons.append(f"ping lento ({self.ping_ms} ms)")
+        if pool.get("saturation") is not None and pool["saturation"] >= self.max_pool_saturation:
+            reasons.append(f"pool saturado ({pool['checked_out']}/{pool['capacity']})")
+        if self.breaker.state != CLOSED:
+            reasons.append(f"circuit breaker {self.breaker.state}")
+        return not reasons, {
+            "ping_ms": self.ping_ms,
+            "checked_seconds_ago": round(time.monotonic() - self.checked_at, 1) if self.checked_at else None,
+            "error": self.error,
+            "pool": pool,
+            "circuit_breaker": self.breaker.as_dict(),
+            "reasons": reasons,
+        }
+
+
+async def run_health_monitor(health: DatabaseHealth, interval_seconds: float) -> None:
+    """Comprueba la base de datos cada ``interval_seconds`` (cancelable)."""
+    while True:
+        await asyncio.to_thread(health.check)
+        await asyncio.sleep(interval_seconds)
@@ -2,6 +2,7 @@
 
 from .auth_identity import AuthIdentity
 from .contribution_invite import ContributionInvite
+from .currency_rate import CurrencyRate
 from .enums import (
     AuthProvider,
     ClaimStatus,
@@ -10,11 +11,13 @@ from .enums import (
     SubjectType,
 )
 from .group import Group, GroupMember
+from .idempotency_key import IdempotencyKey
 from .item import Item
 from .item_acl import ItemACL
 from .item_activity import ItemActivity
 from .item_claim import ItemClaim
 from .item_contribution import ItemContribution
+from .product_price import PriceHistory, ProductPrice
 from .session import Session
 from .tag import Tag, WishlistTag
 from .user import User
@@ -25,8 +28,10 @@ __all__ = [
     "AuthProvider",
     "ClaimStatus",
     "ContributionInvite",
+    "CurrencyRate",
     "Group",
     "GroupMember",
+    "IdempotencyKey",
     "InviteStatus",
     "Item",
     "ItemACL",
@@ -34,6 +39,8 @@ __all__ = [
     "ItemClaim",
     "ItemContribution",
     "ListRole",
+    "PriceHistory",
+    "ProductPrice",
     "Session",
     "SubjectType",
     "Tag",
@@ -16,8 +16,7 @@ class AuthIdentity(Base):
         UUID(as_uuid=True),
         primary_key=True,
         default=uuid.uuid4,
-        server_default=func.gen_random_uuid(),
-        index=True
+        server_default=func.gen_random_uuid()
     )
     user_id = Column(
         UUID(as_uuid=True),
@@ -28,9 +27,8 @@ class AuthIdentity(Base):
     
     provider = Column(
         Text,
-        nullable=False,
-        index=True
-    )  # 'google', 'facebook', 'github', 'apple'
+        nullable=False
+    )  # 'google', 'facebook', 'github', 'apple' - indexado por uq_provider_user_id
     provider_user_id = Column(Text, nullable=False)  # "sub" de OpenID / ID único del proveedor
     provider_email = Column(CITEXT, nullable=True)  # Email reportado por proveedor (si lo comparte)
     email_verified = Column(Boolean, nullable=True)  # Verificación de ese proveedor (si aplica)
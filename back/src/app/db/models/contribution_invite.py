@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, Text, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -17,8 +17,7 @@ class ContributionInvite(Base):
         UUID(as_uuid=True),
         primary_key=True,
         default=uuid.uuid4,
-        server_default=func.gen_random_uuid(),
-        index=True
+        server_default=func.gen_random_uuid()
     )
     item_id = Column(
         UUID(as_uuid=True),
@@ -28,8 +27,9 @@ class ContributionInvite(Base):
     )
     inviter_id = Column(
         UUID(as_uuid=True),
-        ForeignKey("users.id"),
-        nullable=False
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
     )
     subject_kind = Column(Text, nullable=False)  # 'user' o 'group' - usar SubjectType enum
     subject_id = Column(UUID(as_uuid=True), nullable=False)  # ID del usuario o grupo
@@ -46,3 +46,23 @@ class ContributionInvite(Base):
     item = relationship("Item", back_populates="contribution_invites")
     inviter = relationship("User", foreign_keys=[inviter_id], back_populates="sent_contribution_invites")
 
+    __table_args__ = (
+        # Invitaciones recibidas por un usuario o grupo, filtradas por estado
+        Index("ix_contribution_invites_subject_status", "subject_kind", "subject_id", "status"),
+        # Una invitación vigente (pendiente o aceptada) por sujeto e item
+        Index(
+            "uq_contribution_invites_open_subject",
+            "item_id",
+            "subject_kind",
+            "subject_id",
+            unique=True,
+            postgresql_where=text("status IN ('pending', 'accepted')"),
+        ),
+        # Barrido de invitaciones pendientes caducadas (app.services.maintenance_service)
+        Index(
+            "ix_contribution_invites_pending_created_at",
+            "created_at",
+            postgresql_where=text("status = 'pending'"),
+        ),
+    )
+
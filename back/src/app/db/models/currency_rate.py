@@ -0,0 +1,15 @@
+from sqlalchemy import Column, DateTime, Numeric, Text
+from sqlalchemy.sql import func
+
+from app.db.session import Base
+
+
+class CurrencyRate(Base):
+    """Tipos de cambio respecto a la moneda base (CURRENCY_BASE, EUR por defecto)."""
+
+    __tablename__ = "currency_rates"
+
+    currency = Column(Text, primary_key=True)  # Código ISO 4217 (USD, GBP…)
+    units_per_base = Column(Numeric(20, 10), nullable=False)  # 1 unidad de la moneda base = N unidades
+    source = Column(Text, nullable=True)  # Fichero o feed del que se cargó
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
@@ -16,8 +16,7 @@ class Group(Base):
         UUID(as_uuid=True),
         primary_key=True,
         default=uuid.uuid4,
-        server_default=func.gen_random_uuid(),
-        index=True
+        server_default=func.gen_random_uuid()
     )
     name = Column(Text, nullable=False)  # p.ej. Familia, Amigas, Clase
     owner_id = Column(
@@ -30,7 +29,7 @@ class Group(Base):
 
     # Relaciones
     owner = relationship("User", foreign_keys=[owner_id], back_populates="owned_groups")
-    members = relationship("GroupMember", back_populates="group", cascade="all, delete-orphan")
+    members = relationship("GroupMember", back_populates="group", cascade="all, delete-orphan", passive_deletes=True)
 
 
 class GroupMember(Base):
@@ -48,13 +47,15 @@ class GroupMember(Base):
         UUID(as_uuid=True),
         ForeignKey("users.id", ondelete="CASCADE"),
         primary_key=True,
-        nullable=False
+        nullable=False,
+        index=True
     )
     added_by = Column(
         UUID(as_uuid=True),
-        ForeignKey("users.id"),
-        nullable=False
-    )
+        ForeignKey("users.id", ondelete="SET NULL"),
+        nullable=True,
+        index=True
+    )  # NULL si quien añadió al miembro ya no existe
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
 
     # Relaciones
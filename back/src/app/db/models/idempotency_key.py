@@ -0,0 +1,28 @@
+from sqlalchemy import CheckConstraint, Column, DateTime, Index, SmallInteger, Text
+from sqlalchemy.dialects.postgresql import BYTEA
+from sqlalchemy.sql import func
+
+from app.db.session import Base
+
+
+class IdempotencyKey(Base):
+    """Respuestas guardadas por Idempotency-Key (app.core.idempotency)."""
+
+    __tablename__ = "idempotency_keys"
+
+    scope = Column(Text, primary_key=True)  # Método y ruta: "POST /api/v1/items"
+    key = Column(Text, primary_key=True)  # Valor de la cabecera Idempotency-Key
+    fingerprint = Column(Text, nullable=False)  # sha256 de método, ruta, query y cuerpo
+    status = Column(Text, nullable=False)  # 'in_progress' mientras se ejecuta, 'completed' con respuesta
+    response_status = Column(SmallInteger, nullable=True)
+    content_type = Column(Text, nullable=True)
+    response_body = Column(BYTEA, nullable=True)
+    locked_until = Column(DateTime(timezone=True), nullable=True)  # Otro intento puede tomarla si caduca
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        CheckConstraint("status IN ('in_progress', 'completed')", name="check_idempotency_status_valid"),
+        # Barrido de claves caducadas (app.services.maintenance_service)
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
@@ -1,10 +1,11 @@
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, Text, CheckConstraint
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, Text, CheckConstraint, text
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
 
 from app.db.session import Base
+from app.utils.ranking import REBALANCE_LENGTH
 
 
 class Item(Base):
@@ -16,16 +17,15 @@ class Item(Base):
         UUID(as_uuid=True),
         primary_key=True,
         default=uuid.uuid4,
-        server_default=func.gen_random_uuid(),
-        index=True
+        server_default=func.gen_random_uuid()
     )
     wishlist_id = Column(
         UUID(as_uuid=True),
         ForeignKey("wishlists.id", ondelete="CASCADE"),
-        nullable=False,
-        index=True
-    )
+        nullable=False
+    )  # Indexado por ix_items_wishlist_id_created_at
     source_url = Column(Text, nullable=False)  # URL del producto
+    source_url_key = Column(Text, nullable=True)  # URL normalizada: clave de product_prices
     name = Column(Text, nullable=False)
     description = Column(Text, nullable=True)
     brand = Column(Text, nullable=True)
@@ -34,6 +34,8 @@ class Item(Base):
     image_url = Column(Text, nullable=True)
     item_metadata = Column("metadata", JSONB, nullable=True)  # Datos del scraper (tallas, color, specs…)
     visibility = Column(Text, nullable=False, default="list")  # 'list' o 'restricted'
+    # Clave de orden dentro de la lista (app.utils.ranking); NULL = item anterior a la migración 0008
+    rank = Column(Text(collation="C"), nullable=True)
     max_contributors = Column(Integer, nullable=True)  # Límites cuando se pide cofinanciación
     min_contributors = Column(Integer, nullable=True)
     target_amount_cents = Column(Integer, nullable=True)  # Si difiere de price_cents (p.ej. vale regalo)
@@ -42,12 +44,24 @@ class Item(Base):
 
     # Relaciones
     wishlist = relationship("Wishlist", back_populates="items")
-    acl = relationship("ItemACL", back_populates="item", cascade="all, delete-orphan")
-    claims = relationship("ItemClaim", back_populates="item", cascade="all, delete-orphan")
-    contributions = relationship("ItemContribution", back_populates="item", cascade="all, delete-orphan")
-    contribution_invites = relationship("ContributionInvite", back_populates="item", cascade="all, delete-orphan")
-    activity = relationship("ItemActivity", back_populates="item", cascade="all, delete-orphan")
+    acl = relationship("ItemACL", back_populates="item", cascade="all, delete-orphan", passive_deletes=True)
+    claims = relationship("ItemClaim", back_populates="item", cascade="all, delete-orphan", passive_deletes=True)
+    contributions = relationship("ItemContribution", back_populates="item", cascade="all, delete-orphan", passive_deletes=True)
+    contribution_invites = relationship("ContributionInvite", back_populates="item", cascade="all, delete-orphan", passive_deletes=True)
+    activity = relationship("ItemActivity", back_populates="item", cascade="all, delete-orphan", passive_deletes=True)
 
     __table_args__ = (
         CheckConstraint("visibility IN ('list', 'restricted')", name="check_visibility_valid"),
+        # Items de una lista en orden de creación
+        Index("ix_items_wishlist_id_created_at", "wishlist_id", "created_at"),
+        # Items de una lista en el orden del usuario (los que no tienen clave, primero)
+        Index("ix_items_wishlist_id_rank", wishlist_id, rank.asc().nulls_first()),
+        # Listas pendientes de reequilibrar (app.services.rank_service)
+        Index(
+            "ix_items_rank_rebalance",
+            "wishlist_id",
+            postgresql_where=text(f"rank IS NULL OR length(rank) > {REBALANCE_LENGTH}"),
+        ),
+        # Items de un producto seguido y backfill de source_url_key (IS NULL)
+        Index("ix_items_source_url_key", "source_url_key"),
     )
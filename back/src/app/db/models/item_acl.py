@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Text
+from sqlalchemy import Column, ForeignKey, Index, Text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -16,9 +16,14 @@ class ItemACL(Base):
         primary_key=True,
         nullable=False
     )
-    subject_kind = Column(Text, primary_key=True, nullable=False, index=True)  # 'user' o 'group'
-    subject_id = Column(UUID(as_uuid=True), primary_key=True, nullable=False, index=True)
+    subject_kind = Column(Text, primary_key=True, nullable=False)  # 'user' o 'group'
+    subject_id = Column(UUID(as_uuid=True), primary_key=True, nullable=False)
 
     # Relaciones
     item = relationship("Item", back_populates="acl")
 
+    __table_args__ = (
+        # Items restringidos visibles para un usuario o grupo
+        Index("ix_item_acl_subject", "subject_kind", "subject_id"),
+    )
+
@@ -16,8 +16,7 @@ class ItemActivity(Base):
         UUID(as_uuid=True),
         primary_key=True,
         default=uuid.uuid4,
-        server_default=func.gen_random_uuid(),
-        index=True
+        server_default=func.gen_random_uuid()
     )
     item_id = Column(
         UUID(as_uuid=True),
@@ -27,7 +26,7 @@ class ItemActivity(Base):
     )
     actor_id = Column(
         UUID(as_uuid=True),
-        ForeignKey("users.id"),
+        ForeignKey("users.id", ondelete="CASCADE"),
         nullable=False,
         index=True
     )
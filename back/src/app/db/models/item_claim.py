@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Text, UniqueConstraint
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, Text, UniqueConstraint, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -17,15 +17,13 @@ class ItemClaim(Base):
         UUID(as_uuid=True),
         primary_key=True,
         default=uuid.uuid4,
-        server_default=func.gen_random_uuid(),
-        index=True
+        server_default=func.gen_random_uuid()
     )
     item_id = Column(
         UUID(as_uuid=True),
         ForeignKey("items.id", ondelete="CASCADE"),
-        nullable=False,
-        index=True
-    )
+        nullable=False
+    )  # Indexado por uq_item_claim e ix_item_claims_item_id_status
     user_id = Column(
         UUID(as_uuid=True),
         ForeignKey("users.id", ondelete="CASCADE"),
@@ -37,6 +35,7 @@ class ItemClaim(Base):
         nullable=False
     )  # interested/claimed/purchased/released/cancelled - usar ClaimStatus enum
     note = Column(Text, nullable=True)  # "¿alguien se apunta? pongo 20€"
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # Concurrencia optimista (claim_service)
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
 
@@ -47,5 +46,20 @@ class ItemClaim(Base):
     __table_args__ = (
         # Un estado activo por usuario
         UniqueConstraint("item_id", "user_id", name="uq_item_claim"),
+        # Estado de los claims de un item (¿alguien lo ha reservado/comprado ya?)
+        Index("ix_item_claims_item_id_status", "item_id", "status"),
+        # Como mucho un claim activo (reservado o comprado) por item
+        Index(
+            "uq_item_claims_active_item",
+            "item_id",
+            unique=True,
+            postgresql_where=text("status IN ('claimed', 'purchased')"),
+        ),
+        # Barrido de claims 'interested' abandonados (app.services.maintenance_service)
+        Index(
+            "ix_item_claims_interested_updated_at",
+            "updated_at",
+            postgresql_where=text("status = 'interested'"),
+        ),
     )
 
@@ -16,15 +16,13 @@ class ItemContribution(Base):
         UUID(as_uuid=True),
         primary_key=True,
         default=uuid.uuid4,
-        server_default=func.gen_random_uuid(),
-        index=True
+        server_default=func.gen_random_uuid()
     )
     item_id = Column(
         UUID(as_uuid=True),
         ForeignKey("items.id", ondelete="CASCADE"),
-        nullable=False,
-        index=True
-    )
+        nullable=False
+    )  # Indexado por uq_item_contribution
     user_id = Column(
         UUID(as_uuid=True),
         ForeignKey("users.id", ondelete="CASCADE"),
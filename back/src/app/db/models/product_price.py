@@ -0,0 +1,56 @@
+from sqlalchemy import Boolean, Column, Date, DateTime, ForeignKey, Index, Integer, SmallInteger, Text, text
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+from app.db.session import Base
+
+
+class ProductPrice(Base):
+    """Producto seguido (una fila por URL normalizada, compartida por todos sus items) y su último precio."""
+
+    __tablename__ = "product_prices"
+
+    url_key = Column(Text, primary_key=True)  # app.scraper.urls.normalize_url(items.source_url)
+    source_url = Column(Text, nullable=False)  # Una URL original para descargar la página
+    price_cents = Column(Integer, nullable=True)  # Último precio observado
+    previous_price_cents = Column(Integer, nullable=True)  # Precio anterior al último cambio
+    currency = Column(Text, nullable=True)
+    available = Column(Boolean, nullable=True)
+    observed_at = Column(DateTime(timezone=True), nullable=True)  # Última comprobación correcta
+    next_check_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    next_event_on = Column(Date, nullable=True)  # Evento más próximo de las listas que lo contienen
+    failures = Column(SmallInteger, nullable=False, server_default="0")  # Fallos seguidos (backoff)
+
+    # Relaciones
+    history = relationship("PriceHistory", back_populates="product", passive_deletes=True)
+
+    __table_args__ = (
+        # Productos pendientes de refrescar, en orden
+        Index("ix_product_prices_next_check_at", "next_check_at"),
+        # Prioridad para productos en listas con un evento próximo
+        Index(
+            "ix_product_prices_next_event_on",
+            "next_event_on",
+            postgresql_where=text("next_event_on IS NOT NULL"),
+        ),
+    )
+
+
+class PriceHistory(Base):
+    """Serie temporal de precios: una fila por cambio de precio o disponibilidad."""
+
+    __tablename__ = "price_history"
+
+    url_key = Column(
+        Text,
+        ForeignKey("product_prices.url_key", ondelete="CASCADE"),
+        primary_key=True,
+        nullable=False
+    )
+    observed_at = Column(DateTime(timezone=True), primary_key=True, nullable=False)
+    price_cents = Column(Integer, nullable=True)
+    currency = Column(Text, nullable=True)
+    available = Column(Boolean, nullable=True)
+
+    # Relaciones
+    product = relationship("ProductPrice", back_populates="history")
@@ -16,8 +16,7 @@ class Session(Base):
         UUID(as_uuid=True),
         primary_key=True,
         default=uuid.uuid4,
-        server_default=func.gen_random_uuid(),
-        index=True
+        server_default=func.gen_random_uuid()
     )
     user_id = Column(
         UUID(as_uuid=True),
@@ -26,7 +25,7 @@ class Session(Base):
         index=True
     )
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
-    expires_at = Column(DateTime(timezone=True), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)  # Barrido de sesiones caducadas
 
     # Relaciones
     user = relationship("User", back_populates="sessions")
@@ -16,14 +16,13 @@ class Tag(Base):
         UUID(as_uuid=True),
         primary_key=True,
         default=uuid.uuid4,
-        server_default=func.gen_random_uuid(),
-        index=True
+        server_default=func.gen_random_uuid()
     )
     name = Column(Text, nullable=False, unique=True)
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
 
     # Relaciones
-    wishlists = relationship("WishlistTag", back_populates="tag", cascade="all, delete-orphan")
+    wishlists = relationship("WishlistTag", back_populates="tag", cascade="all, delete-orphan", passive_deletes=True)
 
 
 class WishlistTag(Base):
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, DateTime, String, Text
+from sqlalchemy import Boolean, Column, DateTime, Index, String, Text, text
 from sqlalchemy.dialects.postgresql import CITEXT, UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -16,8 +16,7 @@ class User(Base):
         UUID(as_uuid=True),
         primary_key=True,
         default=uuid.uuid4,
-        server_default=func.gen_random_uuid(),
-        index=True
+        server_default=func.gen_random_uuid()
     )
     email = Column(CITEXT, unique=True, index=True, nullable=True)  # Puede ser NULL si el proveedor no comparte email
     email_verified = Column(Boolean, nullable=False, default=False)
@@ -25,16 +24,22 @@ class User(Base):
     avatar_url = Column(Text, nullable=True)  # Foto del proveedor (si hay)
     locale = Column(Text, nullable=True)  # "es-ES", "en-US", etc.
     is_active = Column(Boolean, nullable=False, default=True)  # Para bloquear cuentas
+    deleted_at = Column(DateTime(timezone=True), nullable=True)  # Borrado pendiente de purga (app.services.deletion_service)
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
 
-    # Relaciones
-    auth_identities = relationship("AuthIdentity", back_populates="user", cascade="all, delete-orphan")
-    sessions = relationship("Session", back_populates="user", cascade="all, delete-orphan")
-    owned_groups = relationship("Group", foreign_keys="Group.owner_id", back_populates="owner", cascade="all, delete-orphan")
-    group_memberships = relationship("GroupMember", foreign_keys="GroupMember.user_id", back_populates="user", cascade="all, delete-orphan")
-    created_wishlists = relationship("Wishlist", back_populates="creator", cascade="all, delete-orphan")
-    item_claims = relationship("ItemClaim", back_populates="user", cascade="all, delete-orphan")
-    item_contributions = relationship("ItemContribution", back_populates="user", cascade="all, delete-orphan")
-    sent_contribution_invites = relationship("ContributionInvite", foreign_keys="ContributionInvite.inviter_id", back_populates="inviter", cascade="all, delete-orphan")
-    item_activities = relationship("ItemActivity", back_populates="actor", cascade="all, delete-orphan")
+    # Relaciones: el borrado en cascada lo hace PostgreSQL (ON DELETE CASCADE, passive_deletes)
+    auth_identities = relationship("AuthIdentity", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    sessions = relationship("Session", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    owned_groups = relationship("Group", foreign_keys="Group.owner_id", back_populates="owner", cascade="all, delete-orphan", passive_deletes=True)
+    group_memberships = relationship("GroupMember", foreign_keys="GroupMember.user_id", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    created_wishlists = relationship("Wishlist", back_populates="creator", cascade="all, delete-orphan", passive_deletes=True)
+    item_claims = relationship("ItemClaim", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    item_contributions = relationship("ItemContribution", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    sent_contribution_invites = relationship("ContributionInvite", foreign_keys="ContributionInvite.inviter_id", back_populates="inviter", cascade="all, delete-orphan", passive_deletes=True)
+    item_activities = relationship("ItemActivity", back_populates="actor", cascade="all, delete-orphan", passive_deletes=True)
+
+    __table_args__ = (
+        # Usuarios pendientes de purga
+        Index("ix_users_deleted_at", "deleted_at", postgresql_where=text("deleted_at IS NOT NULL")),
+    )
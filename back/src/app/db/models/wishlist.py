@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Text, UniqueConstraint
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Index, Text, UniqueConstraint, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -17,8 +17,7 @@ class Wishlist(Base):
         UUID(as_uuid=True),
         primary_key=True,
         default=uuid.uuid4,
-        server_default=func.gen_random_uuid(),
-        index=True
+        server_default=func.gen_random_uuid()
     )
     creator_id = Column(
         UUID(as_uuid=True),
@@ -28,14 +27,21 @@ class Wishlist(Base):
     )
     name = Column(Text, nullable=False)
     description = Column(Text, nullable=True)
+    event_date = Column(Date, nullable=True)  # Fecha del evento (cumpleaños, boda…); prioriza el refresco de precios
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
+    deleted_at = Column(DateTime(timezone=True), nullable=True)  # Borrado pendiente de purga (app.services.deletion_service)
 
-    # Relaciones
+    # Relaciones: el borrado en cascada lo hace PostgreSQL (ON DELETE CASCADE, passive_deletes)
     creator = relationship("User", back_populates="created_wishlists")
-    permissions = relationship("WishlistPermission", back_populates="wishlist", cascade="all, delete-orphan")
-    tags = relationship("WishlistTag", back_populates="wishlist", cascade="all, delete-orphan")
-    items = relationship("Item", back_populates="wishlist", cascade="all, delete-orphan")
+    permissions = relationship("WishlistPermission", back_populates="wishlist", cascade="all, delete-orphan", passive_deletes=True)
+    tags = relationship("WishlistTag", back_populates="wishlist", cascade="all, delete-orphan", passive_deletes=True)
+    items = relationship("Item", back_populates="wishlist", cascade="all, delete-orphan", passive_deletes=True)
+
+    __table_args__ = (
+        # Listas pendientes de purga
+        Index("ix_wishlists_deleted_at", "deleted_at", postgresql_where=text("deleted_at IS NOT NULL")),
+    )
 
 
 class WishlistPermission(Base):
@@ -47,17 +53,15 @@ class WishlistPermission(Base):
         UUID(as_uuid=True),
         primary_key=True,
         default=uuid.uuid4,
-        server_default=func.gen_random_uuid(),
-        index=True
+        server_default=func.gen_random_uuid()
     )
     wishlist_id = Column(
         UUID(as_uuid=True),
         ForeignKey("wishlists.id", ondelete="CASCADE"),
-        nullable=False,
-        index=True
-    )
-    subject_kind = Column(Text, nullable=False, index=True)  # 'user' o 'group' - usar SubjectType enum en la aplicación
-    subject_id = Column(UUID(as_uuid=True), nullable=False, index=True)  # users.id o groups.id
+        nullable=False
+    )  # Indexado por uq_wishlist_permission
+    subject_kind = Column(Text, nullable=False)  # 'user' o 'group' - usar SubjectType enum en la aplicación
+    subject_id = Column(UUID(as_uuid=True), nullable=False)  # users.id o groups.id
     role = Column(
         Text,
         nullable=False,
@@ -70,5 +74,7 @@ class WishlistPermission(Base):
     __table_args__ = (
         # Unique constraint para (wishlist_id, subject_kind, subject_id)
         UniqueConstraint("wishlist_id", "subject_kind", "subject_id", name="uq_wishlist_permission"),
+        # Listas compartidas con un usuario o grupo
+        Index("ix_wishlist_permissions_subject", "subject_kind", "subject_id", "wishlist_id"),
     )
 
@@ -0,0 +1,56 @@
+"""
+Contador de queries SQL y commits por request
+
+Registra listeners ``before_cursor_execute`` y ``commit`` en el engine que
+incrementan un contador ligado al contexto del request actual. El middleware
+de ``main.py`` expone el resultado en las cabeceras ``X-DB-Queries`` y
+``X-DB-Commits`` cuando ``DB_QUERY_COUNT_HEADER`` está activado (lo usan los
+benchmarks). Las idas y vueltas a la base de datos de un request son las
+queries más los commits.
+"""
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+QUERY_COUNT_HEADER = "X-DB-Queries"
+COMMIT_COUNT_HEADER = "X-DB-Commits"
+
+# Se guarda una lista mutable ([queries, commits]) para que los hilos del
+# threadpool (endpoints síncronos) compartan el mismo contador que el middleware.
+_query_count: ContextVar[Optional[list[int]]] = ContextVar("db_query_count", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    counter = _query_count.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+def _commit(conn) -> None:
+    counter = _query_count.get()
+    if counter is not None:
+        counter[1] += 1
+
+
+def install(engine: Engine) -> None:
+    """Registra el contador en un engine (idempotente)."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    if not event.contains(engine, "commit", _commit):
+        event.listen(engine, "commit", _commit)
+
+
+def start() -> list[int]:
+    """Empieza a contar queries y commits en el contexto actual."""
+    counter = [0, 0]
+    _query_count.set(counter)
+    return counter
+
+
+def current() -> Optional[int]:
+    """Número de queries ejecutadas en el contexto actual (None si no se cuenta)."""
+    counter = _query_count.get()
+    return counter[0] if counter is not None else None
+
@@ -0,0 +1,130 @@
+"""
+Reintento de transacciones ante errores transitorios de la base de datos
+
+Algunos errores desaparecen si se repite la transacción entera:
+
+- ``40001`` (serialization_failure): conflicto con otra transacción en
+  ``REPEATABLE READ``/``SERIALIZABLE``
+- ``40P01`` (deadlock_detected): PostgreSQL abortó esta transacción para
+  deshacer un interbloqueo (p. ej. dos movimientos de items que bloquean las
+  mismas filas en distinto orden)
+- Conexión perdida (clase ``08``, ``57P01``-``57P03`` o conexión invalidada
+  por SQLAlchemy): el pool descarta la conexión y el reintento usa otra
+
+``app.db.unit_of_work.transactional`` repite el servicio completo tras el
+rollback, con backoff exponencial con jitter ("full jitter") y dentro de un
+presupuesto de tiempo (``DB_RETRY_*``). Es seguro porque nada sale de la
+transacción antes del commit (``after_commit``). La excepción: si la conexión
+se pierde durante el COMMIT no se sabe si se confirmó, y no se reintenta.
+"""
+import random
+import threading
+import time
+from typing import Any, Callable, Optional, TypeVar
+
+from sqlalchemy.exc import DBAPIError
+
+from app.core.config import settings
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+SERIALIZATION_FAILURE = "40001"
+DEADLOCK_DETECTED = "40P01"
+# admin_shutdown, crash_shutdown, cannot_connect_now
+_CONNECTION_SQLSTATES = frozenset({"57P01", "57P02", "57P03"})
+
+_metrics_lock = threading.Lock()
+_metrics: dict[str, Any] = {"retries": {}, "recovered": 0, "exhausted": 0, "operations": {}}
+
+
+def _sqlstate(exc: DBAPIError) -> Optional[str]:
+    # psycopg 3 expone ``sqlstate``; psycopg2, ``pgcode``
+    orig = exc.orig
+    return getattr(orig, "sqlstate", None) or getattr(orig, "pgcode", None)
+
+
+def retry_reason(exc: BaseException) -> Optional[str]:
+    """Motivo por el que ``exc`` se puede reintentar (``serialization``, ``deadlock``, ``connection``) o None."""
+    if not isinstance(exc, DBAPIError):
+        return None
+    sqlstate = _sqlstate(exc)
+    if sqlstate == SERIALIZATION_FAILURE:
+        return "serialization"
+    if sqlstate == DEADLOCK_DETECTED:
+        return "deadlock"
+    if exc.connection_invalidated or (sqlstate and (sqlstate.startswith("08") or sqlstate in _CONNECTION_SQLSTATES)):
+        return "connection"
+    return None
+
+
+def backoff(attempt: int, *, base: float, cap: float) -> float:
+    """Espera antes del reintento ``attempt`` (1 = primero): aleatoria entre 0 y ``base * 2^(attempt-1)``."""
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+def _record(operation: str, *, reason: Optional[str] = None, outcome: Optional[str] = None) -> None:
+    with _metrics_lock:
+        stats = _metrics["operations"].setdefault(operation, {"retries": 0, "recovered": 0, "exhausted": 0})
+        if reason is not None:
+            _metrics["retries"][reason] = _metrics["retries"].get(reason, 0) + 1
+            stats["retries"] += 1
+        if outcome is not None:
+            _metrics[outcome] += 1
+            stats[outcome] += 1
+
+
+def run(
+    operation: str,
+    attempt: Callable[[], T],
+    *,
+    commit_interrupted: Callable[[], bool],
+    max_attempts: Optional[int] = None,
+    budget_seconds: Optional[float] = None,
+) -> T:
+    """
+    Ejecuta ``attempt`` (una transacción completa, con su rollback si falla) y la repite ante errores transitorios.
+
+    ``commit_interrupted`` indica si el último fallo ocurrió durante el COMMIT:
+    en ese caso un error de conexión no se reintenta. Si se agotan los
+    intentos o el presupuesto, se relanza el último error.
+    """
+    max_attempts = max_attempts or settings.DB_RETRY_MAX_ATTEMPTS
+    budget_seconds = budget_seconds if budget_seconds is not None else settings.DB_RETRY_BUDGET_SECONDS
+    deadline = time.monotonic() + budget_seconds
+    retried = False
+    number = 0
+    while True:
+        number += 1
+        try:
+            result = attempt()
+        except DBAPIError as exc:
+            reason = retry_reason(exc)
+            if reason is None or (reason == "connection" and commit_interrupted()):
+                raise
+            delay = backoff(number, base=settings.DB_RETRY_BASE_DELAY_SECONDS, cap=settings.DB_RETRY_MAX_DELAY_SECONDS)
+            if number >= max_attempts or time.monotonic() + delay > deadline:
+                _record(operation, outcome="exhausted")
+                logger.warning(f"{operation}: error transitorio ({reason}) tras {number} intentos, sin más reintentos")
+                raise
+            _record(operation, reason=reason)
+            logger.info(f"{operation}: error transitorio ({reason}), reintento {number} en {delay * 1000:.0f} ms")
+            retried = True
+            time.sleep(delay)
+            continue
+        if retried:
+            _record(operation, outcome="recovered")
+        return result
+
+
+def get_metrics() -> dict[str, Any]:
+    """Reintentos por motivo y por operación, y transacciones recuperadas o agotadas."""
+    with _metrics_lock:
+        return {
+            "retries": dict(_metrics["retries"]),
+            "recovered": _metrics["recovered"],
+            "exhausted": _metrics["exhausted"],
+            "operations": {name: dict(stats) for name, stats in _metrics["operations"].items()},
+        }
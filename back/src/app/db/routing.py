@@ -0,0 +1,197 @@
+"""
+Enrutado de lecturas a réplicas de PostgreSQL
+
+- ``ReplicaPool``: engines de las réplicas con su estado (sana, retraso) y
+  selección round-robin entre las que están al día
+- ``RoutingSession``: sesión que envía las lecturas a una réplica y todo lo
+  demás al primario. Una sesión usa siempre la misma réplica y, en cuanto
+  escribe (flush, INSERT/UPDATE/DELETE o ``for_update``), se queda en el
+  primario hasta cerrarse
+- ``prefer_replica``: ContextVar que el middleware de ``main.py`` activa en
+  los GET/HEAD sin cookie de "lectura tras escritura". Fuera de un request
+  (workers, CLI) todo va al primario
+
+Si ninguna réplica está sana o su retraso supera ``REPLICA_MAX_LAG_SECONDS``,
+las lecturas vuelven al primario automáticamente.
+"""
+import asyncio
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Cookie que fuerza el primario durante unos segundos tras una escritura del cliente
+STICKY_COOKIE = "db_primary_until"
+
+_prefer_replica: ContextVar[bool] = ContextVar("db_prefer_replica", default=False)
+
+# Retraso de una réplica: 0 si ha reproducido todo lo recibido; si no, antigüedad
+# de la última transacción reproducida. Un primario devuelve NULL (no es réplica).
+_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN NULL
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class ReplicaState:
+    """Estado observado de una réplica"""
+
+    def __init__(self, name: str, engine: Engine) -> None:
+        self.name = name
+        self.engine = engine
+        self.healthy = False  # Hasta la primera comprobación correcta no recibe tráfico
+        self.lag_seconds: Optional[float] = None
+        self.checked_at: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "healthy": self.healthy,
+            "lag_seconds": self.lag_seconds,
+            "checked_seconds_ago": round(time.monotonic() - self.checked_at, 1) if self.checked_at else None,
+            "error": self.error,
+        }
+
+
+class ReplicaPool:
+    """Réplicas de lectura, su retraso y la selección de la siguiente"""
+
+    def __init__(self, engines: list[Engine], max_lag_seconds: float) -> None:
+        self.replicas = [ReplicaState(f"replica-{n}", engine) for n, engine in enumerate(engines)]
+        self.max_lag_seconds = max_lag_seconds
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        for state in self.replicas:
+            event.listen(state.engine, "handle_error", self._on_error(state))
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def _on_error(self, state: ReplicaState):
+        def handle_error(context) -> None:
+            # Conexión perdida: sacar la réplica hasta la próxima comprobación correcta
+            if context.is_disconnect and state.healthy:
+                state.healthy = False
+                state.error = str(context.original_exception)
+                logger.warning(f"Réplica {state.name} desconectada; lecturas al primario")
+
+        return handle_error
+
+    def choose(self) -> Optional[Engine]:
+        """Siguiente réplica disponible (round-robin) o None si hay que leer del primario."""
+        available = [
+            state for state in self.replicas
+            if state.healthy and state.lag_seconds is not None and state.lag_seconds <= self.max_lag_seconds
+        ]
+        if not available:
+            return None
+        with self._lock:
+            index = next(self._counter)
+        return available[index % len(available)].engine
+
+    def check(self) -> None:
+        """Mide el retraso de cada réplica y actualiza su estado (síncrono; llamar desde un hilo)."""
+        for state in self.replicas:
+            was_available = state.healthy and (state.lag_seconds or 0) <= self.max_lag_seconds
+            try:
+                with state.engine.connect() as conn:
+                    lag = conn.execute(_LAG_SQL).scalar()
+                if lag is None:
+                    raise RuntimeError("el servidor no está en modo réplica (pg_is_in_recovery() = false)")
+                state.lag_seconds = float(lag)
+                state.healthy = True
+                state.error = None
+            except Exception as exc:
+                state.healthy = False
+                state.error = str(exc)
+            state.checked_at = time.monotonic()
+
+            available = state.healthy and state.lag_seconds <= self.max_lag_seconds
+            if was_available and not available:
+                logger.warning(
+                    f"Réplica {state.name} fuera de servicio (retraso={state.lag_seconds}, error={state.error})"
+                )
+            elif available and not was_available:
+                logger.info(f"Réplica {state.name} disponible (retraso {state.lag_seconds:.2f} s)")
+
+    def status(self) -> list[dict[str, Any]]:
+        """Estado de cada réplica (para health checks y diagnóstico)."""
+        return [state.as_dict() for state in self.replicas]
+
+    def dispose(self) -> None:
+        for state in self.replicas:
+            state.engine.dispose()
+
+
+async def run_lag_monitor(pool: ReplicaPool, interval_seconds: float) -> None:
+    """Comprueba el retraso de las réplicas cada ``interval_seconds`` (cancelable)."""
+    while True:
+        await asyncio.to_thread(pool.check)
+        await asyncio.sleep(interval_seconds)
+
+
+class RoutingSession(Session):
+    """Sesión que lee de una réplica cuando el contexto lo permite y escribe en el primario"""
+
+    def __init__(self, *args: Any, replicas: Optional[ReplicaPool] = None, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._replicas = replicas
+        self._replica: Optional[Engine] = None
+        self._pinned_primary = False
+
+    def get_bind(self, mapper=None, clause=None, **kwargs: Any):
+        primary = super().get_bind(mapper=mapper, clause=clause, **kwargs)
+        if self._pinned_primary or not self._replicas or not _prefer_replica.get():
+            return primary
+
+        is_plain_read = isinstance(clause, Select) and clause._for_update_arg is None
+        if self._flushing or not is_plain_read:
+            # A partir de aquí la sesión ve sus propias escrituras: no volver a la réplica
+            self._pinned_primary = True
+            return primary
+
+        if self._replica is None:
+            self._replica = self._replicas.choose()
+            if self._replica is None:
+                self._pinned_primary = True
+                return primary
+        return self._replica
+
+    def close(self) -> None:
+        super().close()
+        self._replica = None
+        self._pinned_primary = False
+
+
+def set_prefer_replica(value: bool):
+    """Permite (o no) leer de réplicas en el contexto actual. Devuelve el token para restaurarlo."""
+    return _prefer_replica.set(value)
+
+
+def reset_prefer_replica(token) -> None:
+    _prefer_replica.reset(token)
+
+
+@contextmanager
+def use_primary() -> Iterator[None]:
+    """Fuerza el primario dentro del bloque (p. ej. una lectura que debe ver una escritura reciente)."""
+    token = _prefer_replica.set(False)
+    try:
+        yield
+    finally:
+        _prefer_replica.reset(token)
@@ -3,8 +3,12 @@ Configuración de la sesión de base de datos
 """
 import logging
 from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.core.config import settings
+from app.core.exceptions import ServiceUnavailableError
+from app.db.health import CircuitBreaker, DatabaseHealth, install_breaker
+from app.db.routing import ReplicaPool, RoutingSession
 
 logger = logging.getLogger(__name__)
 
@@ -15,22 +19,24 @@ try:
 except ImportError:
     logger.warning("psycopg v3 no está disponible. Asegúrate de tener psycopg[binary] instalado.")
 
-# Crear el motor de la base de datos
-# Forzar el uso de psycopg (versión 3) para Python 3.13+
-database_url = settings.DATABASE_URL
-original_url = database_url
 
-# Normalizar la URL para usar psycopg v3
-if database_url.startswith("postgresql://"):
-    # Reemplazar postgresql:// por postgresql+psycopg:// para usar psycopg v3
-    database_url = database_url.replace("postgresql://", "postgresql+psycopg://", 1)
-elif database_url.startswith("postgresql+psycopg2://"):
-    # Si ya especifica psycopg2, cambiar a psycopg v3
-    database_url = database_url.replace("postgresql+psycopg2://", "postgresql+psycopg://", 1)
-# Si ya tiene postgresql+psycopg://, dejarlo como está
+def _normalize_url(url: str) -> str:
+    """Fuerza el uso de psycopg (versión 3) para Python 3.13+."""
+    if url.startswith("postgresql://"):
+        # Reemplazar postgresql:// por postgresql+psycopg:// para usar psycopg v3
+        return url.replace("postgresql://", "postgresql+psycopg://", 1)
+    if url.startswith("postgresql+psycopg2://"):
+        # Si ya especifica psycopg2, cambiar a psycopg v3
+        return url.replace("postgresql+psycopg2://", "postgresql+psycopg://", 1)
+    # Si ya tiene postgresql+psycopg://, dejarlo como está
+    return url
 
-if original_url != database_url:
-    logger.info(f"URL de base de datos normalizada: {original_url} -> {database_url}")
+
+# Crear el motor de la base de datos (primario: recibe todas las escrituras)
+database_url = _normalize_url(settings.DATABASE_URL)
+
+if settings.DATABASE_URL != database_url:
+    logger.info(f"URL de base de datos normalizada: {settings.DATABASE_URL} -> {database_url}")
 
 engine = create_engine(
     database_url,
@@ -38,11 +44,44 @@ engine = create_engine(
     echo=False,  # Silenciar queries SQL (siempre desactivado)
 )
 
+# Circuit breaker y estado de salud del primario: ver app.db.health
+circuit_breaker = CircuitBreaker(
+    failure_threshold=settings.DB_CIRCUIT_FAILURE_THRESHOLD,
+    open_seconds=settings.DB_CIRCUIT_OPEN_SECONDS,
+    enabled=settings.DB_CIRCUIT_BREAKER_ENABLED,
+)
+install_breaker(engine, circuit_breaker)
+database_health = DatabaseHealth(
+    engine,
+    circuit_breaker,
+    max_ping_ms=settings.DB_HEALTH_MAX_PING_MS,
+    max_pool_saturation=settings.DB_HEALTH_MAX_POOL_SATURATION,
+    stale_seconds=settings.DB_HEALTH_STALE_SECONDS,
+)
+
+# Réplicas de lectura (opcionales): ver app.db.routing
+replica_pool = ReplicaPool(
+    [
+        create_engine(_normalize_url(url), pool_pre_ping=True, echo=False)
+        for url in settings.DATABASE_REPLICA_URLS
+    ],
+    max_lag_seconds=settings.REPLICA_MAX_LAG_SECONDS,
+)
+
 # Crear la clase base para los modelos
 Base = declarative_base()
 
-# Crear la fábrica de sesiones
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Crear la fábrica de sesiones (lee de réplicas solo dentro de requests GET/HEAD).
+# Sin expire_on_commit: los objetos devueltos por RETURNING siguen cargados tras
+# el commit de la unidad de trabajo (app.db.unit_of_work) y no se releen
+SessionLocal = sessionmaker(
+    class_=RoutingSession,
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+    bind=engine,
+    replicas=replica_pool,
+)
 
 
 def get_db():
@@ -52,10 +91,22 @@ def get_db():
         @app.get("/items")
         def read_items(db: Session = Depends(get_db)):
             ...
+
+    Con el circuit breaker abierto responde 503 sin esperar al pool.
     """
+    if not circuit_breaker.allow():
+        raise ServiceUnavailableError(
+            message="La base de datos no está disponible, reintenta en unos segundos",
+            retry_after=circuit_breaker.retry_after(),
+            details={"circuit_breaker": circuit_breaker.state},
+        )
     db = SessionLocal()
     try:
         yield db
+    except PoolTimeoutError as e:
+        # Pool agotado: no pasa por handle_error del engine
+        circuit_breaker.record_failure(e)
+        raise
     finally:
         db.close()
 
@@ -0,0 +1,125 @@
+"""
+Unidad de trabajo: una transacción por llamada de servicio
+
+Los repositorios de escritura no hacen commit: ejecutan su sentencia (con
+``RETURNING`` cuando hace falta devolver la fila) y la transacción la cierra
+el servicio con ``transaction(db)`` o ``@transactional``:
+
+- Un endpoint que escribe varias veces paga un solo COMMIT (un fsync)
+- Todo o nada: una excepción dentro del bloque deshace todas sus escrituras
+- Los bloques se anidan: solo el más externo hace commit o rollback, así un
+  servicio que llama a otro comparte su transacción. Si se captura la
+  excepción de un bloque interno, lo que ya escribió sigue en la transacción
+- ``after_commit`` aplaza los efectos fuera de la base de datos (invalidar la
+  caché, encolar el scraper) hasta que el commit ha ido bien; con rollback se descartan
+- ``@transactional`` repite el servicio entero ante errores transitorios
+  (serialización, interbloqueo, conexión perdida; ver ``app.db.retry``) y
+  puede fijar un nivel de aislamiento más estricto para la transacción
+
+La sesión usa ``expire_on_commit=False`` (``app.db.session``): los objetos
+devueltos por un ``RETURNING`` siguen siendo válidos después del commit y
+serializar la respuesta no lanza otro SELECT.
+
+Las tareas por lotes (mantenimiento, purga, precios, idempotencia) siguen
+haciendo commit en cada lote: transacciones cortas que no retienen bloqueos
+durante toda la pasada.
+"""
+import functools
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+from sqlalchemy.orm import Session
+
+from app.db import retry as db_retry
+
+_DEPTH_KEY = "unit_of_work_depth"
+_CALLBACKS_KEY = "unit_of_work_after_commit"
+_COMMITTING_KEY = "unit_of_work_committing"
+
+
+@contextmanager
+def transaction(db: Session, *, isolation_level: Optional[str] = None) -> Iterator[Session]:
+    """
+    Ejecuta el bloque en una transacción: commit al salir y rollback si hay una excepción.
+
+    Dentro de otro ``transaction`` sobre la misma sesión no confirma nada: decide
+    el bloque externo. ``isolation_level`` (p. ej. ``"SERIALIZABLE"``) solo se
+    puede pedir en el bloque externo y antes de que la sesión haya ejecutado nada.
+    """
+    depth = db.info.get(_DEPTH_KEY, 0)
+    if isolation_level is not None:
+        if depth > 0 or db.in_transaction():
+            raise RuntimeError("isolation_level necesita empezar la transacción (sin consultas previas en la sesión)")
+        db.connection(execution_options={"isolation_level": isolation_level})
+    db.info[_DEPTH_KEY] = depth + 1
+    try:
+        yield db
+        if depth == 0:
+            # Si la conexión se pierde durante el COMMIT no se sabe si se confirmó (ver app.db.retry)
+            db.info[_COMMITTING_KEY] = True
+            db.commit()
+            del db.info[_COMMITTING_KEY]
+    except BaseException:
+        if depth == 0:
+            db.info.pop(_CALLBACKS_KEY, None)
+            db.rollback()
+        raise
+    finally:
+        db.info[_DEPTH_KEY] = depth
+
+    if depth == 0:
+        for callback in db.info.pop(_CALLBACKS_KEY, ()):
+            callback()
+
+
+def in_transaction(db: Session) -> bool:
+    """Si hay un bloque ``transaction`` abierto sobre la sesión."""
+    return db.info.get(_DEPTH_KEY, 0) > 0
+
+
+def after_commit(db: Session, callback: Callable[[], None]) -> None:
+    """
+    Ejecuta ``callback`` cuando el bloque ``transaction`` más externo haga commit.
+
+    Si la transacción se deshace, no se ejecuta. Fuera de un bloque se ejecuta al momento.
+    """
+    if not in_transaction(db):
+        callback()
+        return
+    db.info.setdefault(_CALLBACKS_KEY, []).append(callback)
+
+
+def transactional(
+    func: Optional[Callable] = None,
+    *,
+    retry: bool = True,
+    isolation_level: Optional[str] = None,
+) -> Callable:
+    """
+    Decorador de servicios: ejecuta ``func(db, ...)`` dentro de ``transaction(db)``.
+
+    Con ``retry`` (por defecto) repite la llamada completa ante errores
+    transitorios, salvo si ya está dentro de otra transacción: entonces
+    reintenta quien la abrió. Se usa como ``@transactional`` o
+    ``@transactional(isolation_level="SERIALIZABLE")``.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(db: Session, *args, **kwargs):
+            def attempt():
+                with transaction(db, isolation_level=isolation_level):
+                    return func(db, *args, **kwargs)
+
+            if not retry or in_transaction(db):
+                return attempt()
+            db.info.pop(_COMMITTING_KEY, None)
+            return db_retry.run(
+                f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}",
+                attempt,
+                commit_interrupted=lambda: db.info.pop(_COMMITTING_KEY, False),
+            )
+
+        return wrapper
+
+    return decorator(func) if func is not None else decorator
@@ -1,12 +1,16 @@
 """
 Aplicación principal FastAPI
 """
-from contextlib import asynccontextmanager
+import asyncio
+import time
+from contextlib import asynccontextmanager, suppress
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from sqlalchemy import text
 
+from app import scraper, warmup
 from app.core.config import settings
 from app.core.logging_config import setup_logging, get_logger
 from app.core.exception_handlers import (
@@ -16,9 +20,17 @@ from app.core.exception_handlers import (
     general_exception_handler,
     database_exception_handler,
 )
+from app.core.compression import CompressionMiddleware
 from app.core.exceptions import AppException
-from app.db.session import engine, Base, SessionLocal
-from app.routers import users, items
+from app.core.idempotency import REPLAYED_HEADER, IdempotencyMiddleware
+from app.core.rate_limit import get_rate_limiter
+from app.db import health, query_counter, retry as db_retry, routing
+from app.db.session import engine, Base, SessionLocal, database_health, replica_pool
+from app.routers import users, items, claims, invites, prices, wishlists
+from app.scraper.pipeline import build_scraper
+from app.services import maintenance_service, price_service
+from app.services.count_service import TOTAL_COUNT_EXACT_HEADER, TOTAL_COUNT_HEADER
+from app.services.loaders import MISSING_IDS_HEADER
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from sqlalchemy.exc import SQLAlchemyError
@@ -34,7 +46,62 @@ async def lifespan(app: FastAPI):
     Lifespan para inicializar y probar la conexión a la base de datos.
     Se ejecuta al iniciar y cerrar la aplicación.
     """
+    # Límites de tasa: un valor inválido (p. ej. "0/minute") falla al arrancar y no en cada request
+    get_rate_limiter()
+
     # Startup: Inicializar base de datos
+    if not settings.STARTUP_DB_CHECK:
+        logger.info("Verificación de la base de datos al arrancar desactivada (STARTUP_DB_CHECK=False)")
+    else:
+        _check_database_connection()
+        if settings.STARTUP_WARMUP:
+            # Conexiones, mappers, sentencias compiladas y serializadores: no los paga el primer request
+            await asyncio.to_thread(
+                warmup.run,
+                app,
+                engine=engine,
+                session_factory=SessionLocal,
+                replica_engines=tuple(replica.engine for replica in replica_pool.replicas),
+                connections=settings.STARTUP_WARMUP_CONNECTIONS,
+            )
+    
+    background_tasks = []
+    if settings.STARTUP_DB_CHECK:
+        # Primer estado de /health/ready antes de aceptar requests
+        await asyncio.to_thread(database_health.check)
+    background_tasks.append(asyncio.create_task(
+        health.run_health_monitor(database_health, settings.DB_HEALTH_CHECK_SECONDS)
+    ))
+    if replica_pool:
+        # Primera comprobación antes de aceptar requests: sin ella no se usa ninguna réplica
+        await asyncio.to_thread(replica_pool.check)
+        background_tasks.append(asyncio.create_task(
+            routing.run_lag_monitor(replica_pool, settings.REPLICA_LAG_CHECK_SECONDS)
+        ))
+    if settings.MAINTENANCE_ENABLED:
+        background_tasks.append(asyncio.create_task(maintenance_service.run_periodically()))
+    if settings.PRICE_REFRESH_ENABLED:
+        background_tasks.append(asyncio.create_task(price_service.run_periodically(build_scraper())))
+    if settings.SCRAPER_ENABLED:
+        await scraper.start()
+    
+    yield
+    
+    # Shutdown: detener tareas en segundo plano y cerrar conexiones
+    await scraper.stop()
+    for task in background_tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    
+    logger.info("Cerrando conexiones a la base de datos...")
+    engine.dispose()
+    replica_pool.dispose()
+    logger.info("Conexiones cerradas")
+
+
+def _check_database_connection() -> None:
+    """Prueba la conexión a la base de datos (las tablas se crean con Alembic)"""
     logger.info("Inicializando base de datos...")
     
     try:
@@ -48,13 +115,6 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Error al conectar con la base de datos: {e}")
         raise
-    
-    yield
-    
-    # Shutdown: Cerrar conexiones
-    logger.info("Cerrando conexiones a la base de datos...")
-    engine.dispose()
-    logger.info("Conexiones cerradas")
 
 
 # Crear la aplicación FastAPI con lifespan
@@ -72,6 +132,18 @@ app.add_exception_handler(StarletteHTTPException, http_exception_handler)
 app.add_exception_handler(SQLAlchemyError, database_exception_handler)  # Maneja errores de SQLAlchemy
 app.add_exception_handler(Exception, general_exception_handler)  # Catch-all para todo lo demás
 
+# Idempotency-Key en los POST de creación (antes que CORS: las respuestas repetidas también llevan sus cabeceras)
+if settings.IDEMPOTENCY_ENABLED:
+    app.add_middleware(
+        IdempotencyMiddleware,
+        paths=settings.IDEMPOTENCY_PATHS,
+        session_factory=SessionLocal,
+        ttl_seconds=settings.IDEMPOTENCY_TTL_HOURS * 3600,
+        lock_seconds=settings.IDEMPOTENCY_LOCK_SECONDS,
+        wait_seconds=settings.IDEMPOTENCY_WAIT_SECONDS,
+        max_response_bytes=settings.IDEMPOTENCY_MAX_RESPONSE_BYTES,
+    )
+
 # Configurar CORS
 app.add_middleware(
     CORSMiddleware,
@@ -79,11 +151,74 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[MISSING_IDS_HEADER, REPLAYED_HEADER, TOTAL_COUNT_HEADER, TOTAL_COUNT_EXACT_HEADER],
 )
 
+# Contar queries y commits por request (cabeceras X-DB-Queries y X-DB-Commits, usadas por los benchmarks)
+if settings.DB_QUERY_COUNT_HEADER:
+    query_counter.install(engine)
+    for replica in replica_pool.replicas:
+        query_counter.install(replica.engine)
+
+    @app.middleware("http")
+    async def db_query_count_middleware(request: Request, call_next):
+        counter = query_counter.start()
+        response = await call_next(request)
+        response.headers[query_counter.QUERY_COUNT_HEADER] = str(counter[0])
+        response.headers[query_counter.COMMIT_COUNT_HEADER] = str(counter[1])
+        return response
+
+# Lecturas de GET/HEAD a réplicas, salvo justo después de que el cliente escriba
+if replica_pool:
+    _READ_METHODS = frozenset({"GET", "HEAD"})
+
+    @app.middleware("http")
+    async def replica_routing_middleware(request: Request, call_next):
+        now = time.time()
+        try:
+            sticky_until = float(request.cookies.get(routing.STICKY_COOKIE, 0))
+        except ValueError:
+            sticky_until = 0.0
+        token = routing.set_prefer_replica(request.method in _READ_METHODS and sticky_until <= now)
+        try:
+            response = await call_next(request)
+        finally:
+            routing.reset_prefer_replica(token)
+
+        if request.method not in _READ_METHODS and response.status_code < 400:
+            # Read-your-writes: las próximas lecturas de este cliente van al primario
+            response.set_cookie(
+                routing.STICKY_COOKIE,
+                str(int(now) + settings.REPLICA_STICKY_SECONDS),
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite="lax",
+            )
+        return response
+
+# Comprimir respuestas (el último middleware añadido es el más externo: comprime la respuesta final)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        encodings=settings.COMPRESSION_ENCODINGS,
+        levels={
+            "gzip": settings.COMPRESSION_GZIP_LEVEL,
+            "br": settings.COMPRESSION_BROTLI_QUALITY,
+            "zstd": settings.COMPRESSION_ZSTD_LEVEL,
+        },
+        min_bytes=settings.COMPRESSION_MIN_BYTES,
+        thread_min_bytes=settings.COMPRESSION_THREAD_MIN_BYTES,
+        cache_max_entries=settings.COMPRESSION_CACHE_MAX_ENTRIES,
+        cache_max_bytes=settings.COMPRESSION_CACHE_MAX_BYTES,
+    )
+
 # Incluir routers
 app.include_router(users.router, prefix="/api/v1")
 app.include_router(items.router, prefix="/api/v1")
+app.include_router(claims.router, prefix="/api/v1")
+app.include_router(invites.router, prefix="/api/v1")
+app.include_router(prices.router, prefix="/api/v1")
+app.include_router(wishlists.router, prefix="/api/v1")
 
 
 @app.get("/")
@@ -101,3 +236,29 @@ def health_check():
     """Endpoint de verificación de salud"""
     return {"status": "healthy"}
 
+
+@app.get("/health/live")
+async def liveness_check():
+    """Liveness: el proceso responde (no consulta la base de datos)"""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness_check():
+    """
+    Readiness: la instancia puede recibir tráfico.
+
+    Usa el último estado medido en segundo plano (ping, pool y circuit
+    breaker; ver app.db.health), sin consultar la base de datos. 503 si no está lista.
+    """
+    ready, database = database_health.readiness()
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "status": "ready" if ready else "not_ready",
+            "database": database,
+            "replicas": replica_pool.status(),
+            "retries": db_retry.get_metrics(),
+        },
+    )
+
@@ -0,0 +1,86 @@
+"""Repositorio para operaciones de claims sobre items (concurrencia optimista)."""
+from typing import Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from app.db.models.item import Item
+from app.db.models.item_claim import ItemClaim
+
+_CLAIM_COLUMNS = tuple(ItemClaim.__table__.c)
+
+
+def get_for_item_and_user(db: Session, item_id: UUID, user_id: UUID) -> Tuple[bool, Optional[Row]]:
+    """
+    Devuelve si el item existe y el claim del usuario sobre él (si lo hay).
+
+    Una sola consulta: items LEFT JOIN item_claims.
+    """
+    stmt = (
+        select(Item.id.label("item_exists"), *_CLAIM_COLUMNS)
+        .select_from(Item)
+        .outerjoin(ItemClaim, (ItemClaim.item_id == Item.id) & (ItemClaim.user_id == user_id))
+        .where(Item.id == item_id)
+    )
+    row = db.execute(stmt).first()
+    if row is None:
+        return False, None
+    return True, (row if row.id is not None else None)
+
+
+def list_for_item(db: Session, item_id: UUID) -> Sequence[Row]:
+    """Claims de un item por fecha de creación (índice ``ix_item_claims_item_id_status``)."""
+    stmt = select(*_CLAIM_COLUMNS).where(ItemClaim.item_id == item_id).order_by(ItemClaim.created_at)
+    return db.execute(stmt).all()
+
+
+def insert_if_absent(
+    db: Session,
+    *,
+    item_id: UUID,
+    user_id: UUID,
+    status: str,
+    note: Optional[str],
+) -> Optional[Row]:
+    """
+    Inserta un claim si no choca con ninguna restricción única.
+
+    Devuelve None si otro request insertó antes el claim del mismo usuario o si el
+    item ya tiene un claim activo (uq_item_claims_active_item). No hace commit.
+    """
+    stmt = (
+        insert(ItemClaim)
+        .values(item_id=item_id, user_id=user_id, status=status, note=note, version=1)
+        .on_conflict_do_nothing()
+        .returning(*_CLAIM_COLUMNS)
+    )
+    return db.execute(stmt).first()
+
+
+def update_status_if_version(
+    db: Session,
+    *,
+    claim_id: UUID,
+    expected_version: int,
+    status: str,
+    note: Optional[str],
+) -> Optional[Row]:
+    """
+    Cambia el estado solo si la versión no ha cambiado (UPDATE ... WHERE version = :v RETURNING).
+
+    Devuelve None si otro request modificó el claim antes. Lanza IntegrityError si el
+    nuevo estado viola uq_item_claims_active_item. No hace commit.
+    """
+    values = {"status": status, "version": ItemClaim.version + 1, "updated_at": func.now()}
+    if note is not None:
+        values["note"] = note
+    stmt = (
+        update(ItemClaim)
+        .where(ItemClaim.id == claim_id, ItemClaim.version == expected_version)
+        .values(**values)
+        .returning(*_CLAIM_COLUMNS)
+    )
+    return db.execute(stmt).first()
@@ -0,0 +1,40 @@
+"""
+Repositorio de recuentos: exactos con tope y estimaciones del planificador
+
+``SELECT count(*)`` recorre todas las filas que cumplen el filtro (PostgreSQL
+no guarda el número de filas de una tabla). Para la cabecera ``X-Total-Count``
+basta con:
+
+- ``capped_count``: contar como mucho ``cap + 1`` filas. Si hay más, se sabe
+  que son "más de ``cap``" sin recorrer el resto
+- ``table_estimate``: ``pg_class.reltuples``, la estimación que mantienen
+  ``ANALYZE`` y autovacuum (una fila de catálogo)
+- ``explain_estimate``: las filas que el planificador espera para una consulta
+  con filtro (``EXPLAIN``, sin ejecutarla)
+"""
+from typing import Optional
+
+from sqlalchemy import Select, func, select, text
+from sqlalchemy.orm import Session
+
+# -1 si la tabla no se ha analizado nunca (PostgreSQL 14+); 0 en versiones anteriores
+_RELTUPLES_SQL = text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:table)")
+
+
+def capped_count(db: Session, query: Select, cap: int) -> Optional[int]:
+    """Filas de ``query`` si son como mucho ``cap``; None si hay más (lee como mucho ``cap + 1``)."""
+    count = db.execute(select(func.count()).select_from(query.limit(cap + 1).subquery())).scalar_one()
+    return count if count <= cap else None
+
+
+def table_estimate(db: Session, table: str) -> Optional[int]:
+    """Filas estimadas de ``table`` según sus estadísticas, o None si no se ha analizado."""
+    reltuples = db.execute(_RELTUPLES_SQL, {"table": table}).scalar()
+    return int(reltuples) if reltuples is not None and reltuples > 0 else None
+
+
+def explain_estimate(db: Session, query: Select) -> int:
+    """Filas que el planificador espera que devuelva ``query`` (no la ejecuta)."""
+    sql = query.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True})
+    plan = db.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+    return int(plan[0]["Plan"]["Plan Rows"])
@@ -0,0 +1,100 @@
+"""Repositorio de tipos de cambio y totales de listas en varias monedas."""
+from decimal import Decimal
+from typing import Any, Mapping, Optional
+from uuid import UUID
+
+from sqlalchemy import Numeric, Text, bindparam, select, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.orm import Session
+
+from app.db.models.currency_rate import CurrencyRate
+
+_UPSERT_RATES_SQL = text("""
+    INSERT INTO currency_rates (currency, units_per_base, source, updated_at)
+    SELECT currency, units_per_base, :source, now()
+    FROM unnest(:currencies, :rates) AS r(currency, units_per_base)
+    ON CONFLICT (currency) DO UPDATE
+    SET units_per_base = EXCLUDED.units_per_base, source = EXCLUDED.source, updated_at = now()
+""").bindparams(
+    bindparam("currencies", type_=ARRAY(Text)),
+    bindparam("rates", type_=ARRAY(Numeric(20, 10))),
+)
+
+# Totales de una lista convertidos a :target en una sola consulta. Los tipos llegan
+# como arrays (caché en memoria); importe en :target = importe * tipo(:target) / tipo(moneda).
+# Objetivo de cada item: target_amount_cents si existe (vale regalo…), si no price_cents.
+_WISHLIST_TOTALS_SQL = text("""
+    WITH rates AS (
+        SELECT * FROM unnest(:currencies, :rates) AS r(currency, units_per_base)
+    ),
+    per_item AS (
+        SELECT COALESCE(i.target_amount_cents, i.price_cents) AS goal_cents,
+               COALESCE(i.currency, :base) AS currency,
+               (SELECT COALESCE(sum(c.amount_cents), 0)
+                FROM item_contributions c
+                WHERE c.item_id = i.id) AS contributed_cents
+        FROM items i
+        WHERE i.wishlist_id = :wishlist_id
+    ),
+    converted AS (
+        SELECT p.goal_cents, p.currency, r.units_per_base IS NOT NULL AS has_rate,
+               (SELECT units_per_base FROM rates WHERE currency = :target) / r.units_per_base AS factor,
+               p.contributed_cents
+        FROM per_item p
+        LEFT JOIN rates r ON r.currency = p.currency
+    )
+    SELECT EXISTS (SELECT 1 FROM wishlists WHERE id = :wishlist_id AND deleted_at IS NULL) AS wishlist_exists,
+           count(*) AS items,
+           count(*) FILTER (WHERE goal_cents IS NULL) AS items_without_price,
+           COALESCE(array_agg(DISTINCT currency) FILTER (WHERE goal_cents IS NOT NULL AND NOT has_rate),
+                    '{}') AS missing_currencies,
+           round(COALESCE(sum(goal_cents * factor), 0))::bigint AS total_cents,
+           round(COALESCE(sum(LEAST(contributed_cents, goal_cents) * factor)
+                          FILTER (WHERE goal_cents IS NOT NULL), 0))::bigint AS contributed_cents,
+           round(COALESCE(sum(GREATEST(goal_cents - contributed_cents, 0) * factor)
+                          FILTER (WHERE goal_cents IS NOT NULL), 0))::bigint AS remaining_cents
+    FROM converted
+""").bindparams(
+    bindparam("currencies", type_=ARRAY(Text)),
+    bindparam("rates", type_=ARRAY(Numeric(20, 10))),
+    bindparam("wishlist_id", type_=PG_UUID(as_uuid=True)),
+)
+
+
+def get_all(db: Session) -> dict[str, Decimal]:
+    """Todos los tipos de cambio (moneda -> unidades por unidad de la moneda base)."""
+    return {row.currency: row.units_per_base for row in db.execute(select(CurrencyRate))}
+
+
+def upsert_rates(db: Session, rates: Mapping[str, Decimal], *, source: Optional[str] = None) -> int:
+    """Inserta o actualiza los tipos de cambio con una sola sentencia."""
+    if not rates:
+        return 0
+    db.execute(
+        _UPSERT_RATES_SQL,
+        {"currencies": list(rates), "rates": list(rates.values()), "source": source},
+    )
+    db.commit()
+    return len(rates)
+
+
+def wishlist_totals(
+    db: Session,
+    wishlist_id: UUID,
+    *,
+    target: str,
+    base: str,
+    rates: Mapping[str, Decimal],
+) -> dict[str, Any]:
+    """Total, aportado y pendiente de una lista en la moneda ``target``."""
+    row = db.execute(
+        _WISHLIST_TOTALS_SQL,
+        {
+            "wishlist_id": wishlist_id,
+            "target": target,
+            "base": base,
+            "currencies": list(rates),
+            "rates": list(rates.values()),
+        },
+    ).one()
+    return dict(row._mapping)
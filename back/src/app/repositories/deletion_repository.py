@@ -0,0 +1,193 @@
+"""
+Repositorio de borrado diferido de usuarios y listas
+
+El borrado en dos fases evita cargar (o borrar de golpe) todo lo que
+cuelga de una cuenta:
+
+1. ``soft_delete_*``: marca ``deleted_at`` en unas pocas filas (el commit
+   lo hace el servicio, ver ``app.db.unit_of_work``)
+2. ``purge_*``: borra por lotes de como mucho ``limit`` filas, de las hojas
+   hacia la raíz. Cada lote confía en el ``ON DELETE CASCADE`` de PostgreSQL
+   para las filas pequeñas que cuelgan de cada fila borrada (un item arrastra
+   sus claims, aportaciones, invitaciones, actividad y ACL)
+
+Como en ``maintenance_repository``, ``FOR UPDATE SKIP LOCKED`` salta las
+filas que un request tiene bloqueadas.
+"""
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+_SOFT_DELETE_USER_SQL = text("""
+    UPDATE users
+    SET deleted_at = now(), is_active = false, email = NULL, updated_at = now()
+    WHERE id = :user_id AND deleted_at IS NULL
+    RETURNING id
+""")
+
+_SOFT_DELETE_USER_WISHLISTS_SQL = text("""
+    UPDATE wishlists
+    SET deleted_at = now()
+    WHERE creator_id = :user_id AND deleted_at IS NULL
+    RETURNING id
+""")
+
+_DELETE_USER_SESSIONS_SQL = text("DELETE FROM sessions WHERE user_id = :user_id")
+
+_SOFT_DELETE_WISHLIST_SQL = text("""
+    UPDATE wishlists
+    SET deleted_at = now()
+    WHERE id = :wishlist_id AND deleted_at IS NULL
+    RETURNING id
+""")
+
+_PURGE_ITEMS_SQL = text("""
+    DELETE FROM items
+    WHERE id IN (
+        SELECT i.id FROM items i
+        JOIN wishlists w ON w.id = i.wishlist_id
+        WHERE w.deleted_at IS NOT NULL
+        LIMIT :limit
+        FOR UPDATE OF i SKIP LOCKED
+    )
+""")
+
+_PURGE_WISHLISTS_SQL = text("""
+    DELETE FROM wishlists
+    WHERE id IN (
+        SELECT w.id FROM wishlists w
+        WHERE w.deleted_at IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM items i WHERE i.wishlist_id = w.id)
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    )
+""")
+
+# Filas de usuarios borrados en datos de otros: (tabla, columna del usuario, clave, condición extra)
+USER_ROWS = (
+    ("item_claims", "user_id", "id", ""),
+    ("item_contributions", "user_id", "id", ""),
+    ("item_activity", "actor_id", "id", ""),
+    ("contribution_invites", "inviter_id", "id", ""),
+    ("contribution_invites", "subject_id", "id", "AND t.subject_kind = 'user'"),
+    ("wishlist_permissions", "subject_id", "id", "AND t.subject_kind = 'user'"),
+    ("item_acl", "subject_id", "item_id, subject_kind, subject_id", "AND t.subject_kind = 'user'"),
+    ("group_members", "user_id", "group_id, user_id", ""),
+)
+
+
+def _purge_user_rows_sql(table: str, column: str, key: str, condition: str):
+    return text(f"""
+    DELETE FROM {table}
+    WHERE ({key}) IN (
+        SELECT {", ".join(f"t.{part.strip()}" for part in key.split(","))} FROM {table} t
+        JOIN users u ON u.id = t.{column}
+        WHERE u.deleted_at IS NOT NULL {condition}
+        LIMIT :limit
+        FOR UPDATE OF t SKIP LOCKED
+    )
+""")
+
+
+_PURGE_USER_ROWS_SQL = tuple(_purge_user_rows_sql(*spec) for spec in USER_ROWS)
+
+# Los grupos se borran junto con los permisos, ACL e invitaciones dirigidos a ellos
+_PURGE_GROUPS_SQL = text("""
+    WITH doomed AS (
+        SELECT g.id FROM groups g
+        JOIN users u ON u.id = g.owner_id
+        WHERE u.deleted_at IS NOT NULL
+        LIMIT :limit
+        FOR UPDATE OF g SKIP LOCKED
+    ), permissions AS (
+        DELETE FROM wishlist_permissions WHERE subject_kind = 'group' AND subject_id IN (SELECT id FROM doomed)
+    ), acl AS (
+        DELETE FROM item_acl WHERE subject_kind = 'group' AND subject_id IN (SELECT id FROM doomed)
+    ), invites AS (
+        DELETE FROM contribution_invites WHERE subject_kind = 'group' AND subject_id IN (SELECT id FROM doomed)
+    )
+    DELETE FROM groups WHERE id IN (SELECT id FROM doomed)
+""")
+
+# Solo usuarios sin filas grandes pendientes: la cascada final (identidades, sesiones) es pequeña
+_PURGE_USERS_SQL = text("""
+    DELETE FROM users
+    WHERE id IN (
+        SELECT u.id FROM users u
+        WHERE u.deleted_at IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM wishlists w WHERE w.creator_id = u.id)
+          AND NOT EXISTS (SELECT 1 FROM groups g WHERE g.owner_id = u.id)
+          AND NOT EXISTS (SELECT 1 FROM item_claims c WHERE c.user_id = u.id)
+          AND NOT EXISTS (SELECT 1 FROM item_contributions c WHERE c.user_id = u.id)
+          AND NOT EXISTS (SELECT 1 FROM item_activity a WHERE a.actor_id = u.id)
+          AND NOT EXISTS (SELECT 1 FROM contribution_invites i WHERE i.inviter_id = u.id)
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    )
+""")
+
+
+def soft_delete_user(db: Session, user_id: UUID) -> Optional[list[UUID]]:
+    """
+    Marca un usuario y sus listas como borrados, libera su email y cierra sus sesiones.
+
+    Devuelve los IDs de las listas marcadas, o None si el usuario no existe
+    (o ya estaba borrado). No hace commit.
+    """
+    if db.execute(_SOFT_DELETE_USER_SQL, {"user_id": user_id}).first() is None:
+        return None
+    wishlist_ids = list(db.scalars(_SOFT_DELETE_USER_WISHLISTS_SQL, {"user_id": user_id}))
+    db.execute(_DELETE_USER_SESSIONS_SQL, {"user_id": user_id})
+    return wishlist_ids
+
+
+def soft_delete_wishlist(db: Session, wishlist_id: UUID) -> bool:
+    """Marca una lista como borrada. False si no existe (o ya estaba borrada). No hace commit."""
+    return db.execute(_SOFT_DELETE_WISHLIST_SQL, {"wishlist_id": wishlist_id}).first() is not None
+
+
+def purge_items(db: Session, *, limit: int) -> int:
+    """Elimina un lote de items de listas borradas (con sus filas dependientes)."""
+    result = db.execute(_PURGE_ITEMS_SQL, {"limit": limit})
+    db.commit()
+    return result.rowcount
+
+
+def purge_wishlists(db: Session, *, limit: int) -> int:
+    """Elimina un lote de listas borradas que ya no tienen items."""
+    result = db.execute(_PURGE_WISHLISTS_SQL, {"limit": limit})
+    db.commit()
+    return result.rowcount
+
+
+def purge_user_rows(db: Session, *, limit: int) -> int:
+    """
+    Elimina hasta ``limit`` filas de usuarios borrados en datos de otros.
+
+    Claims, aportaciones, actividad, invitaciones, permisos y pertenencia a
+    grupos (``USER_ROWS``): una sentencia por tabla, cada una en su transacción.
+    """
+    total = 0
+    for statement in _PURGE_USER_ROWS_SQL:
+        if total >= limit:
+            break
+        # Un lote incompleto deja la tabla vacía (salvo filas bloqueadas): se pasa a la siguiente
+        total += db.execute(statement, {"limit": limit - total}).rowcount
+        db.commit()
+    return total
+
+
+def purge_groups(db: Session, *, limit: int) -> int:
+    """Elimina un lote de grupos de usuarios borrados y las referencias a esos grupos."""
+    result = db.execute(_PURGE_GROUPS_SQL, {"limit": limit})
+    db.commit()
+    return result.rowcount
+
+
+def purge_users(db: Session, *, limit: int) -> int:
+    """Elimina un lote de usuarios borrados a los que ya no les quedan filas grandes."""
+    result = db.execute(_PURGE_USERS_SQL, {"limit": limit})
+    db.commit()
+    return result.rowcount
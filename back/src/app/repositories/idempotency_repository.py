@@ -0,0 +1,108 @@
+"""
+Repositorio de claves de idempotencia
+
+La fila ``in_progress`` hace de candado: solo quien la inserta (o la
+recupera porque su candado o la clave han caducado) ejecuta el request.
+``INSERT ... ON CONFLICT DO UPDATE ... WHERE`` lo decide en una sentencia
+atómica: un duplicado concurrente espera al commit del primero y no obtiene fila.
+"""
+from typing import Any, NamedTuple, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+IN_PROGRESS = "in_progress"
+COMPLETED = "completed"
+
+_ACQUIRE_SQL = text("""
+    INSERT INTO idempotency_keys (scope, key, fingerprint, status, locked_until, expires_at)
+    VALUES (
+        :scope, :key, :fingerprint, 'in_progress',
+        now() + make_interval(secs => :lock_seconds),
+        now() + make_interval(secs => :ttl_seconds)
+    )
+    ON CONFLICT (scope, key) DO UPDATE
+    SET fingerprint = EXCLUDED.fingerprint,
+        status = 'in_progress',
+        response_status = NULL,
+        content_type = NULL,
+        response_body = NULL,
+        locked_until = EXCLUDED.locked_until,
+        created_at = now(),
+        expires_at = EXCLUDED.expires_at
+    WHERE idempotency_keys.expires_at <= now()
+       OR (idempotency_keys.status = 'in_progress' AND idempotency_keys.locked_until <= now())
+    RETURNING 1
+""")
+
+_GET_SQL = text("""
+    SELECT fingerprint, status, response_status, content_type, response_body
+    FROM idempotency_keys
+    WHERE scope = :scope AND key = :key
+""")
+
+_COMPLETE_SQL = text("""
+    UPDATE idempotency_keys
+    SET status = 'completed', response_status = :status_code, content_type = :content_type,
+        response_body = :body, locked_until = NULL
+    WHERE scope = :scope AND key = :key AND status = 'in_progress'
+""")
+
+_RELEASE_SQL = text("""
+    DELETE FROM idempotency_keys
+    WHERE scope = :scope AND key = :key AND status = 'in_progress'
+""")
+
+
+class Acquired(NamedTuple):
+    """Si este intento ejecuta el request y, si no, la fila existente"""
+    acquired: bool
+    existing: Optional[Any]
+
+
+def acquire(
+    db: Session,
+    *,
+    scope: str,
+    key: str,
+    fingerprint: str,
+    lock_seconds: float,
+    ttl_seconds: float,
+) -> Acquired:
+    """
+    Reserva la clave o devuelve la fila que ya la ocupa (en curso o completada).
+
+    ``existing`` puede ser None sin reserva si otro intento liberó la fila
+    entre las dos sentencias: basta con volver a llamar.
+    """
+    params = {"scope": scope, "key": key}
+    acquired = db.execute(
+        _ACQUIRE_SQL,
+        {**params, "fingerprint": fingerprint, "lock_seconds": lock_seconds, "ttl_seconds": ttl_seconds},
+    ).first() is not None
+    existing = None if acquired else db.execute(_GET_SQL, params).first()
+    db.commit()
+    return Acquired(acquired=acquired, existing=existing)
+
+
+def complete(
+    db: Session,
+    *,
+    scope: str,
+    key: str,
+    status_code: int,
+    content_type: Optional[str],
+    body: bytes,
+) -> None:
+    """Guarda la respuesta y libera el candado."""
+    db.execute(
+        _COMPLETE_SQL,
+        {"scope": scope, "key": key, "status_code": status_code, "content_type": content_type, "body": body},
+    )
+    db.commit()
+
+
+def release(db: Session, *, scope: str, key: str) -> None:
+    """Borra una reserva en curso (el request falló): el siguiente reintento vuelve a ejecutarse."""
+    db.execute(_RELEASE_SQL, {"scope": scope, "key": key})
+    db.commit()
@@ -0,0 +1,111 @@
+"""Repositorio para invitaciones a aportar (envío masivo basado en conjuntos)."""
+from typing import Any, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import Integer, bindparam, exists, select, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.orm import Session
+
+from app.db.models.enums import InviteStatus, SubjectType
+from app.db.models.item import Item
+from app.db.models.wishlist import Wishlist
+
+# Una sola sentencia: comprueba usuarios y grupos, expande los grupos, inserta las
+# invitaciones que no existan (INSERT ... SELECT con ON CONFLICT sobre
+# uq_contribution_invites_open_subject) y registra una actividad 'invite_sent' por
+# invitación creada. subject_id no tiene clave foránea: solo se invita a usuarios que
+# existen y no están borrados, y los IDs que no existen se devuelven al llamador.
+# Un grupo cuyo propietario está borrado se trata como borrado (lo elimina la purga).
+_FAN_OUT_SQL = text("""
+    WITH live_users AS (
+        SELECT u.id FROM users u
+        WHERE u.id = ANY(:user_ids) AND u.deleted_at IS NULL
+    ),
+    live_groups AS (
+        SELECT g.id FROM groups g
+        JOIN users o ON o.id = g.owner_id AND o.deleted_at IS NULL
+        WHERE g.id = ANY(:group_ids)
+    ),
+    targets AS (
+        SELECT DISTINCT ON (user_id) user_id, group_id
+        FROM (
+            SELECT lu.id AS user_id, NULL::uuid AS group_id
+            FROM live_users lu
+            UNION ALL
+            SELECT gm.user_id, gm.group_id
+            FROM group_members gm
+            JOIN live_groups lg ON lg.id = gm.group_id
+            JOIN users u ON u.id = gm.user_id AND u.deleted_at IS NULL
+        ) expanded
+        WHERE user_id <> :inviter_id
+        ORDER BY user_id, group_id NULLS FIRST
+    ),
+    inserted AS (
+        INSERT INTO contribution_invites (item_id, inviter_id, subject_kind, subject_id, suggested_each_cents, status)
+        SELECT :item_id, :inviter_id, :subject_user, t.user_id, :suggested_each_cents, :pending
+        FROM targets t
+        ON CONFLICT DO NOTHING
+        RETURNING id, subject_id
+    ),
+    activity AS (
+        INSERT INTO item_activity (item_id, actor_id, kind, payload)
+        SELECT :item_id, :inviter_id, 'invite_sent',
+               jsonb_build_object('invite_id', i.id, 'user_id', i.subject_id, 'group_id', t.group_id)
+        FROM inserted i
+        JOIN targets t ON t.user_id = i.subject_id
+        RETURNING payload
+    )
+    SELECT (SELECT count(*) FROM targets) AS targets,
+           COALESCE((SELECT jsonb_agg(payload) FROM activity), '[]'::jsonb) AS invites,
+           ARRAY(SELECT unnest(:user_ids) EXCEPT SELECT id FROM live_users) AS unknown_user_ids,
+           ARRAY(SELECT unnest(:group_ids) EXCEPT SELECT id FROM live_groups) AS unknown_group_ids
+""").bindparams(
+    bindparam("user_ids", type_=ARRAY(PG_UUID(as_uuid=True))),
+    bindparam("group_ids", type_=ARRAY(PG_UUID(as_uuid=True))),
+    bindparam("item_id", type_=PG_UUID(as_uuid=True)),
+    bindparam("inviter_id", type_=PG_UUID(as_uuid=True)),
+    bindparam("suggested_each_cents", type_=Integer),
+)
+
+
+def item_exists(db: Session, item_id: UUID) -> bool:
+    """Comprueba si existe un item (en una lista no borrada)."""
+    live = exists().where(Wishlist.id == Item.wishlist_id, Wishlist.deleted_at.is_(None))
+    return db.execute(select(exists().where(Item.id == item_id, live))).scalar()
+
+
+def fan_out(
+    db: Session,
+    *,
+    item_id: UUID,
+    inviter_id: UUID,
+    user_ids: Sequence[UUID],
+    group_ids: Sequence[UUID],
+    suggested_each_cents: Optional[int],
+) -> dict[str, Any]:
+    """
+    Crea invitaciones para los usuarios y los miembros de los grupos indicados.
+
+    Omite al propio invitador y a quien ya tenga una invitación pendiente o aceptada
+    para el item. Devuelve el número de destinatarios, las invitaciones creadas y
+    los IDs de usuarios y grupos que no existen o están borrados (a esos no se
+    invita). No hace commit.
+    """
+    row = db.execute(
+        _FAN_OUT_SQL,
+        {
+            "user_ids": list(user_ids),
+            "group_ids": list(group_ids),
+            "item_id": item_id,
+            "inviter_id": inviter_id,
+            "suggested_each_cents": suggested_each_cents,
+            "subject_user": SubjectType.USER.value,
+            "pending": InviteStatus.PENDING.value,
+        },
+    ).one()
+    return {
+        "targets": row.targets,
+        "invites": row.invites,
+        "unknown_user_ids": sorted(row.unknown_user_ids, key=str),
+        "unknown_group_ids": sorted(row.unknown_group_ids, key=str),
+    }
@@ -1,14 +1,112 @@
 """Repositorio para operaciones de items."""
 from typing import Optional, Sequence
+from uuid import UUID
 
+from sqlalchemy import Boolean, Integer, Select, Text, any_, bindparam, case, cast, func, insert, literal, select, text
+from sqlalchemy import delete as sql_delete
+from sqlalchemy import update as sql_update
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID as PG_UUID
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 
 from app.db.models.item import Item
+from app.db.models.wishlist import Wishlist
+from app.repositories import count_repository
+from app.scraper.parser import ProductData
+from app.utils.ranking import REBALANCE_LENGTH
 
+# Columnas de una actualización parcial (item_schema.ItemUpdate) y su tipo en PostgreSQL
+BULK_UPDATE_COLUMNS = {
+    "name": Text(),
+    "description": Text(),
+    "brand": Text(),
+    "price_cents": Integer(),
+    "currency": Text(),
+    "image_url": Text(),
+    "visibility": Text(),
+}
 
-def get(db: Session, item_id: int) -> Optional[Item]:
-    """Obtiene un item por ID."""
-    return db.get(Item, item_id)
+
+def _bulk_update_sql():
+    # Por cada columna, un array de valores y otro de "se envió": un campo no enviado conserva
+    # su valor y uno enviado como null lo borra. El SQL es el mismo para 1 o 500 items.
+    columns = list(BULK_UPDATE_COLUMNS)
+    assignments = ",\n        ".join(f"{c} = CASE WHEN v.set_{c} THEN v.{c} ELSE i.{c} END" for c in columns)
+    arrays = ", ".join(f":{c}, :set_{c}" for c in columns)
+    aliases = ", ".join(f"{c}, set_{c}" for c in columns)
+    return text(f"""
+    UPDATE items AS i
+    SET {assignments},
+        updated_at = now()
+    FROM unnest(:ids, {arrays}) AS v(id, {aliases})
+    WHERE i.id = v.id
+      AND EXISTS (SELECT 1 FROM wishlists w WHERE w.id = i.wishlist_id AND w.deleted_at IS NULL)
+    RETURNING i.id
+""").bindparams(
+        bindparam("ids", type_=ARRAY(PG_UUID(as_uuid=True))),
+        *(bindparam(c, type_=ARRAY(t)) for c, t in BULK_UPDATE_COLUMNS.items()),
+        *(bindparam(f"set_{c}", type_=ARRAY(Boolean())) for c in columns),
+    )
+
+
+_BULK_UPDATE_SQL = _bulk_update_sql()
+
+# Última clave por lista: un max() por lista resuelto con ix_items_wishlist_id_rank
+_LAST_RANKS_SQL = text("""
+    SELECT w.id, (SELECT max(rank) FROM items WHERE wishlist_id = w.id) AS rank
+    FROM unnest(:ids) AS w(id)
+""").bindparams(bindparam("ids", type_=ARRAY(PG_UUID(as_uuid=True))))
+
+# El predicado tiene que coincidir con el de ix_items_rank_rebalance (constante, no parámetro)
+_REBALANCE_CANDIDATES_SQL = text(f"""
+    SELECT DISTINCT wishlist_id FROM items
+    WHERE (rank IS NULL OR length(rank) > {REBALANCE_LENGTH})
+      AND EXISTS (SELECT 1 FROM wishlists w WHERE w.id = items.wishlist_id AND w.deleted_at IS NULL)
+    LIMIT :limit
+""")
+
+_ASSIGN_RANKS_SQL = text("""
+    UPDATE items AS i
+    SET rank = v.rank
+    FROM unnest(:ids, :ranks) AS v(id, rank)
+    WHERE i.id = v.id
+""").bindparams(
+    bindparam("ids", type_=ARRAY(PG_UUID(as_uuid=True))),
+    bindparam("ranks", type_=ARRAY(Text())),
+)
+
+
+def _in_live_wishlist():
+    # Los items de una lista borrada (pendiente de purga) ya no existen para las lecturas ni las escrituras
+    return select(Wishlist.id).where(Wishlist.id == Item.wishlist_id, Wishlist.deleted_at.is_(None)).exists()
+
+
+def get(db: Session, item_id: UUID) -> Optional[Item]:
+    """Obtiene un item por ID (None si no existe o su lista está borrada)."""
+    return db.scalars(select(Item).where(Item.id == item_id, _in_live_wishlist())).first()
+
+
+def get_many(db: Session, item_ids: Sequence[UUID], *, for_update: bool = False) -> Sequence[Item]:
+    """
+    Obtiene varios items por ID en una consulta (``id = ANY(:ids)``).
+
+    No garantiza orden y omite los IDs que no existen o cuya lista está
+    borrada. Con ``for_update`` bloquea las filas hasta el final de la
+    transacción.
+    """
+    ids = bindparam("ids", list(item_ids), type_=ARRAY(PG_UUID(as_uuid=True)))
+    query = select(Item).where(Item.id == any_(ids), _in_live_wishlist())
+    if for_update:
+        query = query.with_for_update()
+    return db.scalars(query).all()
+
+
+def _filter_multi(query: Select, wishlist_id: Optional[UUID], *, ordered: bool = True) -> Select:
+    query = query.where(_in_live_wishlist())
+    if wishlist_id is None:
+        return query
+    query = query.where(Item.wishlist_id == wishlist_id)
+    return query.order_by(Item.rank.asc().nulls_first(), Item.created_at, Item.id) if ordered else query
 
 
 def get_multi(
@@ -16,34 +114,235 @@ def get_multi(
     *,
     skip: int = 0,
     limit: int = 100,
-    owner_id: Optional[int] = None,
+    wishlist_id: Optional[UUID] = None,
 ) -> Sequence[Item]:
-    """Obtiene una lista paginada de items, opcionalmente filtrados por propietario."""
-    query = db.query(Item)
-    if owner_id is not None:
-        query = query.filter(Item.owner_id == owner_id)
-    return query.offset(skip).limit(limit).all()
-
-
-def create(db: Session, *, owner_id: int, data: dict) -> Item:
-    """Crea un item."""
-    item = Item(owner_id=owner_id, **data)
-    db.add(item)
-    db.commit()
-    db.refresh(item)
-    return item
-
-
-def update(db: Session, item: Item, *, values: dict) -> Item:
-    """Actualiza campos de un item."""
-    for field, value in values.items():
-        setattr(item, field, value)
-    db.commit()
-    db.refresh(item)
-    return item
-
-
-def delete(db: Session, item: Item) -> None:
-    """Elimina un item."""
-    db.delete(item)
-    db.commit()
+    """
+    Obtiene una lista paginada de items, opcionalmente filtrados por lista.
+
+    Los items de una lista se devuelven en el orden del usuario (``rank``).
+    """
+    return db.scalars(_filter_multi(select(Item), wishlist_id).offset(skip).limit(limit)).all()
+
+
+def get_multi_rows(
+    db: Session,
+    *,
+    columns: Sequence[str],
+    skip: int = 0,
+    limit: int = 100,
+    wishlist_id: Optional[UUID] = None,
+) -> Sequence[Row]:
+    """
+    Como ``get_multi``, pero solo lee ``columns`` (atributos de ``Item``) y devuelve filas ``Row``.
+
+    Sin entidades ORM: ni mapa de identidad ni instrumentación, y la consulta
+    no trae las columnas que la respuesta no usa.
+    """
+    query = select(*(getattr(Item, name) for name in columns))
+    return db.execute(_filter_multi(query, wishlist_id).offset(skip).limit(limit)).all()
+
+
+def count_multi(db: Session, *, cap: int, wishlist_id: Optional[UUID] = None) -> Optional[int]:
+    """Items que devolvería ``get_multi`` sin paginar, si son como mucho ``cap`` (None si hay más)."""
+    return count_repository.capped_count(db, _filter_multi(select(Item.id), wishlist_id, ordered=False), cap)
+
+
+def estimate_multi(db: Session, *, wishlist_id: Optional[UUID] = None) -> Optional[int]:
+    """
+    Estimación del planificador de los items de ``get_multi`` sin paginar.
+
+    Sin filtro, ``pg_class.reltuples`` (None si la tabla no se ha analizado);
+    con ``wishlist_id``, las filas que espera ``EXPLAIN``.
+    """
+    if wishlist_id is None:
+        return count_repository.table_estimate(db, Item.__tablename__)
+    return count_repository.explain_estimate(db, _filter_multi(select(Item.id), wishlist_id, ordered=False))
+
+
+def create(db: Session, *, data: dict) -> Item:
+    """Crea un item con ``INSERT ... RETURNING`` (sin SELECT posterior). No hace commit."""
+    return db.scalars(insert(Item).returning(Item), [data]).one()
+
+
+def update(db: Session, item_id: UUID, *, values: dict) -> Optional[Item]:
+    """
+    Actualiza campos de un item con ``UPDATE ... RETURNING``, sin leerlo antes. No hace commit.
+
+    Devuelve None si no existe o su lista está borrada. Sin campos que cambiar, solo lo lee.
+    """
+    if not values:
+        return get(db, item_id)
+    stmt = (
+        sql_update(Item)
+        .where(Item.id == item_id, _in_live_wishlist())
+        .values(**values)
+        .returning(Item)
+        .execution_options(populate_existing=True)
+    )
+    return db.scalars(stmt).first()
+
+
+def delete(db: Session, item_id: UUID) -> Optional[UUID]:
+    """
+    Elimina un item (``DELETE ... RETURNING``), sin leerlo antes. No hace commit.
+
+    Devuelve la lista del item eliminado, o None si no existía o su lista está borrada.
+    """
+    stmt = sql_delete(Item).where(Item.id == item_id, _in_live_wishlist()).returning(Item.wishlist_id)
+    return db.scalars(stmt.execution_options(synchronize_session=False)).first()
+
+
+def lock_wishlists(db: Session, wishlist_ids: Sequence[UUID]) -> set[UUID]:
+    """
+    Bloquea las listas de ``wishlist_ids`` que existen y no están borradas, hasta el commit.
+
+    Serializa la asignación de claves de orden (``rank``) de cada lista: quien
+    añade o mueve items en ella espera a que termine la transacción anterior,
+    así que nunca lee la misma última clave que otra. ``FOR NO KEY UPDATE``
+    no bloquea las claves foráneas hacia la lista (claims, permisos...) y el
+    orden por ID evita interbloqueos entre lotes. Devuelve los IDs bloqueados.
+    """
+    ids = bindparam("ids", list(wishlist_ids), type_=ARRAY(PG_UUID(as_uuid=True)))
+    query = (
+        select(Wishlist.id)
+        .where(Wishlist.id == any_(ids), Wishlist.deleted_at.is_(None))
+        .order_by(Wishlist.id)
+        .with_for_update(key_share=True)
+    )
+    return set(db.scalars(query))
+
+
+def lock_item_wishlist(db: Session, item_id: UUID) -> Optional[UUID]:
+    """Bloquea como ``lock_wishlists`` la lista de un item. Devuelve su ID, o None si el item o la lista no existen."""
+    query = (
+        select(Wishlist.id)
+        .join(Item, Item.wishlist_id == Wishlist.id)
+        .where(Item.id == item_id, Wishlist.deleted_at.is_(None))
+        .with_for_update(of=Wishlist, key_share=True)
+    )
+    return db.scalar(query)
+
+
+def bulk_create(db: Session, rows: Sequence[dict]) -> list[UUID]:
+    """
+    Inserta varios items en un solo ``INSERT ... VALUES (...), (...) RETURNING id``.
+
+    No hace commit. Devuelve los IDs en el orden de ``rows``.
+    """
+    stmt = insert(Item).returning(Item.id, sort_by_parameter_order=True)
+    return list(db.scalars(stmt, list(rows)))
+
+
+def bulk_update(db: Session, patches: Sequence[tuple[UUID, dict]]) -> set[UUID]:
+    """
+    Aplica actualizaciones parciales a varios items en una sentencia (``UPDATE ... FROM unnest``).
+
+    Cada parche solo contiene los campos enviados. No hace commit. Devuelve
+    los IDs actualizados (los que no aparecen no existen o su lista está borrada).
+    """
+    unknown = {field for _, values in patches for field in values} - set(BULK_UPDATE_COLUMNS)
+    if unknown:
+        raise ValueError(f"Campos no actualizables en lote: {sorted(unknown)}")
+
+    params: dict = {"ids": [item_id for item_id, _ in patches]}
+    for column in BULK_UPDATE_COLUMNS:
+        params[column] = [values.get(column) for _, values in patches]
+        params[f"set_{column}"] = [column in values for _, values in patches]
+    return set(db.scalars(_BULK_UPDATE_SQL, params))
+
+
+def bulk_delete(db: Session, item_ids: Sequence[UUID]) -> set[UUID]:
+    """
+    Elimina varios items en una sentencia (``DELETE ... WHERE id = ANY(:ids) RETURNING id``).
+
+    No hace commit. Devuelve los IDs eliminados (los de listas borradas no se tocan).
+    """
+    ids = bindparam("ids", list(item_ids), type_=ARRAY(PG_UUID(as_uuid=True)))
+    stmt = sql_delete(Item).where(Item.id == any_(ids), _in_live_wishlist()).returning(Item.id)
+    return set(db.scalars(stmt.execution_options(synchronize_session=False)))
+
+
+def last_ranks(db: Session, wishlist_ids: Sequence[UUID]) -> dict[UUID, Optional[str]]:
+    """Clave de orden más alta de cada lista (None si no tiene items con clave)."""
+    return dict(db.execute(_LAST_RANKS_SQL, {"ids": list(wishlist_ids)}).tuples())
+
+
+def next_rank(db: Session, wishlist_id: UUID, *, after: Optional[str], exclude_id: UUID) -> Optional[str]:
+    """Primera clave de la lista posterior a ``after`` (None = desde el principio), sin contar ``exclude_id``."""
+    query = select(func.min(Item.rank)).where(Item.wishlist_id == wishlist_id, Item.id != exclude_id)
+    query = query.where(Item.rank > after if after is not None else Item.rank.is_not(None))
+    return db.scalar(query)
+
+
+def has_unranked(db: Session, wishlist_id: UUID) -> bool:
+    """Si la lista tiene items sin clave de orden (anteriores a la migración 0008)."""
+    query = select(Item.id).where(Item.wishlist_id == wishlist_id, Item.rank.is_(None)).limit(1)
+    return db.scalar(query) is not None
+
+
+def set_rank(db: Session, item_id: UUID, rank: str) -> Optional[Item]:
+    """Cambia la clave de orden de un item (una fila, ``UPDATE ... RETURNING``). No hace commit."""
+    stmt = (
+        sql_update(Item)
+        .where(Item.id == item_id)
+        .values(rank=rank)
+        .returning(Item)
+        .execution_options(populate_existing=True)
+    )
+    return db.scalars(stmt).first()
+
+
+def rebalance_candidates(db: Session, *, limit: int) -> list[UUID]:
+    """Listas no borradas con items sin clave o con claves de más de ``REBALANCE_LENGTH`` caracteres."""
+    return list(db.scalars(_REBALANCE_CANDIDATES_SQL, {"limit": limit}))
+
+
+def lock_ordered_ids(db: Session, wishlist_id: UUID) -> list[UUID]:
+    """
+    IDs de los items de una lista en su orden actual, bloqueados hasta el commit.
+
+    Los items sin clave van primero (son los más antiguos) por fecha de creación.
+    """
+    query = (
+        select(Item.id)
+        .where(Item.wishlist_id == wishlist_id)
+        .order_by(Item.rank.asc().nulls_first(), Item.created_at, Item.id)
+        .with_for_update()
+    )
+    return list(db.scalars(query))
+
+
+def assign_ranks(db: Session, item_ids: Sequence[UUID], ranks: Sequence[str]) -> None:
+    """Asigna una clave a cada item en una sentencia (``UPDATE ... FROM unnest``). No hace commit."""
+    db.execute(_ASSIGN_RANKS_SQL, {"ids": list(item_ids), "ranks": list(ranks)})
+
+
+def apply_scraped(db: Session, item_id: UUID, product: ProductData) -> bool:
+    """
+    Completa un item con los datos del scraper sin pisar los del usuario.
+
+    Solo rellena columnas vacías; la moneda solo cambia si también se rellena
+    el precio. En ``metadata`` se añaden las claves que el item no tenga.
+    No hace commit.
+    """
+    metadata = dict(product.metadata)
+    if product.name:
+        metadata.setdefault("title", product.name)
+
+    values = {
+        "brand": func.coalesce(Item.brand, product.brand),
+        "description": func.coalesce(Item.description, product.description),
+        "image_url": func.coalesce(Item.image_url, product.image_url),
+        "price_cents": func.coalesce(Item.price_cents, product.price_cents),
+        # Las claves existentes ganan: el operando derecho de || tiene prioridad
+        "item_metadata": bindparam("scraped_metadata", metadata, type_=JSONB).op("||", return_type=JSONB)(
+            func.coalesce(Item.item_metadata, cast(literal("{}"), JSONB))
+        ),
+    }
+    if product.price_cents is not None and product.currency:
+        values["currency"] = case((Item.price_cents.is_(None), product.currency), else_=Item.currency)
+
+    result = db.execute(
+        sql_update(Item).where(Item.id == item_id).values(values).execution_options(synchronize_session=False)
+    )
+    return result.rowcount > 0
@@ -0,0 +1,104 @@
+"""
+Repositorio de tareas de mantenimiento (caducidad por lotes)
+
+Cada función procesa como mucho ``limit`` filas en una sentencia:
+``... WHERE id IN (SELECT id ... LIMIT :limit FOR UPDATE SKIP LOCKED)``.
+SKIP LOCKED evita esperar a filas que un request (o otro worker) tiene
+bloqueadas; se procesarán en la siguiente pasada.
+"""
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.db.models.enums import ClaimStatus, InviteStatus
+
+_EXPIRE_INVITES_SQL = text("""
+    UPDATE contribution_invites
+    SET status = :expired
+    WHERE id IN (
+        SELECT id FROM contribution_invites
+        WHERE status = :pending AND created_at < :older_than
+        ORDER BY created_at
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    )
+""")
+
+_DELETE_SESSIONS_SQL = text("""
+    DELETE FROM sessions
+    WHERE id IN (
+        SELECT id FROM sessions
+        WHERE expires_at < :now
+        ORDER BY expires_at
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    )
+""")
+
+_DELETE_IDEMPOTENCY_KEYS_SQL = text("""
+    DELETE FROM idempotency_keys
+    WHERE (scope, key) IN (
+        SELECT scope, key FROM idempotency_keys
+        WHERE expires_at < :now
+        ORDER BY expires_at
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    )
+""")
+
+_RELEASE_CLAIMS_SQL = text("""
+    UPDATE item_claims
+    SET status = :released, version = version + 1, updated_at = now()
+    WHERE id IN (
+        SELECT id FROM item_claims
+        WHERE status = :interested AND updated_at < :older_than
+        ORDER BY updated_at
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    )
+""")
+
+
+def expire_pending_invites(db: Session, *, older_than: datetime, limit: int) -> int:
+    """Marca como 'expired' un lote de invitaciones pendientes anteriores a ``older_than``."""
+    result = db.execute(
+        _EXPIRE_INVITES_SQL,
+        {
+            "expired": InviteStatus.EXPIRED.value,
+            "pending": InviteStatus.PENDING.value,
+            "older_than": older_than,
+            "limit": limit,
+        },
+    )
+    db.commit()
+    return result.rowcount
+
+
+def delete_expired_sessions(db: Session, *, now: datetime, limit: int) -> int:
+    """Elimina un lote de sesiones caducadas."""
+    result = db.execute(_DELETE_SESSIONS_SQL, {"now": now, "limit": limit})
+    db.commit()
+    return result.rowcount
+
+
+def delete_expired_idempotency_keys(db: Session, *, now: datetime, limit: int) -> int:
+    """Elimina un lote de claves de idempotencia caducadas."""
+    result = db.execute(_DELETE_IDEMPOTENCY_KEYS_SQL, {"now": now, "limit": limit})
+    db.commit()
+    return result.rowcount
+
+
+def release_stale_interested_claims(db: Session, *, older_than: datetime, limit: int) -> int:
+    """Pasa a 'released' un lote de claims 'interested' sin cambios desde ``older_than``."""
+    result = db.execute(
+        _RELEASE_CLAIMS_SQL,
+        {
+            "released": ClaimStatus.RELEASED.value,
+            "interested": ClaimStatus.INTERESTED.value,
+            "older_than": older_than,
+            "limit": limit,
+        },
+    )
+    db.commit()
+    return result.rowcount
@@ -0,0 +1,260 @@
+"""Repositorio de seguimiento de precios (product_prices y price_history)."""
+from datetime import date, datetime
+from typing import Any, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import Boolean, Date, DateTime, Integer, Text, bindparam, select, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from app.db.models.item import Item
+from app.db.models.product_price import PriceHistory, ProductPrice
+
+# Items sin clave de URL; SKIP LOCKED para no esperar a items en edición
+_ITEMS_WITHOUT_KEY_SQL = text("""
+    SELECT id, source_url FROM items
+    WHERE source_url_key IS NULL
+    LIMIT :limit
+    FOR UPDATE SKIP LOCKED
+""")
+
+# Guarda las claves y da de alta los productos nuevos en una sentencia. DO UPDATE
+# ... WHERE false no escribe, pero bloquea la fila que ya existía: así la tarea
+# unreferenced_products (SKIP LOCKED) no la borra antes de que se vea este item
+_SET_KEYS_SQL = text("""
+    WITH keys AS (
+        SELECT * FROM unnest(:item_ids, :url_keys, :source_urls) AS k(item_id, url_key, source_url)
+    ),
+    updated AS (
+        UPDATE items i SET source_url_key = k.url_key
+        FROM keys k
+        WHERE i.id = k.item_id
+    )
+    INSERT INTO product_prices (url_key, source_url)
+    SELECT DISTINCT ON (url_key) url_key, source_url
+    FROM keys
+    WHERE url_key <> ''
+    ORDER BY url_key
+    ON CONFLICT (url_key) DO UPDATE SET source_url = product_prices.source_url WHERE false
+""").bindparams(
+    bindparam("item_ids", type_=ARRAY(PG_UUID(as_uuid=True))),
+    bindparam("url_keys", type_=ARRAY(Text)),
+    bindparam("source_urls", type_=ARRAY(Text)),
+)
+
+# Reserva (lease) de productos a refrescar: se adelanta next_check_at para que otro
+# planificador no los coja mientras se descargan. Solo los que sigue algún item de
+# una lista no borrada (ix_items_source_url_key)
+_CLAIM_EVENT_DUE_SQL = text("""
+    UPDATE product_prices SET next_check_at = now() + make_interval(secs => :lease_seconds)
+    WHERE url_key IN (
+        SELECT url_key FROM product_prices p
+        WHERE next_event_on BETWEEN current_date AND current_date + :horizon_days
+          AND next_check_at <= now()
+          AND EXISTS (
+              SELECT 1 FROM items i
+              JOIN wishlists w ON w.id = i.wishlist_id
+              WHERE i.source_url_key = p.url_key AND w.deleted_at IS NULL
+          )
+        ORDER BY next_event_on
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING url_key, source_url
+""")
+
+_CLAIM_DUE_SQL = text("""
+    UPDATE product_prices SET next_check_at = now() + make_interval(secs => :lease_seconds)
+    WHERE url_key IN (
+        SELECT url_key FROM product_prices p
+        WHERE next_check_at <= now()
+          AND EXISTS (
+              SELECT 1 FROM items i
+              JOIN wishlists w ON w.id = i.wishlist_id
+              WHERE i.source_url_key = p.url_key AND w.deleted_at IS NULL
+          )
+        ORDER BY next_check_at
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING url_key, source_url
+""")
+
+# Productos que ya no tiene ningún item (borrados o purgados); price_history se va en cascada
+_DELETE_UNREFERENCED_SQL = text("""
+    DELETE FROM product_prices
+    WHERE url_key IN (
+        SELECT url_key FROM product_prices p
+        WHERE NOT EXISTS (SELECT 1 FROM items i WHERE i.source_url_key = p.url_key)
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    )
+""")
+
+_UPCOMING_EVENTS_SQL = text("""
+    SELECT i.source_url_key AS url_key, min(w.event_date) AS next_event_on
+    FROM items i
+    JOIN wishlists w ON w.id = i.wishlist_id
+    WHERE i.source_url_key = ANY(:url_keys)
+      AND w.event_date >= current_date
+    GROUP BY i.source_url_key
+""").bindparams(bindparam("url_keys", type_=ARRAY(Text)))
+
+# Inserta en price_history solo los cambios (o la primera observación) y actualiza
+# el último precio de todos los productos del lote
+_RECORD_PRICES_SQL = text("""
+    WITH obs AS (
+        SELECT * FROM unnest(:url_keys, :prices, :currencies, :available, :next_event_on, :next_check_at)
+            AS o(url_key, price_cents, currency, available, next_event_on, next_check_at)
+    ),
+    changed AS (
+        INSERT INTO price_history (url_key, observed_at, price_cents, currency, available)
+        SELECT o.url_key, :observed_at, o.price_cents, o.currency, o.available
+        FROM obs o
+        JOIN product_prices p ON p.url_key = o.url_key
+        WHERE p.observed_at IS NULL
+           OR p.price_cents IS DISTINCT FROM o.price_cents
+           OR p.currency IS DISTINCT FROM o.currency
+           OR p.available IS DISTINCT FROM o.available
+        ON CONFLICT DO NOTHING
+        RETURNING url_key
+    ),
+    updated AS (
+        UPDATE product_prices p
+        SET previous_price_cents = CASE
+                WHEN p.price_cents IS DISTINCT FROM o.price_cents THEN p.price_cents
+                ELSE p.previous_price_cents
+            END,
+            price_cents = o.price_cents,
+            currency = o.currency,
+            available = o.available,
+            observed_at = :observed_at,
+            next_event_on = o.next_event_on,
+            next_check_at = o.next_check_at,
+            failures = 0
+        FROM obs o
+        WHERE p.url_key = o.url_key
+        RETURNING p.url_key
+    )
+    SELECT (SELECT count(*) FROM updated) AS updated, (SELECT count(*) FROM changed) AS changed
+""").bindparams(
+    bindparam("url_keys", type_=ARRAY(Text)),
+    bindparam("prices", type_=ARRAY(Integer)),
+    bindparam("currencies", type_=ARRAY(Text)),
+    bindparam("available", type_=ARRAY(Boolean)),
+    bindparam("next_event_on", type_=ARRAY(Date)),
+    bindparam("next_check_at", type_=ARRAY(DateTime(timezone=True))),
+    bindparam("observed_at", type_=DateTime(timezone=True)),
+)
+
+# Backoff exponencial por fallos seguidos, acotado a :max_seconds
+_RECORD_FAILURES_SQL = text("""
+    UPDATE product_prices
+    SET failures = LEAST(failures + 1, 30),
+        next_check_at = now() + make_interval(secs => LEAST(:base_seconds * power(2, failures), :max_seconds))
+    WHERE url_key = ANY(:url_keys)
+""").bindparams(bindparam("url_keys", type_=ARRAY(Text)))
+
+
+def items_without_url_key(db: Session, *, limit: int) -> Sequence[Row]:
+    """Lote de items sin ``source_url_key`` (bloqueados hasta el commit de ``set_url_keys``)."""
+    return db.execute(_ITEMS_WITHOUT_KEY_SQL, {"limit": limit}).all()
+
+
+def set_url_keys(db: Session, keys: Sequence[tuple[UUID, str, str]]) -> None:
+    """
+    Guarda ``(item_id, url_key, source_url)`` y da de alta los productos nuevos.
+
+    Una clave vacía marca una URL no válida: el item no se vuelve a procesar ni se sigue.
+    """
+    item_ids, url_keys, source_urls = zip(*keys)
+    db.execute(
+        _SET_KEYS_SQL,
+        {"item_ids": list(item_ids), "url_keys": list(url_keys), "source_urls": list(source_urls)},
+    )
+    db.commit()
+
+
+def claim_due(db: Session, *, limit: int, lease_seconds: int, horizon_days: int) -> list[Row]:
+    """
+    Reserva hasta ``limit`` productos pendientes de refrescar.
+
+    Primero los que están en listas con un evento en los próximos ``horizon_days`` días
+    (por fecha del evento); el resto, por antigüedad de ``next_check_at``.
+    """
+    params = {"limit": limit, "lease_seconds": lease_seconds, "horizon_days": horizon_days}
+    claimed = db.execute(_CLAIM_EVENT_DUE_SQL, params).all()
+    if len(claimed) < limit:
+        params["limit"] = limit - len(claimed)
+        claimed += db.execute(_CLAIM_DUE_SQL, params).all()
+    db.commit()
+    return claimed
+
+
+def delete_unreferenced(db: Session, *, limit: int) -> int:
+    """Elimina un lote de productos que ya no sigue ningún item (y su historial)."""
+    result = db.execute(_DELETE_UNREFERENCED_SQL, {"limit": limit})
+    db.commit()
+    return result.rowcount
+
+
+def upcoming_events(db: Session, url_keys: Sequence[str]) -> dict[str, date]:
+    """Fecha del evento futuro más próximo de las listas que contienen cada producto."""
+    rows = db.execute(_UPCOMING_EVENTS_SQL, {"url_keys": list(url_keys)})
+    return {row.url_key: row.next_event_on for row in rows}
+
+
+def record_prices(db: Session, observations: Sequence[dict[str, Any]], *, observed_at: datetime) -> dict[str, int]:
+    """
+    Guarda un lote de observaciones con una sola sentencia.
+
+    Cada observación tiene ``url_key``, ``price_cents``, ``currency``, ``available``,
+    ``next_event_on`` y ``next_check_at``. Devuelve productos actualizados y cambios registrados.
+    """
+    row = db.execute(
+        _RECORD_PRICES_SQL,
+        {
+            "url_keys": [o["url_key"] for o in observations],
+            "prices": [o["price_cents"] for o in observations],
+            "currencies": [o["currency"] for o in observations],
+            "available": [o["available"] for o in observations],
+            "next_event_on": [o["next_event_on"] for o in observations],
+            "next_check_at": [o["next_check_at"] for o in observations],
+            "observed_at": observed_at,
+        },
+    ).one()
+    db.commit()
+    return {"updated": row.updated, "changed": row.changed}
+
+
+def record_failures(db: Session, url_keys: Sequence[str], *, base_seconds: int, max_seconds: int) -> None:
+    """Aplaza los productos que no se pudieron descargar (backoff exponencial)."""
+    db.execute(
+        _RECORD_FAILURES_SQL,
+        {"url_keys": list(url_keys), "base_seconds": base_seconds, "max_seconds": max_seconds},
+    )
+    db.commit()
+
+
+def get_latest_for_item(db: Session, item_id: UUID) -> Optional[Row]:
+    """
+    Último precio del producto de un item (búsquedas por clave primaria, sin leer el historial).
+
+    Devuelve None si el item no existe; ``ProductPrice`` es None si aún no se sigue.
+    """
+    return db.execute(
+        select(Item.id, Item.source_url_key, ProductPrice)
+        .outerjoin(ProductPrice, ProductPrice.url_key == Item.source_url_key)
+        .where(Item.id == item_id)
+    ).one_or_none()
+
+
+def get_history(db: Session, url_key: str, *, limit: int) -> Sequence[PriceHistory]:
+    """Cambios de precio más recientes de un producto (recorre la clave primaria hacia atrás)."""
+    return db.execute(
+        select(PriceHistory)
+        .where(PriceHistory.url_key == url_key)
+        .order_by(PriceHistory.observed_at.desc())
+        .limit(limit)
+    ).scalars().all()
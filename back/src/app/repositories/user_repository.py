@@ -1,14 +1,32 @@
 """Repositorio para operaciones de usuarios."""
 from typing import Optional, Sequence
+from uuid import UUID
 
+from sqlalchemy import any_, bindparam, insert, select
+from sqlalchemy import delete as sql_delete
+from sqlalchemy import update as sql_update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 
 from app.db.models.user import User
+from app.repositories import count_repository
 
 
-def get(db: Session, user_id: int) -> Optional[User]:
-    """Obtiene un usuario por ID."""
-    return db.get(User, user_id)
+def get(db: Session, user_id: UUID) -> Optional[User]:
+    """Obtiene un usuario por ID (los borrados no existen)."""
+    return db.scalars(select(User).where(User.id == user_id, User.deleted_at.is_(None))).first()
+
+
+def get_many(db: Session, user_ids: Sequence[UUID]) -> Sequence[User]:
+    """
+    Obtiene varios usuarios por ID en una consulta (``id = ANY(:ids)``).
+
+    Un único parámetro array: el SQL es el mismo sea cual sea el número de IDs.
+    No garantiza orden y omite los IDs que no existen o están borrados.
+    """
+    ids = bindparam("ids", list(user_ids), type_=ARRAY(PG_UUID(as_uuid=True)))
+    return db.scalars(select(User).where(User.id == any_(ids), User.deleted_at.is_(None))).all()
 
 
 def get_by_email(db: Session, email: str) -> Optional[User]:
@@ -22,33 +40,59 @@ def get_by_username(db: Session, username: str) -> Optional[User]:
 
 
 def get_multi(db: Session, *, skip: int = 0, limit: int = 100) -> Sequence[User]:
-    """Obtiene una lista paginada de usuarios."""
-    return db.query(User).offset(skip).limit(limit).all()
+    """Obtiene una lista paginada de usuarios (sin los borrados)."""
+    return db.query(User).filter(User.deleted_at.is_(None)).offset(skip).limit(limit).all()
 
 
-def create(db: Session, *, email: str, username: str, hashed_password: str) -> User:
-    """Crea un usuario."""
-    user = User(
-        email=email,
-        username=username,
-        hashed_password=hashed_password,
-    )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    return user
+def get_multi_rows(db: Session, *, columns: Sequence[str], skip: int = 0, limit: int = 100) -> Sequence[Row]:
+    """Como ``get_multi``, pero solo lee ``columns`` (atributos de ``User``) y devuelve filas ``Row``."""
+    query = select(*(getattr(User, name) for name in columns)).where(User.deleted_at.is_(None))
+    return db.execute(query.offset(skip).limit(limit)).all()
+
+
+def count_multi(db: Session, *, cap: int) -> Optional[int]:
+    """Usuarios que devolvería ``get_multi`` sin paginar, si son como mucho ``cap`` (None si hay más)."""
+    return count_repository.capped_count(db, select(User.id).where(User.deleted_at.is_(None)), cap)
+
 
+def estimate_multi(db: Session) -> Optional[int]:
+    """
+    Estimación de los usuarios de ``get_multi`` según ``pg_class.reltuples`` (None si no se ha analizado).
+
+    Incluye los borrados pendientes de purga: son pocos y duran poco.
+    """
+    return count_repository.table_estimate(db, User.__tablename__)
+
+
+def create(db: Session, *, data: dict) -> User:
+    """Crea un usuario con ``INSERT ... RETURNING`` (sin SELECT posterior). No hace commit."""
+    return db.scalars(insert(User).returning(User), [data]).one()
+
+
+def update(db: Session, user_id: UUID, *, values: dict) -> Optional[User]:
+    """
+    Actualiza campos de un usuario con ``UPDATE ... RETURNING``, sin leerlo antes. No hace commit.
+
+    Devuelve None si no existe (o está borrado). Sin campos que cambiar, solo lo lee.
+    """
+    if not values:
+        return get(db, user_id)
+    stmt = (
+        sql_update(User)
+        .where(User.id == user_id, User.deleted_at.is_(None))
+        .values(**values)
+        .returning(User)
+        .execution_options(populate_existing=True)
+    )
+    return db.scalars(stmt).first()
 
-def update(db: Session, user: User, *, values: dict) -> User:
-    """Actualiza campos de un usuario."""
-    for field, value in values.items():
-        setattr(user, field, value)
-    db.commit()
-    db.refresh(user)
-    return user
 
+def delete(db: Session, user_id: UUID) -> bool:
+    """
+    Elimina un usuario en el momento (``DELETE ... RETURNING id``). No hace commit.
 
-def delete(db: Session, user: User) -> None:
-    """Elimina un usuario."""
-    db.delete(user)
-    db.commit()
+    PostgreSQL borra en cascada todo lo que cuelga de él en la misma
+    transacción; para cuentas reales usar ``deletion_service.delete_user``.
+    """
+    stmt = sql_delete(User).where(User.id == user_id).returning(User.id)
+    return db.scalars(stmt.execution_options(synchronize_session=False)).first() is not None
@@ -0,0 +1,41 @@
+"""
+Router para endpoints de claims sobre items
+"""
+from typing import List
+from uuid import UUID
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.core.logging_config import get_logger
+from app.db.session import get_db
+from app.schemas import claim as claim_schema
+from app.services import claim_service as claim_service_module
+from app.services.loaders import Loaders, get_loaders
+
+router = APIRouter(prefix="/items", tags=["claims"])
+logger = get_logger(__name__)
+
+
+@router.get("/{item_id}/claims", response_model=List[claim_schema.ClaimWithUser])
+def read_item_claims(item_id: UUID, loaders: Loaders = Depends(get_loaders)):
+    """Claims de un item con el usuario de cada uno (nombre y avatar), en una consulta por entidad"""
+    return claim_service_module.list_for_item(loaders, item_id)
+
+
+@router.put("/{item_id}/claim", response_model=claim_schema.Claim)
+def update_claim(
+    item_id: UUID,
+    claim: claim_schema.ClaimTransition,
+    user_id: UUID,  # En producción, esto vendría del token JWT
+    db: Session = Depends(get_db)
+):
+    """Cambia el estado del claim del usuario sobre un item (409 si otro request se adelanta)"""
+    return claim_service_module.transition(
+        db,
+        item_id=item_id,
+        user_id=user_id,
+        target=claim.status,
+        expected_version=claim.expected_version,
+        note=claim.note,
+    )
@@ -0,0 +1,37 @@
+"""
+Router para endpoints de invitaciones a aportar
+"""
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, status
+from sqlalchemy.orm import Session
+
+from app.core.logging_config import get_logger
+from app.db.session import get_db
+from app.schemas import invite as invite_schema
+from app.services import invite_service as invite_service_module
+
+router = APIRouter(prefix="/items", tags=["invites"])
+logger = get_logger(__name__)
+
+
+@router.post(
+    "/{item_id}/invites",
+    response_model=invite_schema.InviteBatchResult,
+    status_code=status.HTTP_201_CREATED,
+)
+def send_invites(
+    item_id: UUID,
+    batch: invite_schema.InviteBatchCreate,
+    inviter_id: UUID,  # En producción, esto vendría del token JWT
+    db: Session = Depends(get_db)
+):
+    """Invita a aportar a varios usuarios y grupos (los grupos se expanden a sus miembros)"""
+    return invite_service_module.send_invites(
+        db,
+        item_id=item_id,
+        inviter_id=inviter_id,
+        user_ids=batch.user_ids,
+        group_ids=batch.group_ids,
+        suggested_each_cents=batch.suggested_each_cents,
+    )
@@ -1,15 +1,21 @@
 """
 Router para endpoints de items
 """
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from uuid import UUID
 
 from app.core.exceptions import NotFoundError
 from app.core.logging_config import get_logger
 from app.db.session import get_db
 from app.schemas import item as item_schema
+from app.schemas.fields import partial_response, sparse_fields
+from app.services import count_service as count_service_module
 from app.services import item_service as item_service_module
+from app.services import rank_service as rank_service_module
+from app.services.count_service import report_total
+from app.services.loaders import Loaders, batch_ids, get_loaders, report_missing
 
 router = APIRouter(prefix="/items", tags=["items"])
 logger = get_logger(__name__)
@@ -18,27 +24,63 @@ logger = get_logger(__name__)
 @router.post("/", response_model=item_schema.Item, status_code=status.HTTP_201_CREATED)
 def create_item(
     item: item_schema.ItemCreate,
-    owner_id: int,  # En producción, esto vendría del token JWT
     db: Session = Depends(get_db)
 ):
-    """Crea un nuevo item"""
-    return item_service_module.create_item(db=db, item=item, owner_id=owner_id)
+    """Crea un nuevo item (los datos del producto se completan en segundo plano)"""
+    return item_service_module.create_item(db=db, item=item)
+
+
+@router.post("/batch", response_model=item_schema.ItemBatchResponse)
+def batch_items(
+    batch: item_schema.ItemBatchRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Crea, actualiza y elimina varios items en una sola transacción.
+
+    Todo o nada: si una operación falla no se aplica ninguna y la respuesta
+    (422) indica el error de cada operación.
+    """
+    return item_service_module.apply_batch(db, batch.operations)
 
 
 @router.get("/", response_model=List[item_schema.Item])
 def read_items(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    owner_id: int = None,
+    wishlist_id: Optional[UUID] = None,
+    count: bool = Query(False, description="Añadir el total sin paginar en X-Total-Count (exacto o estimado)"),
+    ids: Optional[List[UUID]] = Depends(batch_ids),
+    fields: Optional[tuple[str, ...]] = Depends(sparse_fields(item_schema.Item)),
+    loaders: Loaders = Depends(get_loaders),
     db: Session = Depends(get_db)
 ):
-    """Obtiene una lista de items"""
-    items = item_service_module.get_items(db, skip=skip, limit=limit, owner_id=owner_id)
+    """
+    Obtiene una lista de items.
+
+    Con ``ids`` devuelve esos items en una sola consulta y en el orden
+    pedido; los que no existen se indican en la cabecera ``X-Missing-Ids``.
+    Con ``fields`` cada item trae solo esos campos. Con ``count`` (sin
+    ``ids``), el total en ``X-Total-Count`` y si es exacto en ``X-Total-Count-Exact``.
+    """
+    if ids is not None:
+        result = item_service_module.get_items_by_ids(loaders, ids)
+        report_missing(response, result.missing)
+        items = result.found
+    else:
+        items = item_service_module.get_items(
+            db, skip=skip, limit=limit, wishlist_id=wishlist_id, fields=fields
+        )
+        if count:
+            report_total(response, count_service_module.count_items(db, wishlist_id))
+    if fields:
+        return partial_response(item_schema.Item, fields, items, headers=response.headers)
     return items
 
 
 @router.get("/{item_id}", response_model=item_schema.Item)
-def read_item(item_id: int, db: Session = Depends(get_db)):
+def read_item(item_id: UUID, db: Session = Depends(get_db)):
     """Obtiene un item por ID"""
     db_item = item_service_module.get_item(db, item_id=item_id)
     if db_item is None:
@@ -48,7 +90,7 @@ def read_item(item_id: int, db: Session = Depends(get_db)):
 
 @router.put("/{item_id}", response_model=item_schema.Item)
 def update_item(
-    item_id: int,
+    item_id: UUID,
     item_update: item_schema.ItemUpdate,
     db: Session = Depends(get_db)
 ):
@@ -59,8 +101,23 @@ def update_item(
     return db_item
 
 
+@router.put("/{item_id}/position", response_model=item_schema.Item)
+def move_item(
+    item_id: UUID,
+    move: item_schema.ItemMove,
+    db: Session = Depends(get_db)
+):
+    """
+    Mueve un item dentro de su lista (arrastrar y soltar).
+
+    Queda justo después de ``after_id``, o al principio si es null. Solo se
+    actualiza la fila del item, sea cual sea el tamaño de la lista.
+    """
+    return rank_service_module.move_item(db, item_id, move.after_id)
+
+
 @router.delete("/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_item(item_id: int, db: Session = Depends(get_db)):
+def delete_item(item_id: UUID, db: Session = Depends(get_db)):
     """Elimina un item"""
     success = item_service_module.delete_item(db, item_id)
     if not success:
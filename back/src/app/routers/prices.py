@@ -0,0 +1,32 @@
+"""
+Router para endpoints de precios de items
+"""
+from typing import List
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.core.logging_config import get_logger
+from app.db.session import get_db
+from app.schemas import price as price_schema
+from app.services import price_service as price_service_module
+
+router = APIRouter(prefix="/items", tags=["prices"])
+logger = get_logger(__name__)
+
+
+@router.get("/{item_id}/price", response_model=price_schema.ItemPrice)
+def read_item_price(item_id: UUID, db: Session = Depends(get_db)):
+    """Obtiene el último precio conocido del producto de un item"""
+    return price_service_module.get_item_price(db, item_id)
+
+
+@router.get("/{item_id}/price/history", response_model=List[price_schema.PricePoint])
+def read_item_price_history(
+    item_id: UUID,
+    limit: int = Query(default=100, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    """Obtiene los cambios de precio del producto de un item (más recientes primero)"""
+    return price_service_module.get_item_price_history(db, item_id, limit=limit)
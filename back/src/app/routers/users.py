@@ -1,54 +1,87 @@
 """
 Router para endpoints de usuarios
 """
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import timedelta
+from uuid import UUID
 
 from app.core.config import settings
 from app.core.logging_config import get_logger
 from app.core.exceptions import NotFoundError, AlreadyExistsError, AuthenticationError
+from app.core.rate_limit import get_rate_limiter, limit_by_ip
 from app.core.security import create_access_token
 from app.db.session import get_db
 from app.schemas import user as user_schema
+from app.schemas.fields import partial_response, sparse_fields
+from app.services import count_service as count_service_module
 from app.services import user_service as user_service_module
+from app.services.count_service import report_total
+from app.services.loaders import Loaders, batch_ids, get_loaders, report_missing
 
 router = APIRouter(prefix="/users", tags=["users"])
 logger = get_logger(__name__)
 
 
-@router.post("/", response_model=user_schema.User, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/",
+    response_model=user_schema.User,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(limit_by_ip("create_user"))],
+)
 def create_user(
     user: user_schema.UserCreate,
     db: Session = Depends(get_db)
 ):
     """Crea un nuevo usuario"""
-    logger.info(f"Intentando crear usuario: {user.username} ({user.email})")
+    logger.info(f"Intentando crear usuario: {user.display_name} ({user.email})")
     
     # Verificar si el usuario ya existe
-    db_user = user_service_module.get_user_by_email(db, email=user.email)
-    if db_user:
-        raise AlreadyExistsError(resource="Usuario", field="email", value=user.email)
-    
-    db_user = user_service_module.get_user_by_username(db, username=user.username)
-    if db_user:
-        raise AlreadyExistsError(resource="Usuario", field="username", value=user.username)
+    if user.email:
+        db_user = user_service_module.get_user_by_email(db, email=user.email)
+        if db_user:
+            raise AlreadyExistsError(resource="Usuario", field="email", value=user.email)
     
     new_user = user_service_module.create_user(db=db, user=user)
-    logger.info(f"Usuario creado exitosamente: ID={new_user.id}, username={new_user.username}")
+    logger.info(f"Usuario creado exitosamente: ID={new_user.id}")
     return new_user
 
 
 @router.get("/", response_model=List[user_schema.User])
-def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Obtiene una lista de usuarios"""
-    users = user_service_module.get_users(db, skip=skip, limit=limit)
+def read_users(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    count: bool = Query(False, description="Añadir el total sin paginar en X-Total-Count (exacto o estimado)"),
+    ids: Optional[List[UUID]] = Depends(batch_ids),
+    fields: Optional[tuple[str, ...]] = Depends(sparse_fields(user_schema.User)),
+    loaders: Loaders = Depends(get_loaders),
+    db: Session = Depends(get_db)
+):
+    """
+    Obtiene una lista de usuarios.
+
+    Con ``ids`` devuelve esos usuarios en una sola consulta y en el orden
+    pedido; los que no existen se indican en la cabecera ``X-Missing-Ids``.
+    Con ``fields`` cada usuario trae solo esos campos. Con ``count`` (sin
+    ``ids``), el total en ``X-Total-Count`` y si es exacto en ``X-Total-Count-Exact``.
+    """
+    if ids is not None:
+        result = user_service_module.get_users_by_ids(loaders, ids)
+        report_missing(response, result.missing)
+        users = result.found
+    else:
+        users = user_service_module.get_users(db, skip=skip, limit=limit, fields=fields)
+        if count:
+            report_total(response, count_service_module.count_users(db))
+    if fields:
+        return partial_response(user_schema.User, fields, users, headers=response.headers)
     return users
 
 
 @router.get("/{user_id}", response_model=user_schema.User)
-def read_user(user_id: int, db: Session = Depends(get_db)):
+def read_user(user_id: UUID, db: Session = Depends(get_db)):
     """Obtiene un usuario por ID"""
     db_user = user_service_module.get_user(db, user_id=user_id)
     if db_user is None:
@@ -58,7 +91,7 @@ def read_user(user_id: int, db: Session = Depends(get_db)):
 
 @router.put("/{user_id}", response_model=user_schema.User)
 def update_user(
-    user_id: int,
+    user_id: UUID,
     user_update: user_schema.UserUpdate,
     db: Session = Depends(get_db)
 ):
@@ -70,17 +103,23 @@ def update_user(
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_user(user_id: int, db: Session = Depends(get_db)):
+def delete_user(user_id: UUID, db: Session = Depends(get_db)):
     """Elimina un usuario"""
     success = user_service_module.delete_user(db, user_id)
     if not success:
         raise NotFoundError(resource="Usuario", identifier=user_id)
 
 
-@router.post("/login", response_model=user_schema.Token)
+@router.post(
+    "/login",
+    response_model=user_schema.Token,
+    dependencies=[Depends(limit_by_ip("login"))],
+)
 def login(user_credentials: user_schema.UserLogin, db: Session = Depends(get_db)):
     """Autentica un usuario y devuelve un token JWT"""
     logger.info(f"Intento de login para usuario: {user_credentials.username}")
+    # Antes de consultar la BD o verificar el hash
+    get_rate_limiter().check("login:username", user_credentials.username.lower())
     
     user = user_service_module.authenticate_user(
         db, user_credentials.username, user_credentials.password
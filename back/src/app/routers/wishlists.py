@@ -0,0 +1,35 @@
+"""
+Router para endpoints de listas de deseos
+"""
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query, status
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.exceptions import NotFoundError
+from app.core.logging_config import get_logger
+from app.db.session import get_db
+from app.schemas import wishlist as wishlist_schema
+from app.services import currency_service as currency_service_module
+from app.services import deletion_service as deletion_service_module
+
+router = APIRouter(prefix="/wishlists", tags=["wishlists"])
+logger = get_logger(__name__)
+
+
+@router.get("/{wishlist_id}/totals", response_model=wishlist_schema.WishlistTotals)
+def read_wishlist_totals(
+    wishlist_id: UUID,
+    currency: str = Query(default=settings.CURRENCY_BASE, min_length=3, max_length=3),
+    db: Session = Depends(get_db)
+):
+    """Obtiene el total, lo aportado y lo pendiente de una lista en la moneda del usuario"""
+    return currency_service_module.get_wishlist_totals(db, wishlist_id, currency)
+
+
+@router.delete("/{wishlist_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_wishlist(wishlist_id: UUID, db: Session = Depends(get_db)):
+    """Elimina una lista (sus items se purgan en segundo plano)"""
+    if not deletion_service_module.delete_wishlist(db, wishlist_id):
+        raise NotFoundError(resource="Wishlist", identifier=wishlist_id)
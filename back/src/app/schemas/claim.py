@@ -0,0 +1,46 @@
+"""
+Schemas Pydantic para claims sobre items
+"""
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+from uuid import UUID
+
+from app.db.models.enums import ClaimStatus
+
+
+class ClaimTransition(BaseModel):
+    """Schema para cambiar el estado de un claim"""
+    status: ClaimStatus
+    expected_version: Optional[int] = None  # Versión leída por el cliente (concurrencia optimista)
+    note: Optional[str] = None
+
+
+class Claim(BaseModel):
+    """Schema de claim para respuesta"""
+    id: UUID
+    item_id: UUID
+    user_id: UUID
+    status: ClaimStatus
+    note: Optional[str] = None
+    version: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class ClaimUser(BaseModel):
+    """Datos del usuario de un claim para pintar su avatar"""
+    id: UUID
+    display_name: str
+    avatar_url: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+class ClaimWithUser(Claim):
+    """Claim con su usuario (None si la cuenta está borrada)"""
+    user: Optional[ClaimUser] = None
@@ -0,0 +1,99 @@
+"""
+Campos parciales en las respuestas de listas (``?fields=id,name``)
+
+Los listados leen solo las columnas que devuelven (``get_multi_rows`` en los
+repositorios): filas ``Row`` de SQLAlchemy, tuplas con nombre sin mapa de
+identidad, instrumentación ni relaciones. Con ``fields`` se leen y
+serializan únicamente los campos pedidos.
+
+Uso en routers:
+    @router.get("/", response_model=List[item_schema.Item])
+    def read_items(fields=Depends(sparse_fields(item_schema.Item))):
+        rows = item_service.get_items(db, fields=fields)
+        return partial_response(item_schema.Item, fields, rows, headers=response.headers) if fields else rows
+"""
+from functools import lru_cache
+from typing import Any, Callable, List, Mapping, Optional, Sequence
+
+from fastapi import Query, Response
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+
+from app.core.exceptions import ValidationError
+
+
+def schema_fields(schema: type[BaseModel]) -> tuple[str, ...]:
+    """Atributos que lee un esquema de respuesta (los nombres de columna del modelo ORM)."""
+    return tuple(schema.model_fields)
+
+
+def _public_names(schema: type[BaseModel]) -> dict[str, str]:
+    # Nombre en la respuesta (alias de serialización si lo hay) -> atributo
+    return {
+        info.serialization_alias or name: name
+        for name, info in schema.model_fields.items()
+    }
+
+
+def parse_fields(schema: type[BaseModel], raw: Sequence[str]) -> Optional[tuple[str, ...]]:
+    """
+    Convierte ``?fields=a,b`` (o ``?fields=a&fields=b``) en los atributos del esquema, en orden y sin repetir.
+
+    None si no se ha pedido ningún campo.
+    """
+    public = _public_names(schema)
+    names = []
+    for value in raw:
+        for field in filter(None, (part.strip() for part in value.split(","))):
+            if field not in public:
+                raise ValidationError(
+                    message=f"Campo desconocido: '{field}'",
+                    details={"field": "fields", "allowed": sorted(public)},
+                )
+            if public[field] not in names:
+                names.append(public[field])
+    return tuple(names) or None
+
+
+def sparse_fields(schema: type[BaseModel]) -> Callable[..., Optional[tuple[str, ...]]]:
+    """Dependencia que valida ``fields`` contra ``schema`` (None = todos los campos)."""
+
+    def dependency(
+        fields: Optional[List[str]] = Query(
+            None, description="Campos de la respuesta: ?fields=id,name (por defecto, todos)"
+        ),
+    ) -> Optional[tuple[str, ...]]:
+        return parse_fields(schema, fields) if fields is not None else None
+
+    return dependency
+
+
+@lru_cache(maxsize=256)
+def _partial_adapter(schema: type[BaseModel], names: tuple[str, ...]) -> TypeAdapter:
+    # Un modelo con solo los campos pedidos (mismos tipos y alias), construido una vez por combinación
+    model = create_model(
+        f"{schema.__name__}Partial",
+        __config__=ConfigDict(from_attributes=True),
+        **{name: (schema.model_fields[name].annotation, schema.model_fields[name]) for name in names},
+    )
+    return TypeAdapter(list[model])
+
+
+def partial_response(
+    schema: type[BaseModel],
+    names: tuple[str, ...],
+    rows: Sequence[Any],
+    *,
+    headers: Optional[Mapping[str, str]] = None,
+) -> Response:
+    """
+    Serializa solo ``names`` de cada fila (``Row`` u objeto ORM) con el formato de ``schema``.
+
+    Devolver una ``Response`` descarta las cabeceras puestas en la respuesta
+    inyectada en el endpoint (p. ej. ``X-Missing-Ids``): se pasan en ``headers``.
+    """
+    adapter = _partial_adapter(schema, names)
+    return Response(
+        content=adapter.dump_json(adapter.validate_python(list(rows), from_attributes=True), by_alias=True),
+        media_type="application/json",
+        headers=dict(headers or {}),
+    )
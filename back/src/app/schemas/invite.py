@@ -0,0 +1,30 @@
+"""
+Schemas Pydantic para invitaciones a aportar
+"""
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from uuid import UUID
+
+
+class InviteBatchCreate(BaseModel):
+    """Schema para invitar a varios usuarios y grupos a la vez"""
+    user_ids: List[UUID] = Field(default_factory=list, max_length=500)
+    group_ids: List[UUID] = Field(default_factory=list, max_length=100)
+    suggested_each_cents: Optional[int] = Field(default=None, ge=0)
+
+
+class InviteSent(BaseModel):
+    """Invitación creada"""
+    invite_id: UUID
+    user_id: UUID
+    group_id: Optional[UUID] = None  # Grupo por el que se invitó (None si fue directa)
+
+
+class InviteBatchResult(BaseModel):
+    """Resultado del envío masivo"""
+    targets: int  # Destinatarios tras expandir los grupos (sin el invitador)
+    created: int
+    skipped: int  # Ya tenían una invitación pendiente o aceptada
+    invites: List[InviteSent]
+    unknown_user_ids: List[UUID] = Field(default_factory=list)  # No existen o están borrados: no se invitan
+    unknown_group_ids: List[UUID] = Field(default_factory=list)
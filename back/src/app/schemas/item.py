@@ -1,34 +1,47 @@
 """
 Schemas Pydantic para items
 """
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import Annotated, Any, List, Literal, Optional, Union
 from datetime import datetime
+from uuid import UUID
 
 
 class ItemBase(BaseModel):
     """Schema base para item"""
-    title: str
+    name: str
     description: Optional[str] = None
+    brand: Optional[str] = None
+    price_cents: Optional[int] = Field(default=None, ge=0)
+    currency: str = "EUR"
+    image_url: Optional[str] = None
+    visibility: str = Field(default="list", pattern="^(list|restricted)$")
 
 
 class ItemCreate(ItemBase):
-    """Schema para crear un item"""
-    pass
+    """Schema para crear un item (marca, imagen y precio se completan con el scraper)"""
+    wishlist_id: UUID
+    source_url: str = Field(min_length=1, max_length=2048)
 
 
 class ItemUpdate(BaseModel):
     """Schema para actualizar un item"""
-    title: Optional[str] = None
+    name: Optional[str] = None
     description: Optional[str] = None
-    is_completed: Optional[bool] = None
+    brand: Optional[str] = None
+    price_cents: Optional[int] = Field(default=None, ge=0)
+    currency: Optional[str] = None
+    image_url: Optional[str] = None
+    visibility: Optional[str] = Field(default=None, pattern="^(list|restricted)$")
 
 
 class ItemInDB(ItemBase):
     """Schema de item en base de datos"""
-    id: int
-    is_completed: bool
-    owner_id: int
+    id: UUID
+    wishlist_id: UUID
+    source_url: str
+    item_metadata: Optional[dict[str, Any]] = Field(default=None, serialization_alias="metadata")
+    rank: Optional[str] = None  # Clave de orden dentro de la lista (comparar como texto)
     created_at: datetime
     updated_at: Optional[datetime] = None
     
@@ -40,3 +53,51 @@ class Item(ItemInDB):
     """Schema de item para respuesta"""
     pass
 
+
+class ItemMove(BaseModel):
+    """Schema para mover un item dentro de su lista"""
+    after_id: Optional[UUID] = None  # Item que queda justo antes; None = al principio
+
+
+class ItemCreateOperation(BaseModel):
+    """Operación de lote: crear un item"""
+    op: Literal["create"]
+    data: ItemCreate
+
+
+class ItemUpdateOperation(BaseModel):
+    """Operación de lote: actualizar un item (solo los campos enviados)"""
+    op: Literal["update"]
+    id: UUID
+    data: ItemUpdate
+
+
+class ItemDeleteOperation(BaseModel):
+    """Operación de lote: eliminar un item"""
+    op: Literal["delete"]
+    id: UUID
+
+
+ItemBatchOperation = Annotated[
+    Union[ItemCreateOperation, ItemUpdateOperation, ItemDeleteOperation],
+    Field(discriminator="op"),
+]
+
+
+class ItemBatchRequest(BaseModel):
+    """Schema para aplicar varias operaciones sobre items en una transacción"""
+    operations: List[ItemBatchOperation] = Field(min_length=1)
+
+
+class ItemBatchResult(BaseModel):
+    """Resultado de una operación del lote (en el mismo orden que la petición)"""
+    index: int
+    op: str
+    id: UUID
+    status: str  # 'created', 'updated' o 'deleted'
+    item: Optional[Item] = None  # Estado final (no se incluye en los borrados)
+
+
+class ItemBatchResponse(BaseModel):
+    """Schema de respuesta de un lote aplicado"""
+    results: List[ItemBatchResult]
@@ -0,0 +1,30 @@
+"""
+Schemas Pydantic para precios de items
+"""
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+from uuid import UUID
+
+
+class ItemPrice(BaseModel):
+    """Último precio conocido del producto de un item"""
+    item_id: UUID
+    tracked: bool  # False hasta que el planificador da de alta el producto
+    price_cents: Optional[int] = None
+    previous_price_cents: Optional[int] = None  # Precio antes del último cambio
+    price_drop_cents: Optional[int] = None  # Bajada respecto al precio anterior (0 si subió)
+    currency: Optional[str] = None
+    available: Optional[bool] = None
+    observed_at: Optional[datetime] = None
+
+
+class PricePoint(BaseModel):
+    """Cambio de precio en el historial"""
+    observed_at: datetime
+    price_cents: Optional[int] = None
+    currency: Optional[str] = None
+    available: Optional[bool] = None
+    
+    class Config:
+        from_attributes = True
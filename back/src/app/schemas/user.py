@@ -1,37 +1,42 @@
 """
 Schemas Pydantic para usuarios
 """
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional
 from datetime import datetime
+from uuid import UUID
 
 
 class UserBase(BaseModel):
     """Schema base para usuario"""
-    email: EmailStr
-    username: str
+    email: Optional[EmailStr] = None
+    display_name: str = Field(min_length=1, max_length=200)
+    avatar_url: Optional[str] = None
+    locale: Optional[str] = None
 
 
 class UserCreate(UserBase):
-    """Schema para crear un usuario"""
-    password: str
+    """Schema para crear un usuario (la autenticación va por auth_identity)"""
+    pass
 
 
 class UserUpdate(BaseModel):
     """Schema para actualizar un usuario"""
     email: Optional[EmailStr] = None
-    username: Optional[str] = None
-    password: Optional[str] = None
+    display_name: Optional[str] = Field(default=None, min_length=1, max_length=200)
+    avatar_url: Optional[str] = None
+    locale: Optional[str] = None
     is_active: Optional[bool] = None
 
 
 class UserInDB(UserBase):
     """Schema de usuario en base de datos"""
-    id: int
+    id: UUID
+    email_verified: bool
     is_active: bool
     created_at: datetime
     updated_at: Optional[datetime] = None
-    
+
     class Config:
         from_attributes = True
 
@@ -51,4 +56,3 @@ class Token(BaseModel):
     """Schema para token de acceso"""
     access_token: str
     token_type: str = "bearer"
-
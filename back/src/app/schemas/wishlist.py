@@ -0,0 +1,18 @@
+"""
+Schemas Pydantic para listas de deseos
+"""
+from pydantic import BaseModel
+from typing import List
+from uuid import UUID
+
+
+class WishlistTotals(BaseModel):
+    """Totales de una lista convertidos a una moneda"""
+    wishlist_id: UUID
+    currency: str
+    items: int
+    items_without_price: int  # Sin precio ni importe objetivo (no suman)
+    missing_currencies: List[str]  # Monedas sin tipo de cambio (sus items no suman)
+    total_cents: int  # Suma de los importes objetivo
+    contributed_cents: int  # Aportado (como mucho el objetivo de cada item)
+    remaining_cents: int  # Pendiente de financiar
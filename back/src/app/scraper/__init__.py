@@ -0,0 +1,10 @@
+"""
+Scraper de páginas de producto para completar los datos de los items.
+
+Uso desde servicios:
+    from app import scraper
+    scraper.submit(item.id, item.source_url)  # No bloquea; no-op si SCRAPER_ENABLED=False
+"""
+from app.scraper.pipeline import get_pipeline, start, stop, submit
+
+__all__ = ["get_pipeline", "start", "stop", "submit"]
@@ -0,0 +1,284 @@
+"""
+Descarga de páginas de producto y caché de resultados
+
+- Un único ``httpx.AsyncClient`` reutiliza conexiones (keep-alive) entre páginas
+- Un semáforo por dominio limita las descargas simultáneas a cada tienda
+- Timeouts por petición y reintentos con backoff exponencial ante errores de
+  red, 429 y 5xx (respetando ``Retry-After``)
+- ``Scraper.scrape`` cachea por URL normalizada (también los fallos, con un
+  TTL más corto) y agrupa las peticiones simultáneas a la misma URL en una sola
+- Las URLs las envían los usuarios: antes de cada petición, también en cada
+  redirección, se resuelve el host y se rechazan las direcciones que no son
+  públicas (loopback, redes privadas, link-local como 169.254.169.254...),
+  salvo con ``allow_private_hosts``. Las redirecciones se limitan a
+  ``max_redirects``
+"""
+import asyncio
+import ipaddress
+import random
+import socket
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from app.core.logging_config import get_logger
+from app.scraper.parser import ProductData, parse_product_page
+from app.scraper.urls import domain_of, normalize_url
+
+logger = get_logger(__name__)
+
+_RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+
+
+async def _resolve(host: str, port: int) -> list[str]:
+    """Direcciones IP de ``host`` (sin bloquear el event loop)."""
+    infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    return [sockaddr[0].split("%", 1)[0] for *_, sockaddr in infos]
+
+
+def _is_public(address: str) -> bool:
+    ip = ipaddress.ip_address(address)
+    # ::ffff:127.0.0.1 es loopback aunque is_global no lo detecte en todas las versiones
+    mapped = getattr(ip, "ipv4_mapped", None)
+    return ip.is_global and (mapped is None or mapped.is_global)
+
+
+class FetchError(Exception):
+    """Error al descargar una página (``retryable`` indica si merece reintentarse)"""
+
+    def __init__(self, url: str, message: str, status_code: Optional[int] = None, retryable: bool = False):
+        self.url = url
+        self.status_code = status_code
+        self.retryable = retryable
+        super().__init__(f"{url}: {message}")
+
+
+class Fetcher:
+    """Cliente HTTP asíncrono con límites por dominio, timeouts y reintentos"""
+
+    def __init__(
+        self,
+        *,
+        per_domain_concurrency: int = 2,
+        max_connections: int = 100,
+        timeout_seconds: float = 10.0,
+        retries: int = 2,
+        backoff_seconds: float = 0.5,
+        max_bytes: int = 2_000_000,
+        user_agent: str = "GiftApp-Scraper/1.0",
+        max_redirects: int = 5,
+        allow_private_hosts: bool = False,
+        transport: Any = None,
+    ) -> None:
+        # httpx solo se importa si se usa el scraper (no penaliza el arranque de la API)
+        import httpx
+
+        self._httpx = httpx
+        self._client = httpx.AsyncClient(
+            follow_redirects=True,
+            max_redirects=max_redirects,
+            # httpx llama a los hooks de petición también en cada salto de una redirección
+            event_hooks={"request": [self._check_host]},
+            timeout=httpx.Timeout(timeout_seconds),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            headers={
+                "User-Agent": user_agent,
+                "Accept": "text/html,application/xhtml+xml",
+                "Accept-Language": "es-ES,es;q=0.9,en;q=0.8",
+            },
+            transport=transport,
+        )
+        self._per_domain = per_domain_concurrency
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._retries = retries
+        self._backoff = backoff_seconds
+        self._max_bytes = max_bytes
+        self._allow_private_hosts = allow_private_hosts
+
+    async def _check_host(self, request: Any) -> None:
+        """
+        Rechaza la petición si el host resuelve a alguna dirección no pública.
+
+        Raises:
+            FetchError: Si el host no se puede resolver o no es público
+        """
+        if self._allow_private_hosts:
+            return
+        url, host = str(request.url), request.url.host
+        try:
+            addresses = await _resolve(host, request.url.port or 443)
+        except socket.gaierror as exc:
+            raise FetchError(url, f"no se pudo resolver '{host}': {exc}", retryable=True) from exc
+        for address in addresses:
+            if not _is_public(address):
+                raise FetchError(url, f"host no permitido: '{host}' resuelve a {address}")
+
+    def _semaphore(self, url: str) -> asyncio.Semaphore:
+        domain = domain_of(url)
+        semaphore = self._semaphores.get(domain)
+        if semaphore is None:
+            semaphore = self._semaphores[domain] = asyncio.Semaphore(self._per_domain)
+        return semaphore
+
+    async def fetch(self, url: str) -> tuple[str, str]:
+        """
+        Descarga ``url`` y devuelve ``(url_final, html)``.
+
+        Raises:
+            FetchError: Si la página no se pudo descargar tras los reintentos
+        """
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore(url):
+                    return await self._fetch_once(url)
+            except FetchError as exc:
+                if not exc.retryable or attempt >= self._retries:
+                    raise
+                delay = getattr(exc, "retry_after", None) or self._backoff * (2 ** attempt)
+                attempt += 1
+                # Jitter para no reintentar todas las URLs de un dominio a la vez
+                await asyncio.sleep(delay * random.uniform(0.8, 1.2))
+
+    async def _fetch_once(self, url: str) -> tuple[str, str]:
+        httpx = self._httpx
+        try:
+            async with self._client.stream("GET", url) as response:
+                if response.status_code != 200:
+                    error = FetchError(
+                        url,
+                        f"HTTP {response.status_code}",
+                        status_code=response.status_code,
+                        retryable=response.status_code in _RETRYABLE_STATUS,
+                    )
+                    retry_after = response.headers.get("retry-after", "")
+                    if retry_after.isdigit():
+                        error.retry_after = min(int(retry_after), 30)
+                    raise error
+
+                content_type = response.headers.get("content-type", "")
+                if "html" not in content_type:
+                    raise FetchError(url, f"tipo de contenido no soportado: '{content_type}'")
+
+                chunks, size = [], 0
+                async for chunk in response.aiter_bytes():
+                    size += len(chunk)
+                    if size > self._max_bytes:
+                        break  # Los datos de producto están en <head>; no hace falta el resto
+                    chunks.append(chunk)
+                encoding = response.encoding or "utf-8"
+                return str(response.url), b"".join(chunks).decode(encoding, errors="replace")
+        except httpx.TooManyRedirects as exc:
+            raise FetchError(url, "demasiadas redirecciones") from exc
+        except httpx.TransportError as exc:  # Timeouts, conexión rechazada o reiniciada…
+            raise FetchError(url, f"{exc.__class__.__name__}: {exc}", retryable=True) from exc
+
+    async def aclose(self) -> None:
+        """Cierra las conexiones abiertas."""
+        await self._client.aclose()
+
+
+class ResultCache:
+    """Caché LRU con TTL de resultados por URL normalizada (``None`` = fallo reciente)"""
+
+    def __init__(self, max_entries: int = 10_000, ttl_seconds: float = 21_600, failure_ttl_seconds: float = 600):
+        self._entries: OrderedDict[str, tuple[float, Optional[ProductData]]] = OrderedDict()
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._failure_ttl = failure_ttl_seconds
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> tuple[bool, Optional[ProductData]]:
+        """Devuelve ``(encontrado, resultado)``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, result = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, result
+
+    def set(self, key: str, result: Optional[ProductData]) -> None:
+        ttl = self._ttl if result is not None else self._failure_ttl
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class Scraper:
+    """Descarga y analiza páginas de producto con caché y deduplicación de peticiones"""
+
+    def __init__(self, fetcher: Fetcher, cache: ResultCache) -> None:
+        self.fetcher = fetcher
+        self.cache = cache
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.stats = {"requests": 0, "cache_hits": 0, "coalesced": 0, "fetched": 0, "failed": 0}
+
+    async def scrape(self, url: str, use_cache: bool = True) -> Optional[ProductData]:
+        """
+        Datos de producto de ``url`` o None si no se pudieron obtener.
+
+        Con ``use_cache=False`` (refresco de precios) siempre se descarga la página,
+        aunque el resultado nuevo sí se guarda en la caché.
+        Nunca lanza excepciones por errores de red o de la página.
+        """
+        self.stats["requests"] += 1
+        try:
+            key = normalize_url(url)
+        except ValueError as exc:
+            logger.info(f"URL ignorada por el scraper: {exc}")
+            self.stats["failed"] += 1
+            return None
+
+        found, result = self.cache.get(key) if use_cache else (False, None)
+        if found:
+            self.stats["cache_hits"] += 1
+            return result
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        result = None
+        try:
+            # La clave es la URL normalizada, pero se descarga la original (esquema, puerto…)
+            result = await self._fetch_and_parse(url)
+            self.cache.set(key, result)
+            return result
+        finally:
+            # También si se cancela: despertar a las peticiones que esperan esta URL
+            future.set_result(result)
+            del self._inflight[key]
+
+    async def _fetch_and_parse(self, url: str) -> Optional[ProductData]:
+        try:
+            final_url, html = await self.fetcher.fetch(url)
+        except FetchError as exc:
+            self.stats["failed"] += 1
+            logger.warning(f"No se pudo descargar la página de producto: {exc}")
+            return None
+
+        self.stats["fetched"] += 1
+        try:
+            # El análisis es CPU; en un hilo para no bloquear el event loop con páginas grandes
+            product = await asyncio.to_thread(parse_product_page, html, final_url)
+        except Exception as exc:
+            self.stats["failed"] += 1
+            logger.warning(f"No se pudo analizar la página de producto {url}: {exc}")
+            return None
+        if product.is_empty():
+            logger.info(f"Sin datos de producto en {url}")
+            return None
+        return product
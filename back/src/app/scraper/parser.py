@@ -0,0 +1,216 @@
+"""
+Extracción de datos de producto de una página HTML
+
+Fuentes, de mayor a menor prioridad:
+1. JSON-LD ``schema.org/Product`` (``<script type="application/ld+json">``)
+2. Open Graph y metadatos de producto (``og:*``, ``product:*``, ``twitter:*``)
+3. Microdatos ``itemprop`` y ``<title>``
+
+Solo usa la librería estándar (``html.parser``), sin dependencias extra.
+"""
+import json
+import re
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from html.parser import HTMLParser
+from typing import Any, Iterator, Optional
+from urllib.parse import urljoin
+
+
+@dataclass
+class ProductData:
+    """Datos de producto extraídos de una página"""
+    name: Optional[str] = None
+    brand: Optional[str] = None
+    description: Optional[str] = None
+    image_url: Optional[str] = None
+    price_cents: Optional[int] = None
+    currency: Optional[str] = None
+    metadata: dict[str, Any] = field(default_factory=dict)  # Color, tallas, sku, disponibilidad…
+
+    def is_empty(self) -> bool:
+        return not any((self.name, self.brand, self.image_url, self.price_cents is not None))
+
+
+class _PageCollector(HTMLParser):
+    """Recoge meta tags, bloques JSON-LD, itemprops y el título en una pasada"""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.meta: dict[str, str] = {}
+        self.itemprops: dict[str, str] = {}
+        self.json_ld: list[str] = []
+        self.title = ""
+        self._capture: Optional[tuple[str, str]] = None  # (tipo, tag): 'ld', 'title' o un itemprop
+        self._buffer: list[str] = []
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, Optional[str]]]) -> None:
+        attributes = {key.lower(): value or "" for key, value in attrs}
+        if tag == "meta":
+            key = (attributes.get("property") or attributes.get("name") or "").lower()
+            if key and "content" in attributes:
+                self.meta.setdefault(key, attributes["content"].strip())
+            if "itemprop" in attributes and "content" in attributes:
+                self.itemprops.setdefault(attributes["itemprop"], attributes["content"].strip())
+        elif tag == "script" and attributes.get("type", "").lower() == "application/ld+json":
+            self._capture, self._buffer = ("ld", tag), []
+        elif tag == "title" and not self.title:
+            self._capture, self._buffer = ("title", tag), []
+        elif "itemprop" in attributes:
+            value = attributes.get("content") or attributes.get("src") or attributes.get("href")
+            if value:
+                self.itemprops.setdefault(attributes["itemprop"], value.strip())
+            elif self._capture is None and "itemscope" not in attributes:
+                # <span itemprop="brand">Acme</span>: el valor es el texto del elemento
+                self._capture, self._buffer = ("itemprop:" + attributes["itemprop"], tag), []
+
+    def handle_data(self, data: str) -> None:
+        if self._capture:
+            self._buffer.append(data)
+
+    def handle_endtag(self, tag: str) -> None:
+        if self._capture is None or self._capture[1] != tag:
+            return
+        kind, _ = self._capture
+        self._capture = None
+        if kind == "ld":
+            self.json_ld.append("".join(self._buffer))
+            return
+        text = " ".join("".join(self._buffer).split())
+        if kind == "title":
+            self.title = text
+        elif text:
+            self.itemprops.setdefault(kind.removeprefix("itemprop:"), text)
+
+
+def _walk_json_ld(node: Any) -> Iterator[dict[str, Any]]:
+    if isinstance(node, list):
+        for child in node:
+            yield from _walk_json_ld(child)
+    elif isinstance(node, dict):
+        yield node
+        for key in ("@graph", "mainEntity", "itemListElement"):
+            if key in node:
+                yield from _walk_json_ld(node[key])
+
+
+def _is_product(node: dict[str, Any]) -> bool:
+    kind = node.get("@type")
+    kinds = kind if isinstance(kind, list) else [kind]
+    return any(isinstance(k, str) and k.lower() in ("product", "productgroup") for k in kinds)
+
+
+def _first(value: Any) -> Any:
+    return value[0] if isinstance(value, list) and value else value
+
+
+def _text(value: Any) -> Optional[str]:
+    value = _first(value)
+    if isinstance(value, dict):
+        value = value.get("name") or value.get("url") or value.get("@id")
+    if value is None:
+        return None
+    value = " ".join(str(value).split())
+    return value or None
+
+
+_PRICE_RE = re.compile(r"\d[\d.,\s]*")
+
+
+def parse_price_cents(value: Any) -> Optional[int]:
+    """Convierte ``"1.299,99"``, ``"1,299.99"``, ``"19.9 €"`` o ``19.9`` en céntimos."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(round(Decimal(str(value)) * 100))
+    match = _PRICE_RE.search(str(value))
+    if not match:
+        return None
+    number = re.sub(r"\s", "", match.group()).rstrip(".,")
+    # El último separador con 1-2 decimales detrás es el decimal; el resto son miles
+    decimal_sep = re.search(r"[.,](\d{1,2})$", number)
+    if decimal_sep:
+        integer = re.sub(r"[.,]", "", number[: decimal_sep.start()])
+        number = f"{integer}.{decimal_sep.group(1)}"
+    else:
+        number = re.sub(r"[.,]", "", number)
+    try:
+        return int(round(Decimal(number) * 100))
+    except InvalidOperation:
+        return None
+
+
+def _from_json_ld(blocks: list[str], base_url: str, product: ProductData) -> None:
+    for raw in blocks:
+        try:
+            document = json.loads(raw)
+        except ValueError:
+            continue
+        for node in _walk_json_ld(document):
+            if not _is_product(node):
+                continue
+            product.name = product.name or _text(node.get("name"))
+            product.brand = product.brand or _text(node.get("brand"))
+            product.description = product.description or _text(node.get("description"))
+            image = _text(node.get("image"))
+            if image and not product.image_url:
+                product.image_url = urljoin(base_url, image)
+
+            offer = _first(node.get("offers")) or {}
+            if isinstance(offer, dict):
+                price = offer.get("price", offer.get("lowPrice"))
+                if product.price_cents is None:
+                    product.price_cents = parse_price_cents(price)
+                product.currency = product.currency or _text(offer.get("priceCurrency"))
+                availability = _text(offer.get("availability"))
+                if availability:
+                    product.metadata.setdefault("availability", availability.rsplit("/", 1)[-1])
+
+            for key in ("sku", "gtin13", "gtin", "mpn", "color", "size", "material"):
+                value = _text(node.get(key))
+                if value:
+                    product.metadata.setdefault(key, value)
+            return
+
+
+def _from_meta(page: _PageCollector, base_url: str, product: ProductData) -> None:
+    meta = page.meta
+    product.name = product.name or meta.get("og:title") or meta.get("twitter:title")
+    product.brand = product.brand or meta.get("product:brand") or meta.get("og:brand")
+    product.description = product.description or meta.get("og:description") or meta.get("description")
+    image = meta.get("og:image") or meta.get("og:image:url") or meta.get("twitter:image")
+    if image and not product.image_url:
+        product.image_url = urljoin(base_url, image)
+    if product.price_cents is None:
+        product.price_cents = parse_price_cents(
+            meta.get("product:price:amount") or meta.get("og:price:amount")
+        )
+    product.currency = product.currency or meta.get("product:price:currency") or meta.get("og:price:currency")
+    if meta.get("product:availability"):
+        product.metadata.setdefault("availability", meta["product:availability"])
+
+
+def _from_itemprops(page: _PageCollector, base_url: str, product: ProductData) -> None:
+    props = page.itemprops
+    product.name = product.name or props.get("name") or page.title or None
+    product.brand = product.brand or props.get("brand")
+    if props.get("image") and not product.image_url:
+        product.image_url = urljoin(base_url, props["image"])
+    if product.price_cents is None:
+        product.price_cents = parse_price_cents(props.get("price"))
+    product.currency = product.currency or props.get("priceCurrency")
+
+
+def parse_product_page(html: str, base_url: str) -> ProductData:
+    """Extrae los datos de producto de ``html`` (URLs relativas resueltas contra ``base_url``)."""
+    page = _PageCollector()
+    page.feed(html)
+    page.close()
+
+    product = ProductData()
+    _from_json_ld(page.json_ld, base_url, product)
+    _from_meta(page, base_url, product)
+    _from_itemprops(page, base_url, product)
+    if product.currency:
+        product.currency = product.currency.upper()[:3]
+    return product
@@ -0,0 +1,178 @@
+"""
+Pipeline de enriquecimiento de items en segundo plano
+
+``submit(item_id, source_url)`` se puede llamar desde cualquier hilo (los
+endpoints síncronos corren en el threadpool de FastAPI): solo encola la
+URL y vuelve al instante. Si el pipeline no está arrancado o la cola está
+llena, el item se queda sin enriquecer, pero su creación nunca espera ni
+falla por el scraper.
+
+Unos pocos workers asyncio consumen la cola, obtienen los datos con
+``Scraper.scrape`` y los guardan con ``item_repository.apply_scraped``
+(en un hilo, con su propia sesión).
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Optional
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.logging_config import get_logger
+from app.scraper.fetcher import Fetcher, ResultCache, Scraper
+from app.scraper.parser import ProductData
+
+logger = get_logger(__name__)
+
+ApplyResult = Callable[[UUID, ProductData], Awaitable[None]]
+
+
+async def _save_to_database(item_id: UUID, product: ProductData) -> None:
+    from app.core.cache import get_cache
+    from app.db.session import SessionLocal
+    from app.db.unit_of_work import after_commit, transaction
+    from app.repositories import item_repository
+
+    def save() -> None:
+        with SessionLocal() as db, transaction(db):
+            if item_repository.apply_scraped(db, item_id, product):
+                after_commit(db, lambda: get_cache().invalidate(f"items:{item_id}"))
+
+    await asyncio.to_thread(save)
+
+
+class EnrichmentPipeline:
+    """Cola acotada de items pendientes de scraping y sus workers"""
+
+    def __init__(
+        self,
+        scraper: Scraper,
+        *,
+        workers: int = 8,
+        queue_size: int = 1000,
+        apply_result: ApplyResult = _save_to_database,
+    ) -> None:
+        self.scraper = scraper
+        self._workers = workers
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._apply_result = apply_result
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: list[asyncio.Task] = []
+        self.stats = {"submitted": 0, "dropped": 0, "enriched": 0, "empty": 0, "errors": 0}
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self) -> None:
+        """Arranca los workers en el event loop actual."""
+        self._loop = asyncio.get_running_loop()
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"scraper-worker-{n}") for n in range(self._workers)
+        ]
+
+    def submit(self, item_id: UUID, url: str) -> bool:
+        """Encola un item sin bloquear (seguro desde otros hilos). Devuelve False si no se encoló."""
+        if self._loop is None or self._loop.is_closed():
+            return False
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            return self._enqueue(item_id, url)
+        self._loop.call_soon_threadsafe(self._enqueue, item_id, url)
+        return True
+
+    def _enqueue(self, item_id: UUID, url: str) -> bool:
+        try:
+            self._queue.put_nowait((item_id, url))
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+            logger.warning(f"Cola del scraper llena; item {item_id} sin enriquecer")
+            return False
+        self.stats["submitted"] += 1
+        return True
+
+    async def join(self) -> None:
+        """Espera a que se procesen todos los items encolados."""
+        await self._queue.join()
+
+    async def stop(self) -> None:
+        """Detiene los workers (los items pendientes se descartan) y cierra las conexiones."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self.scraper.fetcher.aclose()
+
+    async def _worker(self) -> None:
+        while True:
+            item_id, url = await self._queue.get()
+            try:
+                product = await self.scraper.scrape(url)
+                if product is None:
+                    self.stats["empty"] += 1
+                else:
+                    await self._apply_result(item_id, product)
+                    self.stats["enriched"] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                self.stats["errors"] += 1
+                logger.error(f"Error al enriquecer el item {item_id}: {exc}")
+            finally:
+                self._queue.task_done()
+
+
+def build_scraper(transport: Any = None) -> Scraper:
+    """Scraper configurado a partir de ``settings`` (``transport`` permite inyectar un httpx transport)."""
+    fetcher = Fetcher(
+        per_domain_concurrency=settings.SCRAPER_PER_DOMAIN_CONCURRENCY,
+        max_connections=settings.SCRAPER_MAX_CONNECTIONS,
+        timeout_seconds=settings.SCRAPER_TIMEOUT_SECONDS,
+        retries=settings.SCRAPER_RETRIES,
+        max_bytes=settings.SCRAPER_MAX_BYTES,
+        user_agent=settings.SCRAPER_USER_AGENT,
+        max_redirects=settings.SCRAPER_MAX_REDIRECTS,
+        allow_private_hosts=settings.SCRAPER_ALLOW_PRIVATE_HOSTS,
+        transport=transport,
+    )
+    cache = ResultCache(
+        max_entries=settings.SCRAPER_CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.SCRAPER_CACHE_TTL_SECONDS,
+        failure_ttl_seconds=settings.SCRAPER_CACHE_FAILURE_TTL_SECONDS,
+    )
+    return Scraper(fetcher, cache)
+
+
+_pipeline: Optional[EnrichmentPipeline] = None
+
+
+def get_pipeline() -> Optional[EnrichmentPipeline]:
+    """Pipeline de la aplicación, o None si no está arrancado."""
+    return _pipeline
+
+
+async def start() -> EnrichmentPipeline:
+    """Crea y arranca el pipeline de la aplicación (desde el lifespan)."""
+    global _pipeline
+    _pipeline = EnrichmentPipeline(
+        build_scraper(),
+        workers=settings.SCRAPER_WORKERS,
+        queue_size=settings.SCRAPER_QUEUE_SIZE,
+    )
+    _pipeline.start()
+    logger.info(f"Scraper de items activo ({settings.SCRAPER_WORKERS} workers)")
+    return _pipeline
+
+
+async def stop() -> None:
+    """Detiene el pipeline de la aplicación."""
+    global _pipeline
+    if _pipeline is not None:
+        await _pipeline.stop()
+        _pipeline = None
+
+
+def submit(item_id: UUID, url: str) -> bool:
+    """Encola un item en el pipeline de la aplicación (no hace nada si está desactivado)."""
+    return _pipeline.submit(item_id, url) if _pipeline is not None else False
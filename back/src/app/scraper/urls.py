@@ -0,0 +1,53 @@
+"""
+Normalización de URLs de producto
+
+La misma página llega con variantes (``http``/``https``, mayúsculas en el
+host, parámetros de campaña, fragmentos, barra final...). La URL normalizada
+es la clave de la caché del scraper y del historial de precios, así que un
+producto presente en muchas listas se descarga una sola vez.
+"""
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Parámetros que no cambian el producto (seguimiento de campañas y afiliados)
+_TRACKING_PARAMS = frozenset({
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "ref", "ref_", "tag", "psc", "spm", "_ga", "_gl",
+})
+_TRACKING_PREFIXES = ("utm_", "pd_rd_", "pf_rd_")
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Devuelve la forma canónica de ``url``.
+
+    - Esquema ``https`` y host en minúsculas, sin ``www.`` ni puerto por defecto
+    - Sin fragmento, sin parámetros de seguimiento y con el resto ordenados
+    - Sin barra final en la ruta
+
+    Raises:
+        ValueError: Si la URL no es http(s) o no tiene host
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme not in _DEFAULT_PORTS or not parts.hostname:
+        raise ValueError(f"URL de producto no válida: '{url}'")
+
+    host = parts.hostname.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port != _DEFAULT_PORTS[scheme]:
+        host = f"{host}:{parts.port}"
+
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in _TRACKING_PARAMS and not key.lower().startswith(_TRACKING_PREFIXES)
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+
+def domain_of(url: str) -> str:
+    """Host de ``url`` (clave de los límites de concurrencia por dominio)."""
+    return (urlsplit(url).hostname or "").lower().removeprefix("www.")
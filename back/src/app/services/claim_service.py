@@ -0,0 +1,137 @@
+"""
+Servicio de claims sobre items ("me lo pido", "lo compré"...)
+
+Implementa la máquina de estados de ClaimStatus con concurrencia optimista:
+en lugar de bloquear filas, cada escritura es condicional (versión del claim
+o restricción única) y, si otro request se adelanta, se devuelve un
+ConflictError que el cliente puede resolver recargando el estado.
+"""
+from typing import Any, Optional
+from uuid import UUID
+
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.exceptions import ConflictError, NotFoundError, ValidationError
+from app.core.logging_config import get_logger
+from app.db.models.enums import ClaimStatus
+from app.db.unit_of_work import transactional
+from app.repositories import claim_repository
+from app.services.loaders import Loaders
+
+logger = get_logger(__name__)
+
+# Estados que ocupan el item (como mucho uno por item)
+ACTIVE_STATUSES = frozenset({ClaimStatus.CLAIMED, ClaimStatus.PURCHASED})
+
+# Transiciones permitidas; None = el usuario todavía no tiene claim sobre el item
+TRANSITIONS: dict[Optional[ClaimStatus], frozenset[ClaimStatus]] = {
+    None: frozenset({ClaimStatus.INTERESTED, ClaimStatus.CLAIMED}),
+    # interested -> released también lo aplica el barrido de claims abandonados
+    ClaimStatus.INTERESTED: frozenset({ClaimStatus.CLAIMED, ClaimStatus.CANCELLED, ClaimStatus.RELEASED}),
+    ClaimStatus.CLAIMED: frozenset({ClaimStatus.PURCHASED, ClaimStatus.RELEASED}),
+    ClaimStatus.PURCHASED: frozenset(),
+    ClaimStatus.RELEASED: frozenset({ClaimStatus.INTERESTED, ClaimStatus.CLAIMED}),
+    ClaimStatus.CANCELLED: frozenset({ClaimStatus.INTERESTED, ClaimStatus.CLAIMED}),
+}
+
+
+def _check_transition(current: Optional[ClaimStatus], target: ClaimStatus) -> None:
+    if target not in TRANSITIONS[current]:
+        origin = current.value if current else "sin claim"
+        raise ValidationError(
+            message=f"Transición de claim no permitida: {origin} -> {target.value}",
+            field="status",
+            details={"from": current.value if current else None, "to": target.value},
+        )
+
+
+def _item_taken(item_id: UUID, target: ClaimStatus) -> ConflictError:
+    return ConflictError(
+        message="El item ya está reservado o comprado por otra persona",
+        details={"item_id": str(item_id), "status": target.value},
+    )
+
+
+@transactional
+def transition(
+    db: Session,
+    *,
+    item_id: UUID,
+    user_id: UUID,
+    target: ClaimStatus,
+    expected_version: Optional[int] = None,
+    note: Optional[str] = None,
+) -> Row:
+    """
+    Cambia el estado del claim de ``user_id`` sobre ``item_id``.
+
+    Si se indica ``expected_version``, falla con ConflictError cuando el claim ya
+    no está en esa versión (el cliente trabajaba con un estado obsoleto).
+    """
+    item_exists, claim = claim_repository.get_for_item_and_user(db, item_id, user_id)
+    if not item_exists:
+        raise NotFoundError(resource="Item", identifier=item_id)
+
+    if claim is None:
+        if expected_version is not None:
+            raise ConflictError(
+                message="El claim ha cambiado desde la última lectura",
+                details={"expected_version": expected_version, "current_version": None},
+            )
+        _check_transition(None, target)
+        row = claim_repository.insert_if_absent(
+            db, item_id=item_id, user_id=user_id, status=target.value, note=note
+        )
+        if row is None:
+            # Otro request del mismo usuario creó el claim, o el item ya está ocupado
+            if target in ACTIVE_STATUSES:
+                raise _item_taken(item_id, target)
+            raise ConflictError(
+                message="El claim ha cambiado desde la última lectura",
+                details={"item_id": str(item_id)},
+            )
+        logger.info(f"Claim creado: item={item_id}, usuario={user_id}, estado={target.value}")
+        return row
+
+    current = ClaimStatus(claim.status)
+    if expected_version is not None and expected_version != claim.version:
+        raise ConflictError(
+            message="El claim ha cambiado desde la última lectura",
+            details={"expected_version": expected_version, "current_version": claim.version},
+        )
+    if current == target:
+        return claim
+    _check_transition(current, target)
+
+    try:
+        row = claim_repository.update_status_if_version(
+            db, claim_id=claim.id, expected_version=claim.version, status=target.value, note=note
+        )
+    except IntegrityError:
+        raise _item_taken(item_id, target)
+    if row is None:
+        raise ConflictError(
+            message="El claim ha cambiado desde la última lectura",
+            details={"expected_version": claim.version},
+        )
+    logger.info(
+        f"Claim actualizado: item={item_id}, usuario={user_id}, {current.value} -> {target.value} (v{row.version})"
+    )
+    return row
+
+
+def list_for_item(loaders: Loaders, item_id: UUID) -> list[dict[str, Any]]:
+    """
+    Claims de un item, cada uno con su usuario.
+
+    Los usuarios se resuelven con ``loaders.users`` en una sola consulta,
+    aunque el item tenga muchos claims (en lugar de una por avatar).
+    """
+    if loaders.items.load(item_id) is None:
+        raise NotFoundError(resource="Item", identifier=item_id)
+
+    claims = claim_repository.list_for_item(loaders.db, item_id)
+    users = loaders.users.load_many([claim.user_id for claim in claims])
+    return [{**claim._mapping, "user": user} for claim, user in zip(claims, users)]
@@ -0,0 +1,132 @@
+"""
+Totales de los listados paginados (cabecera ``X-Total-Count``)
+
+Con ``?count=true``, ``GET /users`` y ``GET /items`` indican el total de
+filas del listado sin paginar ("1–100 de N") sin pagar un ``count(*)``
+completo sobre tablas grandes:
+
+- Listado sin filtro: si las estadísticas (``pg_class.reltuples``) dicen que
+  hay más de ``COUNT_EXACT_MAX_ROWS`` filas, se usa esa estimación
+- En otro caso se cuentan como mucho ``COUNT_EXACT_MAX_ROWS + 1`` filas: si
+  no se llega, el total es exacto; si se llega, se usa la estimación del
+  planificador (``EXPLAIN``), nunca menor que lo ya contado
+- Cada total se guarda en memoria del proceso durante ``COUNT_CACHE_TTL_SECONDS``
+  por filtro: un cliente que pasa páginas no vuelve a contar en cada una
+
+``X-Total-Count-Exact`` dice si el total es exacto (``true``) o estimado
+(``false``). Por la caché, un total exacto puede ir hasta
+``COUNT_CACHE_TTL_SECONDS`` por detrás de las últimas escrituras.
+"""
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, NamedTuple, Optional
+from uuid import UUID
+
+from fastapi import Response
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logging_config import get_logger
+from app.repositories import item_repository, user_repository
+
+logger = get_logger(__name__)
+
+TOTAL_COUNT_HEADER = "X-Total-Count"
+TOTAL_COUNT_EXACT_HEADER = "X-Total-Count-Exact"
+
+
+class TotalCount(NamedTuple):
+    """Total de un listado y si es exacto o estimado"""
+    value: int
+    exact: bool
+
+
+class CountCache:
+    """Totales por filtro en memoria, con TTL y como mucho ``max_entries`` (LRU)"""
+
+    def __init__(self, ttl_seconds: float, max_entries: int) -> None:
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[TotalCount, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[TotalCount]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: str, total: TotalCount) -> None:
+        with self._lock:
+            self._entries[key] = (total, time.monotonic() + self._ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+
+@lru_cache(maxsize=1)
+def get_count_cache() -> CountCache:
+    """Caché de totales del proceso."""
+    return CountCache(ttl_seconds=settings.COUNT_CACHE_TTL_SECONDS, max_entries=settings.COUNT_CACHE_MAX_ENTRIES)
+
+
+def _total(
+    key: str,
+    count: Callable[[int], Optional[int]],
+    estimate: Callable[[], Optional[int]],
+    *,
+    filtered: bool,
+) -> TotalCount:
+    cache = get_count_cache()
+    total = cache.get(key)
+    if total is not None:
+        return total
+
+    cap = settings.COUNT_EXACT_MAX_ROWS
+    if not filtered:
+        estimated = estimate()
+        if estimated is not None and estimated > cap:
+            total = TotalCount(estimated, exact=False)
+    if total is None:
+        exact = count(cap)
+        # Más de cap filas: la estimación no puede ser menor que lo ya contado
+        total = TotalCount(exact, exact=True) if exact is not None else TotalCount(
+            max(estimate() or 0, cap + 1), exact=False
+        )
+    cache.set(key, total)
+    logger.debug(f"Total de '{key}': {total.value} ({'exacto' if total.exact else 'estimado'})")
+    return total
+
+
+def count_items(db: Session, wishlist_id: Optional[UUID] = None) -> TotalCount:
+    """Total de items del listado (de una lista, o de todas)."""
+    return _total(
+        f"items:{wishlist_id or '*'}",
+        lambda cap: item_repository.count_multi(db, cap=cap, wishlist_id=wishlist_id),
+        lambda: item_repository.estimate_multi(db, wishlist_id=wishlist_id),
+        filtered=wishlist_id is not None,
+    )
+
+
+def count_users(db: Session) -> TotalCount:
+    """Total de usuarios del listado (sin los borrados)."""
+    return _total(
+        "users",
+        lambda cap: user_repository.count_multi(db, cap=cap),
+        lambda: user_repository.estimate_multi(db),
+        filtered=False,
+    )
+
+
+def report_total(response: Response, total: TotalCount) -> None:
+    """Indica el total en ``X-Total-Count`` y si es exacto en ``X-Total-Count-Exact``."""
+    response.headers[TOTAL_COUNT_HEADER] = str(total.value)
+    response.headers[TOTAL_COUNT_EXACT_HEADER] = "true" if total.exact else "false"
@@ -0,0 +1,161 @@
+"""
+Servicio de monedas: tipos de cambio y totales de listas
+
+Los tipos se guardan en ``currency_rates`` (relativos a ``CURRENCY_BASE``) y
+se cargan desde un fichero o un feed con ``python -m app.cli.currency_rates``.
+Cada proceso los mantiene en memoria (``RateCache``) y los relee como mucho
+cada ``CURRENCY_RATES_REFRESH_SECONDS``; las consultas de totales reciben los
+tipos como parámetros, así que no hacen JOIN con la tabla.
+"""
+import csv
+import io
+import json
+import threading
+import time
+import xml.etree.ElementTree as ElementTree
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+from typing import Any, Optional
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.exceptions import NotFoundError, ValidationError
+from app.core.logging_config import get_logger
+from app.repositories import currency_repository
+
+logger = get_logger(__name__)
+
+
+class RateCache:
+    """Tipos de cambio en memoria con refresco periódico desde la base de datos"""
+
+    def __init__(self, base: str, refresh_seconds: float) -> None:
+        self.base = base
+        self._refresh_seconds = refresh_seconds
+        self._rates: dict[str, Decimal] = {base: Decimal(1)}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def get(self, db: Session) -> dict[str, Decimal]:
+        """Tipos vigentes; se recargan si han caducado (un solo hilo recarga a la vez)."""
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self._refresh_seconds:
+            return self._rates
+        with self._lock:
+            if self._loaded_at is None or time.monotonic() - self._loaded_at >= self._refresh_seconds:
+                self.refresh(db)
+        return self._rates
+
+    def refresh(self, db: Session) -> None:
+        """Recarga los tipos desde ``currency_rates``."""
+        rates = currency_repository.get_all(db)
+        rates[self.base] = Decimal(1)
+        self._rates = rates  # Sustitución atómica: los lectores ven el dict viejo o el nuevo
+        self._loaded_at = time.monotonic()
+        logger.debug(f"Tipos de cambio recargados: {len(rates)} monedas")
+
+    def invalidate(self) -> None:
+        """Fuerza la recarga en la próxima lectura."""
+        self._loaded_at = None
+
+
+@lru_cache(maxsize=1)
+def get_rate_cache() -> RateCache:
+    """Caché de tipos de cambio del proceso."""
+    return RateCache(base=settings.CURRENCY_BASE, refresh_seconds=settings.CURRENCY_RATES_REFRESH_SECONDS)
+
+
+def convert(db: Session, amount_cents: int, from_currency: str, to_currency: str) -> int:
+    """Convierte un importe usando los tipos en caché."""
+    rates = get_rate_cache().get(db)
+    try:
+        factor = rates[to_currency.upper()] / rates[from_currency.upper()]
+    except KeyError as exc:
+        raise ValidationError(f"Moneda sin tipo de cambio: {exc.args[0]}", field="currency")
+    return int((amount_cents * factor).to_integral_value())
+
+
+def get_wishlist_totals(db: Session, wishlist_id: UUID, currency: str) -> dict[str, Any]:
+    """
+    Total, aportado y pendiente de una lista convertidos a ``currency``.
+
+    La conversión y la suma se hacen en una única consulta SQL.
+    """
+    currency = currency.upper()
+    cache = get_rate_cache()
+    rates = cache.get(db)
+    if currency not in rates:
+        raise ValidationError(f"Moneda sin tipo de cambio: {currency}", field="currency")
+
+    totals = currency_repository.wishlist_totals(
+        db, wishlist_id, target=currency, base=cache.base, rates=rates
+    )
+    if not totals.pop("wishlist_exists"):
+        raise NotFoundError(resource="Wishlist", identifier=wishlist_id)
+    if totals["missing_currencies"]:
+        logger.warning(f"Lista {wishlist_id}: items en monedas sin tipo de cambio {totals['missing_currencies']}")
+    return {"wishlist_id": wishlist_id, "currency": currency, **totals}
+
+
+# ---------------------------------------------------------------------------
+# Carga de tipos desde ficheros y feeds
+# ---------------------------------------------------------------------------
+
+_ECB_NS = "{http://www.ecb.int/vocabulary/2002-08-01/eurofxref}"
+
+
+def parse_rates(content: str, base: str) -> dict[str, Decimal]:
+    """
+    Interpreta tipos de cambio en uno de estos formatos:
+
+    - XML del BCE (``eurofxref-daily.xml``, base EUR)
+    - JSON ``{"base": "EUR", "rates": {"USD": 1.08, ...}}``
+    - CSV ``currency,rate`` (con o sin cabecera), relativo a ``base``
+
+    Si el origen usa otra base, los tipos se recalculan respecto a ``base``.
+    """
+    content = content.strip()
+    source_base = base
+    if content.startswith("<"):
+        source_base = "EUR"
+        root = ElementTree.fromstring(content)
+        rates = {
+            node.attrib["currency"]: node.attrib["rate"]
+            for node in root.iter(f"{_ECB_NS}Cube")
+            if "currency" in node.attrib
+        }
+    elif content.startswith("{"):
+        document = json.loads(content)
+        source_base = document.get("base", base)
+        rates = document["rates"]
+    else:
+        rates = {
+            row[0]: row[1]
+            for row in csv.reader(io.StringIO(content))
+            if len(row) >= 2 and row[0].strip().lower() not in ("currency", "moneda")
+        }
+
+    try:
+        parsed = {code.strip().upper(): Decimal(str(rate).strip()) for code, rate in rates.items()}
+    except InvalidOperation as exc:
+        raise ValueError(f"Tipo de cambio no numérico: {exc}") from exc
+    parsed[source_base.upper()] = Decimal(1)
+    if any(rate <= 0 for rate in parsed.values()):
+        raise ValueError("Los tipos de cambio deben ser positivos")
+
+    if source_base.upper() != base.upper():
+        if base.upper() not in parsed:
+            raise ValueError(f"El origen no incluye la moneda base {base}")
+        pivot = parsed[base.upper()]
+        parsed = {code: rate / pivot for code, rate in parsed.items()}
+    return parsed
+
+
+def load_rates(db: Session, content: str, *, source: str) -> int:
+    """Carga tipos desde ``content`` en ``currency_rates`` e invalida la caché."""
+    rates = parse_rates(content, settings.CURRENCY_BASE)
+    count = currency_repository.upsert_rates(db, rates, source=source)
+    get_rate_cache().invalidate()
+    logger.info(f"Tipos de cambio cargados desde {source}: {count} monedas")
+    return count
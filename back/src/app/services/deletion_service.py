@@ -0,0 +1,63 @@
+"""
+Servicio de borrado diferido de usuarios y listas
+
+``DELETE /users/{id}`` y ``DELETE /wishlists/{id}`` solo marcan
+``deleted_at`` (unas pocas filas) y responden al momento: desde ese
+instante el usuario o la lista dejan de aparecer en las lecturas. La purga
+real la hacen las tareas ``purged_*`` del barrido de mantenimiento, por
+lotes de ``MAINTENANCE_BATCH_SIZE`` filas y de las hojas hacia la raíz:
+
+1. ``purged_items``: items de listas borradas (PostgreSQL borra en cascada sus claims, aportaciones...)
+2. ``purged_wishlists``: listas borradas ya vacías
+3. ``purged_user_rows``: claims, aportaciones, actividad, invitaciones y permisos de usuarios borrados
+4. ``purged_groups``: grupos de usuarios borrados
+5. ``purged_users``: usuarios borrados a los que ya no les queda nada grande
+
+Las relaciones del ORM usan ``passive_deletes=True``: ni aquí ni en un
+``db.delete()`` se cargan en memoria las filas dependientes.
+"""
+from typing import Callable
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.core.cache import get_cache
+from app.core.logging_config import get_logger
+from app.db.unit_of_work import after_commit, transactional
+from app.repositories import deletion_repository
+
+logger = get_logger(__name__)
+
+
+@transactional
+def delete_user(db: Session, user_id: UUID) -> bool:
+    """Marca un usuario y sus listas para purga (una transacción). False si no existe."""
+    wishlist_ids = deletion_repository.soft_delete_user(db, user_id)
+    if wishlist_ids is None:
+        return False
+    after_commit(db, lambda: get_cache().invalidate(
+        f"users:{user_id}", *(f"wishlists:{wishlist_id}" for wishlist_id in wishlist_ids)
+    ))
+    logger.info(f"Usuario {user_id} marcado para purga ({len(wishlist_ids)} listas)")
+    return True
+
+
+@transactional
+def delete_wishlist(db: Session, wishlist_id: UUID) -> bool:
+    """Marca una lista para purga. False si no existe."""
+    if not deletion_repository.soft_delete_wishlist(db, wishlist_id):
+        return False
+    after_commit(db, lambda: get_cache().invalidate(f"wishlists:{wishlist_id}"))
+    logger.info(f"Lista {wishlist_id} marcada para purga")
+    return True
+
+
+def purge_tasks() -> dict[str, Callable[[Session, int], int]]:
+    """Tareas de purga para el barrido de mantenimiento, en el orden en que deben ejecutarse."""
+    return {
+        "purged_items": lambda db, limit: deletion_repository.purge_items(db, limit=limit),
+        "purged_wishlists": lambda db, limit: deletion_repository.purge_wishlists(db, limit=limit),
+        "purged_user_rows": lambda db, limit: deletion_repository.purge_user_rows(db, limit=limit),
+        "purged_groups": lambda db, limit: deletion_repository.purge_groups(db, limit=limit),
+        "purged_users": lambda db, limit: deletion_repository.purge_users(db, limit=limit),
+    }
@@ -0,0 +1,63 @@
+"""
+Servicio de invitaciones a aportar en regalos de grupo
+"""
+from typing import Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.core.exceptions import NotFoundError
+from app.core.logging_config import get_logger
+from app.db.unit_of_work import transactional
+from app.repositories import invite_repository, user_repository
+
+logger = get_logger(__name__)
+
+
+@transactional
+def send_invites(
+    db: Session,
+    *,
+    item_id: UUID,
+    inviter_id: UUID,
+    user_ids: Sequence[UUID] = (),
+    group_ids: Sequence[UUID] = (),
+    suggested_each_cents: Optional[int] = None,
+) -> dict:
+    """
+    Invita a aportar a usuarios y grupos (un grupo se expande a sus miembros).
+
+    Todo se escribe con una sentencia por tabla, sin recorrer los miembros en Python.
+    Los usuarios y grupos que no existen (o están borrados) no se invitan y se
+    devuelven en ``unknown_user_ids`` y ``unknown_group_ids``.
+
+    Raises:
+        NotFoundError: Si el item o el invitador no existen
+    """
+    if not invite_repository.item_exists(db, item_id):
+        raise NotFoundError(resource="Item", identifier=item_id)
+    if user_repository.get(db, inviter_id) is None:
+        raise NotFoundError(resource="Usuario", identifier=inviter_id)
+
+    result = invite_repository.fan_out(
+        db,
+        item_id=item_id,
+        inviter_id=inviter_id,
+        user_ids=user_ids,
+        group_ids=group_ids,
+        suggested_each_cents=suggested_each_cents,
+    )
+    created = len(result["invites"])
+    unknown = len(result["unknown_user_ids"]) + len(result["unknown_group_ids"])
+    logger.info(
+        f"Invitaciones enviadas: item={item_id}, destinatarios={result['targets']}, "
+        f"creadas={created}, ya invitados={result['targets'] - created}, IDs desconocidos={unknown}"
+    )
+    return {
+        "targets": result["targets"],
+        "created": created,
+        "skipped": result["targets"] - created,
+        "invites": result["invites"],
+        "unknown_user_ids": result["unknown_user_ids"],
+        "unknown_group_ids": result["unknown_group_ids"],
+    }
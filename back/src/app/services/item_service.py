@@ -1,66 +1,217 @@
 """
 Servicio de lógica de negocio para items
 """
-from typing import List, Optional
+from typing import List, Optional, Sequence
+from uuid import UUID
 
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 
+from app import scraper
+from app.core.cache import cached, get_cache
+from app.core.config import settings
+from app.core.exceptions import NotFoundError, ValidationError
 from app.core.logging_config import get_logger
 from app.db.models.item import Item
+from app.db.unit_of_work import after_commit, transactional
 from app.repositories import item_repository
 from app.schemas import item as item_schema
+from app.schemas.fields import schema_fields
+from app.services.loaders import Loaders
+from app.utils import ranking
+from app.utils.dataloader import LoadResult
 
 logger = get_logger(__name__)
 
+# Columnas que lee el listado de items (las de la respuesta)
+_ITEM_COLUMNS = schema_fields(item_schema.Item)
 
-def get_item(db: Session, item_id: int) -> Optional[Item]:
-    """Obtiene un item por ID."""
+
+@cached(
+    "items:{item_id}",
+    schema=item_schema.Item,
+    tags=("items:{item_id}",),
+    tags_from=lambda item: [f"wishlists:{item['wishlist_id']}"],
+)
+def get_item(db: Session, item_id: UUID) -> Optional[Item]:
+    """
+    Obtiene un item por ID.
+
+    Cacheado (``CACHE_ENABLED``): devuelve un ``item_schema.Item``, no el
+    modelo ORM. Se invalida con ``items:<id>`` o con ``wishlists:<id>`` de su lista.
+    """
     return item_repository.get(db, item_id)
 
 
+def get_items_by_ids(loaders: Loaders, item_ids: Sequence[UUID]) -> LoadResult:
+    """Obtiene varios items en una consulta, en el orden pedido y con los IDs que no existen."""
+    return loaders.items.find_many(item_ids)
+
+
 def get_items(
     db: Session,
     skip: int = 0,
     limit: int = 100,
-    owner_id: Optional[int] = None,
-) -> List[Item]:
-    """Obtiene una lista de items."""
+    wishlist_id: Optional[UUID] = None,
+    fields: Optional[Sequence[str]] = None,
+) -> List[Row]:
+    """
+    Obtiene una lista de items como filas con solo las columnas de la respuesta.
+
+    ``fields`` limita las columnas leídas (atributos de ``item_schema.Item``).
+    """
     return list(
-        item_repository.get_multi(
-            db, skip=skip, limit=limit, owner_id=owner_id
+        item_repository.get_multi_rows(
+            db,
+            columns=fields or _ITEM_COLUMNS,
+            skip=skip,
+            limit=limit,
+            wishlist_id=wishlist_id,
         )
     )
 
 
-def create_item(db: Session, item: item_schema.ItemCreate, owner_id: int) -> Item:
-    """Crea un nuevo item."""
-    return item_repository.create(
-        db,
-        owner_id=owner_id,
-        data=item.model_dump(),
-    )
+@transactional
+def create_item(db: Session, item: item_schema.ItemCreate) -> Item:
+    """
+    Crea un nuevo item y encola su enriquecimiento con el scraper.
+
+    El scraping nunca se hace dentro del request: ``scraper.submit`` solo
+    encola la URL (o la descarta si la cola está llena), y solo tras el commit.
 
+    Raises:
+        NotFoundError: Si la lista no existe o está borrada
+    """
+    # El bloqueo de la lista serializa la lectura de su última clave con otras altas y movimientos
+    if not item_repository.lock_wishlists(db, [item.wishlist_id]):
+        raise NotFoundError(resource="Wishlist", identifier=item.wishlist_id)
+    # Los items nuevos van al final de su lista
+    last_rank = item_repository.last_ranks(db, [item.wishlist_id]).get(item.wishlist_id)
+    db_item = item_repository.create(db, data={**item.model_dump(), "rank": ranking.key_between(last_rank, None)})
+    after_commit(db, lambda: scraper.submit(db_item.id, db_item.source_url))
+    return db_item
 
+
+@transactional
 def update_item(
     db: Session,
-    item_id: int,
+    item_id: UUID,
     item_update: item_schema.ItemUpdate,
 ) -> Optional[Item]:
-    """Actualiza un item."""
-    db_item = get_item(db, item_id)
-    if not db_item:
-        return None
-
+    """Actualiza un item (una sola sentencia: ``UPDATE ... RETURNING``)."""
     update_data = item_update.model_dump(exclude_unset=True)
-    return item_repository.update(db, db_item, values=update_data)
+    db_item = item_repository.update(db, item_id, values=update_data)
+    if db_item is not None:
+        after_commit(db, lambda: get_cache().invalidate(f"items:{item_id}"))
+    return db_item
 
 
-def delete_item(db: Session, item_id: int) -> bool:
-    """Elimina un item."""
-    db_item = get_item(db, item_id)
-    if not db_item:
+@transactional
+def delete_item(db: Session, item_id: UUID) -> bool:
+    """Elimina un item (una sola sentencia: ``DELETE ... RETURNING``)."""
+    if item_repository.delete(db, item_id) is None:
         return False
-
-    item_repository.delete(db, db_item)
+    after_commit(db, lambda: get_cache().invalidate(f"items:{item_id}"))
     return True
 
+
+@transactional
+def apply_batch(
+    db: Session,
+    operations: Sequence[item_schema.ItemBatchOperation],
+) -> item_schema.ItemBatchResponse:
+    """
+    Aplica creaciones, actualizaciones y borrados de items en una transacción.
+
+    Todo o nada: si alguna operación falla (item o lista inexistente, el
+    mismo item dos veces) no se aplica ninguna y se lanza ValidationError
+    con el error de cada operación. Son como mucho seis sentencias sea
+    cual sea el tamaño del lote: bloqueo de las listas, última clave de
+    orden de cada lista, un INSERT, un UPDATE, un DELETE y la lectura del
+    estado final.
+    """
+    if len(operations) > settings.ITEM_BATCH_MAX_OPERATIONS:
+        raise ValidationError(
+            message=f"Como mucho {settings.ITEM_BATCH_MAX_OPERATIONS} operaciones por lote",
+            details={"field": "operations", "received": len(operations)},
+        )
+
+    creates, updates, deletes = [], [], []
+    errors: dict[int, str] = {}
+    first_use: dict[UUID, int] = {}
+    for index, operation in enumerate(operations):
+        if operation.op == "create":
+            creates.append((index, operation))
+            continue
+        if operation.id in first_use:
+            errors[index] = f"El item ya aparece en la operación {first_use[operation.id]}"
+            continue
+        first_use[operation.id] = index
+        (updates if operation.op == "update" else deletes).append((index, operation))
+
+    if creates:
+        wishlist_ids = {operation.data.wishlist_id for _, operation in creates}
+        # Bloqueadas hasta el commit: nadie más añade ni mueve items en ellas mientras se asignan las claves
+        missing = wishlist_ids - item_repository.lock_wishlists(db, list(wishlist_ids))
+        for index, operation in creates:
+            if operation.data.wishlist_id in missing:
+                errors[index] = f"Lista no encontrada (ID: {operation.data.wishlist_id})"
+
+    # Las actualizaciones y borrados se ejecutan aunque ya haya errores para
+    # informar también de los items inexistentes; el ValidationError deshace la transacción
+    created_ids: list[UUID] = []
+    if creates and not errors:
+        # Los items nuevos van al final de su lista, en el orden del lote
+        ranks = item_repository.last_ranks(db, list({op.data.wishlist_id for _, op in creates}))
+        rows = []
+        for _, operation in creates:
+            wishlist_id = operation.data.wishlist_id
+            ranks[wishlist_id] = ranking.key_between(ranks[wishlist_id], None)
+            rows.append({**operation.data.model_dump(), "rank": ranks[wishlist_id]})
+        created_ids = item_repository.bulk_create(db, rows)
+    updated = item_repository.bulk_update(
+        db, [(op.id, op.data.model_dump(exclude_unset=True)) for _, op in updates]
+    ) if updates else set()
+    deleted = item_repository.bulk_delete(db, [op.id for _, op in deletes]) if deletes else set()
+    for index, operation in updates + deletes:
+        if operation.id not in (updated if operation.op == "update" else deleted):
+            errors[index] = f"Item no encontrado (ID: {operation.id})"
+
+    if errors:
+        logger.info(f"Lote de items rechazado: {len(errors)} de {len(operations)} operaciones con error")
+        raise ValidationError(
+            message="Lote rechazado: no se ha aplicado ninguna operación",
+            details={"errors": [
+                {"index": index, "op": operations[index].op, "message": message}
+                for index, message in sorted(errors.items())
+            ]},
+        )
+
+    # Estado final leído en la misma transacción
+    final = {
+        item.id: item_schema.Item.model_validate(item)
+        for item in item_repository.get_many(db, created_ids + [op.id for _, op in updates])
+    }
+
+    def publish() -> None:
+        get_cache().invalidate(*(f"items:{op.id}" for _, op in updates + deletes))
+        for item_id in created_ids:
+            scraper.submit(item_id, final[item_id].source_url)
+
+    after_commit(db, publish)
+
+    results = []
+    created = iter(created_ids)
+    for index, operation in enumerate(operations):
+        item_id = next(created) if operation.op == "create" else operation.id
+        results.append(item_schema.ItemBatchResult(
+            index=index,
+            op=operation.op,
+            id=item_id,
+            status={"create": "created", "update": "updated", "delete": "deleted"}[operation.op],
+            item=final.get(item_id),
+        ))
+    logger.info(
+        f"Lote de items aplicado: {len(creates)} creados, {len(updates)} actualizados, {len(deletes)} eliminados"
+    )
+    return item_schema.ItemBatchResponse(results=results)
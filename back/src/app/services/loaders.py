@@ -0,0 +1,81 @@
+"""
+DataLoaders por request
+
+``get_loaders`` es una dependencia de FastAPI: se resuelve una vez por
+request, así que todos los routers y servicios de ese request comparten los
+mismos loaders (y su caché) sobre la misma sesión. Cada loader resuelve sus
+claves con una consulta ``id = ANY(:ids)`` por lote.
+
+Uso en routers:
+    @router.get("/")
+    def read_users(ids=Depends(batch_ids), loaders: Loaders = Depends(get_loaders)):
+        result = loaders.users.find_many(ids)
+
+Uso en servicios (``claim_service.list_for_item``): los usuarios de todos los
+claims de un item se piden con un solo ``load_many``.
+"""
+from operator import attrgetter
+from typing import List, Optional, Sequence
+from uuid import UUID
+
+from fastapi import Depends, Query, Response
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.exceptions import ValidationError
+from app.db.models.item import Item
+from app.db.models.user import User
+from app.db.session import get_db
+from app.repositories import item_repository, user_repository
+from app.utils.dataloader import DataLoader
+
+MISSING_IDS_HEADER = "X-Missing-Ids"
+
+
+class Loaders:
+    """Un DataLoader por entidad, ligado a la sesión del request"""
+
+    def __init__(self, db: Session) -> None:
+        self.db = db
+        batch = settings.BATCH_MAX_IDS
+        self.users: DataLoader[UUID, User] = DataLoader(
+            lambda ids: user_repository.get_many(db, ids), attrgetter("id"), max_batch_size=batch
+        )
+        self.items: DataLoader[UUID, Item] = DataLoader(
+            lambda ids: item_repository.get_many(db, ids), attrgetter("id"), max_batch_size=batch
+        )
+
+
+def get_loaders(db: Session = Depends(get_db)) -> Loaders:
+    """Dependencia que crea los loaders del request."""
+    return Loaders(db)
+
+
+def batch_ids(
+    ids: Optional[List[str]] = Query(
+        None, description="IDs a obtener: ?ids=a&ids=b o ?ids=a,b (resultado en ese orden)"
+    ),
+) -> Optional[list[UUID]]:
+    """Dependencia que valida el parámetro ``ids`` (None si no se ha enviado)."""
+    if ids is None:
+        return None
+
+    parsed = []
+    for raw in ids:
+        for value in filter(None, (part.strip() for part in raw.split(","))):
+            try:
+                parsed.append(UUID(value))
+            except ValueError:
+                raise ValidationError(message=f"ID inválido: '{value}'", field="ids")
+    if len(parsed) > settings.BATCH_MAX_IDS:
+        raise ValidationError(
+            message=f"Como mucho {settings.BATCH_MAX_IDS} IDs por petición",
+            details={"field": "ids", "received": len(parsed)},
+        )
+    return parsed
+
+
+def report_missing(response: Response, missing: Sequence[UUID]) -> None:
+    """Indica en ``X-Missing-Ids`` los IDs pedidos que no existen."""
+    if missing:
+        response.headers[MISSING_IDS_HEADER] = ",".join(str(key) for key in missing)
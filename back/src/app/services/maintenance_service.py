@@ -0,0 +1,131 @@
+"""
+Servicio de mantenimiento: caducidad de invitaciones, sesiones, claims y claves de
+idempotencia, reequilibrado de las claves de orden de los items, purga de
+usuarios y listas borrados y baja de los productos sin items
+
+Nada en el flujo de requests caduca estas filas, así que sin este barrido
+las tablas (y sus índices) crecen sin límite. Cada tarea se ejecuta en
+lotes de ``MAINTENANCE_BATCH_SIZE`` filas, una transacción corta por lote,
+hasta que un lote sale incompleto o se alcanza ``MAINTENANCE_MAX_BATCHES``.
+
+Se puede ejecutar:
+- Dentro del lifespan de la API (``MAINTENANCE_ENABLED=True``)
+- Como proceso aparte: ``python -m app.cli.maintenance``
+"""
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logging_config import get_logger
+from app.db.session import SessionLocal
+from app.repositories import maintenance_repository, price_repository
+from app.services import deletion_service, rank_service
+
+logger = get_logger(__name__)
+
+_metrics_lock = threading.Lock()
+_metrics: dict[str, Any] = {"runs": 0, "last_run": None, "totals": {}}
+
+
+def _tasks(now: datetime) -> dict[str, Callable[[Session, int], int]]:
+    """Tareas de barrido: nombre -> función(db, limit) que procesa un lote."""
+    invite_cutoff = now - timedelta(days=settings.INVITE_EXPIRE_DAYS)
+    claim_cutoff = now - timedelta(days=settings.CLAIM_INTEREST_EXPIRE_DAYS)
+    return {
+        "expired_invites": lambda db, limit: maintenance_repository.expire_pending_invites(
+            db, older_than=invite_cutoff, limit=limit
+        ),
+        "expired_sessions": lambda db, limit: maintenance_repository.delete_expired_sessions(
+            db, now=now, limit=limit
+        ),
+        "released_claims": lambda db, limit: maintenance_repository.release_stale_interested_claims(
+            db, older_than=claim_cutoff, limit=limit
+        ),
+        "expired_idempotency_keys": lambda db, limit: maintenance_repository.delete_expired_idempotency_keys(
+            db, now=now, limit=limit
+        ),
+        "rebalanced_item_ranks": lambda db, limit: rank_service.rebalance(db, limit=limit),
+        **deletion_service.purge_tasks(),
+        # Después de las purgas: los productos de los items recién purgados ya no tienen referencias
+        "unreferenced_products": lambda db, limit: price_repository.delete_unreferenced(db, limit=limit),
+    }
+
+
+def run_once(
+    batch_size: Optional[int] = None,
+    max_batches: Optional[int] = None,
+) -> dict[str, Any]:
+    """
+    Ejecuta una pasada de todas las tareas.
+
+    Returns:
+        Resumen de la pasada: filas procesadas y lotes por tarea, duración y errores
+    """
+    batch_size = batch_size or settings.MAINTENANCE_BATCH_SIZE
+    max_batches = max_batches or settings.MAINTENANCE_MAX_BATCHES
+    started = time.perf_counter()
+    now = datetime.now(timezone.utc)
+    summary: dict[str, Any] = {"started_at": now.isoformat(), "tasks": {}, "errors": {}}
+
+    for name, task in _tasks(now).items():
+        rows = batches = 0
+        with SessionLocal() as db:
+            try:
+                while batches < max_batches:
+                    processed = task(db, batch_size)
+                    rows += processed
+                    batches += 1
+                    if processed < batch_size:
+                        break
+            except Exception as e:
+                # Una tarea fallida no impide las demás; los lotes ya confirmados se mantienen
+                db.rollback()
+                logger.error(f"Error en la tarea de mantenimiento '{name}': {e}")
+                summary["errors"][name] = str(e)
+        summary["tasks"][name] = {"rows": rows, "batches": batches}
+
+    summary["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    _record(summary)
+    logger.info(
+        "Mantenimiento completado en {} ms: {}".format(
+            summary["duration_ms"],
+            ", ".join(f"{name}={task['rows']}" for name, task in summary["tasks"].items()),
+        )
+    )
+    return summary
+
+
+def _record(summary: dict[str, Any]) -> None:
+    with _metrics_lock:
+        _metrics["runs"] += 1
+        _metrics["last_run"] = summary
+        for name, task in summary["tasks"].items():
+            _metrics["totals"][name] = _metrics["totals"].get(name, 0) + task["rows"]
+
+
+def get_metrics() -> dict[str, Any]:
+    """Número de pasadas, resumen de la última y filas acumuladas por tarea (en este proceso)."""
+    with _metrics_lock:
+        return {
+            "runs": _metrics["runs"],
+            "last_run": _metrics["last_run"],
+            "totals": dict(_metrics["totals"]),
+        }
+
+
+async def run_periodically(interval_seconds: Optional[float] = None) -> None:
+    """Bucle que ejecuta ``run_once`` cada ``interval_seconds`` en un hilo aparte (cancelable)."""
+    interval_seconds = interval_seconds or settings.MAINTENANCE_INTERVAL_SECONDS
+    logger.info(f"Barrido de mantenimiento activo cada {interval_seconds} s")
+    while True:
+        try:
+            # El trabajo es síncrono (SQLAlchemy); no bloquear el event loop
+            await asyncio.to_thread(run_once)
+        except Exception as e:
+            logger.error(f"Error en el barrido de mantenimiento: {e}")
+        await asyncio.sleep(interval_seconds)
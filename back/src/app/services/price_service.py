@@ -0,0 +1,222 @@
+"""
+Servicio de seguimiento de precios
+
+El planificador (``run_periodically`` en el lifespan o ``python -m
+app.cli.price_refresh``) repite en cada pasada:
+
+1. Rellena ``items.source_url_key`` por lotes y da de alta los productos
+   nuevos en ``product_prices`` (una fila por URL normalizada, así que un
+   producto en muchas listas se descarga una sola vez)
+2. Reserva lotes de productos pendientes, primero los de listas con un
+   evento próximo, y los descarga en paralelo con el scraper (límites por dominio)
+3. Guarda cada lote con una sola sentencia: último precio en ``product_prices``
+   y solo los cambios en ``price_history``
+
+La API lee el último precio de ``product_prices`` por clave primaria, sin
+recorrer el historial.
+"""
+import asyncio
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Optional
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.exceptions import NotFoundError
+from app.core.logging_config import get_logger
+from app.db.session import SessionLocal
+from app.repositories import price_repository
+from app.scraper.fetcher import Scraper
+from app.scraper.parser import ProductData
+from app.scraper.urls import normalize_url
+
+logger = get_logger(__name__)
+
+_metrics_lock = threading.Lock()
+_metrics: dict[str, Any] = {"runs": 0, "last_run": None, "totals": {}}
+
+_AVAILABILITY = {"instock": True, "in stock": True, "limitedavailability": True, "presale": True,
+                 "outofstock": False, "out of stock": False, "soldout": False, "discontinued": False}
+
+
+def get_item_price(db: Session, item_id: UUID) -> dict[str, Any]:
+    """Último precio conocido del producto de un item."""
+    row = price_repository.get_latest_for_item(db, item_id)
+    if row is None:
+        raise NotFoundError(resource="Item", identifier=item_id)
+
+    product = row.ProductPrice
+    if product is None or product.observed_at is None:
+        return {"item_id": item_id, "tracked": product is not None}
+
+    drop = None
+    if product.price_cents is not None and product.previous_price_cents is not None:
+        drop = max(product.previous_price_cents - product.price_cents, 0)
+    return {
+        "item_id": item_id,
+        "tracked": True,
+        "price_cents": product.price_cents,
+        "previous_price_cents": product.previous_price_cents,
+        "price_drop_cents": drop,
+        "currency": product.currency,
+        "available": product.available,
+        "observed_at": product.observed_at,
+    }
+
+
+def get_item_price_history(db: Session, item_id: UUID, limit: int = 100) -> list:
+    """Cambios de precio del producto de un item, del más reciente al más antiguo."""
+    row = price_repository.get_latest_for_item(db, item_id)
+    if row is None:
+        raise NotFoundError(resource="Item", identifier=item_id)
+    if not row.source_url_key:
+        return []
+    return list(price_repository.get_history(db, row.source_url_key, limit=limit))
+
+
+def _availability(product: ProductData) -> Optional[bool]:
+    value = str(product.metadata.get("availability", "")).lower()
+    return _AVAILABILITY.get(value)
+
+
+def _next_check_at(now: datetime, next_event_on: Optional[date]) -> datetime:
+    """Los productos de listas con un evento próximo se refrescan con más frecuencia."""
+    horizon = now.date() + timedelta(days=settings.PRICE_REFRESH_EVENT_HORIZON_DAYS)
+    if next_event_on is not None and next_event_on <= horizon:
+        return now + timedelta(hours=settings.PRICE_REFRESH_EVENT_INTERVAL_HOURS)
+    return now + timedelta(hours=settings.PRICE_REFRESH_INTERVAL_HOURS)
+
+
+def backfill_url_keys(max_batches: Optional[int] = None) -> int:
+    """Rellena ``source_url_key`` por lotes y da de alta los productos nuevos. Devuelve items procesados."""
+    max_batches = max_batches or settings.PRICE_REFRESH_MAX_BATCHES
+    batch_size = settings.PRICE_REFRESH_BACKFILL_BATCH_SIZE
+    total = 0
+    with SessionLocal() as db:
+        for _ in range(max_batches):
+            rows = price_repository.items_without_url_key(db, limit=batch_size)
+            if not rows:
+                db.rollback()
+                break
+            keys = []
+            for row in rows:
+                try:
+                    keys.append((row.id, normalize_url(row.source_url), row.source_url))
+                except ValueError:
+                    keys.append((row.id, "", row.source_url))  # URL no válida: no se sigue
+            price_repository.set_url_keys(db, keys)
+            total += len(rows)
+            if len(rows) < batch_size:
+                break
+    return total
+
+
+async def refresh_batch(scraper: Scraper) -> dict[str, int]:
+    """Reserva, descarga y guarda un lote de productos. Devuelve los contadores del lote."""
+
+    def claim() -> tuple[list, dict[str, date]]:
+        with SessionLocal() as db:
+            claimed = price_repository.claim_due(
+                db,
+                limit=settings.PRICE_REFRESH_BATCH_SIZE,
+                lease_seconds=settings.PRICE_REFRESH_LEASE_SECONDS,
+                horizon_days=settings.PRICE_REFRESH_EVENT_HORIZON_DAYS,
+            )
+            events = price_repository.upcoming_events(db, [row.url_key for row in claimed]) if claimed else {}
+            return claimed, events
+
+    claimed, events = await asyncio.to_thread(claim)
+    if not claimed:
+        return {"claimed": 0, "updated": 0, "changed": 0, "failed": 0}
+
+    # El scraper limita la concurrencia por dominio; aquí se lanzan todas a la vez
+    results = await asyncio.gather(*(scraper.scrape(row.source_url, use_cache=False) for row in claimed))
+
+    now = datetime.now(timezone.utc)
+    observations, failed = [], []
+    for row, product in zip(claimed, results):
+        if product is None:
+            failed.append(row.url_key)
+            continue
+        next_event_on = events.get(row.url_key)
+        observations.append({
+            "url_key": row.url_key,
+            "price_cents": product.price_cents,
+            "currency": product.currency,
+            "available": _availability(product),
+            "next_event_on": next_event_on,
+            "next_check_at": _next_check_at(now, next_event_on),
+        })
+
+    def save() -> dict[str, int]:
+        counts = {"updated": 0, "changed": 0}
+        with SessionLocal() as db:
+            if observations:
+                counts = price_repository.record_prices(db, observations, observed_at=now)
+            if failed:
+                price_repository.record_failures(
+                    db,
+                    failed,
+                    base_seconds=settings.PRICE_REFRESH_RETRY_BASE_SECONDS,
+                    max_seconds=settings.PRICE_REFRESH_RETRY_MAX_SECONDS,
+                )
+        return counts
+
+    counts = await asyncio.to_thread(save)
+    return {"claimed": len(claimed), **counts, "failed": len(failed)}
+
+
+async def refresh_once(scraper: Scraper) -> dict[str, Any]:
+    """Una pasada completa: backfill de claves y lotes de refresco hasta agotar los pendientes."""
+    started = time.perf_counter()
+    summary: dict[str, Any] = {
+        "backfilled": await asyncio.to_thread(backfill_url_keys),
+        "batches": 0, "claimed": 0, "updated": 0, "changed": 0, "failed": 0,
+    }
+    for _ in range(settings.PRICE_REFRESH_MAX_BATCHES):
+        batch = await refresh_batch(scraper)
+        if not batch["claimed"]:
+            break
+        summary["batches"] += 1
+        for key, value in batch.items():
+            summary[key] += value
+
+    summary["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    _record(summary)
+    logger.info(
+        f"Refresco de precios: {summary['claimed']} productos, {summary['changed']} cambios, "
+        f"{summary['failed']} fallos, {summary['backfilled']} items nuevos ({summary['duration_ms']} ms)"
+    )
+    return summary
+
+
+def _record(summary: dict[str, Any]) -> None:
+    with _metrics_lock:
+        _metrics["runs"] += 1
+        _metrics["last_run"] = summary
+        for key in ("backfilled", "claimed", "updated", "changed", "failed"):
+            _metrics["totals"][key] = _metrics["totals"].get(key, 0) + summary[key]
+
+
+def get_metrics() -> dict[str, Any]:
+    """Número de pasadas, resumen de la última y contadores acumulados (en este proceso)."""
+    with _metrics_lock:
+        return {"runs": _metrics["runs"], "last_run": _metrics["last_run"], "totals": dict(_metrics["totals"])}
+
+
+async def run_periodically(scraper: Scraper, interval_seconds: Optional[float] = None) -> None:
+    """Bucle del planificador: una pasada cada ``interval_seconds`` (cancelable)."""
+    interval_seconds = interval_seconds or settings.PRICE_REFRESH_TICK_SECONDS
+    logger.info(f"Planificador de precios activo cada {interval_seconds} s")
+    try:
+        while True:
+            try:
+                await refresh_once(scraper)
+            except Exception as e:
+                logger.error(f"Error en el refresco de precios: {e}")
+            await asyncio.sleep(interval_seconds)
+    finally:
+        await scraper.fetcher.aclose()
@@ -0,0 +1,109 @@
+"""
+Servicio de orden de items: mover un item y reequilibrar claves de orden
+
+Mover un item escribe una sola fila: su nueva clave queda entre las de sus
+vecinos (``app.utils.ranking``). Dos casos necesitan renumerar una lista
+entera, siempre fuera del camino habitual:
+
+- Listas con items sin clave (anteriores a la migración 0008)
+- Listas en las que muchos movimientos al mismo hueco han alargado las
+  claves más allá de ``REBALANCE_LENGTH``
+
+``rebalance`` las renumera con claves enteras cortas (``a0``, ``a1``...)
+conservando el orden. Se ejecuta como tarea del barrido de mantenimiento
+(``rebalanced_item_ranks``); la primera vez que se mueve un item de una
+lista sin numerar, la lista se numera en ese momento.
+"""
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.core.cache import get_cache
+from app.core.exceptions import NotFoundError, ValidationError
+from app.core.logging_config import get_logger
+from app.db.models.item import Item
+from app.db.unit_of_work import after_commit, transactional
+from app.repositories import item_repository
+from app.utils import ranking
+
+logger = get_logger(__name__)
+
+
+def _renumber(db: Session, wishlist_id: UUID) -> int:
+    item_ids = item_repository.lock_ordered_ids(db, wishlist_id)
+    item_repository.assign_ranks(db, item_ids, [ranking.nth_key(n) for n in range(len(item_ids))])
+    return len(item_ids)
+
+
+@transactional
+def rebalance_wishlist(db: Session, wishlist_id: UUID) -> int:
+    """Renumera las claves de una lista conservando el orden. Devuelve los items renumerados."""
+    if not item_repository.lock_wishlists(db, [wishlist_id]):
+        return 0  # Borrada: la purga eliminará sus items
+    count = _renumber(db, wishlist_id)
+    after_commit(db, lambda: get_cache().invalidate(f"wishlists:{wishlist_id}"))
+    return count
+
+
+def rebalance(db: Session, *, limit: int) -> int:
+    """
+    Renumera listas pendientes hasta haber tocado ``limit`` items (o no quedar ninguna).
+
+    Cada lista es una transacción. Devuelve los items renumerados, como las
+    tareas de ``maintenance_repository``: menos de ``limit`` significa que no quedan.
+    """
+    count = 0
+    while count < limit:
+        wishlist_ids = item_repository.rebalance_candidates(db, limit=1)
+        if not wishlist_ids:
+            break
+        count += rebalance_wishlist(db, wishlist_ids[0])
+    if count:
+        logger.info(f"Claves de orden reequilibradas: {count} items")
+    return count
+
+
+@transactional
+def move_item(db: Session, item_id: UUID, after_id: Optional[UUID]) -> Item:
+    """
+    Coloca un item justo después de ``after_id`` (None = al principio de su lista).
+
+    Bloquea primero la lista del item (como las altas de items): los
+    movimientos y altas de una misma lista se aplican uno después de otro,
+    así que nunca calculan la misma clave. Después bloquea el item y su nuevo
+    vecino anterior. Salvo que la lista no esté numerada todavía, solo se
+    escribe la fila del item.
+    """
+    if after_id == item_id:
+        raise ValidationError(message="Un item no se puede colocar después de sí mismo", field="after_id")
+
+    # Lista antes que items: el mismo orden de bloqueo que las altas y los lotes
+    if item_repository.lock_item_wishlist(db, item_id) is None:
+        raise NotFoundError(resource="Item", identifier=item_id)
+    locked = {item.id: item for item in item_repository.get_many(
+        db, [item_id] if after_id is None else [item_id, after_id], for_update=True
+    )}
+    item = locked.get(item_id)
+    if item is None:
+        raise NotFoundError(resource="Item", identifier=item_id)
+    after = locked.get(after_id) if after_id is not None else None
+    if after_id is not None and (after is None or after.wishlist_id != item.wishlist_id):
+        raise ValidationError(
+            message=f"El item {after_id} no existe o no pertenece a la misma lista",
+            field="after_id",
+        )
+
+    if item_repository.has_unranked(db, item.wishlist_id):
+        _renumber(db, item.wishlist_id)
+        db.refresh(item)
+        if after is not None:
+            db.refresh(after)
+
+    lower = after.rank if after is not None else None
+    upper = item_repository.next_rank(db, item.wishlist_id, after=lower, exclude_id=item_id)
+    rank = ranking.key_between(lower, upper)
+    moved = item_repository.set_rank(db, item_id, rank)
+    after_commit(db, lambda: get_cache().invalidate(f"items:{item_id}", f"wishlists:{item.wishlist_id}"))
+    logger.debug(f"Item {item_id} movido a la clave '{rank}'")
+    return moved
@@ -1,25 +1,46 @@
 """
 Servicio de lógica de negocio para usuarios
 """
-from typing import List, Optional
+from typing import List, Optional, Sequence
+from uuid import UUID
 
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 
+from app.core.cache import cached, get_cache
 from app.core.logging_config import get_logger
 from app.core.security import verify_password
 from app.db.models.user import User
+from app.db.unit_of_work import after_commit, transactional
 from app.repositories import user_repository
 from app.schemas import user as user_schema
-from app.utils.hashing import hash_password
+from app.schemas.fields import schema_fields
+from app.services import deletion_service
+from app.services.loaders import Loaders
+from app.utils.dataloader import LoadResult
 
 logger = get_logger(__name__)
 
+# Columnas que lee el listado de usuarios (las de la respuesta)
+_USER_COLUMNS = schema_fields(user_schema.User)
 
-def get_user(db: Session, user_id: int) -> Optional[User]:
-    """Obtiene un usuario por ID."""
+
+@cached("users:{user_id}", schema=user_schema.User, tags=("users:{user_id}",))
+def get_user(db: Session, user_id: UUID) -> Optional[User]:
+    """
+    Obtiene un usuario por ID.
+
+    Cacheado (``CACHE_ENABLED``): devuelve un ``user_schema.User``, no el
+    modelo ORM. Las escrituras usan ``user_repository.get`` directamente.
+    """
     return user_repository.get(db, user_id)
 
 
+def get_users_by_ids(loaders: Loaders, user_ids: Sequence[UUID]) -> LoadResult:
+    """Obtiene varios usuarios en una consulta, en el orden pedido y con los IDs que no existen."""
+    return loaders.users.find_many(user_ids)
+
+
 def get_user_by_email(db: Session, email: str) -> Optional[User]:
     """Obtiene un usuario por email."""
     return user_repository.get_by_email(db, email)
@@ -30,50 +51,51 @@ def get_user_by_username(db: Session, username: str) -> Optional[User]:
     return user_repository.get_by_username(db, username)
 
 
-def get_users(db: Session, skip: int = 0, limit: int = 100) -> List[User]:
-    """Obtiene una lista de usuarios."""
-    return list(user_repository.get_multi(db, skip=skip, limit=limit))
+def get_users(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    fields: Optional[Sequence[str]] = None,
+) -> List[Row]:
+    """
+    Obtiene una lista de usuarios como filas con solo las columnas de la respuesta.
 
+    ``fields`` limita las columnas leídas (atributos de ``user_schema.User``).
+    """
+    return list(user_repository.get_multi_rows(db, columns=fields or _USER_COLUMNS, skip=skip, limit=limit))
 
+
+@transactional
 def create_user(db: Session, user: user_schema.UserCreate) -> User:
     """Crea un nuevo usuario."""
-    logger.debug(f"Creando usuario: {user.username}")
-    hashed_password = hash_password(user.password)
-    new_user = user_repository.create(
-        db,
-        email=user.email,
-        username=user.username,
-        hashed_password=hashed_password,
-    )
-    logger.info(f"Usuario creado: ID={new_user.id}, username={new_user.username}")
+    logger.debug(f"Creando usuario: {user.display_name}")
+    new_user = user_repository.create(db, data=user.model_dump())
+    logger.info(f"Usuario creado: ID={new_user.id}, email={new_user.email}")
     return new_user
 
 
+@transactional
 def update_user(
     db: Session,
-    user_id: int,
+    user_id: UUID,
     user_update: user_schema.UserUpdate,
 ) -> Optional[User]:
-    """Actualiza un usuario existente."""
-    db_user = get_user(db, user_id)
-    if not db_user:
-        return None
-
+    """Actualiza un usuario existente (una sola sentencia: ``UPDATE ... RETURNING``)."""
     update_data = user_update.model_dump(exclude_unset=True)
-    if "password" in update_data:
-        update_data["hashed_password"] = hash_password(update_data.pop("password"))
-
-    return user_repository.update(db, db_user, values=update_data)
+    db_user = user_repository.update(db, user_id, values=update_data)
+    if db_user is not None:
+        after_commit(db, lambda: get_cache().invalidate(f"users:{user_id}"))
+    return db_user
 
 
-def delete_user(db: Session, user_id: int) -> bool:
-    """Elimina un usuario."""
-    db_user = get_user(db, user_id)
-    if not db_user:
-        return False
+def delete_user(db: Session, user_id: UUID) -> bool:
+    """
+    Elimina un usuario.
 
-    user_repository.delete(db, db_user)
-    return True
+    Solo lo marca como borrado (y a sus listas); sus datos se purgan en
+    segundo plano por lotes (ver ``deletion_service``).
+    """
+    return deletion_service.delete_user(db, user_id)
 
 
 def authenticate_user(db: Session, username: str, password: str) -> Optional[User]:
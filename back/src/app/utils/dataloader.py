@@ -0,0 +1,93 @@
+"""
+DataLoader: agrupa búsquedas por clave en una sola consulta
+
+Pensado para vivir lo que dura un request (ver ``app.services.loaders``).
+En lugar de pedir cada usuario o item relacionado por separado (N+1), el
+código registra las claves que va a necesitar con ``prefetch`` y las
+resuelve juntas; ``load_many`` hace lo mismo con una lista de claves:
+
+    loader.prefetch(claim.user_id for claim in claims)
+    users = loader.load_many([claim.user_id for claim in claims])  # Una consulta
+
+Cada clave se consulta como mucho una vez por loader: los aciertos y los
+ausentes quedan cacheados. Los resultados se devuelven en el orden pedido.
+"""
+from typing import Callable, Generic, Hashable, Iterable, NamedTuple, Optional, Sequence, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LoadResult(NamedTuple):
+    """Valores encontrados (en el orden pedido, sin repetidos) y claves que no existen"""
+    found: list
+    missing: list
+
+
+class DataLoader(Generic[K, V]):
+    """Resuelve claves en lotes con ``batch_fn`` y cachea el resultado"""
+
+    def __init__(
+        self,
+        batch_fn: Callable[[list[K]], Iterable[V]],
+        key_of: Callable[[V], K],
+        *,
+        max_batch_size: int = 1000,
+    ) -> None:
+        """
+        Args:
+            batch_fn: Recibe claves sin repetir y devuelve los valores que existan, en cualquier orden
+            key_of: Clave de un valor devuelto por ``batch_fn`` (p. ej. ``lambda user: user.id``)
+            max_batch_size: Claves máximas por llamada a ``batch_fn``
+        """
+        self._batch_fn = batch_fn
+        self._key_of = key_of
+        self._max_batch_size = max_batch_size
+        self._cache: dict[K, Optional[V]] = {}
+        self._pending: dict[K, None] = {}  # dict como conjunto ordenado
+        self.batches = 0
+
+    def prime(self, key: K, value: Optional[V]) -> None:
+        """Añade a la caché un valor ya conocido (None si se sabe que no existe)."""
+        self._cache[key] = value
+        self._pending.pop(key, None)
+
+    def prefetch(self, keys: Iterable[K]) -> None:
+        """Registra claves para resolverlas en la próxima carga, sin consultar todavía."""
+        for key in keys:
+            if key not in self._cache:
+                self._pending[key] = None
+
+    def _dispatch(self) -> None:
+        keys = list(self._pending)
+        self._pending.clear()
+        for start in range(0, len(keys), self._max_batch_size):
+            chunk = keys[start:start + self._max_batch_size]
+            self.batches += 1
+            found = {self._key_of(value): value for value in self._batch_fn(chunk)}
+            for key in chunk:
+                self._cache[key] = found.get(key)
+
+    def load_many(self, keys: Sequence[K]) -> list[Optional[V]]:
+        """Un valor (o None si no existe) por clave, en el mismo orden que ``keys``."""
+        self.prefetch(keys)
+        if self._pending:
+            self._dispatch()
+        return [self._cache[key] for key in keys]
+
+    def load(self, key: K) -> Optional[V]:
+        """Valor de una clave; resuelve a la vez las claves pendientes de ``prefetch``."""
+        return self.load_many([key])[0]
+
+    def find_many(self, keys: Sequence[K]) -> LoadResult:
+        """Como ``load_many``, pero separando los encontrados de las claves que no existen."""
+        found, missing, seen = [], [], set()
+        for key, value in zip(keys, self.load_many(keys)):
+            if key in seen:
+                continue
+            seen.add(key)
+            if value is None:
+                missing.append(key)
+            else:
+                found.append(value)
+        return LoadResult(found=found, missing=missing)
@@ -0,0 +1,186 @@
+"""
+Claves de orden fraccionarias (orden lexicográfico)
+
+Cada item guarda una clave de texto y la lista se ordena por esa clave
+(``COLLATE "C"``: orden de bytes, igual que en Python). Para mover un item
+basta con darle una clave entre las de sus nuevos vecinos: se escribe una
+sola fila, sea cual sea el tamaño de la lista.
+
+Formato (el de la librería ``fractional-indexing``): una parte entera de
+longitud variable más una parte fraccionaria opcional en base 62:
+
+- La primera letra indica la longitud de la parte entera: ``a`` = 1 dígito,
+  ``b`` = 2 dígitos... (``A``-``Z`` para las negativas, antes de ``a0``)
+- Añadir al final incrementa la parte entera: ``a0``, ``a1``... ``az``, ``b00``.
+  La clave crece con el logaritmo del número de items
+- Insertar entre dos claves usa la parte fraccionaria: ``a1`` < ``a1V`` < ``a2``.
+  Insertar muchas veces en el mismo hueco alarga la clave (un carácter cada
+  ~6 inserciones); ``app.services.rank_service`` reequilibra esas listas
+
+La parte fraccionaria nunca termina en ``0``, para que siempre exista una
+clave entre dos claves distintas.
+"""
+from typing import Optional
+
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+_BASE = len(DIGITS)
+_ZERO = DIGITS[0]
+_SMALLEST_INTEGER = "A" + _ZERO * 26
+
+# Claves más largas que esto marcan la lista para reequilibrar (ver rank_service)
+REBALANCE_LENGTH = 24
+
+
+def _midpoint(a: str, b: Optional[str]) -> str:
+    """Parte fraccionaria entre ``a`` y ``b`` (None = sin límite superior)."""
+    if b is not None:
+        # Prefijo común (``a`` se completa con ceros)
+        n = 0
+        while n < len(b) and (a[n] if n < len(a) else _ZERO) == b[n]:
+            n += 1
+        if n > 0:
+            return b[:n] + _midpoint(a[n:], b[n:])
+
+    digit_a = DIGITS.index(a[0]) if a else 0
+    digit_b = DIGITS.index(b[0]) if b is not None else _BASE
+    if digit_b - digit_a > 1:
+        return DIGITS[(digit_a + digit_b + 1) // 2]
+    # Dígitos consecutivos
+    if b is not None and len(b) > 1:
+        return b[0]
+    return DIGITS[digit_a] + _midpoint(a[1:], None)
+
+
+def _integer_length(head: str) -> int:
+    if "a" <= head <= "z":
+        return ord(head) - ord("a") + 2
+    if "A" <= head <= "Z":
+        return ord("Z") - ord(head) + 2
+    raise ValueError(f"Clave de orden inválida (cabecera '{head}')")
+
+
+def _split(key: str) -> tuple[str, str]:
+    length = _integer_length(key[0])
+    if length > len(key):
+        raise ValueError(f"Clave de orden inválida: '{key}'")
+    return key[:length], key[length:]
+
+
+def validate(key: str) -> None:
+    """Lanza ValueError si ``key`` no es una clave de orden válida."""
+    if not key or key == _SMALLEST_INTEGER:
+        raise ValueError(f"Clave de orden inválida: '{key}'")
+    integer, fraction = _split(key)
+    if fraction.endswith(_ZERO) or any(char not in DIGITS for char in key[1:]):
+        raise ValueError(f"Clave de orden inválida: '{key}'")
+
+
+def _increment(integer: str) -> Optional[str]:
+    head, digits = integer[0], list(integer[1:])
+    for i in reversed(range(len(digits))):
+        value = DIGITS.index(digits[i]) + 1
+        if value < _BASE:
+            digits[i] = DIGITS[value]
+            return head + "".join(digits)
+        digits[i] = _ZERO
+    # Acarreo: la parte entera gana (o pierde, si es negativa) un dígito
+    if head == "Z":
+        return "a" + _ZERO
+    if head == "z":
+        return None
+    head = chr(ord(head) + 1)
+    if head > "a":
+        digits.append(_ZERO)
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def _decrement(integer: str) -> Optional[str]:
+    head, digits = integer[0], list(integer[1:])
+    for i in reversed(range(len(digits))):
+        value = DIGITS.index(digits[i]) - 1
+        if value >= 0:
+            digits[i] = DIGITS[value]
+            return head + "".join(digits)
+        digits[i] = DIGITS[-1]
+    if head == "a":
+        return "Z" + DIGITS[-1]
+    if head == "A":
+        return None
+    head = chr(ord(head) - 1)
+    if head < "Z":
+        digits.append(DIGITS[-1])
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def key_between(before: Optional[str], after: Optional[str]) -> str:
+    """
+    Clave estrictamente entre ``before`` y ``after``.
+
+    None significa "sin vecino": ``key_between(None, None)`` es la primera
+    clave de una lista vacía, ``key_between(last, None)`` va al final y
+    ``key_between(None, first)`` al principio.
+    """
+    if before is not None:
+        validate(before)
+    if after is not None:
+        validate(after)
+    if before is not None and after is not None and before >= after:
+        raise ValueError(f"'{before}' no es menor que '{after}'")
+
+    if before is None:
+        if after is None:
+            return "a" + _ZERO
+        integer, fraction = _split(after)
+        if integer == _SMALLEST_INTEGER:
+            return integer + _midpoint("", fraction)
+        if integer < after:
+            return integer
+        previous = _decrement(integer)
+        if previous is None:
+            raise ValueError("No quedan claves antes de la primera")
+        return previous
+
+    integer, fraction = _split(before)
+    if after is None:
+        following = _increment(integer)
+        return integer + _midpoint(fraction, None) if following is None else following
+
+    after_integer, after_fraction = _split(after)
+    if integer == after_integer:
+        return integer + _midpoint(fraction, after_fraction)
+    following = _increment(integer)
+    if following is None:
+        raise ValueError("No quedan claves después de la última")
+    if following < after:
+        return following
+    return integer + _midpoint(fraction, None)
+
+
+def keys_after(before: Optional[str], count: int) -> list[str]:
+    """``count`` claves consecutivas después de ``before`` (None = lista vacía)."""
+    keys = []
+    for _ in range(count):
+        before = key_between(before, None)
+        keys.append(before)
+    return keys
+
+
+def nth_key(n: int) -> str:
+    """
+    Clave entera en la posición ``n`` (0 = ``a0``) de la secuencia de ``keys_after(None, ...)``.
+
+    Sirve para numerar una lista entera sin generar las anteriores: reequilibrado y datos sintéticos.
+    """
+    length = 1
+    while n >= _BASE ** length:
+        n -= _BASE ** length
+        length += 1
+    digits = []
+    for _ in range(length):
+        n, digit = divmod(n, _BASE)
+        digits.append(DIGITS[digit])
+    return chr(ord("a") + length - 1) + "".join(reversed(digits))
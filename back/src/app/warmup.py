@@ -0,0 +1,178 @@
+"""
+Calentamiento al arrancar (lifespan)
+
+Sin él, los primeros requests tras un despliegue pagan costes que solo
+ocurren una vez por proceso y disparan el p99:
+
+- Abrir las conexiones del pool (TCP, TLS y autenticación de PostgreSQL)
+- ``configure_mappers()``: SQLAlchemy resuelve las relaciones de todos los
+  modelos la primera vez que se usa uno
+- Compilar cada sentencia: la caché de sentencias compiladas es por engine,
+  así que las consultas calientes se ejecutan una vez en el primario y en
+  cada réplica (con IDs que no existen: no leen datos)
+- Los serializadores de respuesta y el esquema OpenAPI (``/docs``)
+
+Uvicorn no acepta conexiones hasta que termina el arranque del lifespan,
+así que ``/health/ready`` no responde OK antes de que acabe. Un fallo en una
+fase se registra y no impide arrancar: el estado real de la base de datos lo
+da ``/health/ready``.
+"""
+import time
+from typing import Any, Callable, Optional, get_args, get_origin
+from uuid import uuid4
+
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, configure_mappers
+
+from app.core.logging_config import get_logger
+from app.repositories import claim_repository, item_repository, user_repository
+from app.schemas import item as item_schema
+from app.schemas import user as user_schema
+from app.schemas.fields import schema_fields
+
+logger = get_logger(__name__)
+
+_ITEM_COLUMNS = schema_fields(item_schema.Item)
+_USER_COLUMNS = schema_fields(user_schema.User)
+
+# Consultas de los endpoints de lectura más usados: (nombre, función(db))
+HOT_QUERIES: tuple[tuple[str, Callable[[Session], Any]], ...] = (
+    ("users.get", lambda db: user_repository.get(db, uuid4())),
+    ("users.get_many", lambda db: user_repository.get_many(db, [uuid4()])),
+    ("users.get_by_email", lambda db: user_repository.get_by_email(db, "")),
+    ("users.get_multi_rows", lambda db: user_repository.get_multi_rows(db, columns=_USER_COLUMNS, limit=1)),
+    ("items.get", lambda db: item_repository.get(db, uuid4())),
+    ("items.get_many", lambda db: item_repository.get_many(db, [uuid4()])),
+    ("items.get_multi_rows", lambda db: item_repository.get_multi_rows(db, columns=_ITEM_COLUMNS, limit=1)),
+    ("items.get_multi_rows_wishlist", lambda db: item_repository.get_multi_rows(
+        db, columns=_ITEM_COLUMNS, limit=1, wishlist_id=uuid4()
+    )),
+    ("claims.get_for_item_and_user", lambda db: claim_repository.get_for_item_and_user(db, uuid4(), uuid4())),
+)
+
+
+def open_connections(engine: Engine, count: int) -> int:
+    """
+    Abre ``count`` conexiones a la vez y las devuelve al pool.
+
+    Se piden todas antes de soltar ninguna: si no, el pool reutilizaría la
+    primera. Devuelve las conexiones abiertas.
+    """
+    connections = []
+    try:
+        for _ in range(count):
+            connections.append(engine.connect())
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
+
+
+def run_hot_queries(db: Session) -> dict[str, Any]:
+    """
+    Ejecuta ``HOT_QUERIES`` una vez (no escriben). Devuelve el resultado de cada consulta que no falló.
+
+    Una consulta que falla se registra y no impide calentar las demás: se
+    deshace su transacción (en PostgreSQL un error la deja abortada) y se
+    sigue con la siguiente. Los ejemplos para los serializadores son filas
+    ``Row`` (``get_multi_rows``), que el rollback no expira.
+    """
+    results = {}
+    for name, query in HOT_QUERIES:
+        try:
+            results[name] = query(db)
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Calentamiento: la consulta '{name}' ha fallado: {e}")
+    return results
+
+
+def _response_type(route: APIRoute) -> tuple[Any, bool]:
+    annotation = route.response_field.type_
+    if get_origin(annotation) in (list, tuple) and get_args(annotation):
+        return get_args(annotation)[0], True
+    return annotation, False
+
+
+def warm_serializers(app: FastAPI, samples: dict[type, Any]) -> int:
+    """
+    Pasa un objeto de ejemplo por el validador y el serializador de respuesta de cada ruta.
+
+    ``samples`` asocia un esquema de respuesta con un objeto (p. ej. un
+    modelo ORM) que lo rellena. Genera además el esquema OpenAPI. Devuelve
+    las rutas calentadas.
+    """
+    warmed = 0
+    for route in app.routes:
+        if not isinstance(route, APIRoute) or route.response_field is None:
+            continue
+        model, many = _response_type(route)
+        sample = samples.get(model)
+        if sample is None:
+            continue
+        value, errors = route.response_field.validate([sample] if many else sample, {}, loc=("response",))
+        if not errors:
+            route.response_field.serialize(value, mode="json")
+            warmed += 1
+    app.openapi()
+    return warmed
+
+
+def _timed(phases: dict[str, Optional[float]], name: str, func: Callable[[], Any]) -> Any:
+    started = time.perf_counter()
+    try:
+        result = func()
+    except Exception as e:
+        phases[name] = None
+        logger.warning(f"Calentamiento: la fase '{name}' ha fallado: {e}")
+        return None
+    phases[name] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+def run(
+    app: FastAPI,
+    *,
+    engine: Engine,
+    session_factory: Callable[[], Session],
+    replica_engines: tuple[Engine, ...] = (),
+    connections: int = 0,
+) -> dict[str, Optional[float]]:
+    """
+    Calienta pools, mappers, sentencias y serializadores (síncrono; llamar desde un hilo).
+
+    ``connections`` son las conexiones abiertas por engine (0 = ``pool_size``
+    de cada uno). Devuelve los milisegundos de cada fase (None si falló).
+    """
+    phases: dict[str, Optional[float]] = {}
+    _timed(phases, "mappers", configure_mappers)
+
+    for index, target in enumerate((engine, *replica_engines)):
+        name = "primary" if index == 0 else f"replica{index}"
+        size = target.pool.size() if hasattr(target.pool, "size") else 1
+        _timed(phases, f"{name}.connections", lambda: open_connections(target, min(connections or size, size)))
+
+    def primary_queries():
+        with session_factory() as db:
+            return run_hot_queries(db)
+
+    results = _timed(phases, "primary.queries", primary_queries) or {}
+    for index, replica_engine in enumerate(replica_engines, start=1):
+        def replica_queries():
+            with Session(bind=replica_engine) as db:
+                return run_hot_queries(db)
+
+        _timed(phases, f"replica{index}.queries", replica_queries)
+
+    # Filas reales si la base de datos tiene alguna; si no, solo se genera el esquema OpenAPI
+    samples = {
+        item_schema.Item: next(iter(results.get("items.get_multi_rows") or ()), None),
+        user_schema.User: next(iter(results.get("users.get_multi_rows") or ()), None),
+    }
+    _timed(phases, "serializers", lambda: warm_serializers(app, samples))
+
+    total = sum(ms for ms in phases.values() if ms is not None)
+    logger.info(f"Calentamiento completado en {total:.0f} ms: {phases}")
+    return phases
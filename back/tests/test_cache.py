@@ -0,0 +1,28 @@
+"""Caché de lecturas: los cálculos de ``@cached`` no leen de réplicas."""
+from uuid import UUID, uuid4
+
+from pydantic import BaseModel
+
+from app.core.cache import cached
+from app.db import routing
+
+
+class Row(BaseModel):
+    id: UUID
+    from_replica: bool
+
+
+@cached("tests:{row_id}", schema=Row, tags=("tests:{row_id}",))
+def get_row(db, row_id: UUID) -> dict:
+    return {"id": row_id, "from_replica": routing._prefer_replica.get()}
+
+
+def test_cache_fill_reads_from_primary():
+    token = routing.set_prefer_replica(True)  # Un GET sin cookie de lectura tras escritura
+    try:
+        row = get_row(None, uuid4())
+        assert routing._prefer_replica.get()
+    finally:
+        routing.reset_prefer_replica(token)
+
+    assert row.from_replica is False
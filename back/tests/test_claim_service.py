@@ -0,0 +1,184 @@
+"""
+Máquina de estados de claims y sus conflictos, sin base de datos
+
+El repositorio se sustituye por uno en memoria que aplica las mismas
+restricciones que PostgreSQL (un claim por item y usuario, un claim activo
+por item, ``UPDATE ... WHERE version = :v``). Para simular dos requests
+simultáneos, ``interleave`` ejecuta otra transición justo después de la
+lectura de la transacción en curso, antes de su escritura.
+"""
+import uuid
+from types import SimpleNamespace
+from typing import Callable, Optional
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.core.exceptions import ConflictError, NotFoundError, ValidationError
+from app.db.models.enums import ClaimStatus
+from app.repositories import claim_repository
+from app.services import claim_service
+
+ACTIVE = {status.value for status in claim_service.ACTIVE_STATUSES}
+
+
+class FakeSession:
+    """Lo que usa ``@transactional`` de una sesión: ``info``, commit y rollback"""
+
+    def __init__(self) -> None:
+        self.info: dict = {}
+        self.commits = 0
+        self.rollbacks = 0
+
+    def in_transaction(self) -> bool:
+        return False
+
+    def commit(self) -> None:
+        self.commits += 1
+
+    def rollback(self) -> None:
+        self.rollbacks += 1
+
+
+class FakeClaimRepository:
+    """Tabla item_claims en memoria con las restricciones únicas de la real"""
+
+    def __init__(self, item_ids: set[uuid.UUID]) -> None:
+        self.item_ids = item_ids
+        self.claims: dict[tuple[uuid.UUID, uuid.UUID], SimpleNamespace] = {}
+        self.reads = 0
+        self._interleaved: Optional[Callable[[], None]] = None
+
+    def interleave(self, concurrent: Callable[[], None]) -> None:
+        """Ejecuta ``concurrent`` tras la próxima lectura (otro request que se adelanta)."""
+        self._interleaved = concurrent
+
+    def _active_on(self, item_id: uuid.UUID, exclude: Optional[uuid.UUID] = None) -> bool:
+        return any(
+            c.item_id == item_id and c.status in ACTIVE and c.id != exclude for c in self.claims.values()
+        )
+
+    def get_for_item_and_user(self, db, item_id, user_id):
+        self.reads += 1
+        claim = self.claims.get((item_id, user_id))
+        # Copia: lo leído no cambia aunque otro request escriba después
+        result = (item_id in self.item_ids, SimpleNamespace(**vars(claim)) if claim else None)
+        concurrent, self._interleaved = self._interleaved, None
+        if concurrent is not None:
+            concurrent()
+        return result
+
+    def insert_if_absent(self, db, *, item_id, user_id, status, note):
+        if (item_id, user_id) in self.claims or (status in ACTIVE and self._active_on(item_id)):
+            return None  # ON CONFLICT DO NOTHING
+        claim = SimpleNamespace(
+            id=uuid.uuid4(), item_id=item_id, user_id=user_id, status=status, note=note, version=1
+        )
+        self.claims[(item_id, user_id)] = claim
+        return SimpleNamespace(**vars(claim))
+
+    def update_status_if_version(self, db, *, claim_id, expected_version, status, note):
+        claim = next(c for c in self.claims.values() if c.id == claim_id)
+        if claim.version != expected_version:
+            return None
+        if status in ACTIVE and self._active_on(claim.item_id, exclude=claim.id):
+            raise IntegrityError("UPDATE item_claims", {}, Exception("uq_item_claims_active_item"))
+        claim.status = status
+        claim.version += 1
+        if note is not None:
+            claim.note = note
+        return SimpleNamespace(**vars(claim))
+
+
+@pytest.fixture
+def item_id() -> uuid.UUID:
+    return uuid.uuid4()
+
+
+@pytest.fixture
+def repo(monkeypatch, item_id) -> FakeClaimRepository:
+    fake = FakeClaimRepository({item_id})
+    for name in ("get_for_item_and_user", "insert_if_absent", "update_status_if_version"):
+        monkeypatch.setattr(claim_repository, name, getattr(fake, name))
+    return fake
+
+
+def _transition(item_id, user_id, target, db=None, **kwargs):
+    return claim_service.transition(
+        db or FakeSession(), item_id=item_id, user_id=user_id, target=target, **kwargs
+    )
+
+
+def test_first_claim_is_created_and_committed(repo, item_id):
+    db = FakeSession()
+    row = _transition(item_id, uuid.uuid4(), ClaimStatus.CLAIMED, db=db)
+
+    assert (row.status, row.version) == ("claimed", 1)
+    assert db.commits == 1
+
+
+def test_unknown_item_is_not_found(repo):
+    with pytest.raises(NotFoundError):
+        _transition(uuid.uuid4(), uuid.uuid4(), ClaimStatus.CLAIMED)
+
+
+def test_invalid_transition_is_rejected(repo, item_id):
+    user_id = uuid.uuid4()
+    _transition(item_id, user_id, ClaimStatus.CLAIMED)
+    _transition(item_id, user_id, ClaimStatus.PURCHASED)
+
+    with pytest.raises(ValidationError):
+        _transition(item_id, user_id, ClaimStatus.CLAIMED)
+    assert repo.claims[(item_id, user_id)].status == "purchased"
+
+
+def test_simultaneous_first_claims_leave_one_winner(repo, item_id):
+    winner, loser = uuid.uuid4(), uuid.uuid4()
+    repo.interleave(lambda: _transition(item_id, winner, ClaimStatus.CLAIMED))
+
+    db = FakeSession()
+    with pytest.raises(ConflictError) as exc_info:
+        _transition(item_id, loser, ClaimStatus.CLAIMED, db=db)
+
+    assert exc_info.value.details["item_id"] == str(item_id)
+    assert (db.commits, db.rollbacks) == (0, 1)
+    assert [c.user_id for c in repo.claims.values() if c.status in ACTIVE] == [winner]
+    # Un conflicto no es un error transitorio: no se repite la transacción
+    assert repo.reads == 2
+
+
+def test_claiming_an_item_already_taken_conflicts(repo, item_id):
+    owner, other = uuid.uuid4(), uuid.uuid4()
+    _transition(item_id, other, ClaimStatus.INTERESTED)
+    _transition(item_id, owner, ClaimStatus.CLAIMED)
+
+    with pytest.raises(ConflictError):
+        _transition(item_id, other, ClaimStatus.CLAIMED)
+    assert repo.claims[(item_id, other)].status == "interested"
+
+
+def test_concurrent_update_of_the_same_claim_conflicts(repo, item_id):
+    user_id = uuid.uuid4()
+    _transition(item_id, user_id, ClaimStatus.INTERESTED)
+    # El mismo usuario cancela desde otra pestaña entre la lectura y el UPDATE
+    repo.interleave(lambda: _transition(item_id, user_id, ClaimStatus.CANCELLED))
+
+    with pytest.raises(ConflictError) as exc_info:
+        _transition(item_id, user_id, ClaimStatus.CLAIMED)
+
+    assert exc_info.value.details == {"expected_version": 1}
+    claim = repo.claims[(item_id, user_id)]
+    assert (claim.status, claim.version) == ("cancelled", 2)
+
+
+def test_stale_expected_version_conflicts_without_writing(repo, item_id):
+    user_id = uuid.uuid4()
+    _transition(item_id, user_id, ClaimStatus.INTERESTED)
+    _transition(item_id, user_id, ClaimStatus.CLAIMED)
+
+    with pytest.raises(ConflictError) as exc_info:
+        _transition(item_id, user_id, ClaimStatus.RELEASED, expected_version=1)
+
+    assert exc_info.value.details == {"expected_version": 1, "current_version": 2}
+    claim = repo.claims[(item_id, user_id)]
+    assert (claim.status, claim.version) == ("claimed", 2)
@@ -0,0 +1,48 @@
+"""Circuit breaker y readiness con un engine SQLite en memoria (sin PostgreSQL)."""
+import time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+
+from app.db.health import CLOSED, OPEN, CircuitBreaker, DatabaseHealth, install_breaker
+
+OPEN_SECONDS = 0.1
+
+
+@pytest.fixture
+def health() -> DatabaseHealth:
+    engine = create_engine("sqlite://")
+    breaker = CircuitBreaker(failure_threshold=2, open_seconds=OPEN_SECONDS)
+    install_breaker(engine, breaker)
+    yield DatabaseHealth(engine, breaker, max_ping_ms=1000, max_pool_saturation=1.0, stale_seconds=60)
+    engine.dispose()
+
+
+def _open_circuit(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure(OperationalError("SELECT 1", {}, Exception("connection refused")))
+    assert breaker.state == OPEN
+
+
+def test_ping_closes_circuit_after_open_seconds(health):
+    health.check()
+    _open_circuit(health.breaker)
+    assert health.readiness()[0] is False
+
+    time.sleep(OPEN_SECONDS)
+    # La base de datos vuelve; ningún request llega a get_db porque el balanceador no envía tráfico
+    health.check()
+
+    ready, details = health.readiness()
+    assert health.breaker.state == CLOSED
+    assert ready, details["reasons"]
+
+
+def test_ping_does_not_shorten_open_period(health):
+    _open_circuit(health.breaker)
+
+    health.check()
+
+    assert health.breaker.state == OPEN
+    assert health.readiness()[1]["reasons"] == ["circuit breaker open"]
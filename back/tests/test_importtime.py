@@ -0,0 +1,25 @@
+"""
+Presupuesto de arranque: falla si importar ``app.main`` se vuelve más lento
+que ``STARTUP_IMPORT_BUDGET_MS`` o si vuelven a cargarse al importar los
+módulos que se difieren hasta su primer uso.
+"""
+import statistics
+
+from app.cli.importtime import module_total_us, profile_imports
+from app.core.config import settings
+
+# Se importan dentro de las funciones que los usan (login, JWT, scraper, Redis)
+DEFERRED_PACKAGES = {"jose", "passlib", "bcrypt", "cryptography", "httpx", "redis"}
+
+
+def test_import_within_budget():
+    # Mediana de varias ejecuciones: una sola puede salir lenta por la caché de disco
+    totals_ms = [module_total_us(profile_imports("app.main").records, "app.main") / 1000 for _ in range(3)]
+
+    assert statistics.median(totals_ms) <= settings.STARTUP_IMPORT_BUDGET_MS, totals_ms
+
+
+def test_deferred_packages_not_imported():
+    imported = {record.module.split(".", 1)[0] for record in profile_imports("app.main").records}
+
+    assert not imported & DEFERRED_PACKAGES
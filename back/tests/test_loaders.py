@@ -0,0 +1,60 @@
+"""DataLoaders del request: los usuarios de los claims de un item se piden en una consulta."""
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.exceptions import NotFoundError
+from app.repositories import claim_repository, item_repository, user_repository
+from app.schemas.claim import ClaimWithUser
+from app.services import claim_service
+from app.services.loaders import Loaders
+
+
+def _claim_row(item_id: uuid.UUID, user_id: uuid.UUID) -> SimpleNamespace:
+    """Lo que usa el servicio de una fila de ``claim_repository.list_for_item``"""
+    now = datetime.now(timezone.utc)
+    mapping = {
+        "id": uuid.uuid4(), "item_id": item_id, "user_id": user_id, "status": "interested",
+        "note": None, "version": 1, "created_at": now, "updated_at": now,
+    }
+    return SimpleNamespace(_mapping=mapping, **mapping)
+
+
+@pytest.fixture
+def data(monkeypatch):
+    item_id = uuid.uuid4()
+    alice, bob, deleted = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    users = {
+        alice: SimpleNamespace(id=alice, display_name="Alice", avatar_url="https://cdn.example.com/a.png"),
+        bob: SimpleNamespace(id=bob, display_name="Bob", avatar_url=None),
+    }
+    # Bob aparece dos veces (p. ej. en dos items de la misma pantalla): se pide una vez
+    rows = [_claim_row(item_id, user_id) for user_id in (alice, bob, deleted, bob)]
+    user_batches = []
+
+    def get_many_users(db, ids):
+        user_batches.append(list(ids))
+        return [users[key] for key in ids if key in users]
+
+    monkeypatch.setattr(user_repository, "get_many", get_many_users)
+    monkeypatch.setattr(
+        item_repository, "get_many", lambda db, ids: [SimpleNamespace(id=key) for key in ids if key == item_id]
+    )
+    monkeypatch.setattr(claim_repository, "list_for_item", lambda db, key: rows if key == item_id else [])
+    return SimpleNamespace(item_id=item_id, user_batches=user_batches, alice=alice, bob=bob, deleted=deleted)
+
+
+def test_claim_users_are_loaded_in_one_batch(data):
+    claims = claim_service.list_for_item(Loaders(db=None), data.item_id)
+
+    assert data.user_batches == [[data.alice, data.bob, data.deleted]]
+    response = [ClaimWithUser.model_validate(claim) for claim in claims]
+    assert [claim.user and claim.user.display_name for claim in response] == ["Alice", "Bob", None, "Bob"]
+    assert response[0].user.avatar_url == "https://cdn.example.com/a.png"
+
+
+def test_unknown_item_is_not_found(data):
+    with pytest.raises(NotFoundError):
+        claim_service.list_for_item(Loaders(db=None), uuid.uuid4())
@@ -0,0 +1,235 @@
+"""
+Scraper contra un servidor HTTP falso en 127.0.0.1
+
+El servidor sirve páginas de producto (JSON-LD, Open Graph, microdatos),
+una página que falla la primera vez, una lenta y redirecciones. Como
+escucha en loopback, los clientes de las pruebas usan
+``allow_private_hosts=True`` salvo en las que comprueban ese bloqueo.
+"""
+import asyncio
+import json
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.scraper import fetcher as fetcher_module
+from app.scraper.fetcher import FetchError, Fetcher, ResultCache, Scraper
+from app.scraper.pipeline import EnrichmentPipeline
+
+PAGES = {
+    "/product/jsonld": '<html><head><script type="application/ld+json">{}</script></head></html>'.format(
+        json.dumps({
+            "@context": "https://schema.org", "@type": "Product", "name": "Cafetera",
+            "brand": {"@type": "Brand", "name": "Acme"}, "image": "/img/1.jpg",
+            "offers": {"@type": "Offer", "price": "89.99", "priceCurrency": "EUR"},
+        })
+    ),
+    "/product/og": (
+        '<html><head><meta property="og:title" content="Cafetera">'
+        '<meta property="og:image" content="https://cdn.example.com/1.jpg">'
+        '<meta property="product:brand" content="Acme">'
+        '<meta property="product:price:amount" content="89,99">'
+        '<meta property="product:price:currency" content="eur"></head></html>'
+    ),
+    "/product/microdata": (
+        '<html><head><title>Cafetera</title></head><body itemscope>'
+        '<span itemprop="brand">Acme</span><img itemprop="image" src="/img/1.jpg">'
+        '<meta itemprop="price" content="89.99"><meta itemprop="priceCurrency" content="EUR"></body></html>'
+    ),
+}
+
+
+class FakeShop:
+    """Estado del servidor falso: visitas por ruta y descargas simultáneas"""
+
+    def __init__(self) -> None:
+        self.hits: Counter = Counter()
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+
+def _make_handler(shop: FakeShop):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args) -> None:
+            pass
+
+        def do_GET(self) -> None:
+            path = self.path.split("?", 1)[0]
+            with shop.lock:
+                shop.hits[path] += 1
+                hits = shop.hits[path]
+                shop.active += 1
+                shop.max_active = max(shop.max_active, shop.active)
+            try:
+                time.sleep(1.0 if path == "/slow" else 0.02)
+                if path == "/flaky" and hits == 1:
+                    self._send(503, "Service Unavailable", "text/plain")
+                elif path in ("/flaky", "/slow"):
+                    self._send(200, PAGES["/product/jsonld"])
+                elif path == "/metadata":
+                    self._redirect("http://169.254.169.254/latest/meta-data/")
+                elif path == "/loop":
+                    self._redirect("/loop")
+                elif path in PAGES:
+                    self._send(200, PAGES[path])
+                elif path.startswith("/product/"):
+                    self._send(200, PAGES["/product/jsonld"])
+                else:
+                    self._send(404, "Not Found", "text/plain")
+            finally:
+                with shop.lock:
+                    shop.active -= 1
+
+        def _redirect(self, location: str) -> None:
+            self.send_response(302)
+            self.send_header("Location", location)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def _send(self, status: int, body: str, content_type: str = "text/html; charset=utf-8") -> None:
+            payload = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    return Handler
+
+
+@pytest.fixture
+def shop():
+    shop = FakeShop()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(shop))
+    server.daemon_threads = True
+    # Intervalo corto: shutdown() espera a la siguiente comprobación del bucle
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    shop.base = f"http://127.0.0.1:{server.server_address[1]}"
+    yield shop
+    server.shutdown()
+    server.server_close()
+
+
+def _scraper(**kwargs) -> Scraper:
+    options = {"timeout_seconds": 0.5, "retries": 2, "backoff_seconds": 0.01, "allow_private_hosts": True}
+    return Scraper(Fetcher(**{**options, **kwargs}), ResultCache())
+
+
+async def _scrape_all(scraper: Scraper, urls: list[str]) -> list:
+    try:
+        return await asyncio.gather(*(scraper.scrape(url) for url in urls))
+    finally:
+        await scraper.fetcher.aclose()
+
+
+@pytest.mark.parametrize("path", ["/product/jsonld", "/product/og", "/product/microdata"])
+def test_extracts_product_fields(shop, path):
+    [product] = asyncio.run(_scrape_all(_scraper(), [shop.base + path]))
+
+    assert (product.name, product.brand, product.price_cents, product.currency) == ("Cafetera", "Acme", 8999, "EUR")
+    assert product.image_url.startswith(("http://127.0.0.1", "https://cdn.example.com"))
+
+
+def test_url_variants_are_fetched_once_within_domain_limit(shop):
+    urls = [
+        variant.format(base=shop.base, n=n)
+        for n in range(6)
+        for variant in (
+            "{base}/product/{n}",
+            "{base}/product/{n}/",
+            "{base}/product/{n}?utm_source=newsletter",
+            "{base}/product/{n}#reviews",
+        )
+    ]
+    scraper = _scraper(per_domain_concurrency=2)
+
+    products = asyncio.run(_scrape_all(scraper, urls))
+
+    assert all(product is not None for product in products)
+    assert dict(shop.hits) == {f"/product/{n}": 1 for n in range(6)}
+    assert shop.max_active <= 2
+
+
+def test_retries_server_errors(shop):
+    [product] = asyncio.run(_scrape_all(_scraper(), [f"{shop.base}/flaky"]))
+
+    assert product is not None
+    assert shop.hits["/flaky"] == 2
+
+
+def test_timeout_gives_up_without_result(shop):
+    [product] = asyncio.run(_scrape_all(_scraper(retries=0, timeout_seconds=0.2), [f"{shop.base}/slow"]))
+
+    assert product is None
+
+
+def test_rejects_loopback_by_default(shop):
+    scraper = _scraper(allow_private_hosts=False)
+
+    [product] = asyncio.run(_scrape_all(scraper, [f"{shop.base}/product/jsonld"]))
+
+    assert product is None
+    assert not shop.hits
+
+
+def test_rejects_redirect_to_private_address(shop, monkeypatch):
+    async def resolve(host, port):
+        # 127.0.0.1 pasa por una tienda pública; la redirección apunta a los metadatos del proveedor cloud
+        return ["93.184.216.34"] if host == "127.0.0.1" else [host]
+
+    monkeypatch.setattr(fetcher_module, "_resolve", resolve)
+    fetcher = Fetcher(retries=0, timeout_seconds=0.5)
+
+    async def fetch():
+        try:
+            await fetcher.fetch(f"{shop.base}/metadata")
+        finally:
+            await fetcher.aclose()
+
+    with pytest.raises(FetchError, match="host no permitido: '169.254.169.254'"):
+        asyncio.run(fetch())
+    assert shop.hits["/metadata"] == 1
+
+
+def test_limits_redirects(shop):
+    fetcher = Fetcher(retries=0, timeout_seconds=0.5, max_redirects=3, allow_private_hosts=True)
+
+    async def fetch():
+        try:
+            await fetcher.fetch(f"{shop.base}/loop")
+        finally:
+            await fetcher.aclose()
+
+    with pytest.raises(FetchError, match="demasiadas redirecciones"):
+        asyncio.run(fetch())
+    assert shop.hits["/loop"] == 4
+
+
+def test_pipeline_submit_does_not_wait_for_the_page(shop):
+    results = {}
+
+    async def collect(item_id, product):
+        results[item_id] = product
+
+    async def run():
+        pipeline = EnrichmentPipeline(_scraper(timeout_seconds=2.0), workers=2, apply_result=collect)
+        pipeline.start()
+        slow_id, item_id = uuid.uuid4(), uuid.uuid4()
+        started = time.perf_counter()
+        # Desde otro hilo, como los endpoints síncronos del threadpool de FastAPI
+        await asyncio.to_thread(pipeline.submit, slow_id, f"{shop.base}/slow")
+        await asyncio.to_thread(pipeline.submit, item_id, f"{shop.base}/product/og")
+        submit_seconds = time.perf_counter() - started
+        await pipeline.join()
+        await pipeline.stop()
+        return submit_seconds, slow_id, item_id
+
+    submit_seconds, slow_id, item_id = asyncio.run(run())
+
+    assert submit_seconds < 0.5
+    assert set(results) == {slow_id, item_id}